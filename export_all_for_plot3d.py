@@ -9,113 +9,98 @@ Features:
 - Finds all existing analysis databases (both individual and averaged)
 - Creates clean Plot_3D files using template names
 - Generates both individual and averaged data exports
+- Exports sample sets in parallel, one sample set per worker process
+- Incremental mode skips sample sets whose databases have not changed
 - Non-destructive: preserves all original analysis data
 - User can edit/delete generated files as needed
 
 Usage:
-    python export_all_for_plot3d.py
+    python export_all_for_plot3d.py [--workers N] [--output-dir DIR] [--incremental]
 """
 
+import argparse
+import json
+import logging
 import os
 import sys
-from typing import List, Dict, Set
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional, Set
 from datetime import datetime
 
-def main():
+DEFAULT_OUTPUT_DIR = os.path.expanduser("~/Desktop/StampZ Exports")
+
+# Stored in the output directory; records the database state behind each export
+MANIFEST_NAME = ".plot3d_export_manifest.json"
+
+
+def main(argv=None):
     """Main export function that processes all existing analysis data."""
-    
+    parser = argparse.ArgumentParser(description="Export all StampZ analysis databases to Plot_3D format")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Number of sample sets to export in parallel (default: CPU count)")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help=f"Directory for the Plot_3D files (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Skip sample sets whose databases have not changed since the last export")
+    args = parser.parse_args(argv)
+
     print("=" * 60)
     print("StampZ Analysis → Plot_3D Batch Export")
     print("=" * 60)
     print()
-    
+
     try:
-        # Import the new direct exporter (bypasses problematic ODS exporter)
-        from utils.direct_plot3d_exporter import DirectPlot3DExporter
-        from utils.color_analysis_db import ColorAnalysisDB
-        
-        # Initialize the direct exporter
-        exporter = DirectPlot3DExporter()
-        
         # Find all existing analysis databases
         sample_sets = find_all_sample_sets()
-        
+
         if not sample_sets:
             print("❌ No existing analysis databases found.")
             print("\nSearched in:")
             print("  • data/color_analysis/")
             print("  • Check that you have completed some color analysis first.")
             return
-        
+
         print(f"📊 Found {len(sample_sets)} analysis database(s):")
         for sample_set in sorted(sample_sets):
             print(f"  • {sample_set}")
         print()
-        
-        # Track results
-        success_count = 0
-        error_count = 0
-        results = []
-        
-        # Process each sample set
-        for sample_set in sorted(sample_sets):
-            print(f"🔄 Processing: {sample_set}")
-            
-            try:
-                # Try to export this sample set using direct exporter
-                result = export_sample_set_to_plot3d_direct(sample_set, exporter)
-                results.append(result)
-                
-                if result['success']:
-                    success_count += 1
-                    print(f"  ✅ {result['message']}")
-                    if result.get('files_created'):
-                        for file_path in result['files_created']:
-                            print(f"     📁 {os.path.basename(file_path)}")
-                else:
-                    error_count += 1
-                    print(f"  ❌ {result['message']}")
-                    
-            except Exception as e:
-                error_count += 1
-                error_result = {
-                    'sample_set': sample_set,
-                    'success': False,
-                    'message': f"Unexpected error: {str(e)}",
-                    'files_created': []
-                }
-                results.append(error_result)
-                print(f"  ❌ Unexpected error: {str(e)}")
-            
-            print()
-        
+
+        results = run_batch_export(sorted(sample_sets), args.output_dir,
+                                   workers=args.workers, incremental=args.incremental)
+
+        success_count = sum(1 for r in results if r['success'] and not r.get('skipped'))
+        skipped_count = sum(1 for r in results if r.get('skipped'))
+        error_count = sum(1 for r in results if not r['success'])
+
         # Print summary
         print("=" * 60)
         print("📊 EXPORT SUMMARY")
         print("=" * 60)
+        print(format_summary_table(results))
+        print()
         print(f"✅ Successful exports: {success_count}")
+        if skipped_count:
+            print(f"⏭️  Unchanged (skipped): {skipped_count}")
         print(f"❌ Failed exports: {error_count}")
         print(f"📁 Total databases processed: {len(sample_sets)}")
         print()
-        
+
         # List all created files
         all_created_files = []
         for result in results:
-            if result['success'] and result.get('files_created'):
+            if result['success'] and result.get('files_created') and not result.get('skipped'):
                 all_created_files.extend(result['files_created'])
-        
+
         if all_created_files:
             print("📁 Files created for Plot_3D:")
-            exports_dir = os.path.join(os.getcwd(), "exports")
             for file_path in sorted(all_created_files):
-                # Show relative path for cleaner output
-                rel_path = os.path.relpath(file_path, os.getcwd())
                 file_size = get_file_size_mb(file_path)
-                print(f"  • {rel_path} ({file_size})")
+                print(f"  • {os.path.basename(file_path)} ({file_size})")
             print()
-            print(f"📂 Location: {exports_dir}")
+            print(f"📂 Location: {args.output_dir}")
             print()
-            
+
         # Usage instructions
         print("🚀 NEXT STEPS:")
         print("1. Launch Plot_3D from your StampZ app")
@@ -125,7 +110,7 @@ def main():
         print()
         print("💡 TIP: Files are named using template names (e.g., '137_Plot3D.ods')")
         print("    You can edit, rename, or delete these files as needed.")
-        
+
     except ImportError as e:
         print(f"❌ Import Error: {e}")
         print("Make sure all required modules are available.")
@@ -135,18 +120,96 @@ def main():
         sys.exit(1)
 
 
+def run_batch_export(sample_sets: List[str], output_dir: str, workers: int = 1,
+                     incremental: bool = False) -> List[Dict]:
+    """Export sample sets to Plot_3D, fanning out across a process pool.
+
+    Args:
+        sample_sets: Sample set names (without _averages suffix)
+        output_dir: Directory for the Plot_3D files
+        workers: Number of worker processes; 1 exports in this process
+        incremental: Skip sample sets whose databases match the stored manifest
+
+    Returns:
+        One result dict per sample set, in the order given
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    prefixes = assign_file_prefixes(sample_sets)
+
+    results = {}
+    pending = []
+    for sample_set in sample_sets:
+        entry = manifest.get(sample_set)
+        if incremental and entry and entry.get('databases') == database_signature(sample_set) \
+                and entry.get('files') and all(os.path.exists(f) for f in entry['files']):
+            print(f"⏭️  Unchanged since last export: {sample_set}")
+            results[sample_set] = {
+                'sample_set': sample_set, 'success': True, 'skipped': True,
+                'message': "Unchanged since last export", 'files_created': entry['files'],
+                'rows_written': 0, 'seconds': 0.0,
+            }
+        else:
+            pending.append(sample_set)
+
+    def record(result):
+        results[result['sample_set']] = result
+        if result['success']:
+            print(f"  ✅ {result['sample_set']}: {result['message']}")
+            # Signed after the export, since exporting creates the averages
+            # database when missing; saved after every sample set so an
+            # interrupted run keeps its progress
+            manifest[result['sample_set']] = {
+                'databases': database_signature(result['sample_set']),
+                'files': result['files_created'],
+                'exported_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            save_manifest(manifest_path, manifest)
+        else:
+            print(f"  ❌ {result['sample_set']}: {result['message']}")
+
+    if pending:
+        print(f"🔄 Exporting {len(pending)} sample set(s) with {max(1, min(workers, len(pending)))} worker(s)")
+
+    if workers <= 1 or len(pending) <= 1:
+        for sample_set in pending:
+            record(export_sample_set_to_plot3d_direct(sample_set, output_dir, prefixes[sample_set]))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = {
+                pool.submit(export_sample_set_to_plot3d_direct, sample_set, output_dir, prefixes[sample_set]):
+                    sample_set
+                for sample_set in pending
+            }
+            for future in as_completed(futures):
+                sample_set = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {
+                        'sample_set': sample_set, 'success': False,
+                        'message': f"Unexpected error: {str(e)}", 'files_created': [],
+                        'rows_written': 0, 'seconds': 0.0,
+                    }
+                record(result)
+    print()
+
+    return [results[sample_set] for sample_set in sample_sets]
+
+
 def find_all_sample_sets() -> Set[str]:
     """Find all existing sample set databases.
-    
+
     Returns:
         Set of sample set names (without _averages suffix)
     """
     try:
         from utils.color_analysis_db import ColorAnalysisDB
-        
+
         # Get all sample set databases
         all_databases = ColorAnalysisDB.get_all_sample_set_databases()
-        
+
         # Extract base sample set names (remove _averages suffix)
         sample_sets = set()
         for db_name in all_databases:
@@ -155,52 +218,158 @@ def find_all_sample_sets() -> Set[str]:
                 sample_sets.add(base_name)
             else:
                 sample_sets.add(db_name)
-        
+
         return sample_sets
-        
+
     except Exception as e:
         print(f"Error finding sample sets: {e}")
         return set()
 
 
-def export_sample_set_to_plot3d_direct(sample_set: str, exporter) -> Dict:
+def assign_file_prefixes(sample_sets: List[str]) -> Dict[str, str]:
+    """Choose output file prefixes so no two sample sets write the same file.
+
+    Names that differ only in case collide on case-insensitive file systems
+    (the default on macOS and Windows); later ones get a numeric suffix.
+    """
+    prefixes = {}
+    used = set()
+    for sample_set in sample_sets:
+        prefix = sample_set
+        counter = 2
+        while prefix.casefold() in used:
+            prefix = f"{sample_set}_{counter}"
+            counter += 1
+        used.add(prefix.casefold())
+        prefixes[sample_set] = prefix
+    return prefixes
+
+
+def database_signature(sample_set: str) -> Dict[str, List[int]]:
+    """Size and modification time of the databases behind a sample set."""
+    from utils.color_analysis_db import ColorAnalysisDB
+
+    data_dir = ColorAnalysisDB.get_color_analysis_directory()
+
+    signature = {}
+    for db_name in (sample_set, f"{sample_set}_averages"):
+        path = os.path.join(data_dir, f"{db_name}.db")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature[f"{db_name}.db"] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def load_manifest(path: str) -> Dict:
+    """Load the export manifest, or an empty one if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path: str, manifest: Dict):
+    """Write the export manifest atomically."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def export_sample_set_to_plot3d_direct(sample_set: str, output_dir: str,
+                                       file_prefix: Optional[str] = None) -> Dict:
     """Export a single sample set to Plot_3D format using direct exporter.
-    
+
+    Runs in a worker process, so it creates its own DirectPlot3DExporter.
+
     Args:
         sample_set: Name of the sample set to export
-        exporter: DirectPlot3DExporter instance
-        
+        output_dir: Directory for the Plot_3D files
+        file_prefix: Output file name prefix (default: the sample set name)
+
     Returns:
-        Dict with success status, message, and created files
+        Dict with success status, message, created files, rows written and seconds taken
     """
     result = {
         'sample_set': sample_set,
         'success': False,
         'message': '',
-        'files_created': []
+        'files_created': [],
+        'rows_written': 0,
+        'seconds': 0.0,
     }
-    
+    started = time.perf_counter()
+
     try:
+        from utils.direct_plot3d_exporter import DirectPlot3DExporter
+        from utils.plot3d_append import DATA_START_ROW, Plot3DIndex, get_plot3d_index
+
+        # Keep per-worker output to warnings; progress is reported by the parent
+        logger = logging.getLogger(f"{__name__}.worker")
+        if not logger.handlers:
+            logger.addHandler(logging.StreamHandler())
+            logger.setLevel(logging.WARNING)
+        exporter = DirectPlot3DExporter(logger=logger)
+
+        # Note where each output file currently ends so new rows can be counted
+        prefix = file_prefix or sample_set
+        rows_before = {}
+        for name in (f"{prefix}_Plot3D.ods", f"{prefix}_Averages_Plot3D.ods"):
+            path = os.path.join(output_dir, name)
+            rows_before[path] = get_plot3d_index(path).next_row if os.path.exists(path) else DATA_START_ROW
+
         # Use the direct exporter to create Plot_3D files
         # This bypasses the problematic ODS intermediate step
         created_files = exporter.export_to_plot3d(
             sample_set_name=sample_set,
+            output_dir=output_dir,
             export_individual=True,
-            export_averages=True
+            export_averages=True,
+            file_prefix=prefix
         )
-        
+
+        for path in created_files:
+            index = Plot3DIndex.load(path)
+            if index is not None:
+                result['rows_written'] += index.next_row - rows_before.get(path, DATA_START_ROW)
+
         if created_files:
             result['success'] = True
             result['files_created'] = created_files
-            result['message'] = f"Successfully exported {len(created_files)} file(s)"
+            result['message'] = f"Exported {result['rows_written']} new row(s) to {len(created_files)} file(s)"
         else:
             result['message'] = f"No data found for sample set '{sample_set}'"
-            
-        return result
-        
+
     except Exception as e:
         result['message'] = f"Export failed: {str(e)}"
-        return result
+
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def format_summary_table(results: List[Dict]) -> str:
+    """Format per-sample-set results as a plain-text table."""
+    headers = ("Sample set", "Status", "Files", "Rows", "Time (s)")
+    rows = []
+    for result in results:
+        status = "skipped" if result.get('skipped') else ("ok" if result['success'] else "failed")
+        rows.append((result['sample_set'], status, str(len(result.get('files_created', []))),
+                     str(result.get('rows_written', 0)), f"{result.get('seconds', 0.0):.2f}"))
+    rows.append(("Total", "", str(sum(int(r[2]) for r in rows)), str(sum(int(r[3]) for r in rows)),
+                 f"{sum(r.get('seconds', 0.0) for r in results):.2f}"))
+
+    widths = [max(len(row[i]) for row in [headers] + rows) for i in range(len(headers))]
+
+    def line(row):
+        return "  ".join(value.ljust(widths[i]) if i < 2 else value.rjust(widths[i])
+                         for i, value in enumerate(row))
+
+    separator = "  ".join("-" * width for width in widths)
+    return "\n".join([line(headers), separator] + [line(row) for row in rows[:-1]] + [separator, line(rows[-1])])
 
 
 def get_file_size_mb(file_path: str) -> str:
@@ -276,21 +276,35 @@ class CanvasCore:
             if display_width < 1 or display_height < 1:
                 return
             
-            # Resize image for display
+            # Only the part of the scaled image inside the canvas is resized,
+            # so a zoomed-in large scan costs no more than the window
+            offset_x, offset_y = self.image_offset
+            visible_left = max(0, -offset_x)
+            visible_top = max(0, -offset_y)
+            visible_right = min(display_width, max(self.canvas.winfo_width(), 1) - offset_x)
+            visible_bottom = min(display_height, max(self.canvas.winfo_height(), 1) - offset_y)
+            
+            # Clear previous image
+            self.canvas.delete('image')
+            if visible_right <= visible_left or visible_bottom <= visible_top:
+                return  # Panned entirely out of view
+            
+            # Resize the visible region of the image for display
+            scale_x = self.original_image.width / display_width
+            scale_y = self.original_image.height / display_height
             resized_image = self.original_image.resize(
-                (display_width, display_height),
-                Image.Resampling.LANCZOS
+                (visible_right - visible_left, visible_bottom - visible_top),
+                Image.Resampling.LANCZOS,
+                box=(visible_left * scale_x, visible_top * scale_y,
+                     visible_right * scale_x, visible_bottom * scale_y)
             )
             
             # Convert to PhotoImage
             self.display_image = ImageTk.PhotoImage(resized_image)
             
-            # Clear previous image
-            self.canvas.delete('image')
-            
             # Draw new image
             self.canvas.create_image(
-                self.image_offset[0], self.image_offset[1],
+                offset_x + visible_left, offset_y + visible_top,
                 anchor=tk.NW,
                 image=self.display_image,
                 tags='image'
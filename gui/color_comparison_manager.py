@@ -8,7 +8,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import List, Optional, Tuple, Dict, Any
 import os
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 # Add project root to path for imports
 import sys
@@ -49,7 +49,9 @@ class ColorComparisonManager(tk.Frame):
         # Initialize instance variables
         self.parent = parent
         self.library = None
-        self.current_image = None
+        self.library_index = None  # Merged index used for "All Libraries"
+        self.current_image = None  # Opened for region reads only when a sample must be re-measured
+        self.current_image_path = None
         self.sample_points = []
         self.delta_e_threshold = 15.0  # Increased threshold for testing
         
@@ -217,48 +219,54 @@ class ColorComparisonManager(tk.Frame):
             self.filename_label.config(text=filename)
             print(f"DEBUG: Updated filename display: {filename}")
             
-            # Load the image (needed for color sampling)
-            self.current_image = Image.open(image_path)
-            
-            # Create color analyzer
+            # Samples already measured on this image (e.g. by the main
+            # window's analysis) come from the shared cache; the image is
+            # only opened if some sample area still has to be measured
+            from utils.analysis_cache import get_analysis_cache, sample_geometry
             from utils.color_analyzer import ColorAnalyzer
+            from utils.coordinate_db import SampleAreaType
+            from utils.tiled_image import TiledImage
+            
+            cache = get_analysis_cache()
+            image_key = cache.image_key(image_path)
             analyzer = ColorAnalyzer()
+            self.current_image = None
+            self.current_image_path = image_path
+            
+            class TempCoord:
+                def __init__(self, x, y, sample_type, size, anchor):
+                    self.x = x
+                    self.y = y
+                    self.sample_type = SampleAreaType.CIRCLE if sample_type == 'circle' else SampleAreaType.RECTANGLE
+                    self.sample_size = size
+                    self.anchor_position = anchor
             
             # Process each sample
             self.sample_points = []
             
             for i, sample in enumerate(sample_data, 1):
                 try:
-                    print(f"DEBUG: Processing sample {i}")
-                    # Create a temporary coordinate point for sampling
-                    from utils.coordinate_db import SampleAreaType
-                    
-                    class TempCoord:
-                        def __init__(self, x, y, sample_type, size, anchor):
-                            self.x = x
-                            self.y = y
-                            self.sample_type = SampleAreaType.CIRCLE if sample_type == 'circle' else SampleAreaType.RECTANGLE
-                            self.sample_size = size
-                            self.anchor_position = anchor
-                    
                     # Extract position and parameters
                     x, y = sample['position']
-                    temp_coord = TempCoord(
-                        x=x,
-                        y=y,
-                        sample_type=sample['type'],
-                        size=sample['size'],
-                        anchor=sample['anchor']
-                    )
+                    geometry = sample_geometry(x, y, sample['type'], *sample['size'], sample['anchor'])
+                    result = cache.get(image_key, analyzer.print_type.name, geometry)
                     
-                    # Sample the color
-                    rgb_values = analyzer._sample_area_color(self.current_image, temp_coord)
-                    if rgb_values:
-                        avg_rgb = analyzer._calculate_average_color(rgb_values)
+                    if result is None:
+                        if self.current_image is None:
+                            self.current_image = TiledImage.open(image_path)
                         
+                        # Sample the color
+                        temp_coord = TempCoord(x, y, sample['type'], sample['size'], sample['anchor'])
+                        rgb_values = analyzer._sample_area_color(self.current_image, temp_coord)
+                        if rgb_values:
+                            avg_rgb = analyzer._calculate_average_color(rgb_values)
+                            result = (avg_rgb, analyzer.rgb_to_lab(avg_rgb))
+                            cache.put(image_key, analyzer.print_type.name, geometry, *result)
+                    
+                    if result:
                         # Store the sample point data
                         sample_point = {
-                            'rgb': avg_rgb,
+                            'rgb': result[0],
                             'position': (x, y),
                             'enabled': tk.BooleanVar(value=True),
                             'index': i,
@@ -267,7 +275,6 @@ class ColorComparisonManager(tk.Frame):
                             'anchor': sample['anchor']
                         }
                         self.sample_points.append(sample_point)
-                        print(f"DEBUG: Added sample {i} with RGB: {avg_rgb}, enabled: {sample_point['enabled'].get()}")
                 except Exception as e:
                     print(f"DEBUG: Error processing sample {i}: {str(e)}")
                     continue
@@ -570,7 +577,7 @@ class ColorComparisonManager(tk.Frame):
                 return
             
             # Check if we have a current image loaded
-            if not self.current_image or not hasattr(self, 'filename_label'):
+            if not self.current_image_path or not hasattr(self, 'filename_label'):
                 messagebox.showerror("Error", "No image data available")
                 return
             
@@ -952,8 +959,17 @@ class ColorComparisonManager(tk.Frame):
                     # Load the first library as primary
                     self.library = ColorLibrary(library_list[0])
                     
-                    # Load all libraries for comparison
-                    self.all_libraries = [ColorLibrary(lib) for lib in library_list]
+                    # Load all libraries for comparison into one merged index,
+                    # reusing libraries that are already indexed
+                    if self.library_index is None:
+                        from utils.color_match_index import LibraryMatchIndex
+                        self.library_index = LibraryMatchIndex()
+                    for lib in set(self.library_index.library_names) - set(library_list):
+                        self.library_index.remove_library(lib)
+                    for lib in library_list:
+                        if lib not in self.library_index.library_names:
+                            self.library_index.add_library(ColorLibrary(lib))
+                    self.all_libraries = self.library_index.libraries
                     print(f"Loaded {len(self.all_libraries)} libraries for comparison")
                 else:
                     print("No libraries found for 'All Libraries' option")
@@ -1005,25 +1021,13 @@ class ColorComparisonManager(tk.Frame):
             widget.destroy()
         
         try:
-            if library_name == "All Libraries" and hasattr(self, 'all_libraries'):
-                # Combine results from all libraries
-                all_matches = []
-                for lib in self.all_libraries:
-                    # Get matches from this library with library name included
-                    lib_matches = lib.find_closest_matches(
-                        sample_lab=avg_lab,
-                        max_delta_e=self.delta_e_threshold,
-                        max_results=5,  # Get more from each library
-                        include_library_name=True
-                    )
-                    # Set the library name for each match
-                    for match in lib_matches:
-                        match.library_name = lib.library_name
-                    all_matches.extend(lib_matches)
-                
-                # Sort combined matches by delta_e
-                all_matches.sort(key=lambda x: x.delta_e_2000)
-                matches = all_matches[:5]  # Take top 5
+            if library_name == "All Libraries" and self.library_index is not None:
+                # Top matches across all libraries in a single pass
+                matches, _ = self.library_index.query(
+                    avg_lab,
+                    max_delta_e=self.delta_e_threshold,
+                    top_k=5
+                )
             else:
                 # Compare with single library
                 result = self.library.compare_sample_to_library(
@@ -45,11 +45,41 @@ class ColorDisplay(tk.Frame):
         self.name_label.pack(anchor="w", pady=(2, 5))
         
         # L*a*b* and RGB values
-        if color_info:
-            info_lines = color_info.split('\n')
-            for line in info_lines:
-                self.info_label = ttk.Label(info_frame, text=line, font=("Arial", 14))
-                self.info_label.pack(anchor="w", pady=1)
+        self.info_frame = info_frame
+        self.info_labels = []
+        self._set_info_lines(color_info)
+    
+    def set_color(self, color_rgb: Tuple[float, float, float],
+                  color_name: str, color_info: str = "", notes: str = ""):
+        """Show a different color in this widget without recreating it.
+        
+        Used by virtualized lists that recycle a fixed pool of rows.
+        """
+        self.color_rgb = color_rgb
+        self.color_name = color_name
+        self.color_info = color_info
+        self.notes = notes
+        
+        self.color_frame.configure(bg=self._rgb_to_hex(color_rgb))
+        self.name_label.configure(text=color_name)
+        self._set_info_lines(color_info)
+    
+    def _set_info_lines(self, color_info: str):
+        """Create or reuse one label per line of color information."""
+        info_lines = color_info.split('\n') if color_info else []
+        
+        # Reuse existing labels, creating or removing only the difference
+        while len(self.info_labels) < len(info_lines):
+            label = ttk.Label(self.info_frame, font=("Arial", 14))
+            label.pack(anchor="w", pady=1)
+            self.info_labels.append(label)
+        while len(self.info_labels) > len(info_lines):
+            self.info_labels.pop().destroy()
+        
+        for label, line in zip(self.info_labels, info_lines):
+            label.configure(text=line)
+        
+        self.info_label = self.info_labels[-1] if self.info_labels else None
     
     def _rgb_to_hex(self, rgb: Tuple[float, float, float]) -> str:
         """Convert RGB values to hex color string."""
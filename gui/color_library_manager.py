@@ -15,11 +15,80 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.color_library import ColorLibrary, LibraryColor
+from utils.color_search_index import ColorSearchIndex
+from utils.task_runner import get_task_runner
 from gui.color_comparison_manager import ColorComparisonManager
 from gui.color_display import ColorDisplay
 
 __all__ = ['ColorLibraryManager']
 
+# Height in pixels of one color row (120 px swatch plus padding)
+COLOR_ROW_HEIGHT = 126
+
+
+class _ColorRow(ttk.Frame):
+    """One recyclable row of the library color list."""
+    
+    def __init__(self, parent, manager: 'ColorLibraryManager', swatch_width: int):
+        super().__init__(parent)
+        self.color = None
+        
+        self.color_display = ColorDisplay(
+            self,
+            (255, 255, 255),
+            "",
+            "",
+            width=swatch_width,
+            height=120  # Increased height to show color values properly
+        )
+        self.color_display.pack(side=tk.LEFT, fill=tk.Y, pady=1, padx=(2, 0))
+        
+        # Simplified notes display
+        notes_frame = ttk.LabelFrame(self, text="Notes", width=250)
+        notes_frame.pack(side=tk.LEFT, padx=(5, 2), pady=1, fill=tk.Y)
+        notes_frame.pack_propagate(False)  # Keep fixed width
+        
+        # Simple label instead of text widget for better performance
+        self.notes_label = ttk.Label(notes_frame, text="", wraplength=230,
+                                     font=("Arial", 9), foreground="gray")
+        self.notes_label.pack(padx=5, pady=2, anchor="w")
+        
+        # Button frame - positioned after notes
+        button_frame = ttk.Frame(self)
+        button_frame.pack(side=tk.LEFT, padx=2)
+        
+        # Buttons act on whichever color the row currently shows
+        ttk.Button(
+            button_frame,
+            text="Edit",
+            width=6,
+            command=lambda: self.color and manager._edit_color(self.color)
+        ).pack(pady=1)
+        ttk.Button(
+            button_frame,
+            text="Delete",
+            width=6,
+            command=lambda: self.color and manager._delete_color(self.color)
+        ).pack(pady=1)
+        
+        manager._add_color_context_menu(self.color_display, self)
+    
+    def show_color(self, color: LibraryColor):
+        """Display color in this row."""
+        self.color = color
+        
+        # Show color information based on user preferences
+        from utils.color_display_utils import get_conditional_color_info
+        color_info = get_conditional_color_info(color.rgb, color.lab)
+        self.color_display.set_color(color.rgb, color.name, color_info)
+        
+        if color.notes and color.notes.strip():
+            notes_text = color.notes[:80] + "..." if len(color.notes) > 80 else color.notes
+        else:
+            notes_text = "No notes"
+        self.notes_label.configure(text=notes_text)
+
+
 class ColorLibraryManager:
     """Color library management interface."""
     
@@ -119,7 +188,7 @@ class ColorLibraryManager:
         self.add_color_btn = ttk.Button(library_row, text="Add Color", command=self._add_color_dialog)
         self.add_color_btn.pack(side=tk.RIGHT, padx=(5, 0))
         
-        # Search and pagination row
+        # Search row
         search_row = ttk.Frame(controls_frame)
         search_row.pack(fill=tk.X, pady=(0, 5))
         
@@ -131,16 +200,12 @@ class ColorLibraryManager:
         self.search_entry.bind('<KeyRelease>', self._on_search_changed)
         ttk.Button(search_row, text="Clear", command=self._clear_search).pack(side=tk.LEFT, padx=(0, 10))
         
-        # Pagination controls
+        # Result count
         self.page_info_label = ttk.Label(search_row, text="")
         self.page_info_label.pack(side=tk.RIGHT, padx=(5, 0))
         
-        self.load_more_btn = ttk.Button(search_row, text="Load More", command=self._load_more_colors)
-        self.load_more_btn.pack(side=tk.RIGHT, padx=(5, 0))
-        
-        # Initialize pagination variables
-        self.current_page = 0
-        self.page_size = 50
+        # Search state; the index is rebuilt whenever the library contents change
+        self.search_index = None
         self.filtered_colors = []
         self.search_term = ""
         
@@ -151,7 +216,7 @@ class ColorLibraryManager:
         
         # Removed category filter dropdown as it's not needed
         
-        # Create main display frame with proper structure for scrolling
+        # Create main display frame for the color list
         self.display_frame = ttk.Frame(self.library_frame)
         self.display_frame.pack(fill=tk.BOTH, expand=True)
         
@@ -159,22 +224,27 @@ class ColorLibraryManager:
         self.library_frame.rowconfigure(0, weight=1)
         self.library_frame.columnconfigure(0, weight=1)
         
-        # Create and configure scroll manager for color display
-        from .scroll_manager import ScrollManager
-        self.scroll_manager = ScrollManager(self.display_frame)
-        
-        # Configure content frame
-        self.colors_scroll_frame = self.scroll_manager.content_frame
-        self.colors_scroll_frame.columnconfigure(0, weight=1)
+        # Virtualized list: only the rows in view exist, and they are recycled while scrolling
+        from .scroll_manager import VirtualListManager
+        self.color_list = VirtualListManager(
+            self.display_frame,
+            row_height=COLOR_ROW_HEIGHT,
+            row_factory=self._create_color_row,
+            row_binder=lambda row, color: row.show_color(color)
+        )
         
         # Store canvas reference for compatibility
-        self.colors_canvas = self.scroll_manager.canvas
+        self.colors_canvas = self.color_list.canvas
         
         # Configure display frame
         self.display_frame.configure(height=600)
         self.display_frame.pack_propagate(False)
-        
-        # No need for additional configuration as ScrollManager handles all scrolling
+    
+    def _create_color_row(self, parent) -> _ColorRow:
+        """Create one pooled row widget for the color list."""
+        window_width = self.root.winfo_width() or 800  # Default if not available
+        frame_width = window_width - 120  # Account for scrollbar and padding
+        return _ColorRow(parent, self, swatch_width=min(frame_width - 400, 1200))
     
     def _create_comparison_tab(self):
         """Create the color comparison tab."""
@@ -342,134 +412,45 @@ class ColorLibraryManager:
         # Just update the categories for use in other parts of the interface
         self.categories = ["All"] + self.library.get_categories()
     
-    def _update_colors_display(self, reset_pagination=True):
-        """Update the colors display in the library tab."""
+    def _update_colors_display(self):
+        """Reload the library colors and refresh the library tab list."""
         if not self.library:
             return
         
-        # Get and sort all colors
+        # Read and sort the library once, then index it for searching
         all_colors = self.library.get_all_colors()
         all_colors.sort(key=lambda x: (x.category, x.name))
+        self.search_index = ColorSearchIndex(all_colors)
         
-        # Apply search filter if active
-        if hasattr(self, 'search_term') and self.search_term:
-            self.filtered_colors = [color for color in all_colors if 
-                                  self.search_term.lower() in color.name.lower() or
-                                  (color.notes and self.search_term.lower() in color.notes.lower()) or
-                                  self.search_term.lower() in color.category.lower()]
-        else:
-            self.filtered_colors = all_colors
-        
-        # Reset pagination if requested
-        if reset_pagination:
-            self.current_page = 0
-        
-        # Calculate pagination
-        start_idx = self.current_page * self.page_size
-        end_idx = start_idx + self.page_size
-        colors_to_display = self.filtered_colors[start_idx:end_idx]
-        
-        # Update pagination info
-        total_colors = len(self.filtered_colors)
-        showing_count = len(colors_to_display)
-        start_num = start_idx + 1 if colors_to_display else 0
-        end_num = start_idx + showing_count
+        self._apply_search_filter(reset_scroll=False)
+    
+    def _apply_search_filter(self, reset_scroll=True):
+        """Show the colors matching the current search term."""
+        if self.search_index is None:
+            return
         
-        # Update page info label
         if self.search_term:
-            page_text = f"Showing {start_num}-{end_num} of {total_colors} matches (filtered from {len(all_colors)} total)"
+            self.filtered_colors = self.search_index.search(self.search_term)
         else:
-            page_text = f"Showing {start_num}-{end_num} of {total_colors} colors"
-        self.page_info_label.config(text=page_text)
+            self.filtered_colors = self.search_index.colors
         
-        # Enable/disable Load More button
-        if end_idx >= total_colors:
-            self.load_more_btn.config(state='disabled', text="No More")
+        # Update result count label
+        total_colors = len(self.search_index)
+        if self.search_term:
+            page_text = f"{len(self.filtered_colors)} matches (filtered from {total_colors} total)"
         else:
-            remaining = total_colors - end_idx
-            self.load_more_btn.config(state='normal', text=f"Load More ({remaining} remaining)")
-        
-        # Clear existing content only if reset
-        if reset_pagination:
-            self.scroll_manager.clear_content()
-        
-        print(f"\nDEBUG: Loading {showing_count} colors (page {self.current_page + 1})")
-        
-        # Calculate frame width once
-        window_width = self.root.winfo_width() or 800  # Default if not available
-        frame_width = window_width - 120  # Account for scrollbar and padding
-        
-        # Create frames for colors
-        for i, color in enumerate(colors_to_display):
-            # Create main frame for each color entry
-            display_frame = ttk.Frame(self.scroll_manager.content_frame)
-            display_frame.pack(fill=tk.X, pady=1, padx=2, expand=True)
-            
-            # Show color information based on user preferences
-            from utils.color_display_utils import get_conditional_color_info
-            color_info = get_conditional_color_info(color.rgb, color.lab)
-
-            # Color display on left - simplified
-            color_display = ColorDisplay(
-                display_frame,
-                color.rgb,
-                color.name,
-                color_info,
-                width=min(frame_width - 400, 1200),  # 4x wider (300 -> 1200)
-                height=120  # Increased height to show color values properly
-            )
-            color_display.pack(side=tk.LEFT, fill=tk.Y)
-
-            # Simplified notes display
-            notes_frame = ttk.LabelFrame(display_frame, text="Notes", width=250)
-            notes_frame.pack(side=tk.LEFT, padx=(5, 2), pady=1, fill=tk.Y)
-            notes_frame.pack_propagate(False)  # Keep fixed width
-
-            # Simple label instead of text widget for better performance
-            if color.notes and color.notes.strip():
-                notes_text = color.notes[:80] + "..." if len(color.notes) > 80 else color.notes
-            else:
-                notes_text = "No notes"
-            
-            notes_label = ttk.Label(notes_frame, text=notes_text, wraplength=230, 
-                                  font=("Arial", 9), foreground="gray")
-            notes_label.pack(padx=5, pady=2, anchor="w")
-
-            # Button frame - positioned after notes
-            button_frame = ttk.Frame(display_frame)
-            button_frame.pack(side=tk.LEFT, padx=2)
-            
-            # Edit button
-            ttk.Button(
-                button_frame,
-                text="Edit",
-                width=6,
-                command=lambda c=color: self._edit_color(c)
-            ).pack(pady=1)
-
-            # Delete button
-            ttk.Button(
-                button_frame,
-                text="Delete",
-                width=6,
-                command=lambda c=color: self._delete_color(c)
-            ).pack(pady=1)
-            
-            # Add context menu
-            self._add_color_context_menu(color_display, color)
-            
-            # Update every 10 items to show progress
-            if i % 10 == 0:
-                self.root.update_idletasks()
-        
-        # Update scroll region after all frames are created
-        self.scroll_manager.update_scroll_region()
+            page_text = f"{total_colors} colors"
+        self.page_info_label.config(text=page_text)
         
-        print(f"DEBUG: Display updated with {showing_count} colors")
+        self.color_list.set_items(self.filtered_colors, reset_scroll=reset_scroll)
     
-    def _add_color_context_menu(self, color_display, color: LibraryColor):
+    def _add_color_context_menu(self, color_display, row: _ColorRow):
         """Add context menu to color display."""
         def show_context_menu(event):
+            # Rows are recycled, so resolve the color at the time of the click
+            color = row.color
+            if color is None:
+                return
             context_menu = tk.Menu(self.root, tearoff=0)
             context_menu.add_command(label="Edit Color", command=lambda: self._edit_color(color))
             context_menu.add_command(label="Delete Color", command=lambda: self._delete_color(color))
@@ -493,15 +474,6 @@ class ColorLibraryManager:
         
         self.stats_label.config(text=stats_text)
     
-    def _load_more_colors(self):
-        """Load more colors (next page)."""
-        if not self.library:
-            return
-        
-        # Increment page and update display without clearing
-        self.current_page += 1
-        self._update_colors_display(reset_pagination=False)
-    
     def _on_search_changed(self, event=None):
         """Handle search term change."""
         # Add a small delay to avoid too many rapid searches
@@ -513,16 +485,13 @@ class ColorLibraryManager:
     def _perform_search(self):
         """Perform the actual search."""
         self.search_term = self.search_var.get().strip()
-        # Reset to first page when searching
-        self.current_page = 0
-        self._update_colors_display(reset_pagination=True)
+        self._apply_search_filter(reset_scroll=True)
     
     def _clear_search(self):
         """Clear the search and show all colors."""
         self.search_var.set("")
         self.search_term = ""
-        self.current_page = 0
-        self._update_colors_display(reset_pagination=True)
+        self._apply_search_filter(reset_scroll=True)
     
     def _on_library_changed(self, event=None):
         """Handle library selection change."""
@@ -978,47 +947,58 @@ class ColorLibraryManager:
             name_entry.configure(state="disabled")  # Initially disabled
             
             def do_import():
-                try:
-                    # Store the import parameters before closing dialog
-                    import_type_value = import_type.get()
-                    new_lib_name_value = new_lib_name.get().strip()
+                # Store the import parameters before closing dialog
+                import_type_value = import_type.get()
+                new_lib_name_value = new_lib_name.get().strip()
+                
+                # Close the import options dialog first
+                dialog.destroy()
+                
+                if import_type_value == "new":
+                    # Validate new library name
+                    if not new_lib_name_value:
+                        messagebox.showerror("Error", "Please enter a library name")
+                        return
                     
-                    # Close the import options dialog first
-                    dialog.destroy()
+                    # Convert to file-safe name
+                    file_name = "_".join(new_lib_name_value.lower().split())
                     
-                    # Do the import without progress dialog to avoid timing issues
-                    if import_type_value == "new":
-                        # Validate new library name
-                        if not new_lib_name_value:
-                            messagebox.showerror("Error", "Please enter a library name")
-                            return
-                        
-                        # Convert to file-safe name
-                        file_name = "_".join(new_lib_name_value.lower().split())
-                        
-                        # Create new library instance
+                    def run_import(task):
+                        # Create new library instance and import directly into it
                         new_library = ColorLibrary(file_name)
-                        
-                        # Import directly into new library
-                        count = new_library.import_library(filename)
-                        
+                        return new_library.import_library(
+                            filename, debug_callback=lambda message: task.check_cancelled()
+                        )
+                    
+                    def on_imported(count):
                         # Update mappings and refresh
                         self.display_to_file_map[new_lib_name_value] = file_name
                         self.file_to_display_map[file_name] = new_lib_name_value
                         self._update_library_list()
                         self._load_library(file_name)
-                    else:
-                        # Import into current library
-                        count = self.library.import_library(filename, replace_existing=True)
-                        self._update_category_list()
-                        self._update_colors_display()
-                        self._update_stats()
+                        messagebox.showinfo("Import Complete", f"Successfully imported {count} colors")
+                else:
+                    library = self.library
                     
-                    # Show success message
-                    messagebox.showinfo("Import Complete", f"Successfully imported {count} colors")
+                    def run_import(task):
+                        # Import into current library
+                        return library.import_library(
+                            filename, replace_existing=True,
+                            debug_callback=lambda message: task.check_cancelled()
+                        )
                     
-                except Exception as e:
-                    messagebox.showerror("Import Error", f"Import failed: {str(e)}")
+                    def on_imported(count):
+                        if self.library is library and self.root.winfo_exists():
+                            self._update_category_list()
+                            self._update_colors_display()
+                            self._update_stats()
+                        messagebox.showinfo("Import Complete", f"Successfully imported {count} colors")
+                
+                get_task_runner(self.root).submit(
+                    f"Import {os.path.basename(filename)}", run_import,
+                    on_success=on_imported,
+                    on_error=lambda e: messagebox.showerror("Import Error", f"Import failed: {str(e)}")
+                )
             
             # Buttons
             btn_frame = ttk.Frame(dialog)
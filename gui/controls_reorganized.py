@@ -10,11 +10,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Callable, Optional, Dict
 import logging
-from utils.image_processor import load_image, ImageLoadError
 
 from utils.save_as import SaveOptions, SaveFormat
 from gui.canvas import ShapeType
-from utils.color_analyzer import PrintType
 from utils.template_protection import TemplateProtectionManager
 
 # Configure logging
@@ -704,12 +702,12 @@ class ReorganizedControlPanel(ttk.Frame):
             self.on_line_color_change(self.line_color.get())
 
     def open_recent(self):
-        """Show dialog to open a file from the Recent directory."""
-        # Get the application's data directory from environment
-        stampz_data_dir = os.getenv('STAMPZ_DATA_DIR')
-        if not stampz_data_dir:
-            stampz_data_dir = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'StampZ_II')
-        recent_dir = os.path.join(stampz_data_dir, 'recent')
+        """Show dialog to open a file from the recent files list."""
+        recent_files = self.main_app.recent_files
+        entries = recent_files.get_recent_entries()
+        if not entries:
+            messagebox.showinfo("No Files", "No recent image files found")
+            return
         
         # Create dialog
         dialog = tk.Toplevel(self)
@@ -718,7 +716,7 @@ class ReorganizedControlPanel(ttk.Frame):
         dialog.grab_set()
 
         # Set dialog size and position
-        dialog_width = 500
+        dialog_width = 680
         dialog_height = 300
         screen_width = dialog.winfo_screenwidth()
         screen_height = dialog.winfo_screenheight()
@@ -730,6 +728,10 @@ class ReorganizedControlPanel(ttk.Frame):
         frame = ttk.Frame(dialog)
         frame.pack(expand=True, fill='both', padx=5, pady=5)
 
+        # Thumbnail preview of the selected file
+        preview = ttk.Label(frame, text="", anchor='center', width=24)
+        preview.pack(side='right', fill='y', padx=(5, 0))
+
         scrollbar = ttk.Scrollbar(frame)
         scrollbar.pack(side='right', fill='y')
 
@@ -738,78 +740,70 @@ class ReorganizedControlPanel(ttk.Frame):
 
         scrollbar.config(command=listbox.yview)
 
-        # Get list of recent files
-        try:
-            # Get files and their modification times
-            files = [(f, os.path.getmtime(os.path.join(recent_dir, f))) 
-                    for f in os.listdir(recent_dir) 
-                    if f.lower().endswith(('.jpg', '.jpeg', '.png', '.tif', '.tiff'))]
-            # Sort by modification time, newest first
-            sorted_files = sorted(files, key=lambda x: x[1], reverse=True)
-            for file, _ in sorted_files:
-                listbox.insert('end', file)
+        # Entries are newest first
+        for entry in entries:
+            listbox.insert('end', f"{entry['name']}  —  {os.path.dirname(entry['path'])}")
+
+        def selected_entry():
+            selection = listbox.curselection()
+            return entries[selection[0]] if selection else None
 
-            if not files:
-                messagebox.showinfo("No Files", "No image files found in Recent directory")
-                dialog.destroy()
+        def show_preview(event=None):
+            entry = selected_entry()
+            thumbnail_path = entry and recent_files.get_thumbnail(entry['open_path'])
+            if not thumbnail_path:
+                preview.configure(image='', text="No preview")
+                preview.image = None
                 return
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not access Recent directory:\n{str(e)}")
-            dialog.destroy()
-            return
+            try:
+                from PIL import Image, ImageTk
+                with Image.open(thumbnail_path) as thumbnail:
+                    photo = ImageTk.PhotoImage(thumbnail)
+                preview.configure(image=photo, text="")
+                preview.image = photo  # Keep a reference
+            except Exception:
+                preview.configure(image='', text="No preview")
+                preview.image = None
+
+        listbox.bind('<<ListboxSelect>>', show_preview)
 
         # Create buttons
         btn_frame = ttk.Frame(dialog)
         btn_frame.pack(fill='x', padx=5, pady=5)
 
         def open_selected():
-            selection = listbox.curselection()
-            if not selection:
+            entry = selected_entry()
+            if entry is None:
                 messagebox.showwarning("No Selection", "Please select a file to open")
                 return
             
-            selected_file = listbox.get(selection[0])
-            # Use the correct Application Support path
-            file_path = os.path.join(recent_dir, selected_file)
-            
+            file_path = entry['open_path']
             if os.path.exists(file_path):
                 try:
-                    # Load the image directly from Recent folder
-                    image, metadata = load_image(file_path)
                     dialog.destroy()
-                    self.main_app.canvas.load_image(image)
-                    self.main_app.current_file = file_path
-                    self.main_app.current_image_metadata = metadata  # Store metadata for later use
-                    self.main_app.control_panel.enable_controls(True)
-                    base_filename = os.path.basename(file_path)
-                    self.main_app.root.title(f"StampZ_II - {base_filename}")
-                    self.main_app.control_panel.update_current_filename(file_path)
-                except ImageLoadError as e:
-                    messagebox.showerror("Error", str(e))
+                    self.main_app.open_image(file_path)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to load image: {str(e)}")
             else:
                 messagebox.showerror("Error", f"File not found:\n{file_path}")
 
-        def delete_selected():
-            selection = listbox.curselection()
-            if not selection:
-                messagebox.showwarning("No Selection", "Please select a file to delete")
+        def remove_selected():
+            entry = selected_entry()
+            if entry is None:
+                messagebox.showwarning("No Selection", "Please select a file to remove")
                 return
             
-            selected_file = listbox.get(selection[0])
-            # Use the correct Application Support path
-            file_path = os.path.join(recent_dir, selected_file)
-            
-            if messagebox.askyesno("Confirm Delete", f"Delete {selected_file}?"):
-                try:
-                    os.remove(file_path)
-                    listbox.delete(selection)
-                except Exception as e:
-                    messagebox.showerror("Error", f"Could not delete file:\n{str(e)}")
+            if messagebox.askyesno("Confirm Remove",
+                                   f"Remove {entry['name']} from the recent files list?\n\n"
+                                   "The image file itself is not deleted."):
+                index = entries.index(entry)
+                recent_files.remove_file(entry['open_path'])
+                entries.pop(index)
+                listbox.delete(index)
+                show_preview()
 
         ttk.Button(btn_frame, text="Open", command=open_selected).pack(side='left', padx=5)
-        ttk.Button(btn_frame, text="Delete", command=delete_selected).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Remove", command=remove_selected).pack(side='left', padx=5)
         ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side='right', padx=5)
 
         # Bind double-click and Enter to open
@@ -817,6 +811,9 @@ class ReorganizedControlPanel(ttk.Frame):
         dialog.bind('<Return>', lambda e: open_selected())
         dialog.bind('<Escape>', lambda e: dialog.destroy())
 
+        listbox.selection_set(0)
+        show_preview()
+
     def _on_ruler_toggle(self):
         """Handle ruler visibility toggle."""
         if self.on_ruler_toggle:
@@ -46,6 +46,14 @@ class DatabaseViewer:
         self.measurements = []
         self.selected_items = set()
         
+        # Paging state for color analysis data; rows are fetched as the user scrolls
+        self.page_size = 500
+        self.total_rows = 0
+        self._db = None
+        self._db_name = None
+        self._loading_page = False
+        self._filter_after_id = None
+        
         self._create_widgets()
         self._load_sample_sets()
     
@@ -84,6 +92,7 @@ class DatabaseViewer:
         self.filter_combo = ttk.Combobox(filter_frame, values=['Set ID', 'Image Name', 'Date', 'Notes'], width=15)
         self.filter_combo.pack(side=tk.LEFT, padx=(0, 5))
         self.filter_combo.set('Image Name')
+        self.filter_combo.bind("<<ComboboxSelected>>", self._apply_filter)
         
         self.filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var, width=20)
         self.filter_entry.pack(side=tk.LEFT, padx=(0, 10))
@@ -94,6 +103,7 @@ class DatabaseViewer:
         self.sort_combo = ttk.Combobox(filter_frame, values=['Set ID', 'Image Name', 'Date', 'Point'], width=15)
         self.sort_combo.pack(side=tk.LEFT, padx=(0, 5))
         self.sort_combo.set('Date')
+        self.sort_combo.bind("<<ComboboxSelected>>", lambda e: self._apply_sort())
         
         self.sort_order = tk.BooleanVar(value=False)  # False = descending (newest first)
         ttk.Radiobutton(filter_frame, text="Asc", variable=self.sort_order, value=True, command=self._apply_sort).pack(side=tk.LEFT)
@@ -122,7 +132,8 @@ class DatabaseViewer:
         # Scrollbars
         vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
         hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.vsb = vsb
+        self.tree.configure(yscrollcommand=self._on_tree_scrolled, xscrollcommand=hsb.set)
         
         # Grid layout
         self.tree.grid(column=0, row=0, sticky="nsew")
@@ -240,8 +251,19 @@ class DatabaseViewer:
             self.current_sample_set = selected
             self._refresh_data()
     
+    # Viewer filter/sort choices mapped to ColorAnalysisDB query fields
+    FILTER_FIELDS = {'Set ID': 'set_id', 'Image Name': 'image_name', 'Date': 'date', 'Notes': 'notes'}
+    SORT_FIELDS = {'Set ID': 'set_id', 'Image Name': 'image_name', 'Date': 'date', 'Point': 'point'}
+    
     def _apply_filter(self, *args):
         """Apply the current filter to the displayed data."""
+        if self.data_source.get() == "color_analysis":
+            # Filtering happens in SQLite; debounce so typing doesn't requery per key
+            if self._filter_after_id:
+                self.dialog.after_cancel(self._filter_after_id)
+            self._filter_after_id = self.dialog.after(300, self._refresh_data)
+            return
+        
         filter_text = self.filter_var.get().strip().lower()
         filter_field = self.filter_combo.get()
         
@@ -273,16 +295,14 @@ class DatabaseViewer:
     
     def _apply_sort(self):
         """Sort the currently visible items."""
+        if self.data_source.get() == "color_analysis":
+            # Sorting happens in SQLite, so reload from the first page
+            self._refresh_data()
+            return
+        
         sort_field = self.sort_combo.get()
         ascending = self.sort_order.get()
         
-        # Map combo selection to column index
-        # Define columns list at class level for consistent reference
-        columns = [
-            "set_id", "image_name", "measurement_date", "point", "l_value", "a_value", "b_value",
-            "rgb_r", "rgb_g", "rgb_b", "x_pos", "y_pos", "shape", "size", "notes"
-        ]
-        
         field_map = {
             'Set ID': 0,  # set_id column index
             'Image Name': 1,  # image_name column index
@@ -302,6 +322,81 @@ class DatabaseViewer:
         for idx, (_, item) in enumerate(items):
             self.tree.move(item, '', idx)
     
+    def _on_tree_scrolled(self, first, last):
+        """Update the scrollbar and fetch the next page when nearing the end."""
+        self.vsb.set(first, last)
+        if (self.data_source.get() == "color_analysis" and not self._loading_page
+                and float(last) > 0.9 and len(self.measurements) < self.total_rows):
+            self._loading_page = True
+            self.dialog.after_idle(self._load_next_page)
+    
+    def _query_options(self) -> Dict:
+        """Current sort and filter settings as ColorAnalysisDB query arguments."""
+        return {
+            'sort_field': self.SORT_FIELDS.get(self.sort_combo.get(), 'date'),
+            'ascending': self.sort_order.get(),
+            'filter_field': self.FILTER_FIELDS.get(self.filter_combo.get(), 'image_name'),
+            'filter_text': self.filter_var.get().strip(),
+        }
+    
+    def _load_next_page(self):
+        """Fetch the next page of measurements and append it to the treeview."""
+        try:
+            if self._db is None or len(self.measurements) >= self.total_rows:
+                return
+            
+            page = self._db.get_measurements_page(
+                len(self.measurements), self.page_size, **self._query_options()
+            )
+            for measurement in page:
+                # Use measurement ID as the item ID for easier deletion
+                item_id = measurement.get('id', '')
+                self.tree.insert('', 'end', iid=str(item_id),
+                                 values=self._format_measurement_values(measurement))
+            self.measurements.extend(page)
+            
+            if not page:
+                # Rows were deleted since counting; stop paging
+                self.total_rows = len(self.measurements)
+            
+            self.status_var.set(
+                f"Showing {len(self.measurements)} of {self.total_rows} measurements "
+                f"from {self.current_sample_set}"
+            )
+        finally:
+            self._loading_page = False
+    
+    @staticmethod
+    def _format_measurement_values(measurement: Dict) -> List:
+        """Format a measurement dictionary as treeview column values."""
+        # Check if this is an averaged measurement and format point display accordingly
+        coordinate_point = measurement.get('coordinate_point', '')
+        is_averaged = measurement.get('is_averaged', False)
+        
+        # Format the point column to show "AVERAGE" instead of "999"
+        if coordinate_point == 999 or is_averaged:
+            point_display = "AVERAGE"
+        else:
+            point_display = str(coordinate_point)
+        
+        return [
+            measurement.get('set_id', ''),           # set_id column
+            measurement.get('image_name', ''),       # image_name column 
+            measurement.get('measurement_date', ''), # measurement_date column
+            point_display,                           # point column - show "AVERAGE" for 999/averaged
+            f"{measurement.get('l_value', 0):.2f}",  # l_value column
+            f"{measurement.get('a_value', 0):.2f}",  # a_value column
+            f"{measurement.get('b_value', 0):.2f}",  # b_value column
+            f"{measurement.get('rgb_r', 0):.2f}",    # rgb_r column
+            f"{measurement.get('rgb_g', 0):.2f}",    # rgb_g column
+            f"{measurement.get('rgb_b', 0):.2f}",    # rgb_b column
+            f"{measurement.get('x_position', 0):.1f}", # x_pos column
+            f"{measurement.get('y_position', 0):.1f}", # y_pos column
+            measurement.get('sample_type', ''),      # shape column
+            measurement.get('sample_size', ''),      # size column
+            measurement.get('notes', '')             # notes column
+        ]
+    
     def _refresh_data(self):
         """Refresh the treeview with current database data."""
         if not self.current_sample_set:
@@ -316,46 +411,18 @@ class DatabaseViewer:
             
             if self.data_source.get() == "color_analysis":
                 from utils.color_analysis_db import ColorAnalysisDB
-                db = ColorAnalysisDB(self.current_sample_set)
-                self.measurements = db.get_all_measurements()
-                
-                # Add to treeview
-                for measurement in self.measurements:
-                    # Map data to correct columns based on column definitions
-                    # columns = ["set_id", "image_name", "measurement_date", "point", "l_value", "a_value", "b_value",
-                    #           "rgb_r", "rgb_g", "rgb_b", "x_pos", "y_pos", "shape", "size", "notes"]
-                    # Check if this is an averaged measurement and format point display accordingly
-                    coordinate_point = measurement.get('coordinate_point', '')
-                    is_averaged = measurement.get('is_averaged', False)
-                    
-                    # Format the point column to show "AVERAGE" instead of "999"
-                    if coordinate_point == 999 or is_averaged:
-                        point_display = "AVERAGE"
-                    else:
-                        point_display = str(coordinate_point)
-                    
-                    values = [
-                        measurement.get('set_id', ''),           # set_id column
-                        measurement.get('image_name', ''),       # image_name column 
-                        measurement.get('measurement_date', ''), # measurement_date column
-                        point_display,                           # point column - show "AVERAGE" for 999/averaged
-                        f"{measurement.get('l_value', 0):.2f}",  # l_value column
-                        f"{measurement.get('a_value', 0):.2f}",  # a_value column
-                        f"{measurement.get('b_value', 0):.2f}",  # b_value column
-                        f"{measurement.get('rgb_r', 0):.2f}",    # rgb_r column
-                        f"{measurement.get('rgb_g', 0):.2f}",    # rgb_g column
-                        f"{measurement.get('rgb_b', 0):.2f}",    # rgb_b column
-                        f"{measurement.get('x_position', 0):.1f}", # x_pos column
-                        f"{measurement.get('y_position', 0):.1f}", # y_pos column
-                        measurement.get('sample_type', ''),      # shape column
-                        measurement.get('sample_size', ''),      # size column
-                        measurement.get('notes', '')             # notes column
-                    ]
-                    # Use measurement ID as the item ID for easier deletion
-                    item_id = measurement.get('id', '')
-                    self.tree.insert('', 'end', iid=str(item_id), values=values)
+                if self._db is None or self._db_name != self.current_sample_set:
+                    self._db = ColorAnalysisDB(self.current_sample_set)
+                    self._db_name = self.current_sample_set
                 
-                self.status_var.set(f"Loaded {len(self.measurements)} measurements from {self.current_sample_set}")
+                # Only count here; rows are fetched a page at a time as the user scrolls
+                options = self._query_options()
+                self.total_rows = self._db.count_measurements(
+                    options['filter_field'], options['filter_text']
+                )
+                self.measurements = []
+                self._loading_page = True
+                self._load_next_page()
             
             else:  # color_libraries
                 from utils.path_utils import get_color_libraries_dir
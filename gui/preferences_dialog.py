@@ -4,6 +4,7 @@ Preferences dialog for StampZ
 Allows users to configure export settings and other preferences.
 """
 
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
@@ -120,6 +121,9 @@ class PreferencesDialog:
         # Sampling preferences tab - Advanced configuration
         self._create_sampling_tab(notebook)
         
+        # Diagnostics tab - Performance tracing and profiling
+        self._create_diagnostics_tab(notebook)
+        
         # Future tabs can be added here
         # self._create_general_tab(notebook)
         # self._create_appearance_tab(notebook)
@@ -571,6 +575,56 @@ class PreferencesDialog:
             font=("TkDefaultFont", 9)
         ).pack(anchor=tk.W)
     
+    def _create_diagnostics_tab(self, notebook):
+        """Create the diagnostics preferences tab."""
+        diagnostics_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(diagnostics_frame, text="Diagnostics")
+        
+        # Tracing section
+        tracing_frame = ttk.LabelFrame(diagnostics_frame, text="Performance Tracing", padding="10")
+        tracing_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.enable_tracing_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            tracing_frame,
+            text="Record a timing trace of image loading, sampling, matching, database and export work",
+            variable=self.enable_tracing_var
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        from utils.path_utils import get_base_data_dir
+        ttk.Label(
+            tracing_frame,
+            text=(f"The trace is written when StampZ exits to:\n{os.path.join(get_base_data_dir(), 'traces')}\n"
+                  "Open it in chrome://tracing or ui.perfetto.dev. "
+                  "The STAMPZ_TRACE environment variable overrides this setting."),
+            wraplength=550,
+            justify=tk.LEFT,
+            font=("TkDefaultFont", 9),
+            foreground="gray"
+        ).pack(anchor=tk.W)
+        
+        # Profiling section
+        profiling_frame = ttk.LabelFrame(diagnostics_frame, text="Action Profiling", padding="10")
+        profiling_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.enable_profiling_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            profiling_frame,
+            text="Profile opening images, analysis, exports, comparison and Plot_3D",
+            variable=self.enable_profiling_var
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        ttk.Label(
+            profiling_frame,
+            text=(f"Each action writes a .prof file and a .txt summary of the slowest functions to:\n"
+                  f"{os.path.join(get_base_data_dir(), 'profiles')}\n"
+                  "Send these files along with reports of slow analysis or export."),
+            wraplength=550,
+            justify=tk.LEFT,
+            font=("TkDefaultFont", 9),
+            foreground="gray"
+        ).pack(anchor=tk.W)
+    
     def _create_migration_tab(self, notebook):
         """Create the migration tab (only if migration is possible)."""
         try:
@@ -935,6 +989,10 @@ class PreferencesDialog:
         self.sample_height_var.set(str(self.prefs_manager.get_default_sample_height()))
         self.sample_anchor_var.set(self.prefs_manager.get_default_sample_anchor())
         
+        # Diagnostics preferences
+        self.enable_tracing_var.set(self.prefs_manager.get_enable_tracing())
+        self.enable_profiling_var.set(self.prefs_manager.get_enable_profiling())
+        
         # Color space preferences
         self.export_include_rgb_var.set(self.prefs_manager.get_export_include_rgb())
         self.export_include_lab_var.set(self.prefs_manager.get_export_include_lab())
@@ -1055,6 +1113,19 @@ class PreferencesDialog:
                 return False
             self.prefs_manager.set_default_sample_anchor(self.sample_anchor_var.get())
             
+            # Diagnostics preferences, applied to the running session too
+            from utils import instrumentation
+            enable_tracing = self.enable_tracing_var.get()
+            self.prefs_manager.set_enable_tracing(enable_tracing)
+            if enable_tracing:
+                instrumentation.configure(True)
+            elif not os.environ.get(instrumentation.TRACE_ENV_VAR):
+                instrumentation.disable()
+            
+            from utils import action_profiler
+            self.prefs_manager.set_enable_profiling(self.enable_profiling_var.get())
+            action_profiler.set_enabled(self.enable_profiling_var.get())
+            
             # Color space preferences
             self.prefs_manager.set_export_include_rgb(self.export_include_rgb_var.get())
             self.prefs_manager.set_export_include_lab(self.export_include_lab_var.get())
@@ -4,8 +4,10 @@ ScrollManager for Color Library
 Handles scrolling functionality for large color lists
 """
 
+import math
 import tkinter as tk
 from tkinter import ttk
+from typing import Any, Callable, Sequence
 
 class ScrollManager:
     """Manages scrollable content display for the color library."""
@@ -177,3 +179,157 @@ class ScrollManager:
     def content_frame(self) -> ttk.Frame:
         """Get the frame where content should be added."""
         return self.scroll_frame
+
+
+class VirtualListManager:
+    """Displays a long list by recycling a fixed pool of row widgets.
+    
+    Only enough rows to fill the visible part of the canvas are ever created.
+    Item i is always shown by pool row i % pool_size, so scrolling by one row
+    rebinds a single widget instead of creating or destroying any.
+    """
+    
+    # Marks a pool slot whose contents must be rebound before it is shown
+    _STALE = -1
+    
+    def __init__(self, parent_frame: ttk.Frame, row_height: int,
+                 row_factory: Callable[[tk.Widget], tk.Widget],
+                 row_binder: Callable[[tk.Widget, Any], None]):
+        """Initialize the virtual list.
+        
+        Args:
+            parent_frame: Parent frame to contain the list
+            row_height: Fixed height in pixels of every row
+            row_factory: Called with the canvas to create one row widget
+            row_binder: Called with a row widget and an item to display
+        """
+        self.parent = parent_frame
+        self.row_height = row_height
+        self.row_factory = row_factory
+        self.row_binder = row_binder
+        
+        self.items: Sequence[Any] = []
+        self._rows = []         # (widget, canvas window id) per pool slot
+        self._bound = []        # item index shown by each pool slot, None if hidden
+        
+        self.scrollbar = ttk.Scrollbar(self.parent, orient='vertical', command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.canvas = tk.Canvas(self.parent, bg='white', height=400, highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.configure(yscrollcommand=self._on_view_changed)
+        
+        self.canvas.bind('<Configure>', self._on_canvas_configure)
+        self._bind_scroll_events(self.canvas)
+        self.canvas.bind('<Enter>', lambda e: self.canvas.focus_set())
+        self.canvas.bind('<Prior>', lambda e: self.canvas.yview_scroll(-1, "pages"))  # Page Up
+        self.canvas.bind('<Next>', lambda e: self.canvas.yview_scroll(1, "pages"))    # Page Down
+        self.canvas.bind('<Home>', lambda e: self.canvas.yview_moveto(0))
+        self.canvas.bind('<End>', lambda e: self.canvas.yview_moveto(1))
+    
+    def _bind_scroll_events(self, widget):
+        """Route mouse wheel events from widget and its children to the canvas."""
+        widget.bind('<MouseWheel>', self._on_mousewheel)   # Windows/Mac
+        widget.bind('<Button-4>', self._on_mousewheel)     # Linux up
+        widget.bind('<Button-5>', self._on_mousewheel)     # Linux down
+        for child in widget.winfo_children():
+            self._bind_scroll_events(child)
+    
+    def _on_mousewheel(self, event):
+        """Handle mouse wheel scrolling for all platforms."""
+        if event.num == 4 or (hasattr(event, 'delta') and event.delta > 0):
+            self.canvas.yview_scroll(-3, "units")
+        elif event.num == 5 or (hasattr(event, 'delta') and event.delta < 0):
+            self.canvas.yview_scroll(3, "units")
+        return "break"
+    
+    def _on_scrollbar(self, *args):
+        """Scroll the canvas from the scrollbar."""
+        self.canvas.yview(*args)
+    
+    def _on_view_changed(self, first, last):
+        """Keep the scrollbar in sync and rebind rows after any view change."""
+        self.scrollbar.set(first, last)
+        self._update_visible_rows()
+    
+    def _on_canvas_configure(self, event):
+        """Resize the row pool and row widths to match the canvas."""
+        if event.width <= 1 or event.height <= 1:
+            return
+        
+        pool_size = math.ceil(event.height / self.row_height) + 1
+        if pool_size != len(self._rows):
+            self._resize_pool(pool_size)
+        
+        for _, window_id in self._rows:
+            self.canvas.itemconfigure(window_id, width=event.width)
+        self._update_scroll_region()
+        self._update_visible_rows()
+    
+    def _resize_pool(self, pool_size: int):
+        """Create or destroy row widgets so the pool has pool_size rows."""
+        while len(self._rows) < pool_size:
+            widget = self.row_factory(self.canvas)
+            window_id = self.canvas.create_window(
+                (0, 0), window=widget, anchor='nw',
+                height=self.row_height, state='hidden'
+            )
+            self._bind_scroll_events(widget)
+            self._rows.append((widget, window_id))
+        while len(self._rows) > pool_size:
+            widget, window_id = self._rows.pop()
+            self.canvas.delete(window_id)
+            widget.destroy()
+        
+        # Item-to-slot mapping depends on the pool size, so rebind everything
+        self._bound = [self._STALE] * len(self._rows)
+    
+    def _update_scroll_region(self):
+        """Size the scroll region for all items, not just the created rows."""
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(len(self.items) * self.row_height, self.canvas.winfo_height())
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+    
+    def _update_visible_rows(self):
+        """Bind pool rows to the items that intersect the visible area."""
+        if not self._rows:
+            return
+        
+        pool_size = len(self._rows)
+        first = max(0, int(self.canvas.canvasy(0) // self.row_height))
+        last = min(first + pool_size, len(self.items))
+        used_slots = set()
+        
+        for index in range(first, last):
+            slot = index % pool_size
+            widget, window_id = self._rows[slot]
+            used_slots.add(slot)
+            if self._bound[slot] != index:
+                self.row_binder(widget, self.items[index])
+                self.canvas.coords(window_id, 0, index * self.row_height)
+                self.canvas.itemconfigure(window_id, state='normal')
+                self._bound[slot] = index
+        
+        for slot, (_, window_id) in enumerate(self._rows):
+            if slot not in used_slots and self._bound[slot] is not None:
+                self.canvas.itemconfigure(window_id, state='hidden')
+                self._bound[slot] = None
+    
+    def set_items(self, items: Sequence[Any], reset_scroll: bool = True):
+        """Replace the displayed items.
+        
+        Args:
+            items: Sequence of items passed one at a time to row_binder
+            reset_scroll: Scroll back to the first item
+        """
+        self.items = items
+        self._bound = [self._STALE] * len(self._rows)
+        self._update_scroll_region()
+        if reset_scroll:
+            self.canvas.yview_moveto(0)
+        self._update_visible_rows()
+    
+    def refresh(self):
+        """Rebind the visible rows, e.g. after the items were edited in place."""
+        self._bound = [self._STALE] * len(self._rows)
+        self._update_visible_rows()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Task queue panel for StampZ background operations."""
+
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from utils.task_runner import BackgroundTask, get_task_runner
+
+
+class TaskQueuePanel:
+    """Window listing running and recent background tasks."""
+
+    def __init__(self, parent: tk.Tk):
+        """Initialize the task queue panel.
+
+        Args:
+            parent: Parent tkinter window
+        """
+        self.runner = get_task_runner(parent)
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Background Tasks")
+        self.dialog.geometry("640x300")
+        self.dialog.transient(parent)
+
+        tree_frame = ttk.Frame(self.dialog)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+
+        columns = ('status', 'progress', 'elapsed', 'message')
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show='tree headings', selectmode='extended')
+        self.tree.heading('#0', text='Task')
+        self.tree.heading('status', text='Status')
+        self.tree.heading('progress', text='Progress')
+        self.tree.heading('elapsed', text='Time')
+        self.tree.heading('message', text='Message')
+        self.tree.column('#0', width=200)
+        self.tree.column('status', width=80, anchor='center')
+        self.tree.column('progress', width=70, anchor='center')
+        self.tree.column('elapsed', width=60, anchor='e')
+        self.tree.column('message', width=220)
+
+        vsb = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=vsb.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(button_frame, text="Cancel Selected", command=self._cancel_selected).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Close", command=self._close).pack(side=tk.RIGHT)
+
+        self.dialog.protocol("WM_DELETE_WINDOW", self._close)
+
+        self.runner.add_listener(self._on_task_changed)
+        for task in self.runner.tasks:
+            self._update_row(task)
+
+        # Refresh elapsed times while tasks are running
+        self._tick_id = None
+        self._tick()
+
+    def _row_values(self, task: BackgroundTask):
+        progress = "" if task.progress is None else f"{int(task.progress * 100)}%"
+        if task.started_at is None:
+            elapsed = ""
+        else:
+            elapsed = f"{(task.finished_at or time.time()) - task.started_at:.1f}s"
+        return (task.status, progress, elapsed, task.message)
+
+    def _update_row(self, task: BackgroundTask):
+        iid = str(task.id)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self._row_values(task))
+        else:
+            self.tree.insert('', 'end', iid=iid, text=task.name, values=self._row_values(task))
+
+    def _on_task_changed(self, task: BackgroundTask):
+        if self.dialog.winfo_exists():
+            self._update_row(task)
+
+    def _tick(self):
+        for task in self.runner.active_tasks:
+            self._update_row(task)
+        self._tick_id = self.dialog.after(500, self._tick)
+
+    def _cancel_selected(self):
+        selected = set(self.tree.selection())
+        for task in self.runner.tasks:
+            if str(task.id) in selected and task.active:
+                task.cancel()
+
+    def _close(self):
+        self.runner.remove_listener(self._on_task_changed)
+        if self._tick_id is not None:
+            self.dialog.after_cancel(self._tick_id)
+        self.dialog.destroy()
+
+
+def show_task_panel(parent: tk.Tk) -> TaskQueuePanel:
+    """Open the background task panel."""
+    return TaskQueuePanel(parent)
@@ -19,8 +19,8 @@ from utils.save_as import SaveManager, SaveOptions, SaveFormat
 from utils.recent_files import RecentFilesManager
 from utils.filename_manager import FilenameManager
 from utils.image_straightener import StraighteningTool
-from utils.ods_exporter import ODSExporter
-from gui.preferences_dialog import show_preferences_dialog
+from utils.task_runner import get_task_runner
+from utils.action_profiler import profiled_action
 from utils.path_utils import ensure_data_directories
 # DependencyChecker imported at function level to avoid CI/CD issues
 
@@ -107,6 +107,7 @@ class StampZApp:
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Export Color Data to ODS...", command=self.export_color_data)
         self.file_menu.add_command(label="Database Viewer...", command=self.open_database_viewer)
+        self.file_menu.add_command(label="Background Tasks...", command=self.open_task_panel)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=self.quit_app, accelerator="Ctrl+Q")
 
@@ -198,21 +199,26 @@ class StampZApp:
                 prefs_manager.set_last_open_directory(filename)
 
         if filename:
-            try:
-                image, metadata = load_image(filename)
-                self.canvas.load_image(image)
-                self.current_file = filename
-                self.current_image_metadata = metadata  # Store metadata for later use
-                self.control_panel.enable_controls(True)
-                base_filename = os.path.basename(filename)
-                self.root.title(f"StampZ - {base_filename}")
-                self.control_panel.update_current_filename(filename)
-                
-                # Show format information to user
-                self._show_format_info(filename, metadata)
-                
-            except ImageLoadError as e:
-                messagebox.showerror("Error", str(e))
+            self._open_image_file(filename)
+    
+    @profiled_action('open_image')
+    def _open_image_file(self, filename):
+        try:
+            image, metadata = load_image(filename)
+            self.canvas.load_image(image)
+            self.current_file = filename
+            self.current_image_metadata = metadata  # Store metadata for later use
+            self.control_panel.enable_controls(True)
+            base_filename = os.path.basename(filename)
+            self.root.title(f"StampZ - {base_filename}")
+            self.control_panel.update_current_filename(filename)
+            self.recent_files.add_file(filename, image=image)
+            
+            # Show format information to user
+            self._show_format_info(filename, metadata)
+            
+        except ImageLoadError as e:
+            messagebox.showerror("Error", str(e))
     
     def _show_format_info(self, filename, metadata):
         """Show format information to the user based on loaded image metadata."""
@@ -460,7 +466,7 @@ class StampZApp:
                     )
 
                 save_manager.save_image(cropped, filepath, panel_options)
-                self.recent_files.add_file(filepath)
+                self.recent_files.add_file(filepath, image=cropped)
 
                 replace_response = messagebox.askyesno(
                     "Replace Original?", 
@@ -493,7 +499,14 @@ class StampZApp:
             self.canvas.fit_to_window()
 
     def quit_app(self):
-        if messagebox.askokcancel("Quit", "Do you want to quit?"):
+        runner = get_task_runner(self.root)
+        if runner.active_tasks:
+            prompt = f"{len(runner.active_tasks)} background task(s) are still running and will be cancelled.\n\nDo you want to quit?"
+        else:
+            prompt = "Do you want to quit?"
+        if messagebox.askokcancel("Quit", prompt):
+            runner.shutdown()
+            
             # Clean up any temporary coordinate data
             try:
                 from utils.coordinate_db import CoordinateDB
@@ -1368,6 +1381,7 @@ class StampZApp:
             default_color = self.control_panel.line_color.get()
             self.canvas.set_line_color(default_color)
 
+    @profiled_action('analyze')
     def _analyze_colors(self):
         if not hasattr(self.canvas, '_coord_markers') or not self.canvas._coord_markers:
             messagebox.showwarning(
@@ -1421,46 +1435,39 @@ class StampZApp:
             print(f"  - sample_set_name: {actual_sample_set}")
             print(f"  - number of markers: {len(self.canvas._coord_markers)}")
             
-            measurements = analyzer.analyze_image_colors_from_canvas(
-                self.current_file, actual_sample_set, self.canvas._coord_markers
-            )
+            # Snapshot the markers so edits on the canvas don't race the worker
+            markers = [dict(marker) for marker in self.canvas._coord_markers]
+            image_path = self.current_file
             
-            print(f"DEBUG: analyze_image_colors_from_canvas returned: {measurements is not None}")
-            if measurements:
-                print(f"DEBUG: Number of measurements: {len(measurements)}")
+            def analyze(task):
+                return analyzer.analyze_image_colors_from_canvas(
+                    image_path, actual_sample_set, markers,
+                    progress_callback=lambda done, total: task.report_progress(
+                        done / total if total else None, f"Sampling point {done + 1} of {total}"
+                    )
+                )
             
-            if measurements:
-                dialog = tk.Toplevel(self.root)
-                dialog.title("Analysis Complete")
-                
-                dialog_width = 400
-                dialog_height = 200
-                
-                screen_width = self.root.winfo_screenwidth()
-                screen_height = self.root.winfo_screenheight()
-                
-                x = screen_width - dialog_width - 50
-                y = (screen_height - dialog_height) // 2
-                
-                dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
-                
-                message = f"Successfully analyzed {len(measurements)} color samples from set '{actual_sample_set}'.\n\n"
-                message += f"Color data has been saved to the database.\n\n"
-                message += f"You can now view the spreadsheet or export the data."
-                
-                ttk.Label(dialog, text=message, wraplength=350, justify="left").pack(padx=20, pady=20)
-                
-                ttk.Button(dialog, text="OK", command=dialog.destroy).pack(pady=10)
-                
-                dialog.transient(self.root)
-                dialog.grab_set()
-                
-                self.root.wait_window(dialog)
-            else:
-                messagebox.showwarning(
-                    "Analysis Failed", 
-                    "No color samples could be analyzed. Please check your sample markers."
+            def on_success(measurements):
+                print(f"DEBUG: analyze_image_colors_from_canvas returned: {measurements is not None}")
+                if measurements:
+                    print(f"DEBUG: Number of measurements: {len(measurements)}")
+                    self._show_analysis_complete(len(measurements), actual_sample_set)
+                else:
+                    messagebox.showwarning(
+                        "Analysis Failed", 
+                        "No color samples could be analyzed. Please check your sample markers."
+                    )
+            
+            def on_error(e):
+                messagebox.showerror(
+                    "Analysis Error", 
+                    f"Failed to analyze color samples:\n\n{str(e)}"
                 )
+            
+            get_task_runner(self.root).submit(
+                f"Analyze colors - {actual_sample_set}", analyze,
+                on_success=on_success, on_error=on_error
+            )
                 
         except Exception as e:
             import traceback
@@ -1469,6 +1476,35 @@ class StampZApp:
                 f"Failed to analyze color samples:\n\n{str(e)}"
             )
 
+    def _show_analysis_complete(self, measurement_count, sample_set_name):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Analysis Complete")
+        
+        dialog_width = 400
+        dialog_height = 200
+        
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        
+        x = screen_width - dialog_width - 50
+        y = (screen_height - dialog_height) // 2
+        
+        dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
+        
+        message = f"Successfully analyzed {measurement_count} color samples from set '{sample_set_name}'.\n\n"
+        message += f"Color data has been saved to the database.\n\n"
+        message += f"You can now view the spreadsheet or export the data."
+        
+        ttk.Label(dialog, text=message, wraplength=350, justify="left").pack(padx=20, pady=20)
+        
+        ttk.Button(dialog, text="OK", command=dialog.destroy).pack(pady=10)
+        
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        self.root.wait_window(dialog)
+
+    @profiled_action('export')
     def export_color_data(self):
         try:
             current_sample_set = None
@@ -1477,6 +1513,7 @@ class StampZApp:
                 self.control_panel.sample_set_name.get().strip()):
                 current_sample_set = self.control_panel.sample_set_name.get().strip()
 
+            from utils.ods_exporter import ODSExporter
             exporter = ODSExporter(sample_set_name=current_sample_set)
             measurements = exporter.get_color_measurements()
 
@@ -1511,27 +1548,39 @@ class StampZApp:
             )
 
             if filepath:
-                success = exporter.export_and_open(filepath)
-                if success:
-                    if current_sample_set:
-                        messagebox.showinfo(
-                            "Export Successful",
-                            f"Successfully exported {len(measurements)} color measurements from sample set '{current_sample_set}' to:\n\n"
-                            f"{os.path.basename(filepath)}\n\n"
-                            f"The spreadsheet has been opened in LibreOffice Calc for analysis."
-                        )
+                def on_success(success):
+                    if success:
+                        if current_sample_set:
+                            messagebox.showinfo(
+                                "Export Successful",
+                                f"Successfully exported {len(measurements)} color measurements from sample set '{current_sample_set}' to:\n\n"
+                                f"{os.path.basename(filepath)}\n\n"
+                                f"The spreadsheet has been opened in LibreOffice Calc for analysis."
+                            )
+                        else:
+                            messagebox.showinfo(
+                                "Export Successful",
+                                f"Successfully exported {len(measurements)} color measurements to:\n\n"
+                                f"{os.path.basename(filepath)}\n\n"
+                                f"The spreadsheet has been opened in LibreOffice Calc for analysis."
+                            )
                     else:
-                        messagebox.showinfo(
-                            "Export Successful",
-                            f"Successfully exported {len(measurements)} color measurements to:\n\n"
-                            f"{os.path.basename(filepath)}\n\n"
-                            f"The spreadsheet has been opened in LibreOffice Calc for analysis."
+                        messagebox.showerror(
+                            "Export Failed",
+                            "Failed to export color data or open spreadsheet. Please check that LibreOffice Calc is installed."
                         )
-                else:
+                
+                def on_error(e):
                     messagebox.showerror(
-                        "Export Failed",
-                        "Failed to export color data or open spreadsheet. Please check that LibreOffice Calc is installed."
+                        "Export Error",
+                        f"An error occurred during export:\n\n{str(e)}"
                     )
+                
+                get_task_runner(self.root).submit(
+                    f"Export {os.path.basename(filepath)}",
+                    lambda task: exporter.export_and_open(filepath),
+                    on_success=on_success, on_error=on_error
+                )
 
         except ImportError:
             messagebox.showerror(
@@ -1562,6 +1611,7 @@ class StampZApp:
                 f"Failed to open Color Library Manager:\n\n{str(e)}"
             )
 
+    @profiled_action('compare')
     def compare_sample_to_library(self):
         try:
             from gui.color_library_manager import ColorLibraryManager
@@ -1686,9 +1736,10 @@ class StampZApp:
                 f"Failed to create standard libraries:\n\n{str(e)}"
             )
 
+    @profiled_action('export_library_matches')
     def export_with_library_matches(self, sample_set_name=None):
         try:
-            from utils.color_library_integration import ColorLibraryIntegration
+            from utils.color_library_integration import ColorLibraryIntegration, NoAnalysisDataError
 
             if not sample_set_name:
                 if (hasattr(self, 'control_panel') and 
@@ -1716,25 +1767,22 @@ class StampZApp:
             )
 
             if filepath:
-                workflow = integration.get_analysis_workflow_summary(sample_set_name, threshold=5.0)
-
-                if workflow['status'] == 'analyzed':
-                    messagebox.showinfo(
-                        "Export Complete",
-                        f"Would export analysis with library matches to:\n\n"
-                        f"{os.path.basename(filepath)}\n\n"
-                        f"This would include:\n"
-                        f"• {workflow['summary']['total_samples']} color samples\n"
-                        f"• Library matches with ΔE values\n"
-                        f"• Match quality ratings\n"
-                        f"• Complete analysis metadata\n\n"
-                        f"Note: This feature requires ODSExporter integration."
-                    )
-                else:
-                    messagebox.showwarning(
-                        "No Data",
-                        f"No analysis data found for sample set '{sample_set_name}'"
+                try:
+                    integration.export_analysis_with_library_matches(
+                        sample_set_name, threshold=5.0, output_path=filepath
                     )
+                except NoAnalysisDataError as e:
+                    # Any other failure is a write error, reported below with its message
+                    messagebox.showwarning("No Data", str(e))
+                    return
+
+                messagebox.showinfo(
+                    "Export Complete",
+                    f"Exported analysis with library matches to:\n\n"
+                    f"{os.path.basename(filepath)}\n\n"
+                    f"Each measurement includes its closest library colors\n"
+                    f"with ΔE values and match quality ratings."
+                )
 
         except ImportError as e:
             messagebox.showerror(
@@ -1752,7 +1800,7 @@ class StampZApp:
         try:
             from utils.spectral_analyzer import SpectralAnalyzer, analyze_spectral_deviation_from_measurements
             from utils.color_analyzer import ColorAnalyzer, ColorMeasurement
-            from tkinter import Toplevel, Text, Scrollbar, Button, Frame, messagebox
+            from tkinter import Toplevel, Text, Scrollbar, Button, Frame, Label, messagebox
             
             # Check if we have color measurement data
             current_sample_set = None
@@ -1828,110 +1876,137 @@ class StampZApp:
             button_frame = Frame(dialog)
             button_frame.pack(fill="x", padx=10, pady=5)
             
-            def run_analysis():
-                text_area.delete(1.0, "end")
-                text_area.insert("end", f"=== SPECTRAL ANALYSIS FOR {current_sample_set} ===\n")
-                text_area.insert("end", f"Analyzing {len(measurements)} color measurements...\n\n")
-                text_area.update()
+            def build_report(task):
+                """Build the spectral report text; runs on a worker thread."""
+                import io
                 
-                try:
-                    # Initialize spectral analyzer
-                    spectral_analyzer = SpectralAnalyzer()
-                    
-                    # Perform wavelength deviation analysis
-                    text_area.insert("end", "WAVELENGTH DEVIATION ANALYSIS\n")
-                    text_area.insert("end", "=" * 40 + "\n")
-                    text_area.insert("end", "This shows how RGB channels deviate across spectral regions:\n\n")
-                    text_area.update()
-                    
-                    # Capture the analysis output
-                    import io
-                    import contextlib
-                    
-                    # Redirect stdout to capture print statements
-                    old_stdout = __import__('sys').stdout
-                    captured_output = io.StringIO()
-                    
-                    try:
-                        __import__('sys').stdout = captured_output
-                        analyze_spectral_deviation_from_measurements(measurements)
-                        captured_text = captured_output.getvalue()
-                        text_area.insert("end", captured_text)
-                    finally:
-                        __import__('sys').stdout = old_stdout
-                    
-                    text_area.insert("end", "\n" + "=" * 60 + "\n\n")
+                report = io.StringIO()
+                report.write(f"=== SPECTRAL ANALYSIS FOR {current_sample_set} ===\n")
+                report.write(f"Analyzing {len(measurements)} color measurements...\n\n")
+                
+                # Initialize spectral analyzer
+                spectral_analyzer = SpectralAnalyzer()
+                
+                # Perform wavelength deviation analysis
+                task.report_progress(0.05, "Wavelength deviation analysis")
+                report.write("WAVELENGTH DEVIATION ANALYSIS\n")
+                report.write("=" * 40 + "\n")
+                report.write("This shows how RGB channels deviate across spectral regions:\n\n")
+                analyze_spectral_deviation_from_measurements(measurements, out=report)
+                
+                report.write("\n" + "=" * 60 + "\n\n")
+                
+                # Generate spectral response analysis
+                report.write("SPECTRAL RESPONSE ANALYSIS\n")
+                report.write("=" * 40 + "\n")
+                
+                illuminants = ['D65', 'A', 'F2']  # Daylight, Incandescent, Fluorescent
+                
+                for index, illuminant in enumerate(illuminants):
+                    task.report_progress(0.2 + 0.6 * index / len(illuminants),
+                                         f"Spectral response under {illuminant}")
+                    report.write(f"\n--- Analysis under {illuminant} illuminant ---\n")
+                    spectral_data = spectral_analyzer.analyze_spectral_response(measurements, illuminant)
                     
-                    # Generate spectral response analysis
-                    text_area.insert("end", "SPECTRAL RESPONSE ANALYSIS\n")
-                    text_area.insert("end", "=" * 40 + "\n")
-                    text_area.update()
+                    sample_count = spectral_data.sample_count
+                    wavelength_count = len(spectral_data.wavelengths)
                     
-                    illuminants = ['D65', 'A', 'F2']  # Daylight, Incandescent, Fluorescent
+                    report.write(f"Generated {len(spectral_data)} spectral measurements\n")
+                    report.write(f"Covers {sample_count} samples across {wavelength_count} wavelength points\n")
                     
-                    for illuminant in illuminants:
-                        text_area.insert("end", f"\n--- Analysis under {illuminant} illuminant ---\n")
-                        spectral_data = spectral_analyzer.analyze_spectral_response(measurements, illuminant)
-                        
-                        sample_count = len(set(m.sample_id for m in spectral_data))
-                        wavelength_count = len(set(m.wavelength for m in spectral_data))
-                        
-                        text_area.insert("end", f"Generated {len(spectral_data)} spectral measurements\n")
-                        text_area.insert("end", f"Covers {sample_count} samples across {wavelength_count} wavelength points\n")
+                    if sample_count:
+                        wavelengths = spectral_data.wavelengths
+                        report.write(f"Spectral range: {wavelengths.min():.0f}-{wavelengths.max():.0f}nm\n")
                         
-                        if spectral_data:
-                            sample_1_data = [m for m in spectral_data if m.sample_id == 'sample_1']
-                            if sample_1_data:
-                                text_area.insert("end", f"Spectral range: {min(m.wavelength for m in sample_1_data):.0f}-{max(m.wavelength for m in sample_1_data):.0f}nm\n")
-                                
-                                max_r = max(sample_1_data, key=lambda m: m.rgb_response[0])
-                                max_g = max(sample_1_data, key=lambda m: m.rgb_response[1])
-                                max_b = max(sample_1_data, key=lambda m: m.rgb_response[2])
-                                
-                                text_area.insert("end", f"Peak responses - R: {max_r.wavelength:.0f}nm, G: {max_g.wavelength:.0f}nm, B: {max_b.wavelength:.0f}nm\n")
-                        text_area.update()
-                    
-                    # Metamerism analysis
-                    text_area.insert("end", "\n" + "=" * 60 + "\n")
-                    text_area.insert("end", "METAMERISM ANALYSIS\n")
-                    text_area.insert("end", "=" * 40 + "\n")
-                    text_area.insert("end", "Analyzing how colors appear under different lighting...\n\n")
-                    text_area.update()
-                    
-                    # Compare first few measurements for metamerism
-                    sample_limit = min(4, len(measurements))
-                    for i in range(sample_limit):
-                        for j in range(i+1, sample_limit):
-                            metamerism_index = spectral_analyzer.calculate_metamerism_index(measurements[i], measurements[j])
-                            
-                            text_area.insert("end", f"Sample {i+1} vs Sample {j+1}: Metamerism Index = {metamerism_index:.3f}\n")
-                            if metamerism_index > 2.0:
-                                text_area.insert("end", "  → High metamerism - colors may appear different under various lights\n")
-                            elif metamerism_index > 1.0:
-                                text_area.insert("end", "  → Moderate metamerism - some color shift possible\n")
-                            else:
-                                text_area.insert("end", "  → Low metamerism - colors should appear consistent\n")
-                            text_area.update()
-                    
-                    text_area.insert("end", "\n" + "=" * 60 + "\n")
-                    text_area.insert("end", "PRACTICAL APPLICATIONS\n")
-                    text_area.insert("end", "=" * 40 + "\n")
-                    text_area.insert("end", "This spectral analysis can help you:\n")
-                    text_area.insert("end", "• Identify pigments with unique spectral signatures\n")
-                    text_area.insert("end", "• Detect printing method differences (line-engraved vs lithographic)\n")
-                    text_area.insert("end", "• Analyze paper aging effects on color reproduction\n")
-                    text_area.insert("end", "• Compare stamps printed in different eras with different inks\n")
-                    text_area.insert("end", "• Identify potential forgeries through spectral inconsistencies\n")
-                    text_area.insert("end", "• Optimize photography lighting for accurate color capture\n\n")
-                    
-                    text_area.insert("end", "Analysis complete!\n")
-                    text_area.see("end")
-                    
-                except Exception as e:
-                    text_area.insert("end", f"\nError during spectral analysis: {str(e)}\n")
-                    import traceback
-                    text_area.insert("end", traceback.format_exc())
+                        peak_r, peak_g, peak_b = spectral_data.peak_wavelengths(0)
+                        report.write(f"Peak responses - R: {peak_r:.0f}nm, G: {peak_g:.0f}nm, B: {peak_b:.0f}nm\n")
+                
+                # Metamerism analysis
+                task.report_progress(0.85, "Metamerism analysis")
+                report.write("\n" + "=" * 60 + "\n")
+                report.write("METAMERISM ANALYSIS\n")
+                report.write("=" * 40 + "\n")
+                report.write("Analyzing how colors appear under different lighting...\n\n")
+                
+                # Rank every pair in the set by metamerism
+                task.check_cancelled()
+                metameric_pairs = spectral_analyzer.find_metameric_pairs(measurements, top_n=10)
+                report.write(f"Most metameric pairs across all {len(measurements)} samples:\n\n")
+                for i, j, metamerism_index in metameric_pairs:
+                    report.write(f"Sample {i+1} vs Sample {j+1}: Metamerism Index = {metamerism_index:.3f}\n")
+                    if metamerism_index > 2.0:
+                        report.write("  → High metamerism - colors may appear different under various lights\n")
+                    elif metamerism_index > 1.0:
+                        report.write("  → Moderate metamerism - some color shift possible\n")
+                    else:
+                        report.write("  → Low metamerism - colors should appear consistent\n")
+                
+                report.write("\n" + "=" * 60 + "\n")
+                report.write("PRACTICAL APPLICATIONS\n")
+                report.write("=" * 40 + "\n")
+                report.write("This spectral analysis can help you:\n")
+                report.write("• Identify pigments with unique spectral signatures\n")
+                report.write("• Detect printing method differences (line-engraved vs lithographic)\n")
+                report.write("• Analyze paper aging effects on color reproduction\n")
+                report.write("• Compare stamps printed in different eras with different inks\n")
+                report.write("• Identify potential forgeries through spectral inconsistencies\n")
+                report.write("• Optimize photography lighting for accurate color capture\n\n")
+                
+                report.write("Analysis complete!\n")
+                return report.getvalue()
             
+            analysis_task = [None]
+            
+            def run_analysis():
+                if analysis_task[0] is not None and analysis_task[0].active:
+                    return
+                
+                text_area.delete(1.0, "end")
+                text_area.insert("end", f"=== SPECTRAL ANALYSIS FOR {current_sample_set} ===\n")
+                text_area.insert("end", f"Analyzing {len(measurements)} color measurements...\n\n")
+                run_button.configure(state="disabled")
+                
+                def alive():
+                    return dialog.winfo_exists()
+                
+                def on_progress(fraction, message):
+                    if alive():
+                        status_label.configure(text=f"{message}... {int((fraction or 0) * 100)}%")
+                
+                def on_success(report):
+                    if alive():
+                        text_area.delete(1.0, "end")
+                        text_area.insert("end", report)
+                        text_area.see("end")
+                
+                def on_error(e):
+                    if alive():
+                        text_area.insert("end", f"\nError during spectral analysis: {str(e)}\n")
+                        text_area.insert("end", analysis_task[0].error_traceback)
+                
+                def on_finished(task):
+                    if task is not analysis_task[0] or task.active:
+                        return
+                    # Unregister even if the dialog was closed, so the runner
+                    # doesn't keep its widgets alive for the rest of the session
+                    get_task_runner().remove_listener(on_finished)
+                    if alive():
+                        run_button.configure(state="normal")
+                        status_label.configure(text="" if task.status == task.DONE else task.status)
+                
+                runner = get_task_runner(self.root)
+                runner.add_listener(on_finished)
+                analysis_task[0] = runner.submit(
+                    f"Spectral analysis - {current_sample_set}", build_report,
+                    on_success=on_success, on_error=on_error, on_progress=on_progress
+                )
+            
+            def close_dialog():
+                if analysis_task[0] is not None and analysis_task[0].active:
+                    analysis_task[0].cancel()
+                dialog.destroy()
+            
+
             def export_results():
                 try:
                     from tkinter import filedialog
@@ -2033,11 +2108,15 @@ class StampZApp:
                     messagebox.showerror("CSV Export Error", f"Failed to export CSV data:\n{str(e)}")
             
             # Add buttons
-            Button(button_frame, text="Run Analysis", command=run_analysis, font=("Arial", 10, "bold")).pack(side="left", padx=5)
+            run_button = Button(button_frame, text="Run Analysis", command=run_analysis, font=("Arial", 10, "bold"))
+            run_button.pack(side="left", padx=5)
             Button(button_frame, text="Export Results", command=export_results).pack(side="left", padx=5)
             Button(button_frame, text="Export CSV Data", command=export_csv_data).pack(side="left", padx=5)
             Button(button_frame, text="Plot Curves", command=plot_spectral_curves).pack(side="left", padx=5)
-            Button(button_frame, text="Close", command=dialog.destroy).pack(side="right", padx=5)
+            Button(button_frame, text="Close", command=close_dialog).pack(side="right", padx=5)
+            status_label = Label(button_frame, text="")
+            status_label.pack(side="right", padx=10)
+            dialog.protocol("WM_DELETE_WINDOW", close_dialog)
             
             # Initial message
             text_area.insert("end", f"Spectral Analysis Tool\n")
@@ -2065,6 +2144,7 @@ class StampZApp:
 
     def open_preferences(self):
         """Open the preferences dialog."""
+        from gui.preferences_dialog import show_preferences_dialog
         result = show_preferences_dialog(self.root)
         if result == "ok":
             print("Preferences updated successfully.")
@@ -3064,6 +3144,7 @@ class StampZApp:
             import traceback
             traceback.print_exc()
 
+    @profiled_action('open_plot3d')
     def open_3d_analysis(self):
         """Open 3D color space analysis tool."""
         try:
@@ -3276,6 +3357,10 @@ class StampZApp:
         from gui.database_viewer import DatabaseViewer
         DatabaseViewer(self.root)
 
+    def open_task_panel(self):
+        from gui.task_panel import show_task_panel
+        show_task_panel(self.root)
+
 def main():
     # Set up logging
     import logging
@@ -3302,6 +3387,19 @@ def main():
     
     logging.info('Starting StampZ application')
     
+    # Record a hot-path trace when STAMPZ_TRACE or the Diagnostics preference asks for one
+    from utils.instrumentation import configure as configure_tracing
+    from utils.user_preferences import get_preferences_manager
+    from utils import action_profiler
+    prefs_manager = get_preferences_manager()
+    if configure_tracing(prefs_manager.get_enable_tracing()):
+        logging.info('Tracing enabled')
+    
+    # Profile menu actions when the Diagnostics preference asks for it
+    action_profiler.set_enabled(prefs_manager.get_enable_profiling())
+    if action_profiler.is_enabled():
+        logging.info(f'Action profiling enabled, writing to {action_profiler.profiles_dir()}')
+    
     try:
         logging.debug('Initializing Tk')
         root = tk.Tk()
@@ -19,8 +19,15 @@ def load_data(file_path, use_rgb=False, handle_blank_rows=True):
         # Load the raw data
         if file_extension == 'ods':
             df = pd.read_excel(file_path, engine='odf')
+        elif file_extension in ('parquet', 'arrow', 'feather'):
+            # Columnar StampZ exports; Arrow IPC files are memory-mapped
+            from utils.arrow_io import read_frame
+            df = read_frame(file_path)
+            if 'Xnorm' not in df.columns and 'l_value' in df.columns:
+                df = measurements_to_plot3d(df)
         else:
-            raise ValueError(f"Unsupported file format: {file_extension}. Only .ods files are supported.")
+            raise ValueError(f"Unsupported file format: {file_extension}. "
+                             "Only .ods, .parquet, .arrow and .feather files are supported.")
         
         # Add original row numbers for proper tracking before any processing
         df['original_row'] = df.index
@@ -73,6 +80,19 @@ def load_data(file_path, use_rgb=False, handle_blank_rows=True):
         traceback.print_exc()
         return None
 
+def measurements_to_plot3d(df):
+    """Map StampZ measurement columns to the Plot_3D layout.
+    
+    Uses the same normalization as the Plot_3D export: L* / 100 and
+    (a*, b*) + 128 / 255.
+    """
+    return pd.DataFrame({
+        'Xnorm': df['l_value'].astype(float) / 100.0,
+        'Ynorm': (df['a_value'].astype(float) + 128.0) / 255.0,
+        'Znorm': (df['b_value'].astype(float) + 128.0) / 255.0,
+        'DataID': df['data_id'].astype(str) if 'data_id' in df.columns else None,
+    })
+
 def process_dataframe(df):
     """Process and clean the DataFrame"""
     try:
@@ -91,14 +111,15 @@ def process_dataframe(df):
             'Sphere': None,  # We'll set this after DataID is established
             'valid_data': False   # Added flag to identify valid data points vs empty rows
         }
-        def get_initial_color(data_id):
-            """Determine initial color based on DataID"""
+        def get_initial_colors(data_ids):
+            """Determine initial colors based on DataID, for a whole column at once"""
             color_map = {
             }
-            for prefix, color in color_map.items():
-                if str(data_id).startswith(prefix):
-                    return color
-            return 'black'  # Only used if no color is specified
+            colors = pd.Series('black', index=data_ids.index, dtype=object)  # Only used if no color is specified
+            # Earlier prefixes win, so apply them last
+            for prefix, color in reversed(list(color_map.items())):
+                colors[data_ids.astype(str).str.startswith(prefix)] = color
+            return colors
         # Create missing columns with default values
         for col, default in defaults.items():
             if col not in df.columns:
@@ -306,9 +327,9 @@ def process_dataframe(df):
         if 'Color' in df.columns:
             existing_colors = df['Color'].copy()
             # Only set default colors for rows without a color
-            df.loc[df['Color'].isna(), 'Color'] = df.loc[df['Color'].isna(), 'DataID'].apply(get_initial_color)
+            df.loc[df['Color'].isna(), 'Color'] = get_initial_colors(df.loc[df['Color'].isna(), 'DataID'])
         else:
-            df['Color'] = df['DataID'].apply(get_initial_color)
+            df['Color'] = get_initial_colors(df['DataID'])
         
         # Log Sphere values to verify they're retained from input file
         
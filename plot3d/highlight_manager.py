@@ -163,13 +163,9 @@ class HighlightManager:
         Handles potential gaps in data due to blank rows and the +1 offset issue.
         """
         try:
-            print(f"DEBUG: Finding DataFrame index for spreadsheet row {user_row}")
-            
             # Check if this exact row exists in our mapping
             if user_row in self.row_mapping:
-                df_index = self.row_mapping[user_row]
-                print(f"DEBUG: Direct mapping found: spreadsheet row {user_row} → DataFrame index {df_index}")
-                return df_index
+                return self.row_mapping[user_row]
             
             # If we don't have an exact match, we need to find the appropriate index
             valid_rows = sorted(self.row_mapping.keys())
@@ -199,12 +195,6 @@ class HighlightManager:
                     next_row = row
                     break
                     
-            # Log what we found
-            if prev_row is not None:
-                print(f"DEBUG: Previous valid row: {prev_row} → index {self.row_mapping[prev_row]}")
-            if next_row is not None:
-                print(f"DEBUG: Next valid row: {next_row} → index {self.row_mapping[next_row]}")
-                
             # Calculate offset from blank rows
             if prev_row is not None and next_row is not None:
                 # We have valid rows both before and after
@@ -212,10 +202,6 @@ class HighlightManager:
                 row_gap = next_row - prev_row
                 index_gap = self.row_mapping[next_row] - self.row_mapping[prev_row]
                 
-                if row_gap > index_gap + 1:
-                    # There are blank rows in between
-                    print(f"DEBUG: Detected blank rows: row gap = {row_gap}, index gap = {index_gap}")
-                    
                 # Calculate how far we are from the previous valid row
                 offset = user_row - prev_row
                 
@@ -224,31 +210,24 @@ class HighlightManager:
                 if offset <= (row_gap - index_gap):
                     # We're in the blank row region, snap to previous index
                     df_index = self.row_mapping[prev_row]
-                    print(f"DEBUG: In blank row region, snapping to previous index {df_index}")
                 else:
                     # Past the blank rows, calculate adjusted index
                     df_index = self.row_mapping[prev_row] + (offset - (row_gap - index_gap))
-                    print(f"DEBUG: Past blank rows, calculated adjusted index {df_index}")
                     
                 return df_index
                 
             elif next_row is not None:
                 # We only have rows after, use the next valid row's index
-                print(f"DEBUG: Only have rows after, using next valid row's index")
                 return self.row_mapping[next_row]
                 
             elif prev_row is not None:
                 # We only have rows before, calculate based on offset from last valid row
                 offset = user_row - prev_row
                 # Basic check to ensure we don't go out of bounds
-                df_index = min(self.row_mapping[prev_row] + offset, len(self.data_df) - 1)
-                print(f"DEBUG: Only have rows before, calculated index {df_index} based on offset {offset}")
-                return df_index
+                return min(self.row_mapping[prev_row] + offset, len(self.data_df) - 1)
                 
             # Final fallback - use basic calculation
-            df_index = max(0, min(user_row - 2, len(self.data_df) - 1))
-            print(f"DEBUG: Using fallback calculation, spreadsheet row {user_row} → DataFrame index {df_index}")
-            return df_index
+            return max(0, min(user_row - 2, len(self.data_df) - 1))
             
         except Exception as e:
             print(f"Error finding DataFrame index: {str(e)}")
@@ -70,6 +70,7 @@ class TemplateSelector:
         
         file_types = [
             ('OpenDocument Spreadsheet', '*.ods'),
+            ('Parquet / Arrow', '*.parquet *.arrow *.feather'),
             ('All files', '*.*')
         ]
         
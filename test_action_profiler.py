@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Test that profiled GUI actions and their background work write profiles."""
+
+import contextlib
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+
+from utils import action_profiler
+from utils.benchmarks import restore_data_dir, use_scratch_data_dir
+from utils.task_runner import TaskRunner
+from test_task_runner import FakeRoot
+
+
+def _slow_sum(n):
+    return sum(i * i for i in range(n))
+
+
+def test_profiled_action_and_its_task():
+    previous = use_scratch_data_dir(tempfile.mkdtemp())
+    root = FakeRoot()
+    runner = TaskRunner(root)
+    results = []
+    start, done = threading.Event(), threading.Event()
+
+    def work(task):
+        start.wait(5)
+        time.sleep(0.05)  # Profiles on Python 3.12+ also see the main thread: let it go idle
+        result = _slow_sum(20000)
+        done.set()
+        return result
+
+    @action_profiler.profiled_action('analyze')
+    def analyze():
+        runner.submit("analyze", work, on_success=results.append)
+        return 'submitted'
+
+    try:
+        start.set()
+        assert analyze() == 'submitted'  # Profiling off: nothing written
+        done.wait(5)
+        root.run_until_idle()
+        assert not os.path.exists(action_profiler.profiles_dir())
+
+        action_profiler.set_enabled(True)
+        start.clear()
+        done.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert analyze() == 'submitted'
+            start.set()  # The action's profile is written; now run the task
+            done.wait(5)
+            root.run_until_idle()
+            runner.shutdown(wait=True)
+        assert action_profiler.current_run() is None
+
+        files = sorted(os.listdir(action_profiler.profiles_dir()))
+        assert len(files) == 4
+        action_prof, action_txt, task_prof, task_txt = files
+        assert action_prof.startswith('analyze_') and task_prof == action_prof[:-5] + '_task.prof'
+
+        folder = action_profiler.profiles_dir()
+        task_stats = pstats.Stats(os.path.join(folder, task_prof))
+        assert any(func[2] == '_slow_sum' for func in task_stats.stats)
+        with open(os.path.join(folder, task_txt)) as f:
+            assert '_slow_sum' in f.read()
+        with open(os.path.join(folder, action_txt)) as f:
+            summary = f.read()
+        assert 'wall time' in summary and '_slow_sum' not in summary  # Ended at the handoff
+        assert results == [_slow_sum(20000)] * 2
+    finally:
+        action_profiler.set_enabled(False)
+        restore_data_dir(previous)
+
+
+def test_only_one_profile_runs_at_a_time():
+    previous = use_scratch_data_dir(tempfile.mkdtemp())
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            result = action_profiler.run_profiled(
+                'outer', action_profiler.run_profiled, 'inner', _slow_sum, 100)
+        assert result == _slow_sum(100)
+        assert 'Not profiling inner' in output.getvalue()
+        assert sorted(os.listdir(action_profiler.profiles_dir())) == ['outer.prof', 'outer.txt']
+    finally:
+        restore_data_dir(previous)
+
+if __name__ == "__main__":
+    test_profiled_action_and_its_task()
+    test_only_one_profile_runs_at_a_time()
+    print("Action profiler test passed")
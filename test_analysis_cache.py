@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Test that sample areas measured once are reused from the analysis cache."""
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from utils.analysis_cache import AnalysisResultCache, get_analysis_cache
+from utils.color_analyzer import ColorAnalyzer, PrintType
+
+
+def _markers():
+    return [
+        {'image_pos': (20, 30), 'sample_type': 'rectangle', 'sample_width': 10, 'sample_height': 6, 'anchor': 'center'},
+        {'image_pos': (50.5, 40), 'sample_type': 'circle', 'sample_width': 12, 'sample_height': 12, 'anchor': 'center'},
+        {'image_pos': (5, 5), 'sample_type': 'rectangle', 'sample_width': 8, 'sample_height': 8, 'anchor': 'top_left'},
+    ]
+
+
+def test_canvas_samples_are_reused_across_views():
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'stamp.png')
+    array = np.random.default_rng(3).integers(0, 256, (80, 100, 3), dtype=np.uint8)
+    Image.fromarray(array, 'RGB').save(path)
+
+    analyzer = ColorAnalyzer.__new__(ColorAnalyzer)
+    analyzer.print_type = PrintType.SOLID_PRINTED
+    cache = get_analysis_cache()
+    cache.clear()
+    image_key = cache.image_key(path)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = analyzer.extract_sample_colors_from_coordinates(Image.open(path), _markers(), image_key=image_key)
+
+    sampled = []
+    original = analyzer._sample_area_color
+    analyzer._sample_area_color = lambda image, coord: sampled.append(coord) or original(image, coord)
+
+    # A copy of the same file hits; widths given as floats are the same geometry
+    copy = os.path.join(folder, 'copy.png')
+    shutil.copy(path, copy)
+    markers = _markers()
+    markers[0]['sample_width'] = 10.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        second = analyzer.extract_sample_colors_from_coordinates(Image.open(copy), markers,
+                                                                 image_key=cache.image_key(copy))
+    assert not sampled
+    assert [(m.rgb, m.lab) for m in second] == [(m.rgb, m.lab) for m in first]
+
+    # A different print type or edited image is measured again
+    analyzer.print_type = PrintType.LINE_ENGRAVED
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.extract_sample_colors_from_coordinates(Image.open(path), _markers(), image_key=image_key)
+    assert len(sampled) == 3
+
+    array[0, 0] = 255 - array[0, 0]
+    Image.fromarray(array, 'RGB').save(copy)
+    os.utime(copy, ns=(1, 1))
+    assert cache.image_key(copy) != image_key
+
+
+def test_least_recently_used_images_are_evicted():
+    cache = AnalysisResultCache(max_images=2)
+    geometry = (1.0, 2.0, 'circle', 3.0, 3.0, 'center')
+    for key in ['a', 'b']:
+        cache.put(key, 'SOLID_PRINTED', geometry, (1, 2, 3), (4, 5, 6))
+    assert cache.get('a', 'SOLID_PRINTED', geometry) == ((1, 2, 3), (4, 5, 6))
+    cache.put('c', 'SOLID_PRINTED', geometry, (1, 2, 3), (4, 5, 6))
+    assert cache.get('b', 'SOLID_PRINTED', geometry) is None
+    assert cache.get('a', 'SOLID_PRINTED', geometry) is not None
+    assert cache.get(None, 'SOLID_PRINTED', geometry) is None
+
+
+if __name__ == "__main__":
+    test_canvas_samples_are_reused_across_views()
+    test_least_recently_used_images_are_evicted()
+    print("Analysis cache tests passed")
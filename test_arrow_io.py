@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Test Parquet / Arrow IPC export and import of measurement data."""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from utils.arrow_io import read_frame, read_table
+from utils.ods_exporter import ColorMeasurement, ODSExporter, _measurements_to_frame
+from utils.ods_importer import ODSImporter
+from plot3d.data_processor import load_data
+
+
+def _measurement(i):
+    return ColorMeasurement(
+        data_id=f"stamp_2026_sample{i}", sample_set_number=1, coordinate_point=i,
+        l_value=50.0 + i, a_value=-3.5, b_value=12.0,
+        rgb_r=100.0, rgb_g=120.0, rgb_b=130.0,
+        x_position=10.0 * i, y_position=20.5,
+        sample_shape='circle', sample_size='10', sample_anchor='center',
+        measurement_date=f"2026-01-0{i}", notes=None,
+    )
+
+
+def _exporter():
+    exporter = ODSExporter.__new__(ODSExporter)
+    exporter.sample_set_name = 'stamp'
+    exporter.prefs_manager = None
+    frame = _measurements_to_frame([_measurement(i) for i in range(1, 4)])
+    frame['image_name'] = 'stamp.tif'
+    exporter.get_measurement_frame = lambda deduplicate=True: frame
+    return exporter
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'arrow'])
+def test_columnar_round_trip(extension):
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, f'stamp.{extension}')
+        assert _exporter().export_to_columnar(path)
+        assert os.listdir(workdir) == [f'stamp.{extension}']
+
+        schema = read_table(path).schema
+        assert schema.field('l_value').type == pa.float64()
+        assert pa.types.is_dictionary(schema.field('image_name').type)
+        assert pa.types.is_dictionary(schema.field('sample_shape').type)
+
+        frame = read_frame(path)
+        assert frame['l_value'].tolist() == [51.0, 52.0, 53.0]
+        assert frame['image_name'].tolist() == ['stamp.tif'] * 3
+
+        measurements = ODSImporter().parse_file(path)
+        assert [m['coordinate_point'] for m in measurements] == [1, 2, 3]
+        assert measurements[0]['notes'] == '' and measurements[0]['sample_shape'] == 'circle'
+
+        df = load_data(path)
+        assert df['DataID'].tolist() == ['stamp_2026_sample1', 'stamp_2026_sample2', 'stamp_2026_sample3']
+        assert df['Xnorm'].tolist() == pytest.approx([0.51, 0.52, 0.53])
+        assert df['Ynorm'].iloc[0] == pytest.approx((128 - 3.5) / 255, abs=1e-4)
+    finally:
+        shutil.rmtree(workdir)
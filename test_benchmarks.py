@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Smoke test for the micro-benchmark runner and result comparison."""
+
+import json
+import os
+import tempfile
+
+from utils.benchmarks import BENCHMARKS, compare_results, run_benchmarks, save_results
+from utils.pipeline_benchmark import IMAGE_STAGES, run_pipeline_benchmark
+
+
+def test_benchmarks_run_and_compare():
+    assert {'extract_pixels_rgb', 'find_closest_matches', 'plot3d_load_data'} <= set(BENCHMARKS)
+
+    names = ['rgb_to_lab', 'delta_e_2000_calculator', 'get_all_measurements']
+    data_dir = os.environ.get('STAMPZ_DATA_DIR')
+    results = run_benchmarks(names, scale=0.01, repeat=2)
+    assert os.environ.get('STAMPZ_DATA_DIR') == data_dir  # Scratch data directory is undone
+    assert [r.name for r in results] == names
+    assert all(len(r.times) == 2 and r.items > 0 and r.median > 0 for r in results)
+
+    path = os.path.join(tempfile.mkdtemp(), 'results.json')
+    save_results(path, results, 0.01)
+    with open(path) as f:
+        current = json.load(f)
+    assert current['environment']['cpu_count'] == os.cpu_count()
+
+    baseline = json.loads(json.dumps(current))
+    baseline['results'][0]['median'] = current['results'][0]['median'] / 2
+    compared = compare_results(baseline, current)
+    assert [(name, regressed) for name, _, _, regressed in compared] == \
+        [('rgb_to_lab', True), ('delta_e_2000_calculator', False), ('get_all_measurements', False)]
+
+
+def test_pipeline_benchmark_reports_each_worker_count():
+    runs = run_pipeline_benchmark(images=4, worker_counts=(1, 2), image_size=(200, 160))
+    assert [run.workers for run in runs] == [1, 2]
+    for run in runs:
+        assert run.images == 4 and run.images_per_second > 0
+        assert 0 < run.latency_p50_ms <= run.latency_p95_ms
+        assert set(run.stage_seconds) == set(IMAGE_STAGES)
+        assert set(run.export_seconds) == {'ods_export', 'plot3d_export'}
+
+
+if __name__ == "__main__":
+    test_benchmarks_run_and_compare()
+    test_pipeline_benchmark_reports_each_worker_count()
+    print("Benchmark tests passed")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Test merged multi-library color matching."""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+import numpy as np
+
+from utils.color_library import ColorLibrary
+from utils.color_analysis_db import ColorAnalysisDB
+from utils.color_library_integration import ColorLibraryIntegration, NoAnalysisDataError
+
+
+def _fill(library, count, seed):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        lab = (float(rng.uniform(20, 90)), float(rng.uniform(-40, 40)), float(rng.uniform(-40, 40)))
+        library.add_color(name=f"Color_L{seed}_{i:03d}", lab=lab, category=f"Cat{i % 3}")
+
+
+def _reference_matches(library, lab, threshold, count):
+    """Original per-color scan with calculate_delta_e_2000."""
+    scored = [(library.calculate_delta_e_2000(lab, c.lab), c.name) for c in library.get_all_colors()]
+    return [(name, d) for d, name in sorted(scored, key=lambda x: x[0]) if d <= threshold][:count]
+
+
+def test_merged_index_matches_per_library_scan():
+    os.environ['STAMPZ_DATA_DIR'] = tempfile.mkdtemp()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for seed, count in [(1, 60), (2, 40), (3, 25)]:
+                _fill(ColorLibrary(f"lib_{seed}"), count, seed)
+            integration = ColorLibraryIntegration(['lib_1', 'lib_2', 'lib_3'])
+
+        samples = [(50.0, 5.0, -5.0), (70.0, -20.0, 10.0), (30.0, 30.0, 30.0)]
+        for lab in samples:
+            result = integration.analyze_sample_against_libraries(lab, threshold=12.0)
+            expected_best = []
+            for name, library in integration.loaded_libraries.items():
+                expected = _reference_matches(library, lab, 12.0, 3)
+                got = result.library_matches[name]
+                assert [m.library_color.name for m in got] == [n for n, _ in expected]
+                assert np.allclose([m.delta_e_2000 for m in got], [d for _, d in expected])
+                expected_best += [(d, n) for n, d in expected]
+            assert [m.library_color.name for _, m in result.best_matches] == \
+                [n for _, n in sorted(expected_best, key=lambda x: x[0])[:5]]
+
+            # Single-library matching uses the same vectorized path
+            library = integration.loaded_libraries['lib_2']
+            assert [m.library_color.name for m in library.find_closest_matches(lab, max_delta_e=12.0, max_results=4)] == \
+                [n for n, _ in _reference_matches(library, lab, 12.0, 4)]
+
+        # Unloading and changes made through another instance are picked up
+        integration.unload_library('lib_3')
+        result = integration.analyze_sample_against_libraries(samples[0], threshold=12.0)
+        assert set(result.library_matches) == {'lib_1', 'lib_2'}
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            ColorLibrary('lib_2').add_color(name="Exact", lab=samples[0])
+        result = integration.analyze_sample_against_libraries(samples[0], threshold=12.0)
+        assert result.best_matches[0][0] == 'lib_2'
+        assert result.best_matches[0][1].library_color.name == "Exact"
+        assert result.best_matches[0][1].delta_e_2000 < 1e-6
+        assert not result.user_action_needed
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+def test_match_many_matches_single_queries():
+    os.environ['STAMPZ_DATA_DIR'] = tempfile.mkdtemp()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for seed, count in [(4, 80), (5, 50)]:
+                _fill(ColorLibrary(f"lib_{seed}"), count, seed)
+            integration = ColorLibraryIntegration(['lib_4', 'lib_5'])
+
+        rng = np.random.default_rng(9)
+        samples = np.column_stack([rng.uniform(20, 90, 200), rng.uniform(-40, 40, 200), rng.uniform(-40, 40, 200)])
+
+        library = integration.loaded_libraries['lib_4']
+        indices, distances = library.match_many(samples, k=3, max_delta_e=10.0, chunk_size=37)
+        colors, _ = library.get_match_data()
+        for row, lab in enumerate(samples):
+            expected = library.find_closest_matches(tuple(lab), max_delta_e=10.0, max_results=3)
+            got = [colors[i].name for i in indices[row] if i >= 0]
+            assert got == [m.library_color.name for m in expected]
+            assert np.allclose(distances[row][:len(expected)], [m.delta_e_2000 for m in expected])
+            assert np.isinf(distances[row][len(expected):]).all()
+
+        # Batch analysis gives the same answers as one call per sample
+        batch = integration.analyze_samples_against_libraries(samples[:20], threshold=10.0)
+        for lab, result in zip(samples[:20], batch):
+            single = integration.analyze_sample_against_libraries(tuple(lab), threshold=10.0)
+            for name in single.library_matches:
+                assert [m.library_color.name for m in result.library_matches[name]] == \
+                    [m.library_color.name for m in single.library_matches[name]]
+            assert [(n, m.library_color.name) for n, m in result.best_matches] == \
+                [(n, m.library_color.name) for n, m in single.best_matches]
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+
+def test_export_failures_are_told_apart():
+    data_dir = tempfile.mkdtemp()
+    os.environ['STAMPZ_DATA_DIR'] = data_dir
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _fill(ColorLibrary("lib_6"), 20, 6)
+            integration = ColorLibraryIntegration(['lib_6'])
+            try:
+                integration.export_analysis_with_library_matches('export_test', output_path=os.path.join(data_dir, 'a.ods'))
+            except NoAnalysisDataError:
+                pass
+            else:
+                raise AssertionError("An empty sample set should raise NoAnalysisDataError")
+
+            db = ColorAnalysisDB('export_test')
+            db.save_color_measurement(db.create_measurement_set('Stamp_1'), 1, 10.0, 20.0,
+                                      50.0, 1.25, -3.5, 120.0, 110.0, 100.0)
+            path = os.path.join(data_dir, 'b.ods')
+            assert integration.export_analysis_with_library_matches('export_test', output_path=path) == path
+            try:
+                # A write failure keeps its own error
+                integration.export_analysis_with_library_matches(
+                    'export_test', output_path=os.path.join(path, 'c.ods'))  # Under a file
+            except OSError:
+                pass
+            else:
+                raise AssertionError("A write failure should raise OSError")
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+if __name__ == "__main__":
+    test_merged_index_matches_per_library_scan()
+    test_match_many_matches_single_queries()
+    test_export_failures_are_told_apart()
+    print("Color match index tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the indexed color library search used by the Color Library Manager
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+from utils.color_library import LibraryColor
+from utils.color_search_index import ColorSearchIndex
+
+
+def _make_color(i, name, notes=None, category="General"):
+    return LibraryColor(
+        id=i, name=name, description=name,
+        rgb=(i % 256, 0, 0), lab=(50.0, 0.0, 0.0),
+        category=category, source="Custom",
+        date_added="2024-01-01", notes=notes
+    )
+
+
+def _linear_search(colors, term):
+    """Reference implementation matching the original per-keystroke filter."""
+    term = term.lower()
+    return [c for c in colors if
+            term in c.name.lower() or
+            (c.notes and term in c.notes.lower()) or
+            term in c.category.lower()]
+
+
+def test_search_matches_linear_filter():
+    colors = [
+        _make_color(0, "Carmine_Red", "SG 137 perf 14", "Red"),
+        _make_color(1, "Deep_Blue", None, "Blue"),
+        _make_color(2, "Rose_Carmine", "pale shade", "Red"),
+        _make_color(3, "Ultramarine", "Blue ink, worn plate", "Blue"),
+        _make_color(4, "Green", "", "General"),
+    ]
+    index = ColorSearchIndex(colors)
+
+    # Includes progressively longer terms to exercise result narrowing
+    for term in ["", "c", "ca", "car", "carm", "carmine", "blue", "BLUE", "pl", "plate",
+                 "137", "d", "xyz", "n", "ne"]:
+        expected = _linear_search(colors, term) if term else colors
+        assert index.search(term) == expected, term
+
+
+def test_search_does_not_match_across_fields():
+    index = ColorSearchIndex([_make_color(0, "Alpha", "beta", "Gamma")])
+    assert index.search("alphabeta") == []
+    assert len(index.search("alpha")) == 1
+
+
+def test_large_library_search():
+    colors = [_make_color(i, f"Color_{i:05d}", f"note {i}", "General") for i in range(20000)]
+    index = ColorSearchIndex(colors)
+
+    assert index.search("color_1") == _linear_search(colors, "color_1")
+    assert index.search("color_19999") == [colors[19999]]
+    assert index.search("note 42") == _linear_search(colors, "note 42")
+
+
+if __name__ == "__main__":
+    test_search_matches_linear_filter()
+    test_search_does_not_match_across_fields()
+    test_large_library_search()
+    print("All color search index tests passed")
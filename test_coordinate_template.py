@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test that compiled coordinate templates sample exactly like the per-point path."""
+
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from utils.color_analyzer import ColorAnalyzer, PrintType
+from utils.coordinate_db import CoordinateDB, CoordinatePoint, SampleAreaType
+from utils.coordinate_template import CompiledTemplate
+
+ANCHORS = ['center', 'top_left', 'top_right', 'bottom_left', 'bottom_right']
+
+
+def _points(count, width, height, rng):
+    points = []
+    for _ in range(count):
+        shape = rng.choice([SampleAreaType.RECTANGLE, SampleAreaType.CIRCLE])
+        size = (rng.choice([1, 2, 5, 7.5, 10, 21]), rng.choice([1, 3, 8, 10.5, 20]))
+        # Include points near and beyond the image edges
+        points.append(CoordinatePoint(rng.uniform(-15, width + 15), rng.uniform(-15, height + 15),
+                                      shape, size, rng.choice(ANCHORS)))
+    return points
+
+
+def test_compiled_template_matches_per_point_sampling():
+    rng = random.Random(7)
+    analyzer = ColorAnalyzer.__new__(ColorAnalyzer)
+    analyzer.print_type = PrintType.SOLID_PRINTED
+
+    for width, height in [(120, 90), (64, 200)]:
+        array = np.random.default_rng(width).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        image = Image.fromarray(array, 'RGB')
+        points = _points(300, width, height, rng)
+        template = CompiledTemplate.compile('test', (len(points), 1), points)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = []
+            for point in points:
+                pixels = analyzer._sample_area_color(image, point)
+                expected.append(pixels[0] if pixels else None)
+
+        assert template.sample(array) == expected
+        assert any(value is None for value in expected)
+
+
+def _coordinate_db(path):
+    db = object.__new__(CoordinateDB)  # Bypass the singleton to use a scratch database
+    db.db_path = path
+    with contextlib.redirect_stdout(io.StringIO()):
+        db._init_db()
+    return db
+
+
+def test_unchanged_templates_are_skipped():
+    folder = tempfile.mkdtemp()
+    db = _coordinate_db(os.path.join(folder, 'coordinates.db'))
+    points = _points(50, 100, 100, random.Random(3))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert db.save_coordinate_set('Template_A', 'a.png', points) == (True, 'Template_A')
+        version = db.get_template_version('Template_A')
+        assert db.save_coordinate_set('Template_A', 'a.png', list(points)) == (True, 'Template_A')
+        assert db.get_template_version('Template_A') == version  # Skipped: no rows rewritten
+
+        points[0].x += 1
+        assert db.save_coordinate_set('Template_A', 'a.png', points)[0]
+        assert db.get_template_version('Template_A') != version
+        assert db.load_coordinate_set('Template_A')[0].x == points[0].x
+
+    # Merging another templates database imports only templates the target lacks
+    other = _coordinate_db(os.path.join(folder, 'other.db'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        other.save_coordinate_set('Template_A', 'a.png', points)
+        other.save_coordinate_set('Template_B', 'b.png', points[:5])
+        other.save_coordinate_set('Template_C', 'c.png', points[:3])
+        db.save_coordinate_set('Template_C', 'c.png', points[10:12])
+    assert CoordinateDB.import_coordinate_sets(other.db_path, db.db_path) == (1, 1, ['Template_C'])
+    assert CoordinateDB.import_coordinate_sets(other.db_path, db.db_path) == (0, 2, ['Template_C'])
+    assert len(db.load_coordinate_set('Template_B')) == 5
+    # A different template of the same name in the target is never overwritten
+    kept = db.load_coordinate_set('Template_C')
+    assert [(p.x, p.y) for p in kept] == [(p.x, p.y) for p in points[10:12]]
+
+    # Sets saved before hashing existed are hashed on the next open
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE coordinate_sets SET content_hash = NULL")
+    db = _coordinate_db(db.db_path)
+    assert CoordinateDB.import_coordinate_sets(other.db_path, db.db_path) == (0, 2, ['Template_C'])
+
+
+if __name__ == "__main__":
+    test_compiled_template_matches_per_point_sampling()
+    test_unchanged_templates_are_skipped()
+    print("Compiled template tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Test that hot-path spans and counters are recorded and written as a Chrome trace."""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from utils import instrumentation
+from utils.color_analyzer import ColorAnalyzer, PrintType
+
+
+def test_disabled_tracing_records_nothing():
+    instrumentation.disable()
+    instrumentation.reset()
+    with instrumentation.span('image.load', path='x.png'):
+        instrumentation.count('sample.pixels', 10)
+    assert instrumentation.write_trace(os.path.join(tempfile.mkdtemp(), 'trace.json')) is None
+    assert instrumentation.counters() == {}
+
+
+def test_sampling_is_traced():
+    path = os.path.join(tempfile.mkdtemp(), 'trace.json')
+    analyzer = ColorAnalyzer.__new__(ColorAnalyzer)
+    analyzer.print_type = PrintType.SOLID_PRINTED
+    image = Image.fromarray(np.full((40, 50, 3), 120, dtype=np.uint8), 'RGB')
+    markers = [
+        {'image_pos': (20, 20), 'sample_type': 'rectangle', 'sample_width': 10, 'sample_height': 6},
+        {'image_pos': (48, 20), 'sample_type': 'rectangle', 'sample_width': 10, 'sample_height': 6},
+    ]
+
+    instrumentation.reset()
+    instrumentation.enable(path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            measurements = analyzer.extract_sample_colors_from_coordinates(image, markers)
+        with instrumentation.span('export.test', rows=2):
+            pass
+    finally:
+        instrumentation.disable()
+    assert len(measurements) == 2
+
+    counters = instrumentation.counters()
+    assert counters['sample.pixels'] == 60 + 42  # The second area is clamped at the right edge
+    assert counters['sample.clamped_areas'] == 1
+    assert counters['sample.cache_misses'] == 2
+
+    assert instrumentation.write_trace() == path
+    with open(path) as f:
+        trace = json.load(f)
+    spans = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+    names = [e['name'] for e in spans]
+    assert names.count('sample.area') == 2 and names.count('convert.rgb_to_lab') == 2
+    assert names.count('sample.markers') == 1
+    markers_span = spans[names.index('sample.markers')]
+    assert all(markers_span['ts'] <= e['ts'] and e['ts'] + e['dur'] <= markers_span['ts'] + markers_span['dur']
+               for e in spans if e['name'] == 'sample.area')
+    assert spans[names.index('export.test')]['args'] == {'rows': 2}
+    assert trace['otherData']['counters'] == counters
+    instrumentation.reset()
+
+
+if __name__ == "__main__":
+    test_disabled_tracing_records_nothing()
+    test_sampling_is_traced()
+    print("Instrumentation tests passed")
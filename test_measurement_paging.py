@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the paged, SQL-sorted measurement queries used by the Database Viewer
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+sys.path.insert(0, '.')
+
+from utils.color_analysis_db import ColorAnalysisDB
+
+
+def _populate(db, images=50, points=4):
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany(
+            "INSERT INTO measurement_sets (image_name) VALUES (?)",
+            [(f"Stamp_{i:03d}",) for i in range(images)]
+        )
+        conn.executemany("""
+            INSERT INTO color_measurements (
+                set_id, coordinate_point, x_position, y_position,
+                l_value, a_value, b_value, rgb_r, rgb_g, rgb_b, notes
+            ) VALUES (?, ?, 0, 0, 50, 0, 0, 128, 128, 128, ?)
+        """, [(i + 1, p + 1, f"note_{i}%") for i in range(images) for p in range(points)])
+
+
+def test_paged_queries(tmp_path=None):
+    data_dir = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    os.environ['STAMPZ_DATA_DIR'] = data_dir
+    try:
+        db = ColorAnalysisDB("paging_test")
+        _populate(db)
+
+        assert db.count_measurements() == 200
+        all_rows = db.get_all_measurements()
+
+        # Pages cover every row exactly once
+        pages = []
+        for offset in range(0, 200, 64):
+            pages.extend(db.get_measurements_page(offset, 64, sort_field='image_name', ascending=True))
+        assert sorted(m['id'] for m in pages) == sorted(m['id'] for m in all_rows)
+        assert [m['image_name'] for m in pages] == sorted(m['image_name'] for m in all_rows)
+        assert set(pages[0].keys()) == set(all_rows[0].keys())
+
+        # Descending point order
+        page = db.get_measurements_page(0, 10, sort_field='point', ascending=False)
+        assert all(m['coordinate_point'] == 4 for m in page)
+
+        # Filters are case-insensitive substrings with LIKE wildcards taken literally
+        assert db.count_measurements('image_name', 'stamp_01') == 40
+        assert db.count_measurements('notes', '7%') == 20
+        assert db.count_measurements('notes', '_7') == 4
+        assert db.count_measurements('notes', 'x%') == 0
+        filtered = db.get_measurements_page(0, 100, filter_field='set_id', filter_text='12')
+        assert {m['set_id'] for m in filtered} == {12}
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+def test_columnar_latest_only(tmp_path=None):
+    data_dir = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    os.environ['STAMPZ_DATA_DIR'] = data_dir
+    try:
+        db = ColorAnalysisDB("columnar_test")
+        _populate(db, images=3, points=2)
+        # Re-measure point 1 of the first image and add an averaged placeholder
+        with sqlite3.connect(db.db_path) as conn:
+            conn.executemany("""
+                INSERT INTO color_measurements (
+                    set_id, coordinate_point, x_position, y_position,
+                    l_value, a_value, b_value, rgb_r, rgb_g, rgb_b, measurement_date
+                ) VALUES (?, ?, 0, 0, ?, 0, 0, 128, 128, 128, '2099-01-01 00:00:00')
+            """, [(1, 1, 75), (1, 999, 60)])
+
+        columns = db.get_measurement_columns()
+        assert len(columns['id']) == 8
+        assert columns['l_value'].dtype == float and columns['coordinate_point'].dtype == int
+
+        latest = db.get_measurement_columns(latest_only=True, exclude_point=999)
+        assert list(latest['image_name']) == ['Stamp_000', 'Stamp_000', 'Stamp_001',
+                                              'Stamp_001', 'Stamp_002', 'Stamp_002']
+        assert list(latest['coordinate_point']) == [1, 2] * 3
+        assert latest['l_value'][0] == 75
+
+        frame = db.get_measurements_dataframe(averaged=True)
+        assert frame.empty and list(frame.columns) == list(ColorAnalysisDB.COLUMNAR_FIELDS)
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+def _row(point, l_value):
+    return {'coordinate_point': point, 'x_pos': 1.0, 'y_pos': 2.0,
+            'l_value': l_value, 'a_value': 0.0, 'b_value': 0.0,
+            'rgb_r': 128.0, 'rgb_g': 128.0, 'rgb_b': 128.0, 'sample_type': 'circle'}
+
+
+def test_batch_save(tmp_path=None):
+    data_dir = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    os.environ['STAMPZ_DATA_DIR'] = data_dir
+    try:
+        db = ColorAnalysisDB("batch_test")
+        set_ids = db.save_measurement_sets([
+            ('Stamp_A', None, [_row(1, 50), _row(2, 51)]),
+            ('Stamp_B', 'second', [_row(1, 60)]),
+        ])
+        assert len(set(set_ids)) == 2
+        assert db.count_measurements() == 3
+
+        # Existing image/point pairs are updated in place; new points are inserted
+        assert db.save_measurement_sets([('Stamp_A', None, [_row(1, 70), _row(3, 52)])]) == set_ids[:1]
+        columns = db.get_measurement_columns()
+        assert list(columns['l_value']) == [70, 51, 52, 60]
+
+        # A bad row rolls back the whole batch
+        assert db.save_measurement_sets([('Stamp_C', None, [_row(1, 80)]), ('Stamp_D', None, [{}])]) is None
+        assert db.count_measurements() == 4
+        assert 'Stamp_C' not in set(db.get_measurement_columns()['image_name'])
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+def test_cleanup_and_maintenance(tmp_path=None):
+    from utils.db_maintenance import maintain_all_databases
+
+    data_dir = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    os.environ['STAMPZ_DATA_DIR'] = data_dir
+    try:
+        db = ColorAnalysisDB("cleanup_test")
+        for _ in range(20):
+            _populate(db, images=10, points=4)
+        # Re-measurements of the same points land on the first 10 sets
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("UPDATE color_measurements SET set_id = (set_id - 1) % 10 + 1")
+        assert db.count_measurements() == 800
+
+        assert db.cleanup_duplicates() == 760
+        assert db.count_measurements() == 40
+        # The latest insert of each point is the one kept
+        assert max(db.get_measurement_columns()['id']) == 800
+
+        _populate(db, images=10, points=4)
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("UPDATE color_measurements SET set_id = (set_id - 1) % 10 + 1")
+        results = maintain_all_databases()
+        assert [r['name'] for r in results] == ['cleanup_test']
+        assert results[0]['rows_removed'] == 40 and results[0]['error'] is None
+        assert results[0]['bytes_reclaimed'] > 0
+        assert db.count_measurements() == 40
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+if __name__ == "__main__":
+    test_paged_queries()
+    test_columnar_latest_only()
+    test_batch_save()
+    test_cleanup_and_maintenance()
+    print("All measurement paging tests passed")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Test incremental ODS-to-database import."""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from utils.color_analysis_db import ColorAnalysisDB
+from utils.ods_importer import ODSImporter
+
+
+def _rows(images, points=4, l_offset=0.0):
+    return [{
+        'image_name': f"Stamp_{i:03d}", 'coordinate_point': p + 1,
+        'l_value': 50.0 + p + l_offset, 'a_value': 1.25, 'b_value': -3.5,
+        'x_position': 10.0, 'y_position': 20.0,
+        'rgb_r': 120.0, 'rgb_g': 110.0, 'rgb_b': 100.0,
+        'sample_shape': 'circle', 'sample_size': '20x20', 'sample_anchor': 'center',
+        'measurement_date': f"2026-01-01 00:{i % 60:02d}:00", 'notes': '',
+        'data_id': f"Stamp_{i:03d}_sample{p + 1}",
+    } for i in images for p in range(points)]
+
+
+def test_incremental_import(tmp_path=None):
+    data_dir = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    os.environ['STAMPZ_DATA_DIR'] = data_dir
+    try:
+        importer = ODSImporter()
+        assert importer.import_to_database(_rows(range(100)), "import_test")
+        db = ColorAnalysisDB("import_test")
+        assert db.count_measurements() == 400
+
+        # Re-importing an updated sheet adds only its new and changed rows
+        updated = _rows(range(120)) + _rows(range(5), l_offset=0.5) + _rows(range(2))
+        assert importer.import_to_database(updated, "import_test", incremental=True)
+        assert db.count_measurements() == 400 + 80 + 20
+
+        # Rows measured in the app are hashed on the next import and matched
+        set_id = db.create_measurement_set("Stamp_500")
+        db.save_color_measurement(set_id, 1, 10.0, 20.0, 50.0, 1.25, -3.5, 120.0, 110.0, 100.0)
+        date = db.get_measurement_columns()['measurement_date'][-1]
+        app_row = dict(_rows([500], points=1)[0], measurement_date=date)
+        assert importer.import_to_database([app_row], "import_test", incremental=True)
+        assert db.count_measurements() == 501
+        assert importer.import_to_database(updated, "import_test", incremental=True)
+        assert db.count_measurements() == 501
+    finally:
+        del os.environ['STAMPZ_DATA_DIR']
+
+
+if __name__ == "__main__":
+    test_incremental_import()
+    print("Incremental import tests passed")
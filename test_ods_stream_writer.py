@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Test the streaming ODS writer and the Plot_3D layout it produces."""
+
+import os
+import shutil
+import tempfile
+import zipfile
+
+import pandas as pd
+
+from utils.ods_exporter import ColorMeasurement, ODSExporter, _measurements_to_frame
+from utils.ods_stream_writer import ODS_MIMETYPE, write_ods
+
+
+def _measurement(i):
+    return ColorMeasurement(
+        data_id=f"stamp_pt{i}", sample_set_number=1, coordinate_point=i,
+        l_value=50.0 + i, a_value=-3.5, b_value=12.0,
+        rgb_r=100.0, rgb_g=120.0, rgb_b=130.0,
+        x_position=10.0 * i, y_position=20.5,
+        sample_shape='circle', sample_size='10', sample_anchor='center',
+        measurement_date=f"2026-01-0{i + 1}", notes='<&>' if i == 0 else None,
+    )
+
+
+def test_streamed_rows_read_back():
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'out.ods')
+        rows = ([str(i * 1.5), f"id{i}", ''] for i in range(1000))
+        assert write_ods(path, 'Data', ['Value', 'Name', 'Empty'], rows, {0}) == 1000
+
+        with zipfile.ZipFile(path) as archive:
+            first = archive.infolist()[0]
+            assert first.filename == 'mimetype' and first.compress_type == zipfile.ZIP_STORED
+            assert archive.read('mimetype').decode() == ODS_MIMETYPE
+
+        df = pd.read_excel(path, engine='odf')
+        assert list(df.columns[:2]) == ['Value', 'Name']
+        assert df['Value'].iloc[-1] == 999 * 1.5
+        assert df['Name'].iloc[0] == 'id0'
+        assert not [f for f in os.listdir(workdir) if f != 'out.ods']
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_plot3d_export_layout():
+    workdir = tempfile.mkdtemp()
+    try:
+        exporter = ODSExporter.__new__(ODSExporter)
+        exporter.sample_set_name = 'stamp'
+        exporter.prefs_manager = None
+        exporter.get_measurement_frame = lambda deduplicate=True: _measurements_to_frame(
+            [_measurement(i) for i in range(3)])
+
+        success, path = exporter.export_for_plot3d(os.path.join(workdir, 'stamp_Plot3D.ods'))
+        assert success
+
+        df = pd.read_excel(path, engine='odf', header=None)
+        assert df.iloc[0, 0] == 'Xnorm' and df.iloc[0, 12] == 'Radius'
+        assert df.iloc[1:7].isna().all().all()
+        assert df.iloc[7, 0] == 0.5 and df.iloc[7, 3] == 'stamp_pt0' and df.iloc[7, 7] == 'black'
+
+        assert exporter.export_to_ods(os.path.join(workdir, 'all.ods'))
+        df = pd.read_excel(os.path.join(workdir, 'all.ods'), engine='odf')
+        assert df['DataID'].tolist() == ['stamp_pt0', 'stamp_pt1', 'stamp_pt2']
+        assert df['L*'].tolist() == [50, 51, 52]
+        assert df['Notes'].iloc[0] == '<&>'
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    test_streamed_rows_read_back()
+    test_plot3d_export_layout()
+    print("Streaming ODS writer tests passed")
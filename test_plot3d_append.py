@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Round-trip test of the append-only Plot_3D export against the bundled template."""
+
+import os
+import shutil
+import tempfile
+import zipfile
+
+import ezodf
+import pandas as pd
+
+from utils.direct_plot3d_exporter import DirectPlot3DExporter
+from utils.plot3d_append import Plot3DIndex, append_rows, get_plot3d_index
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'data', 'templates', 'plot3d', 'Plot3D_Template.ods')
+
+
+def _data(names):
+    return [{'L_norm': 0.5 + i / 100, 'a_norm': 0.25, 'b_norm': 0.75, 'DataID': name}
+            for i, name in enumerate(names)]
+
+
+def test_append_round_trip():
+    workdir = tempfile.mkdtemp()
+    try:
+        exporter = DirectPlot3DExporter()
+        exporter.template_path = TEMPLATE
+        path = os.path.join(workdir, 'Stamp_Plot3D.ods')
+
+        assert exporter._create_plot3d_file(path, _data(['a_P1', 'a_P2', 'b_P1']))
+        index = Plot3DIndex.load(path)
+        assert index.data_ids == {'a_P1', 'a_P2', 'b_P1'} and index.next_row == 10
+
+        # Only new DataIDs are appended, right after the last data row
+        assert append_rows(path, exporter._plot3d_rows(_data(['b_P1', 'c_P1', 'c_P2']))) == 2
+        assert Plot3DIndex.load(path).next_row == 12
+
+        df = pd.read_excel(path, engine='odf', header=None)
+        assert list(df.iloc[0, :4]) == ['Xnorm', 'Ynorm', 'Znorm', 'DataID']
+        assert list(df.iloc[7:12, 3]) == ['a_P1', 'a_P2', 'b_P1', 'c_P1', 'c_P2']
+        assert df.iloc[7, 0] == 0.5 and df.iloc[11, 2] == 0.75
+        assert df.iloc[1:7, :4].isna().all().all()
+
+        # Everything outside columns A-D of the data rows matches the template
+        template = pd.read_excel(TEMPLATE, engine='odf', header=None)
+        patched = df.drop(index=range(7, 12)).iloc[:, 4:]
+        expected = template.drop(index=range(7, 12)).iloc[:, 4:]
+        pd.testing.assert_frame_equal(patched.reset_index(drop=True), expected.reset_index(drop=True))
+        assert df.iloc[7:12, 4:].equals(template.iloc[7:12, 4:])
+
+        # Other zip entries are copied through unchanged, mimetype first
+        with zipfile.ZipFile(TEMPLATE) as original, zipfile.ZipFile(path) as result:
+            assert result.namelist() == original.namelist()
+            for name in original.namelist():
+                if name != 'content.xml':
+                    assert result.read(name) == original.read(name)
+
+        # A file rewritten by another program invalidates the index and is rescanned
+        doc = ezodf.opendoc(path)
+        doc.sheets[0][12, 0].set_value(0.1)
+        doc.sheets[0][12, 3].set_value('manual')
+        doc.save()
+        assert get_plot3d_index(path).next_row == 13
+        assert append_rows(path, [(0.2, 0.3, 0.4, 'manual'), (0.2, 0.3, 0.4, 'd_P1')]) == 1
+        df = pd.read_excel(path, engine='odf', header=None)
+        assert list(df.iloc[11:14, 3]) == ['c_P2', 'manual', 'd_P1']
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    test_append_round_trip()
+    print("Plot_3D append test passed")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Test the batch Plot_3D export helpers."""
+
+import os
+import shutil
+import tempfile
+
+from export_all_for_plot3d import (assign_file_prefixes, format_summary_table,
+                                   load_manifest, save_manifest)
+
+
+def test_file_prefixes_avoid_case_collisions():
+    prefixes = assign_file_prefixes(['Stamp', 'stamp', 'STAMP', 'Other'])
+    assert prefixes == {'Stamp': 'Stamp', 'stamp': 'stamp_2', 'STAMP': 'STAMP_3', 'Other': 'Other'}
+
+
+def test_manifest_round_trip_and_summary():
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'manifest.json')
+        assert load_manifest(path) == {}
+        save_manifest(path, {'Stamp': {'databases': {'Stamp.db': [10, 20]}, 'files': []}})
+        assert load_manifest(path)['Stamp']['databases'] == {'Stamp.db': [10, 20]}
+        assert os.listdir(workdir) == ['manifest.json']
+
+        table = format_summary_table([
+            {'sample_set': 'Stamp', 'success': True, 'files_created': ['a', 'b'], 'rows_written': 12, 'seconds': 1.5},
+            {'sample_set': 'Other', 'success': False, 'files_created': [], 'rows_written': 0, 'seconds': 0.25},
+        ])
+        lines = table.splitlines()
+        assert lines[0].split() == ['Sample', 'set', 'Status', 'Files', 'Rows', 'Time', '(s)']
+        assert lines[-1].split() == ['Total', '2', '12', '1.75']
+        assert 'failed' in lines[3]
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    test_file_prefixes_avoid_case_collisions()
+    test_manifest_round_trip_and_summary()
+    print("Batch export tests passed")
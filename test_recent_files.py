@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Test the reference-based recent files store."""
+
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+
+from utils.recent_files import RecentFilesManager
+
+
+def _make_image(path, color):
+    Image.new('RGB', (400, 300), color).save(path)
+
+
+def test_recent_files_store_references_and_dedupes():
+    workdir = tempfile.mkdtemp()
+    try:
+        recent_dir = os.path.join(workdir, 'recent')
+        images_dir = os.path.join(workdir, 'images')
+        os.makedirs(images_dir)
+
+        red = os.path.join(images_dir, 'red.png')
+        blue = os.path.join(images_dir, 'blue.png')
+        red_copy = os.path.join(images_dir, 'red_copy.png')
+        _make_image(red, 'red')
+        _make_image(blue, 'blue')
+        shutil.copy(red, red_copy)
+
+        manager = RecentFilesManager(recent_dir=recent_dir, max_files=2)
+
+        # Files are referenced in place, not copied
+        assert manager.add_file(red) == os.path.realpath(red)
+        assert manager.add_file(blue) == os.path.realpath(blue)
+        assert not [f for f in os.listdir(recent_dir) if f.endswith('.png')]
+
+        # Re-adding and adding identical content refresh the existing entry
+        manager.add_file(red)
+        manager.add_file(red_copy)
+        files = manager.get_recent_files()
+        assert files == [os.path.realpath(red_copy), os.path.realpath(blue)]
+
+        # A file edited in place keeps its entry, with a new thumbnail
+        edited = Image.new('RGB', (1200, 500), 'green')
+        edited.save(red_copy)
+        manager.add_file(red_copy, image=edited)
+        assert manager.get_recent_files() == files
+        with Image.open(manager.get_thumbnail(red_copy)) as image:
+            assert image.size == (160, 67) and image.getpixel((0, 0)) == (0, 128, 0)
+
+        # The index survives a restart and thumbnails are small
+        manager = RecentFilesManager(recent_dir=recent_dir, max_files=2)
+        assert manager.get_recent_files() == files
+        thumbnail = manager.get_thumbnail(blue)
+        with Image.open(thumbnail) as image:
+            assert max(image.size) <= 160
+
+        # Removing forgets the reference and thumbnail but keeps the image
+        assert manager.remove_file(blue)
+        assert os.path.exists(blue)
+        assert not os.path.exists(thumbnail)
+        assert manager.get_recent_files() == [os.path.realpath(red_copy)]
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_legacy_copies_are_adopted():
+    workdir = tempfile.mkdtemp()
+    try:
+        _make_image(os.path.join(workdir, 'old_copy.png'), 'green')
+        manager = RecentFilesManager(recent_dir=workdir)
+        assert manager.get_recent_files() == [os.path.realpath(os.path.join(workdir, 'old_copy.png'))]
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    test_recent_files_store_references_and_dedupes()
+    test_legacy_copies_are_adopted()
+    print("Recent files tests passed")
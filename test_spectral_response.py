@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test the array-based spectral response analysis."""
+
+import numpy as np
+
+from utils.color_analyzer import ColorMeasurement
+from utils.spectral_analyzer import SpectralAnalyzer, SpectralMeasurement
+
+
+def _measurements(count, seed=1):
+    rng = np.random.default_rng(seed)
+    return [
+        ColorMeasurement(
+            coordinate_id=i, coordinate_point=i + 1, position=(0.0, 0.0),
+            rgb=tuple(int(v) for v in rng.integers(0, 256, 3)), lab=(50.0, 0.0, 0.0),
+            sample_area={}, measurement_date='', notes=''
+        )
+        for i in range(count)
+    ]
+
+
+def test_spectral_response_matches_per_wavelength_model():
+    analyzer = SpectralAnalyzer()
+    measurements = _measurements(12)
+
+    result = analyzer.analyze_spectral_response(measurements, 'A')
+    assert len(result) == 12 * 75
+    assert result.sample_count == 12
+
+    views = list(result)
+    assert all(isinstance(view, SpectralMeasurement) for view in views)
+    assert views[76] == result[76]
+    for view in views[75:150]:
+        wl = view.wavelength
+        r, g, b = (c / 255.0 for c in measurements[1].rgb)
+        expected = (
+            (np.exp(-((wl - 600) / 80) ** 2) if wl > 500 else 0) * r,
+            np.exp(-((wl - 550) / 60) ** 2) * g,
+            (np.exp(-((wl - 450) / 50) ** 2) if wl < 550 else 0) * b,
+        )
+        power = (wl / 560) ** -1.5
+        assert view.sample_id == 'sample_2'
+        assert np.allclose(view.rgb_response, expected, rtol=1e-12, atol=0)
+        assert np.allclose(view.relative_response, [e / power for e in expected], rtol=1e-12, atol=0)
+
+    peaks = result.peak_wavelengths(1)
+    for channel, peak in enumerate(peaks):
+        assert peak == max(views[75:150], key=lambda m: m.rgb_response[channel]).wavelength
+
+
+def test_metamerism_matrix_and_top_pairs():
+    analyzer = SpectralAnalyzer()
+    measurements = _measurements(40, seed=5)
+
+    matrix = analyzer.calculate_metamerism_matrix(measurements, chunk_size=7)
+    for i in range(0, 40, 3):
+        for j in range(40):
+            expected = analyzer.calculate_metamerism_index(measurements[i], measurements[j])
+            assert abs(matrix[i, j] - expected) < 1e-9
+
+    pairs = analyzer.find_metameric_pairs(measurements, top_n=5, chunk_size=6)
+    ranked = sorted(((matrix[i, j], i, j) for i in range(40) for j in range(i + 1, 40)), reverse=True)
+    assert [(i, j) for i, j, _ in pairs] == [(i, j) for _, i, j in ranked[:5]]
+
+    # Any subset of self.illuminants; a single illuminant has no spread
+    assert analyzer.calculate_metamerism_matrix(measurements, ['D65', 'LED']).max() > 0
+    assert not analyzer.calculate_metamerism_matrix(measurements, ['A']).any()
+    assert np.allclose(analyzer._xyz_scale('D65'), 1.0)
+
+    # The single-pair path uses the same illuminant model
+    led = analyzer.calculate_metamerism_matrix(measurements, ['D65', 'LED', 'F2'])
+    analyzer.METAMERISM_ILLUMINANTS = ('D65', 'LED', 'F2')
+    assert abs(analyzer.calculate_metamerism_index(measurements[3], measurements[8]) - led[3, 8]) < 1e-9
+
+    for unknown in (lambda: analyzer.find_metameric_pairs(measurements, illuminants=['D65', 'D50']),
+                    lambda: analyzer._rgb_to_xyz((10, 20, 30), 'D50')):
+        try:
+            unknown()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("D50 is not one of the analyzer's illuminants")
+
+if __name__ == "__main__":
+    test_spectral_response_matches_per_wavelength_model()
+    test_metamerism_matrix_and_top_pairs()
+    print("Spectral response tests passed")
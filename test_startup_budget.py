@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Startup benchmark: importing main must stay light and within budget."""
+
+from utils.startup_profile import DEFAULT_BUDGET, parse_importtime, profile_import
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:       300 |        420 | json\n"
+    )
+    timings = parse_importtime(output)
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in timings] == [
+        ('json.decoder', 120, 120, 1),
+        ('json', 300, 420, 0),
+    ]
+
+
+def test_main_startup_budget():
+    # Best of three runs to keep the benchmark stable on a busy machine
+    profiles = [profile_import('main') for _ in range(3)]
+    best = min(profiles, key=lambda p: p.total_seconds)
+    print(best.format_report(10))
+
+    assert not best.loaded_deferred_modules(), \
+        f"Heavy modules imported at startup: {best.loaded_deferred_modules()}"
+    assert best.total_seconds < DEFAULT_BUDGET, \
+        f"Importing main took {best.total_seconds:.3f}s (budget {DEFAULT_BUDGET}s)"
+
+
+if __name__ == "__main__":
+    test_parse_importtime()
+    test_main_startup_budget()
+    print("Startup budget test passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test the background task runner without a display."""
+
+import time
+
+from utils.task_runner import BackgroundTask, TaskRunner
+
+
+class FakeRoot:
+    """Minimal stand-in for the Tk after() event loop."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, func):
+        self.pending.append(func)
+        return len(self.pending)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def run_until_idle(self, timeout=5.0):
+        deadline = time.time() + timeout
+        while self.pending and time.time() < deadline:
+            time.sleep(0.01)
+            self.pending.pop(0)()
+
+
+def test_success_error_and_cancel():
+    root = FakeRoot()
+    runner = TaskRunner(root)
+    results = []
+    progress = []
+
+    def count(task, n):
+        for i in range(n):
+            task.report_progress((i + 1) / n, f"step {i + 1}")
+        return n
+
+    def fail(task):
+        raise ValueError("boom")
+
+    def spin(task):
+        while True:
+            task.report_progress(message="spinning")
+            time.sleep(0.01)
+
+    ok = runner.submit("count", count, 3, on_success=results.append,
+                       on_progress=lambda fraction, message: progress.append(fraction))
+    bad = runner.submit("fail", fail, on_error=lambda e: results.append(str(e)))
+    spinning = runner.submit("spin", spin, on_cancel=lambda: results.append("cancelled"))
+    time.sleep(0.05)
+    spinning.cancel()
+
+    root.run_until_idle()
+    runner.shutdown(wait=True)
+
+    assert ok.status == BackgroundTask.DONE and ok.result == 3
+    assert bad.status == BackgroundTask.FAILED
+    assert spinning.status == BackgroundTask.CANCELLED
+    assert sorted(results, key=str) == sorted([3, "boom", "cancelled"], key=str)
+    assert progress[-1] == 1.0
+    assert not runner.active_tasks
+
+
+if __name__ == "__main__":
+    test_success_error_and_cancel()
+    print("Task runner test passed")
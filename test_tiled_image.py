@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Test that large images are read by region and give the same samples as PIL."""
+
+import contextlib
+import io
+import os
+import struct
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from utils import image_straightener, tiled_image
+from utils.benchmarks import restore_data_dir, use_scratch_data_dir
+from utils.color_analyzer import ColorAnalyzer, PrintType
+from utils.coordinate_db import CoordinatePoint, SampleAreaType
+from utils.coordinate_template import CompiledTemplate
+from utils.tiled_image import TiledImage
+
+
+def _rgb(height, width, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def _markers():
+    return [
+        {'image_pos': (20, 30), 'sample_type': 'rectangle', 'sample_width': 10, 'sample_height': 6, 'anchor': 'center'},
+        {'image_pos': (50.5, 40), 'sample_type': 'circle', 'sample_width': 12, 'sample_height': 12, 'anchor': 'center'},
+        {'image_pos': (97, 3), 'sample_type': 'rectangle', 'sample_width': 8, 'sample_height': 8, 'anchor': 'top_left'},
+    ]
+
+
+def _write_rgb16_tiff(path, pixels):
+    """Write (h, w, 3) uint16 pixels as an uncompressed TIFF, which PIL can't save."""
+    height, width, _ = pixels.shape
+    data = pixels.astype('<u2').tobytes()
+    bits_offset = 8 + 2 + 12 * 9 + 4
+    entries = [(256, 3, width), (257, 3, height), (258, 3, bits_offset), (259, 3, 1), (262, 3, 2),
+               (273, 4, bits_offset + 6), (277, 3, 3), (278, 3, height), (279, 4, len(data))]
+    with open(path, 'wb') as f:
+        f.write(b'II*\x00' + struct.pack('<IH', 8, len(entries)))
+        for tag, kind, value in entries:
+            count = 3 if tag == 258 else 1
+            f.write(struct.pack('<HHII' if kind == 4 or count > 1 else '<HHIHxx', tag, kind, count, value))
+        f.write(struct.pack('<I3H', 0, 16, 16, 16) + data)
+
+
+def test_uncompressed_tiffs_are_mapped():
+    folder = tempfile.mkdtemp()
+    array = _rgb(70, 90)
+    cases = {
+        'rgb.tif': (Image.fromarray(array, 'RGB'), array),
+        'gray.tif': (Image.fromarray(array[:, :, 0], 'L'), np.repeat(array[:, :, :1], 3, axis=2)),
+        'rgba.tif': (Image.fromarray(np.dstack([array, array[:, :, :1]]), 'RGBA'), array),
+    }
+    low_bytes = np.arange(90, dtype=np.uint32)[None, :, None] * 2  # Where high byte and 1/257 differ
+    wide = np.minimum(array.astype(np.uint32) * 257 + low_bytes, 65535).astype(np.uint16)
+    _write_rgb16_tiff(os.path.join(folder, 'rgb16.tif'), wide)
+    cases['rgb16.tif'] = (None, (wide >> 8).astype(np.uint8))
+
+    for name, (image, expected) in cases.items():
+        path = os.path.join(folder, name)
+        if image is not None:
+            image.save(path)
+        with TiledImage.open(path) as tiled:
+            assert tiled.source == 'mapped', name
+            assert tiled.size == (90, 70)
+            assert np.array_equal(tiled.region((0, 0, 90, 70)), expected), name
+            assert np.array_equal(tiled.region((80, 60, 120, 95)), expected[60:, 80:]), name
+            assert np.array_equal(np.asarray(tiled.crop((5, 7, 25, 17))), expected[7:17, 5:25]), name
+            assert tiled.region((95, 0, 99, 10)).size == 0
+        # Mapped pixels are what PIL decodes, as for compressed files
+        with Image.open(path) as decoded:
+            assert np.array_equal(np.asarray(decoded.convert('RGB')), expected), name
+
+
+def test_16_bit_grayscale_is_left_to_pil():
+    path = os.path.join(tempfile.mkdtemp(), 'gray16.tif')
+    Image.fromarray(np.array([[33024, 300, 65535, 100]], dtype=np.uint16)).save(path)
+    with TiledImage.open(path) as tiled, Image.open(path) as decoded:
+        assert tiled.source == 'memory'
+        assert np.array_equal(tiled.region((0, 0, 4, 1)), np.asarray(decoded.convert('RGB')))
+
+
+def test_compressed_images_are_decoded_once():
+    folder = tempfile.mkdtemp()
+    array = _rgb(70, 90, seed=1)
+    png, lzw = os.path.join(folder, 'stamp.png'), os.path.join(folder, 'stamp.tif')
+    Image.fromarray(array).save(png)
+    Image.fromarray(array).save(lzw, compression='tiff_lzw')
+
+    with TiledImage.open(lzw) as tiled:
+        assert tiled.source == 'memory'
+        assert np.array_equal(tiled.region((0, 0, 90, 70)), array)
+
+    previous = use_scratch_data_dir(tempfile.mkdtemp())
+    limit = tiled_image.MAX_IN_MEMORY_BYTES
+    tiled_image.MAX_IN_MEMORY_BYTES = 1000
+    try:
+        for _ in range(2):  # The second open maps the cache written by the first
+            with TiledImage.open(png) as tiled:
+                assert tiled.source == 'cache'
+                assert np.array_equal(np.vstack([strip for _, strip in tiled.strips(16)]), array)
+        assert len(os.listdir(tiled_image._decoded_cache_dir())) == 1
+    finally:
+        tiled_image.MAX_IN_MEMORY_BYTES = limit
+        restore_data_dir(previous)
+
+
+def test_region_sampling_matches_pil():
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'stamp.tif')
+    array = _rgb(80, 100, seed=2)
+    Image.fromarray(array).save(path)
+
+    analyzer = ColorAnalyzer.__new__(ColorAnalyzer)
+    analyzer.print_type = PrintType.SOLID_PRINTED
+    points = [CoordinatePoint(20, 30, SampleAreaType.RECTANGLE, (10, 6), 'center'),
+              CoordinatePoint(50.5, 40, SampleAreaType.CIRCLE, (12, 12), 'center'),
+              CoordinatePoint(97, 3, SampleAreaType.RECTANGLE, (8, 8), 'top_left'),
+              CoordinatePoint(140, 3, SampleAreaType.RECTANGLE, (8, 8), 'center')]
+    template = CompiledTemplate.compile('test', (len(points), 1), points)
+
+    with TiledImage.open(path) as tiled, contextlib.redirect_stdout(io.StringIO()):
+        assert tiled.source == 'mapped'
+        assert template.sample(tiled) == template.sample(array)
+        assert ([analyzer._sample_area_color(tiled, p) for p in points]
+                == [analyzer._sample_area_color(Image.open(path), p) for p in points])
+        from_tiles = analyzer.extract_sample_colors_from_coordinates(tiled, _markers())
+        from_pil = analyzer.extract_sample_colors_from_coordinates(Image.open(path), _markers())
+    assert [m.rgb for m in from_tiles] == [m.rgb for m in from_pil]
+
+
+def test_auto_crop_is_independent_of_strip_size():
+    array = np.full((300, 260, 3), 255, dtype=np.uint8)
+    array[40:170, 90:200] = _rgb(130, 110, seed=3)
+    rotated = Image.fromarray(array).rotate(-6, expand=True, fillcolor='white')
+
+    straightener = image_straightener.ImageStraightener
+    rows = image_straightener.CROP_STRIP_ROWS
+    try:
+        for image in (rotated, rotated.convert('RGBA')):
+            crops, fallbacks = set(), set()
+            for image_straightener.CROP_STRIP_ROWS in (5, 64, 1000):
+                crops.add(straightener._crop_background_padding(image).size)
+                fallbacks.add(straightener._simple_crop_fallback(image).size)
+            assert len(crops) == 1 and len(fallbacks) == 1, image.mode
+            width, height = crops.pop()
+            assert width < rotated.width and height < rotated.height
+    finally:
+        image_straightener.CROP_STRIP_ROWS = rows
+
+
+def test_auto_crop_keeps_thin_outlines():
+    # A 1-pixel frame only survives the noise-removing opening once filled
+    image = Image.new('RGBA', (200, 150), 'white')
+    ImageDraw.Draw(image).rectangle([40, 30, 120, 90], outline='black')
+
+    rows = image_straightener.CROP_STRIP_ROWS
+    try:
+        for image_straightener.CROP_STRIP_ROWS in (5, 1000):
+            cropped = image_straightener.ImageStraightener._crop_background_padding(image)
+            assert cropped.size == (81 + 8, 61 + 8)  # Dilation and margin: 4 pixels each side
+    finally:
+        image_straightener.CROP_STRIP_ROWS = rows
+
+
+if __name__ == "__main__":
+    test_uncompressed_tiffs_are_mapped()
+    test_16_bit_grayscale_is_left_to_pil()
+    test_compressed_images_are_decoded_once()
+    test_region_sampling_matches_pil()
+    test_auto_crop_is_independent_of_strip_size()
+    test_auto_crop_keeps_thin_outlines()
+    print("Tiled image tests passed")
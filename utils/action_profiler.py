@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Per-action profiling of StampZ GUI actions.
+
+When profiling is turned on in Preferences > Diagnostics, each decorated
+menu action (open image, analyze, export, compare, open Plot_3D) runs
+under cProfile, and so does any work the action hands to the background
+task runner, in its worker thread. Each run writes two files to the
+profiles folder of the data directory:
+
+    <action>_<timestamp>.prof   cProfile data, for snakeviz, pstats or
+                                flameprof (flame graphs)
+    <action>_<timestamp>.txt    wall time and the top functions by
+                                cumulative time
+
+Background work is written as <action>_<timestamp>_task.prof/.txt. Only
+one profiler runs at a time (Python 3.12+ refuses a second one, even on
+another thread), so an action's profile ends when it hands work to the
+task runner, and the task is profiled from then on. On 3.12+ a profile
+also records Python code other threads run meanwhile, such as Tk event
+handlers on the main thread.
+"""
+
+import functools
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+# Number of functions listed in each summary
+TOP_FUNCTIONS = 40
+
+_enabled = False
+_local = threading.local()
+
+# Held while any profiler is running, in whichever thread
+_active = threading.Lock()
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def profiles_dir() -> str:
+    """Folder receiving the profile files."""
+    from .path_utils import get_base_data_dir
+    return os.path.join(get_base_data_dir(), 'profiles')
+
+
+def current_run() -> Optional[str]:
+    """Label of the profiled action running on this thread, if any."""
+    return getattr(_local, 'run', None)
+
+
+def end_current_profile() -> None:
+    """Stop profiling on this thread, so another thread can profile.
+
+    The stopped profile is still written when its action returns.
+    """
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is not None:
+        _local.profiler = None
+        profiler.disable()
+        _active.release()
+
+
+def write_profile(profiler, label: str, wall_seconds: float) -> str:
+    """Write label.prof and a label.txt summary to the profiles folder.
+
+    Returns:
+        Path of the .prof file
+    """
+    import pstats
+
+    folder = profiles_dir()
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{label}.prof")
+    profiler.dump_stats(path)
+    with open(os.path.join(folder, f"{label}.txt"), 'w') as f:
+        f.write(f"{label}: {wall_seconds:.3f} s wall time\n")
+        f.write("Time spent waiting in dialogs is included in the Tk calls.\n\n")
+        pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    return path
+
+
+def run_profiled(label: str, func: Callable, *args, **kwargs):
+    """Call func under cProfile and write its profile as label.
+
+    The profile is written even if func raises; a failure to write it is
+    reported but never replaces func's own result or exception. If another
+    profiler is already running, here or in another profiling tool, func
+    runs without one.
+    """
+    import cProfile
+
+    if not _active.acquire(blocking=False):
+        print(f"Not profiling {label}: another profile is running")
+        return func(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:  # Python 3.12+: "Another profiling tool is already active"
+        _active.release()
+        print(f"Not profiling {label}: {e}")
+        return func(*args, **kwargs)
+
+    _local.run = label
+    _local.profiler = profiler
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        wall_seconds = time.perf_counter() - start
+        end_current_profile()
+        _local.run = None
+        try:
+            path = write_profile(profiler, label, wall_seconds)
+            print(f"Profile written to: {path}")
+        except Exception as e:
+            print(f"Error writing profile for {label}: {e}")
+
+
+def profiled_action(name: str):
+    """Decorator profiling each call of a GUI action while profiling is on.
+
+    Actions called from inside another profiled action are part of the
+    outer profile.
+
+    Args:
+        name: Action name used in the profile file names
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled or current_run() is not None:
+                return func(*args, **kwargs)
+            label = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+            return run_profiled(label, func, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Shared cache of sample area analysis results for StampZ.
+
+Sampling a marker means decoding the image and averaging every pixel in
+the sample area. The main window's analysis, the library comparison window
+and the library manager all sample the same markers on the same image, so
+each sampled area is kept here, keyed by the image's content hash, the
+print type and the sample geometry, and any of them can reuse it.
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .recent_files import file_fingerprint, full_content_hash
+
+# Number of images whose sample results are kept
+MAX_CACHED_IMAGES = 32
+
+SampleGeometry = Tuple[float, float, str, float, float, str]
+SampleResult = Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+
+
+def sample_geometry(x, y, sample_type, width, height, anchor) -> SampleGeometry:
+    """Normalized description of a sample area, used as part of the cache key.
+
+    Args:
+        x, y: Image position of the marker
+        sample_type: 'circle' or 'rectangle'
+        width, height: Sample area size in pixels
+        anchor: Anchor position string
+    """
+    return (float(x), float(y), str(sample_type), float(width), float(height), str(anchor))
+
+
+class AnalysisResultCache:
+    """Average RGB and L*a*b* per sample area, per image content.
+
+    Image files are identified by the SHA-256 of their contents, so a file
+    that is renamed or copied still hits, and an edited file misses. The
+    hash is computed once per path, size and modification time.
+    """
+
+    def __init__(self, max_images: int = MAX_CACHED_IMAGES):
+        self.max_images = max_images
+        self._lock = threading.Lock()
+        self._content_hashes: Dict[str, str] = {}  # File fingerprint -> content hash
+        # Image content hash -> {(print type, geometry) -> result}, least recently used first
+        self._images: "OrderedDict[str, Dict[Tuple[str, SampleGeometry], SampleResult]]" = OrderedDict()
+
+    def image_key(self, image_path: str) -> Optional[str]:
+        """Content hash identifying an image file, or None if it can't be read."""
+        try:
+            path = Path(image_path)
+            fingerprint = file_fingerprint(path)
+            with self._lock:
+                content_hash = self._content_hashes.get(fingerprint)
+            if content_hash is None:
+                content_hash = full_content_hash(path)
+                with self._lock:
+                    self._content_hashes[fingerprint] = content_hash
+            return content_hash
+        except OSError:
+            return None
+
+    def get(self, image_key: Optional[str], print_type: str,
+            geometry: SampleGeometry) -> Optional[SampleResult]:
+        """Cached (avg_rgb, lab) for a sample area, or None."""
+        if image_key is None:
+            return None
+        with self._lock:
+            samples = self._images.get(image_key)
+            if samples is None:
+                return None
+            self._images.move_to_end(image_key)
+            return samples.get((print_type, geometry))
+
+    def put(self, image_key: Optional[str], print_type: str, geometry: SampleGeometry,
+            avg_rgb: Tuple[float, float, float], lab: Tuple[float, float, float]) -> None:
+        """Store the result of sampling one area."""
+        if image_key is None:
+            return
+        with self._lock:
+            samples = self._images.setdefault(image_key, {})
+            self._images.move_to_end(image_key)
+            samples[(print_type, geometry)] = (tuple(avg_rgb), tuple(lab))
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._content_hashes.clear()
+            self._images.clear()
+
+
+# Global cache shared by the main window, comparison window and library manager
+_analysis_cache = None
+
+
+def get_analysis_cache() -> AnalysisResultCache:
+    """Get the global analysis result cache, creating it on first use."""
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = AnalysisResultCache()
+    return _analysis_cache
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Columnar Parquet / Arrow IPC files for StampZ measurement data.
+
+Measurements are stored with typed float columns for L*a*b*, RGB and
+position, integer point numbers, and dictionary-encoded image names, sample
+shapes and anchors. Arrow IPC (.arrow/.feather) files are written
+uncompressed so they can be memory-mapped on read; Parquet files are
+compressed for exchange with other tools.
+
+pyarrow is optional and only imported when one of these files is used.
+"""
+
+import os
+from typing import List, Optional
+
+ARROW_EXTENSIONS = ('.arrow', '.feather')
+PARQUET_EXTENSIONS = ('.parquet',)
+
+# Column name -> Arrow type name; order is the on-disk column order
+MEASUREMENT_SCHEMA = (
+    ('data_id', 'string'),
+    ('image_name', 'dictionary'),
+    ('sample_set_number', 'int32'),
+    ('coordinate_point', 'int32'),
+    ('l_value', 'float64'),
+    ('a_value', 'float64'),
+    ('b_value', 'float64'),
+    ('rgb_r', 'float64'),
+    ('rgb_g', 'float64'),
+    ('rgb_b', 'float64'),
+    ('x_position', 'float64'),
+    ('y_position', 'float64'),
+    ('sample_shape', 'dictionary'),
+    ('sample_size', 'string'),
+    ('sample_anchor', 'dictionary'),
+    ('measurement_date', 'string'),
+    ('notes', 'string'),
+    ('is_averaged', 'bool_'),
+    ('source_samples_count', 'int32'),
+    ('source_sample_ids', 'string'),
+)
+
+
+def _require_pyarrow():
+    """Import pyarrow, with an install hint if it is missing."""
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ImportError("pyarrow library not available. Install with: pip install pyarrow")
+
+
+def is_columnar_file(path: str) -> bool:
+    """True if the path has a Parquet or Arrow IPC extension."""
+    return path.lower().endswith(ARROW_EXTENSIONS + PARQUET_EXTENSIONS)
+
+
+def _arrow_type(pa, type_name: str):
+    if type_name == 'dictionary':
+        return pa.dictionary(pa.int32(), pa.string())
+    return getattr(pa, type_name)()
+
+
+def measurement_table(frame):
+    """Convert a measurement frame (ODSExporter.get_measurement_frame) to an Arrow table."""
+    import pandas as pd
+    pa = _require_pyarrow()
+
+    arrays = []
+    names = []
+    for name, type_name in MEASUREMENT_SCHEMA:
+        if name not in frame:
+            continue
+        column = frame[name]
+        if type_name in ('string', 'dictionary'):
+            values = column.astype(object).where(column.notna(), None)
+            values = [None if v is None else str(v) for v in values]
+        elif type_name == 'bool_':
+            values = column.fillna(False).astype(bool)
+        elif type_name == 'int32':
+            values = pd.to_numeric(column, errors='coerce').astype('Int32')
+        else:
+            values = pd.to_numeric(column, errors='coerce').astype(float)
+
+        array = pa.array(values, type=pa.string() if type_name == 'dictionary' else _arrow_type(pa, type_name),
+                         from_pandas=True)
+        if type_name == 'dictionary':
+            array = array.dictionary_encode()
+        arrays.append(array)
+        names.append(name)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def write_measurements(frame, output_path: str) -> int:
+    """Write a measurement frame as Parquet or Arrow IPC, chosen by extension.
+
+    The file is written to a temporary name and moved into place once complete.
+
+    Returns:
+        Number of rows written
+    """
+    pa = _require_pyarrow()
+    table = measurement_table(frame)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    temp_path = f"{output_path}.partial"
+    try:
+        if output_path.lower().endswith(PARQUET_EXTENSIONS):
+            import pyarrow.parquet as pq
+            pq.write_table(table, temp_path, compression='zstd')
+        else:
+            with pa.OSFile(temp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return table.num_rows
+
+
+def read_table(path: str, columns: Optional[List[str]] = None):
+    """Read a Parquet or Arrow IPC file; Arrow IPC files are memory-mapped."""
+    pa = _require_pyarrow()
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def read_frame(path: str, columns: Optional[List[str]] = None):
+    """Read a Parquet or Arrow IPC file into a DataFrame with plain string columns."""
+    pa = _require_pyarrow()
+    table = read_table(path, columns)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table.to_pandas()
@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the StampZ color hot paths.
+
+Every benchmark runs against fixed synthetic fixtures (seeded, generated
+into a scratch data directory), so results are comparable between commits
+on the same machine. Results are written as JSON and can be compared with
+an earlier run to spot regressions.
+
+Usage:
+    python -m utils.benchmarks [--only NAME ...] [--scale 1.0] [--repeat 3]
+                               [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fixture sizes at scale 1.0
+RGB_IMAGE_SIZE = (6000, 4000)
+TIFF16_IMAGE_SIZE = (4000, 3000)
+LIBRARY_COLORS = 20000
+MEASUREMENT_IMAGES = 4000
+POINTS_PER_IMAGE = 5
+PLOT3D_ROWS = 50000
+CONVERSION_COLORS = 10000
+DELTA_E_PAIRS = 20000
+MATCH_QUERIES = 200
+
+# Relative slowdown of the median reported as a regression by --compare
+DEFAULT_TOLERANCE = 0.10
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark."""
+    name: str
+    items: int                      # Work items per run (pixels, colors, rows...)
+    times: List[float] = field(default_factory=list)
+
+    @property
+    def best(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.median if self.median > 0 else float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.update(best=self.best, median=self.median, items_per_second=self.items_per_second)
+        return data
+
+
+def use_scratch_data_dir(folder: str):
+    """Point STAMPZ_DATA_DIR and the coordinate database at a scratch folder.
+
+    Returns:
+        The previous settings, for restore_data_dir
+    """
+    from utils.coordinate_db import CoordinateDB
+
+    previous = (os.environ.get('STAMPZ_DATA_DIR'), CoordinateDB._instance, CoordinateDB._initialized)
+    os.environ['STAMPZ_DATA_DIR'] = folder
+    os.makedirs(os.path.join(folder, 'data'), exist_ok=True)
+
+    db = object.__new__(CoordinateDB)  # Bypass the singleton's fixed path
+    db.db_path = os.path.join(folder, 'data', 'coordinates.db')
+    with quiet():
+        db._init_db()
+    CoordinateDB._instance, CoordinateDB._initialized = db, True
+    CoordinateDB._compiled_templates.clear()
+    return previous
+
+
+def restore_data_dir(previous) -> None:
+    """Undo use_scratch_data_dir."""
+    from utils.coordinate_db import CoordinateDB
+
+    previous_env, CoordinateDB._instance, CoordinateDB._initialized = previous
+    CoordinateDB._compiled_templates.clear()
+    if previous_env is None:
+        os.environ.pop('STAMPZ_DATA_DIR', None)
+    else:
+        os.environ['STAMPZ_DATA_DIR'] = previous_env
+
+
+@contextlib.contextmanager
+def scratch_data_dir(folder: str):
+    """Run with the data directory and coordinate database in a scratch folder.
+
+    Nothing the benchmarks write reaches the user's data directory; the
+    previous settings are restored on exit.
+    """
+    previous = use_scratch_data_dir(folder)
+    try:
+        yield folder
+    finally:
+        restore_data_dir(previous)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Discard the diagnostic printing of the code under test."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+class BenchmarkFixtures:
+    """Seeded synthetic inputs, each generated on first use.
+
+    Args:
+        folder: Scratch data directory (see scratch_data_dir)
+        scale: Multiplier for fixture sizes; 1.0 gives the documented sizes
+        seed: Random seed for all fixtures
+    """
+
+    def __init__(self, folder: str, scale: float = 1.0, seed: int = 2024):
+        self.folder = folder
+        self.scale = scale
+        self.seed = seed
+
+    def count(self, base: int) -> int:
+        return max(1, int(round(base * self.scale)))
+
+    def image_size(self, base: Tuple[int, int]) -> Tuple[int, int]:
+        # Scale the area, not each side
+        side = self.scale ** 0.5
+        return max(64, int(base[0] * side)), max(64, int(base[1] * side))
+
+    def rng(self, offset: int = 0) -> np.random.Generator:
+        return np.random.default_rng(self.seed + offset)
+
+    def random_labs(self, count: int, offset: int = 0) -> np.ndarray:
+        rng = self.rng(offset)
+        return np.column_stack([
+            rng.uniform(15, 95, count), rng.uniform(-60, 60, count), rng.uniform(-60, 60, count)
+        ])
+
+    @cached_property
+    def rgb_image(self) -> Image.Image:
+        """Large 8-bit RGB scan with smooth gradients and noise."""
+        width, height = self.image_size(RGB_IMAGE_SIZE)
+        rng = self.rng(1)
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        array = np.empty((height, width, 3), dtype=np.uint8)
+        noise = rng.integers(-8, 9, (height, width), dtype=np.int16)
+        array[..., 0] = np.clip(x + noise, 0, 255)
+        array[..., 1] = np.clip(y + noise, 0, 255)
+        array[..., 2] = np.clip((x + y) / 2 - noise, 0, 255)
+        return Image.fromarray(array, 'RGB')
+
+    @cached_property
+    def tiff16_path(self) -> str:
+        """Large 16-bit TIFF (single channel, as written by Pillow)."""
+        width, height = self.image_size(TIFF16_IMAGE_SIZE)
+        array = self.rng(2).integers(0, 65536, (height, width), dtype=np.uint16)
+        path = os.path.join(self.folder, 'scan_16bit.tif')
+        Image.fromarray(array).save(path)  # uint16 -> mode I;16
+        return path
+
+    @cached_property
+    def library(self):
+        """Color library with LIBRARY_COLORS entries."""
+        import sqlite3
+        from utils.color_library import ColorLibrary
+
+        with quiet():
+            library = ColorLibrary('benchmark_library')
+        labs = self.random_labs(self.count(LIBRARY_COLORS), offset=3)
+        rows = [
+            (f"Color_{i:05d}", "", l, a, b, 128.0, 128.0, 128.0, f"Category_{i % 12}")
+            for i, (l, a, b) in enumerate(labs.tolist())
+        ]
+        with sqlite3.connect(library.db_path) as conn:
+            conn.execute("DELETE FROM library_colors")
+            conn.executemany("""
+                INSERT INTO library_colors (name, description, lab_l, lab_a, lab_b,
+                                            rgb_r, rgb_g, rgb_b, category)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        return library
+
+    @cached_property
+    def measurement_db(self):
+        """Sample set database with MEASUREMENT_IMAGES x POINTS_PER_IMAGE rows."""
+        from utils.color_analysis_db import ColorAnalysisDB
+
+        with quiet():
+            db = ColorAnalysisDB('benchmark_set')
+            images = self.count(MEASUREMENT_IMAGES)
+            labs = self.random_labs(images * POINTS_PER_IMAGE, offset=4)
+            batch = []
+            for image in range(images):
+                measurements = []
+                for point in range(POINTS_PER_IMAGE):
+                    l, a, b = labs[image * POINTS_PER_IMAGE + point]
+                    measurements.append({
+                        'coordinate_point': point + 1, 'x_pos': 100.0 * point, 'y_pos': 50.0,
+                        'l_value': l, 'a_value': a, 'b_value': b,
+                        'rgb_r': 120.0, 'rgb_g': 110.0, 'rgb_b': 100.0,
+                        'sample_type': 'circle', 'sample_size': '20x20', 'sample_anchor': 'center',
+                    })
+                batch.append((f"S{image:05d}", None, measurements))
+            db.save_measurement_sets(batch)
+        return db
+
+    @cached_property
+    def export_measurements(self) -> list:
+        """ODS exporter measurements matching the measurement database."""
+        from utils.ods_exporter import ColorMeasurement
+
+        labs = self.random_labs(self.count(MEASUREMENT_IMAGES) * POINTS_PER_IMAGE, offset=4)
+        return [
+            ColorMeasurement(
+                data_id=f"S{i // POINTS_PER_IMAGE:05d}", sample_set_number=i // POINTS_PER_IMAGE + 1,
+                coordinate_point=i % POINTS_PER_IMAGE + 1, l_value=l, a_value=a, b_value=b,
+                rgb_r=120.0, rgb_g=110.0, rgb_b=100.0, x_position=100.0, y_position=50.0,
+                sample_shape='circle', sample_size='20x20', sample_anchor='center',
+                measurement_date='2024-01-01 12:00:00'
+            )
+            for i, (l, a, b) in enumerate(labs.tolist())
+        ]
+
+    @cached_property
+    def plot3d_sheet(self) -> str:
+        """Plot_3D .ods sheet with PLOT3D_ROWS data rows."""
+        from utils.ods_exporter import PLOT3D_HEADERS, PLOT3D_NUMERIC_COLUMNS, PLOT3D_RESERVED_ROWS
+        from utils.ods_stream_writer import write_ods
+
+        rows = self.count(PLOT3D_ROWS)
+        norm = self.rng(5).random((rows, 3))
+        path = os.path.join(self.folder, 'plot3d_sheet.ods')
+        write_ods(
+            path, 'Sheet1', PLOT3D_HEADERS,
+            ([f"{x:.4f}", f"{y:.4f}", f"{z:.4f}", f"S{i:05d}", '', '', '.', 'blue', '', '', '', '', '']
+             for i, (x, y, z) in enumerate(norm.tolist())),
+            PLOT3D_NUMERIC_COLUMNS, blank_rows=PLOT3D_RESERVED_ROWS
+        )
+        return path
+
+
+# name -> (description, setup); setup(fixtures) returns (timed callable, items per run)
+BENCHMARKS: Dict[str, Tuple[str, Callable[[BenchmarkFixtures], Tuple[Callable[[], Any], int]]]] = {}
+
+
+def benchmark(name: str, description: str):
+    """Register a benchmark setup function."""
+    def register(setup):
+        BENCHMARKS[name] = (description, setup)
+        return setup
+    return register
+
+
+def _analyzer():
+    from utils.color_analyzer import ColorAnalyzer
+    with quiet():
+        return ColorAnalyzer()
+
+
+@benchmark('extract_pixels_rgb', "ColorAnalyzer._extract_pixels_from_bounds, 40px areas on a large RGB scan")
+def _bench_extract_pixels_rgb(fixtures):
+    from utils.coordinate_db import SampleAreaType
+
+    analyzer, image = _analyzer(), fixtures.rgb_image
+    width, height = image.size
+    areas = [((x, y, x + 40, y + 40), shape)
+             for x, y in [(width // 4, height // 4), (width // 2, height // 2), (3 * width // 4, height // 3)]
+             for shape in (SampleAreaType.RECTANGLE, SampleAreaType.CIRCLE)]
+
+    def run():
+        for bounds, shape in areas:
+            analyzer._extract_pixels_from_bounds(image, bounds, shape)
+    return run, len(areas) * 40 * 40
+
+
+@benchmark('extract_pixels_tiff16', "ColorAnalyzer._extract_pixels_from_bounds on a large 16-bit TIFF")
+def _bench_extract_pixels_tiff16(fixtures):
+    from utils.coordinate_db import SampleAreaType
+
+    analyzer = _analyzer()
+    image = Image.open(fixtures.tiff16_path)
+    image.load()
+    width, height = image.size
+    bounds = (width // 2, height // 2, width // 2 + 40, height // 2 + 40)
+
+    def run():
+        analyzer._extract_pixels_from_bounds(image, bounds, SampleAreaType.RECTANGLE)
+    return run, 40 * 40
+
+
+@benchmark('rgb_to_lab', "ColorAnalyzer.rgb_to_lab, one call per color")
+def _bench_rgb_to_lab(fixtures):
+    analyzer = _analyzer()
+    colors = [tuple(c) for c in fixtures.rng(6).uniform(0, 255, (fixtures.count(CONVERSION_COLORS), 3)).tolist()]
+
+    def run():
+        for rgb in colors:
+            analyzer.rgb_to_lab(rgb)
+    return run, len(colors)
+
+
+@benchmark('find_closest_matches', "ColorLibrary.find_closest_matches against a 20k-color library")
+def _bench_find_closest_matches(fixtures):
+    library = fixtures.library
+    queries = [tuple(lab) for lab in fixtures.random_labs(MATCH_QUERIES, offset=7).tolist()]
+    library.find_closest_matches(queries[0])  # Load the match data outside the timing
+
+    def run():
+        for lab in queries:
+            library.find_closest_matches(lab, max_delta_e=10.0, max_results=3)
+    return run, len(queries)
+
+
+def _delta_e_benchmark(calculator_factory):
+    def setup(fixtures):
+        calculator = calculator_factory()
+        count = fixtures.count(DELTA_E_PAIRS)
+        pairs = list(zip(map(tuple, fixtures.random_labs(count, offset=8).tolist()),
+                         map(tuple, fixtures.random_labs(count, offset=9).tolist())))
+
+        def run():
+            for lab1, lab2 in pairs:
+                calculator.calculate_delta_e_2000(lab1, lab2)
+        return run, len(pairs)
+    return setup
+
+
+def _plot3d_calculator(module_name, class_name):
+    def create():
+        import importlib
+        import logging
+        logger = logging.getLogger(f"benchmarks.{class_name}")
+        logger.setLevel(logging.WARNING)
+        return getattr(importlib.import_module(module_name), class_name)(logger=logger)
+    return create
+
+
+benchmark('delta_e_2000_calculator', "DeltaECalculator.calculate_delta_e_2000 (Plot_3D)")(
+    _delta_e_benchmark(_plot3d_calculator('plot3d.delta_e_calculator', 'DeltaECalculator')))
+benchmark('delta_e_2000_manager', "DeltaEManager.calculate_delta_e_2000 (Plot_3D)")(
+    _delta_e_benchmark(_plot3d_calculator('plot3d.delta_e_manager', 'DeltaEManager')))
+benchmark('delta_e_2000_reference', "ReferencePointCalculator.calculate_delta_e_2000 (Plot_3D)")(
+    _delta_e_benchmark(_plot3d_calculator('plot3d.reference_point_calculator', 'ReferencePointCalculator')))
+
+
+@benchmark('get_all_measurements', "ColorAnalysisDB.get_all_measurements on a 20k-row sample set")
+def _bench_get_all_measurements(fixtures):
+    db = fixtures.measurement_db
+    return db.get_all_measurements, fixtures.count(MEASUREMENT_IMAGES) * POINTS_PER_IMAGE
+
+
+@benchmark('create_ods_document', "ODSExporter.create_ods_document for 20k measurements")
+def _bench_create_ods_document(fixtures):
+    from utils.ods_exporter import ODSExporter
+
+    with quiet():
+        exporter = ODSExporter('benchmark_set')
+    measurements = fixtures.export_measurements
+    return (lambda: exporter.create_ods_document(measurements)), len(measurements)
+
+
+@benchmark('plot3d_load_data', "Plot_3D load_data on a 50k-row sheet")
+def _bench_plot3d_load_data(fixtures):
+    from plot3d.data_processor import load_data
+
+    path = fixtures.plot3d_sheet
+    if load_data(path) is None:
+        raise RuntimeError(f"load_data could not read the benchmark sheet {path}")
+    return (lambda: load_data(path)), fixtures.count(PLOT3D_ROWS)
+
+
+def run_benchmarks(names: Optional[List[str]] = None, scale: float = 1.0, repeat: int = 3,
+                   folder: Optional[str] = None,
+                   progress: Optional[Callable[[str], None]] = None) -> List[BenchmarkResult]:
+    """Run benchmarks against freshly generated fixtures.
+
+    Args:
+        names: Benchmarks to run (default: all, in registration order)
+        scale: Fixture size multiplier
+        repeat: Timed runs per benchmark, after one untimed warm-up run
+        folder: Scratch directory to use (default: a temporary directory, removed afterwards)
+        progress: Optional callable receiving a line per finished benchmark
+
+    Returns:
+        One BenchmarkResult per benchmark
+    """
+    unknown = set(names or ()) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    owns_folder = folder is None
+    folder = folder or tempfile.mkdtemp(prefix='stampz_bench_')
+    results = []
+    try:
+        with scratch_data_dir(folder):
+            fixtures = BenchmarkFixtures(folder, scale)
+            for name in names or list(BENCHMARKS):
+                with quiet():
+                    run, items = BENCHMARKS[name][1](fixtures)
+                    run()  # Warm-up: imports, caches, lazy loading
+                    result = BenchmarkResult(name, items)
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        run()
+                        result.times.append(time.perf_counter() - start)
+                results.append(result)
+                if progress:
+                    progress(f"{name:<28} median {result.median * 1000:>10.2f}ms  "
+                             f"{result.items_per_second:>14,.0f} items/s")
+    finally:
+        if owns_folder:
+            shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+
+def environment_info() -> Dict[str, Any]:
+    """Machine and code version the results were measured on."""
+    import pandas as pd
+    import PIL
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pillow': PIL.__version__,
+    }
+
+
+def save_results(path: str, results: List[BenchmarkResult], scale: float) -> None:
+    """Write results and environment info as JSON."""
+    data = {
+        'environment': environment_info(),
+        'scale': scale,
+        'results': [result.to_dict() for result in results],
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = DEFAULT_TOLERANCE) -> List[Tuple[str, float, float, bool]]:
+    """Compare the median times of two saved runs.
+
+    Args:
+        baseline, current: Loaded result files
+        tolerance: Relative slowdown allowed before a benchmark counts as regressed
+
+    Returns:
+        (name, baseline median, current median, regressed) for benchmarks in both runs
+    """
+    if baseline.get('scale') != current.get('scale'):
+        raise ValueError("Runs were made at different fixture scales and cannot be compared")
+    before = {r['name']: r['median'] for r in baseline['results']}
+    return [
+        (r['name'], before[r['name']], r['median'], r['median'] > before[r['name']] * (1 + tolerance))
+        for r in current['results'] if r['name'] in before
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run StampZ color hot-path micro-benchmarks")
+    parser.add_argument('--only', nargs='+', metavar='NAME', help="Benchmarks to run (default: all)")
+    parser.add_argument('--list', action='store_true', help="List the available benchmarks")
+    parser.add_argument('--scale', type=float, default=1.0, help="Fixture size multiplier (default: 1.0)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument('--output', help="JSON file for the results (default: benchmark_<commit>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="Earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slowdown counted as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (description, _) in BENCHMARKS.items():
+            print(f"{name:<28} {description}")
+        return 0
+
+    results = run_benchmarks(args.only, args.scale, args.repeat, progress=print)
+    output = args.output
+    if output is None:
+        commit = environment_info()['commit']
+        output = f"benchmark_{commit[:10] if commit else datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    save_results(output, results, args.scale)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        with open(output) as f:
+            current = json.load(f)
+        regressions = 0
+        print(f"\n{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+        for name, before, after, regressed in compare_results(baseline, current, args.tolerance):
+            regressions += regressed
+            flag = "  REGRESSED" if regressed else ""
+            print(f"{name:<28} {before * 1000:>10.2f}ms {after * 1000:>10.2f}ms "
+                  f"{(after / before - 1) * 100:>+7.1f}%{flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,20 @@ Separate database utilities for color analysis data.
 Each sample set gets its own database file for perfect data separation.
 """
 
+import hashlib
 import sqlite3
 import os
 import re
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from datetime import datetime
 
+from .instrumentation import traced
+
+if TYPE_CHECKING:  # Annotations only: the methods import these when called, keeping startup light
+    import numpy
+    import pandas
+
+
 class ColorAnalysisDB:
     """Handle database operations for color analysis data."""
     
@@ -115,6 +123,8 @@ class ColorAnalysisDB:
                 CREATE INDEX IF NOT EXISTS idx_set_point 
                 ON color_measurements(set_id, coordinate_point)
             """)
+            self._ensure_row_hash_column(conn)
+            self._create_query_indexes(conn)
     
     def create_measurement_set(self, image_name: str, description: str = None) -> int:
         """Create a new measurement set and return its ID."""
@@ -141,6 +151,91 @@ class ColorAnalysisDB:
             print(f"Error creating measurement set: {e}")
             return None
 
+    @traced('db.save_measurement_sets')
+    def save_measurement_sets(
+        self,
+        batch: List[Tuple[str, Optional[str], List[Dict]]],
+        replace_existing: bool = True
+    ) -> Optional[List[int]]:
+        """Save the measurements of one or more images in a single transaction.
+        
+        Each measurement dict uses the keyword names of save_color_measurement
+        (coordinate_point, x_pos, y_pos, l_value, ..., notes). Rows are written
+        with executemany and committed once for the whole batch; if anything
+        fails, nothing from the batch is kept.
+        
+        Args:
+            batch: List of (image_name, description, measurements) per image
+            replace_existing: If True, replace existing measurements for same set/point
+            
+        Returns:
+            Measurement set IDs in batch order, or None if the save failed
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                set_ids = []
+                inserts = []
+                updates = []
+                for image_name, description, measurements in batch:
+                    existing = conn.execute(
+                        "SELECT set_id FROM measurement_sets WHERE image_name = ?", (image_name,)
+                    ).fetchone()
+                    if existing:
+                        set_id = existing[0]
+                    else:
+                        set_id = conn.execute("""
+                            INSERT INTO measurement_sets (image_name, description)
+                            VALUES (?, ?)
+                        """, (image_name, description)).lastrowid
+                    set_ids.append(set_id)
+                    
+                    if replace_existing:
+                        # Last measurement of a point wins, as with repeated single saves
+                        measurements = list({m['coordinate_point']: m for m in measurements}.values())
+                        present = {point for (point,) in conn.execute(
+                            "SELECT DISTINCT coordinate_point FROM color_measurements WHERE set_id = ?", (set_id,))}
+                    else:
+                        present = set()
+                    
+                    for m in measurements:
+                        values = (
+                            m['x_pos'], m['y_pos'], m['l_value'], m['a_value'], m['b_value'],
+                            m['rgb_r'], m['rgb_g'], m['rgb_b'],
+                            m.get('sample_type'), m.get('sample_size'), m.get('sample_anchor'), m.get('notes')
+                        )
+                        if m['coordinate_point'] in present:
+                            updates.append(values + (set_id, m['coordinate_point']))
+                        else:
+                            inserts.append((set_id, m['coordinate_point']) + values)
+                
+                if updates:
+                    conn.executemany("""
+                        UPDATE color_measurements SET
+                            x_position = ?, y_position = ?,
+                            l_value = ?, a_value = ?, b_value = ?,
+                            rgb_r = ?, rgb_g = ?, rgb_b = ?,
+                            sample_type = ?, sample_size = ?, sample_anchor = ?,
+                            measurement_date = datetime('now', 'localtime'),
+                            notes = ?, row_hash = NULL
+                        WHERE set_id = ? AND coordinate_point = ?
+                    """, updates)
+                if inserts:
+                    conn.executemany("""
+                        INSERT INTO color_measurements (
+                            set_id, coordinate_point, x_position, y_position,
+                            l_value, a_value, b_value, rgb_r, rgb_g, rgb_b,
+                            sample_type, sample_size, sample_anchor, notes
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, inserts)
+                
+                print(f"Saved {len(inserts)} new and {len(updates)} updated measurements "
+                      f"across {len(set_ids)} measurement set(s)")
+                return set_ids
+        except (sqlite3.Error, KeyError) as e:
+            print(f"Error saving measurement batch: {e}")
+            return None
+    
+    @traced('db.save_color_measurement')
     def save_color_measurement(
         self,
         set_id: int,
@@ -193,7 +288,7 @@ class ColorAnalysisDB:
                                 rgb_r = ?, rgb_g = ?, rgb_b = ?,
                                 sample_type = ?, sample_size = ?, sample_anchor = ?,
                                 measurement_date = datetime('now', 'localtime'),
-                                notes = ?
+                                notes = ?, row_hash = NULL
                             WHERE set_id = ? AND coordinate_point = ?
                         """, (
                             x_pos, y_pos, l_value, a_value, b_value,
@@ -251,6 +346,258 @@ class ColorAnalysisDB:
         print(f"WARNING: save_averaged_measurement is deprecated. Averaged measurements should be saved to separate _averages database.")
         return False
     
+    # Columns shared by every color_measurements table, in _row_to_measurement order
+    _MEASUREMENT_COLUMNS = """
+                            m.id, m.set_id, s.image_name, m.measurement_date,
+                            m.coordinate_point, m.x_position, m.y_position,
+                            m.l_value, m.a_value, m.b_value, 
+                            m.rgb_r, m.rgb_g, m.rgb_b,
+                            m.sample_type, m.sample_size, m.sample_anchor,
+                            m.notes"""
+    
+    # Extra columns only present in averaged databases
+    _AVERAGED_COLUMNS = ", m.is_averaged, m.source_samples_count, m.source_sample_ids"
+    
+    # Fields returned by the columnar queries, in SELECT order
+    COLUMNAR_FIELDS = (
+        'id', 'set_id', 'image_name', 'measurement_date', 'coordinate_point',
+        'x_position', 'y_position', 'l_value', 'a_value', 'b_value',
+        'rgb_r', 'rgb_g', 'rgb_b', 'sample_type', 'sample_size', 'sample_anchor',
+        'notes', 'is_averaged', 'source_samples_count', 'source_sample_ids',
+    )
+    
+    # NumPy dtypes for the numeric columnar fields; everything else is object
+    _COLUMNAR_DTYPES = {
+        'id': 'int64', 'set_id': 'int64', 'coordinate_point': 'int64',
+        'x_position': 'float64', 'y_position': 'float64',
+        'l_value': 'float64', 'a_value': 'float64', 'b_value': 'float64',
+        'rgb_r': 'float64', 'rgb_g': 'float64', 'rgb_b': 'float64',
+        'is_averaged': 'bool',
+    }
+    
+    # Sortable fields for paged queries; m.id breaks ties so pages are stable
+    SORT_COLUMNS = {
+        'set_id': 'm.set_id',
+        'image_name': 's.image_name',
+        'date': 'm.measurement_date',
+        'point': 'm.coordinate_point',
+    }
+    
+    # Filterable fields for paged queries (case-insensitive substring match)
+    FILTER_COLUMNS = {
+        'set_id': 'CAST(m.set_id AS TEXT)',
+        'image_name': 's.image_name',
+        'date': 'm.measurement_date',
+        'notes': 'm.notes',
+    }
+    
+    def _ensure_row_hash_column(self, conn):
+        """Add the indexed row_hash column used to skip rows that were already imported."""
+        try:
+            conn.execute("ALTER TABLE color_measurements ADD COLUMN row_hash TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_row_hash
+            ON color_measurements(row_hash)
+        """)
+    
+    @staticmethod
+    def measurement_row_hash(image_name: str, coordinate_point: int, l_value: float,
+                             a_value: float, b_value: float, measurement_date: Optional[str]) -> str:
+        """Identity of a measurement row for import deduplication.
+        
+        Lab values are rounded to 4 decimals so the same row read back from a
+        spreadsheet hashes the same as the stored one.
+        """
+        key = (f"{image_name}|{int(coordinate_point)}|{float(l_value):.4f}|{float(a_value):.4f}|"
+               f"{float(b_value):.4f}|{measurement_date or ''}")
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def backfill_row_hashes(self, conn) -> int:
+        """Compute row_hash for rows saved without one (or whose values changed since).
+        
+        Returns:
+            Number of rows updated
+        """
+        rows = conn.execute("""
+            SELECT m.id, s.image_name, m.coordinate_point, m.l_value, m.a_value, m.b_value, m.measurement_date
+            FROM color_measurements m
+            JOIN measurement_sets s ON m.set_id = s.set_id
+            WHERE m.row_hash IS NULL
+        """).fetchall()
+        conn.executemany(
+            "UPDATE color_measurements SET row_hash = ? WHERE id = ?",
+            [(self.measurement_row_hash(*row[1:]), row[0]) for row in rows]
+        )
+        return len(rows)
+    
+    def _create_query_indexes(self, conn):
+        """Create indexes backing the sorted and filtered measurement queries."""
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_measurement_date
+            ON color_measurements(measurement_date)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_coordinate_point
+            ON color_measurements(coordinate_point)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sets_image_name
+            ON measurement_sets(image_name)
+        """)
+    
+    def _has_averaged_columns(self, conn) -> bool:
+        """Check whether color_measurements has the averaged measurement columns."""
+        cursor = conn.execute("PRAGMA table_info(color_measurements)")
+        columns = [row[1] for row in cursor.fetchall()]
+        return all(col in columns for col in ['is_averaged', 'source_samples_count', 'source_sample_ids'])
+    
+    def _measurement_select(self, conn) -> str:
+        """Build the SELECT ... FROM clause for measurement dictionaries."""
+        columns = self._MEASUREMENT_COLUMNS
+        if self._has_averaged_columns(conn):
+            columns += self._AVERAGED_COLUMNS
+        return f"""
+                        SELECT {columns}
+                        FROM color_measurements m
+                        JOIN measurement_sets s ON m.set_id = s.set_id"""
+    
+    @staticmethod
+    def _row_to_measurement(row) -> dict:
+        """Convert a row selected by _measurement_select into a measurement dictionary."""
+        measurement = {
+            'id': row[0],
+            'set_id': row[1],
+            'image_name': row[2],
+            'measurement_date': row[3],
+            'coordinate_point': row[4],
+            'x_position': row[5],
+            'y_position': row[6],
+            'l_value': row[7],
+            'a_value': row[8],
+            'b_value': row[9],
+            'rgb_r': row[10],
+            'rgb_g': row[11],
+            'rgb_b': row[12],
+            'sample_type': row[13],
+            'sample_size': row[14],
+            'sample_anchor': row[15],
+            'notes': row[16],
+        }
+        if len(row) > 17:
+            # Averaged databases
+            measurement['is_averaged'] = bool(row[17]) if row[17] is not None else False
+            measurement['source_samples_count'] = row[18]
+            measurement['source_sample_ids'] = row[19]
+        else:
+            # Main DB only contains individual measurements
+            measurement['is_averaged'] = False
+            measurement['source_samples_count'] = None
+            measurement['source_sample_ids'] = None
+        return measurement
+    
+    def _filter_clause(self, filter_field: Optional[str], filter_text: Optional[str]):
+        """Build a WHERE clause and parameters for a substring filter."""
+        if not filter_text or filter_field not in self.FILTER_COLUMNS:
+            return "", ()
+        
+        # Escape LIKE wildcards so the text is matched literally
+        escaped = filter_text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return (
+            f" WHERE {self.FILTER_COLUMNS[filter_field]} LIKE ? ESCAPE '\\'",
+            (f"%{escaped}%",)
+        )
+    
+    def _columnar_query(self, conn, latest_only: bool, averaged: Optional[bool],
+                        exclude_point: Optional[int]):
+        """Build the SQL and parameters behind get_measurement_columns."""
+        if self._has_averaged_columns(conn):
+            is_averaged = "COALESCE(m.is_averaged, 0)"
+            extra = (f"{is_averaged} AS is_averaged, m.source_samples_count AS source_samples_count, "
+                     "m.source_sample_ids AS source_sample_ids")
+        else:
+            # Main DB only contains individual measurements
+            is_averaged = "0"
+            extra = "0 AS is_averaged, NULL AS source_samples_count, NULL AS source_sample_ids"
+        
+        conditions, params = [], []
+        if averaged is not None:
+            conditions.append(f"{is_averaged} = ?")
+            params.append(1 if averaged else 0)
+        if exclude_point is not None:
+            conditions.append("m.coordinate_point != ?")
+            params.append(exclude_point)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        # Keep only the latest measurement per image and point in SQL
+        rank = ""
+        if latest_only:
+            rank = """, ROW_NUMBER() OVER (
+                               PARTITION BY s.image_name, m.coordinate_point
+                               ORDER BY m.measurement_date DESC, m.id DESC
+                           ) AS rn"""
+        
+        sql = f"""
+            SELECT {', '.join(self.COLUMNAR_FIELDS)} FROM (
+                SELECT {self._MEASUREMENT_COLUMNS}, {extra}{rank}
+                FROM color_measurements m
+                JOIN measurement_sets s ON m.set_id = s.set_id
+                {where}
+            ) AS q
+            {"WHERE rn = 1" if latest_only else ""}
+            ORDER BY image_name, coordinate_point, measurement_date, id
+        """
+        return sql, tuple(params)
+    
+    @traced('db.get_measurement_columns')
+    def get_measurement_columns(self, latest_only: bool = False, averaged: Optional[bool] = None,
+                                exclude_point: Optional[int] = None) -> Dict[str, 'numpy.ndarray']:
+        """Get measurements as one NumPy array per field.
+        
+        Args:
+            latest_only: Keep only the most recent measurement for each image/coordinate point
+            averaged: True for averaged rows only, False for individual rows only, None for both
+            exclude_point: Coordinate point to leave out (e.g. 999 for averaged placeholders)
+            
+        Returns:
+            Dictionary mapping each name in COLUMNAR_FIELDS to an array, ordered by
+            image name, coordinate point and date
+        """
+        import numpy as np
+        
+        rows = []
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                sql, params = self._columnar_query(conn, latest_only, averaged, exclude_point)
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error retrieving measurement columns: {e}")
+        
+        values = list(zip(*rows)) if rows else [()] * len(self.COLUMNAR_FIELDS)
+        columns = {}
+        for field, column in zip(self.COLUMNAR_FIELDS, values):
+            dtype = self._COLUMNAR_DTYPES.get(field, object)
+            if dtype == object:
+                array = np.empty(len(column), dtype=object)
+                array[:] = column
+            else:
+                array = np.array(column, dtype=dtype)
+            columns[field] = array
+        return columns
+    
+    def get_measurements_dataframe(self, latest_only: bool = False, averaged: Optional[bool] = None,
+                                   exclude_point: Optional[int] = None) -> 'pandas.DataFrame':
+        """Get measurements as a pandas DataFrame with one column per field.
+        
+        Takes the same arguments as get_measurement_columns.
+        """
+        import pandas as pd
+        
+        return pd.DataFrame(self.get_measurement_columns(latest_only, averaged, exclude_point),
+                            columns=list(self.COLUMNAR_FIELDS))
+    
+    @traced('db.get_all_measurements')
     def get_all_measurements(self) -> List[dict]:
         """Get all color measurements for this sample set.
         
@@ -259,95 +606,74 @@ class ColorAnalysisDB:
         """
         try:
             with sqlite3.connect(self.db_path) as conn:
-                # First, check what columns exist in the table
-                cursor = conn.execute("PRAGMA table_info(color_measurements)")
-                columns = [row[1] for row in cursor.fetchall()]
-                has_averaged_columns = all(col in columns for col in ['is_averaged', 'source_samples_count', 'source_sample_ids'])
-                
-                if has_averaged_columns:
-                    # Query with averaged columns (for averaged databases)
-                    cursor = conn.execute("""
-                        SELECT 
-                            m.id, m.set_id, s.image_name, m.measurement_date,
-                            m.coordinate_point, m.x_position, m.y_position,
-                            m.l_value, m.a_value, m.b_value, 
-                            m.rgb_r, m.rgb_g, m.rgb_b,
-                            m.sample_type, m.sample_size, m.sample_anchor,
-                            m.notes, m.is_averaged, m.source_samples_count, m.source_sample_ids
-                        FROM color_measurements m
-                        JOIN measurement_sets s ON m.set_id = s.set_id
-                        ORDER BY s.image_name, m.coordinate_point, m.measurement_date
-                    """)
-                    
-                    measurements = []
-                    for row in cursor:
-                        measurements.append({
-                            'id': row[0],
-                            'set_id': row[1],
-                            'image_name': row[2],
-                            'measurement_date': row[3],
-                            'coordinate_point': row[4],
-                            'x_position': row[5],
-                            'y_position': row[6],
-                            'l_value': row[7],
-                            'a_value': row[8],
-                            'b_value': row[9],
-                            'rgb_r': row[10],
-                            'rgb_g': row[11],
-                            'rgb_b': row[12],
-                            'sample_type': row[13],
-                            'sample_size': row[14],
-                            'sample_anchor': row[15],
-                            'notes': row[16],
-                            'is_averaged': bool(row[17]) if row[17] is not None else False,
-                            'source_samples_count': row[18],
-                            'source_sample_ids': row[19]
-                        })
-                else:
-                    # Query without averaged columns (for main databases)
-                    cursor = conn.execute("""
-                        SELECT 
-                            m.id, m.set_id, s.image_name, m.measurement_date,
-                            m.coordinate_point, m.x_position, m.y_position,
-                            m.l_value, m.a_value, m.b_value, 
-                            m.rgb_r, m.rgb_g, m.rgb_b,
-                            m.sample_type, m.sample_size, m.sample_anchor,
-                            m.notes
-                        FROM color_measurements m
-                        JOIN measurement_sets s ON m.set_id = s.set_id
-                        ORDER BY s.image_name, m.coordinate_point, m.measurement_date
-                    """)
-                    
-                    measurements = []
-                    for row in cursor:
-                        measurements.append({
-                            'id': row[0],
-                            'set_id': row[1],
-                            'image_name': row[2],
-                            'measurement_date': row[3],
-                            'coordinate_point': row[4],
-                            'x_position': row[5],
-                            'y_position': row[6],
-                            'l_value': row[7],
-                            'a_value': row[8],
-                            'b_value': row[9],
-                            'rgb_r': row[10],
-                            'rgb_g': row[11],
-                            'rgb_b': row[12],
-                            'sample_type': row[13],
-                            'sample_size': row[14],
-                            'sample_anchor': row[15],
-                            'notes': row[16],
-                            'is_averaged': False,  # Main DB only contains individual measurements
-                            'source_samples_count': None,
-                            'source_sample_ids': None
-                        })
-                
-                return measurements
+                cursor = conn.execute(
+                    self._measurement_select(conn) +
+                    " ORDER BY s.image_name, m.coordinate_point, m.measurement_date"
+                )
+                return [self._row_to_measurement(row) for row in cursor]
         except sqlite3.Error as e:
             print(f"Error retrieving measurements: {e}")
             return []
     
+    def count_measurements(self, filter_field: Optional[str] = None,
+                           filter_text: Optional[str] = None) -> int:
+        """Count measurements, optionally restricted by a substring filter.
+        
+        Args:
+            filter_field: Key of FILTER_COLUMNS to filter on
+            filter_text: Case-insensitive substring the field must contain
+            
+        Returns:
+            Number of matching measurements
+        """
+        where, params = self._filter_clause(filter_field, filter_text)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute(f"""
+                    SELECT COUNT(*)
+                    FROM color_measurements m
+                    JOIN measurement_sets s ON m.set_id = s.set_id
+                    {where}
+                """, params)
+                return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error counting measurements: {e}")
+            return 0
+    
+    @traced('db.get_measurements_page')
+    def get_measurements_page(self, offset: int, limit: int,
+                              sort_field: str = 'date', ascending: bool = False,
+                              filter_field: Optional[str] = None,
+                              filter_text: Optional[str] = None) -> List[dict]:
+        """Get one page of measurements with sorting and filtering done in SQLite.
+        
+        Args:
+            offset: Number of matching rows to skip
+            limit: Maximum number of rows to return
+            sort_field: Key of SORT_COLUMNS to order by
+            ascending: Sort direction
+            filter_field: Key of FILTER_COLUMNS to filter on
+            filter_text: Case-insensitive substring the field must contain
+            
+        Returns:
+            List of measurement dictionaries, same format as get_all_measurements
+        """
+        where, params = self._filter_clause(filter_field, filter_text)
+        order_column = self.SORT_COLUMNS.get(sort_field, self.SORT_COLUMNS['date'])
+        direction = "ASC" if ascending else "DESC"
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute(
+                    self._measurement_select(conn) +
+                    f"{where} ORDER BY {order_column} {direction}, m.id {direction}"
+                    " LIMIT ? OFFSET ?",
+                    params + (limit, offset)
+                )
+                return [self._row_to_measurement(row) for row in cursor]
+        except sqlite3.Error as e:
+            print(f"Error retrieving measurement page: {e}")
+            return []
+    
     def get_measurements_for_image(self, image_name: str) -> List[dict]:
         """Get all measurements for a specific image.
         
@@ -410,45 +736,67 @@ class ColorAnalysisDB:
             print(f"Error clearing measurements: {e}")
             return False
     
-    def cleanup_duplicates(self) -> int:
+    @staticmethod
+    def _delete_duplicate_rows(conn) -> int:
+        """Delete all but the latest measurement of each set/point in one statement."""
+        cursor = conn.execute("""
+            DELETE FROM color_measurements
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY set_id, coordinate_point
+                               ORDER BY measurement_date DESC, id DESC
+                           ) AS rn
+                    FROM color_measurements
+                ) ranked
+                WHERE rn > 1
+            )
+        """)
+        return cursor.rowcount
+    
+    @staticmethod
+    def compact_database(db_path: str, vacuum: bool = True, analyze: bool = True) -> Tuple[int, int]:
+        """Remove duplicate measurements from a database file, then optionally ANALYZE and VACUUM it.
+        
+        Works on the file directly, so it can be run over every sample set
+        database (including _averages ones) without opening them through the class.
+        
+        Returns:
+            Tuple of (rows removed, bytes reclaimed)
+        """
+        size_before = os.path.getsize(db_path)
+        conn = sqlite3.connect(db_path)
+        try:
+            with conn:
+                removed = ColorAnalysisDB._delete_duplicate_rows(conn)
+            # VACUUM cannot run inside a transaction
+            conn.isolation_level = None
+            if analyze:
+                conn.execute("ANALYZE")
+            if vacuum:
+                conn.execute("VACUUM")
+        finally:
+            conn.close()
+        return removed, size_before - os.path.getsize(db_path)
+    
+    def cleanup_duplicates(self, vacuum: bool = False, analyze: bool = False) -> int:
         """Remove duplicate measurements, keeping only the latest for each image/coordinate point.
         
+        Args:
+            vacuum: If True, VACUUM afterwards so the freed pages are returned to the file system
+            analyze: If True, refresh the query planner statistics afterwards
+        
         Returns:
             Number of duplicate measurements removed
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # First, count total duplicates
-                cursor = conn.execute("""
-                    SELECT COUNT(*) FROM color_measurements
-                """)
-                total_before = cursor.fetchone()[0]
-                
-                # Remove duplicates, keeping only the latest measurement_date for each image/point
-                conn.execute("""
-                    DELETE FROM color_measurements
-                    WHERE id NOT IN (
-                        SELECT id FROM (
-                            SELECT id, 
-                                   ROW_NUMBER() OVER (
-                                       PARTITION BY set_id, coordinate_point 
-                                       ORDER BY measurement_date DESC
-                                   ) as rn
-                            FROM color_measurements
-                        ) ranked
-                        WHERE rn = 1
-                    )
-                """)
-                
-                # Count remaining
-                cursor = conn.execute("""
-                    SELECT COUNT(*) FROM color_measurements
-                """)
-                total_after = cursor.fetchone()[0]
-                
-                duplicates_removed = total_before - total_after
-                print(f"Removed {duplicates_removed} duplicate measurements from {self.sample_set_name}")
-                return duplicates_removed
+            duplicates_removed, bytes_reclaimed = self.compact_database(self.db_path, vacuum, analyze)
+            message = f"Removed {duplicates_removed} duplicate measurements from {self.sample_set_name}"
+            if vacuum:
+                message += f" ({bytes_reclaimed} bytes reclaimed)"
+            print(message)
+            return duplicates_removed
                 
         except sqlite3.Error as e:
             print(f"Error cleaning duplicates: {e}")
@@ -458,6 +806,17 @@ class ColorAnalysisDB:
         """Get the path to this sample set's database file."""
         return self.db_path
     
+    @staticmethod
+    def get_color_analysis_directory() -> str:
+        """Directory holding the sample set database files."""
+        # Use STAMPZ_DATA_DIR environment variable if available (for packaged apps)
+        stampz_data_dir = os.getenv('STAMPZ_DATA_DIR')
+        if stampz_data_dir:
+            return os.path.join(stampz_data_dir, "data", "color_analysis")
+        # Running from source - use relative path
+        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(current_dir, "data", "color_analysis")
+    
     @staticmethod
     def get_all_sample_set_databases(data_dir: str = None) -> List[str]:
         """Get all sample set database names.
@@ -469,14 +828,7 @@ class ColorAnalysisDB:
             List of sample set names (without .db extension)
         """
         if data_dir is None:
-            # Use STAMPZ_DATA_DIR environment variable if available (for packaged apps)
-            stampz_data_dir = os.getenv('STAMPZ_DATA_DIR')
-            if stampz_data_dir:
-                data_dir = os.path.join(stampz_data_dir, "data", "color_analysis")
-            else:
-                # Running from source - use relative path
-                current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                data_dir = os.path.join(current_dir, "data", "color_analysis")
+            data_dir = ColorAnalysisDB.get_color_analysis_directory()
         
         if not os.path.exists(data_dir):
             return []
@@ -568,6 +920,8 @@ class AveragedColorAnalysisDB(ColorAnalysisDB):
                 CREATE INDEX IF NOT EXISTS idx_set_point 
                 ON color_measurements(set_id, coordinate_point)
             """)
+            self._ensure_row_hash_column(conn)
+            self._create_query_indexes(conn)
     
     def save_averaged_measurement(
         self,
@@ -6,13 +6,16 @@ Extract and analyze colors from coordinate sample areas.
 
 import numpy as np
 from enum import Enum, auto
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Callable
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime
 from PIL import Image
 import os
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PrintType(Enum):
     """Type of printing method used for the stamp."""
@@ -29,6 +32,8 @@ except ImportError:
 
 from .coordinate_db import CoordinateDB, CoordinatePoint, SampleAreaType
 from .color_analysis_db import ColorAnalysisDB
+from .instrumentation import count, traced
+from .tiled_image import TiledImage
 
 @dataclass
 class ColorMeasurement:
@@ -57,6 +62,7 @@ class ColorAnalyzer:
         self.db = CoordinateDB()
         self.print_type = print_type
     
+    @traced('convert.rgb_to_lab')
     def rgb_to_lab(self, rgb: Tuple[float, float, float]) -> Tuple[float, float, float]:
         """Convert RGB to CIE L*a*b* color space.
         
@@ -232,29 +238,37 @@ class ColorAnalyzer:
             'outliers_excluded': len(outlier_indices)
         }
     
+    @traced('sample.template')
     def extract_sample_colors(self, image: Image.Image, coordinate_set_name: str) -> List[ColorMeasurement]:
         """Extract colors from all sample areas in a coordinate set.
         
         Args:
-            image: PIL Image to sample from
+            image: PIL Image or TiledImage to sample from
             coordinate_set_name: Name of the coordinate set to use
             
         Returns:
             List of ColorMeasurement objects
         """
-        # Load coordinates from database
-        coordinates = self.db.load_coordinate_set(coordinate_set_name)
-        if not coordinates:
+        # Compiled once per template version and reused for every image
+        template = self.db.get_compiled_template(coordinate_set_name)
+        if template is None:
             raise ValueError(f"Coordinate set '{coordinate_set_name}' not found")
         
+        if isinstance(image, TiledImage):
+            # Only the sample boxes are read
+            area_colors = template.sample(image)
+        else:
+            # Convert once for all sample areas, rather than per area
+            rgb_image = image if image.mode == 'RGB' else image.convert('RGB')
+            area_colors = template.sample(np.asarray(rgb_image))
+        
         measurements = []
         
-        for i, coord in enumerate(coordinates):
+        for i, (coord, area_color) in enumerate(zip(template.points, area_colors)):
             try:
-                # Extract color from this sample area
-                rgb_values = self._sample_area_color(image, coord)
-                if rgb_values:
-                    avg_rgb = self._calculate_average_color(rgb_values)
+                # Areas entirely outside the image are skipped
+                if area_color is not None:
+                    avg_rgb = self._calculate_average_color([area_color])
                     lab_values = self.rgb_to_lab(avg_rgb)
                     
                     measurement = ColorMeasurement(
@@ -278,19 +292,31 @@ class ColorAnalyzer:
         
         return measurements
     
-    def extract_sample_colors_from_coordinates(self, image: Image.Image, canvas_coordinates: List[dict]) -> List[ColorMeasurement]:
+    @traced('sample.markers')
+    def extract_sample_colors_from_coordinates(self, image: Image.Image, canvas_coordinates: List[dict],
+                                               progress_callback: Optional[Callable[[int, int], None]] = None,
+                                               image_key: Optional[str] = None) -> List[ColorMeasurement]:
         """Extract colors from canvas coordinate markers (including fine adjustments).
         
         Args:
-            image: PIL Image to sample from
+            image: PIL Image or TiledImage to sample from
             canvas_coordinates: List of coordinate marker dictionaries from canvas
+            progress_callback: Optional callable(done, total) invoked before each marker
+            image_key: Content hash of the image file; when given, sample areas
+                are read from and stored in the shared analysis cache
             
         Returns:
             List of ColorMeasurement objects
         """
+        from .analysis_cache import get_analysis_cache, sample_geometry
+        
+        cache = get_analysis_cache()
         measurements = []
+        total = len(canvas_coordinates)
         
         for i, marker in enumerate(canvas_coordinates):
+            if progress_callback:
+                progress_callback(i, total)
             if marker.get('is_preview', False):
                 continue  # Skip preview markers
                 
@@ -302,12 +328,6 @@ class ColorAnalyzer:
                 sample_height = marker.get('sample_height', 20)
                 anchor = marker.get('anchor', 'center')
                 
-                # Debug output for sample #4 issue
-                print(f"DEBUG: Processing canvas marker {i} (1-based: {i+1})")
-                print(f"  Position: ({x}, {y})")
-                print(f"  Sample type: {sample_type}, Size: {sample_width}x{sample_height}, Anchor: {anchor}")
-                print(f"  Marker index from data: {marker.get('index', 'N/A')}")
-                
                 # Create a temporary CoordinatePoint-like object for sampling
                 class TempCoord:
                     def __init__(self, x, y, sample_type, width, height, anchor):
@@ -317,14 +337,21 @@ class ColorAnalyzer:
                         self.sample_size = (width, height)
                         self.anchor_position = anchor
                 
-                temp_coord = TempCoord(x, y, sample_type, sample_width, sample_height, anchor)
-                
-                # Extract color from this sample area using existing method
-                rgb_values = self._sample_area_color(image, temp_coord)
-                if rgb_values:
-                    avg_rgb = self._calculate_average_color(rgb_values)
-                    lab_values = self.rgb_to_lab(avg_rgb)
+                geometry = sample_geometry(x, y, sample_type, sample_width, sample_height, anchor)
+                result = cache.get(image_key, self.print_type.name, geometry)
+                count('sample.cache_hits' if result is not None else 'sample.cache_misses')
+                if result is None:
+                    temp_coord = TempCoord(x, y, sample_type, sample_width, sample_height, anchor)
                     
+                    # Extract color from this sample area using existing method
+                    rgb_values = self._sample_area_color(image, temp_coord)
+                    if rgb_values:
+                        avg_rgb = self._calculate_average_color(rgb_values)
+                        result = (avg_rgb, self.rgb_to_lab(avg_rgb))
+                        cache.put(image_key, self.print_type.name, geometry, *result)
+                
+                if result:
+                    avg_rgb, lab_values = result
                     measurement = ColorMeasurement(
                         coordinate_id=marker.get('index', i),
                         coordinate_point=i + 1,  # 1-based point number
@@ -346,11 +373,16 @@ class ColorAnalyzer:
         
         return measurements
     
+    @traced('sample.area')
     def _sample_area_color(self, image: Image.Image, coord) -> Optional[List[Tuple[int, int, int]]]:
         """Sample colors from a specific coordinate area.
         
+        Only the area's bounding box is read from the image, so a TiledImage
+        never loads more than the area and a PIL image is converted to RGB
+        per area rather than as a whole.
+        
         Args:
-            image: PIL Image to sample from
+            image: PIL Image or TiledImage to sample from
             coord: Coordinate point defining the sample area
             
         Returns:
@@ -366,8 +398,11 @@ class ColorAnalyzer:
             if not bounds:
                 return None
             
-            # Extract pixels from the area
-            pixels = self._extract_pixels_from_bounds(image, bounds, coord.sample_type)
+            # Extract pixels from the area, in the coordinates of its bounding box
+            left, top, right, bottom = bounds
+            area = image.crop(bounds)
+            pixels = self._extract_pixels_from_bounds(area, (0, 0, right - left, bottom - top), coord.sample_type)
+            logger.debug("Sampled area (%d, %d, %d, %d) at (%.1f, %.1f)", left, top, right, bottom, coord.x, coord.y)
             return pixels
             
         except Exception as e:
@@ -415,14 +450,6 @@ class ColorAnalyzer:
             right = int(x)
             bottom = int(pil_y + height)
         
-        # Debug output after bounds calculation
-        print(f"DEBUG: Sample area bounds calculation:")
-        print(f"  Cartesian position: ({x}, {y})")
-        print(f"  PIL Y position: {pil_y}")
-        print(f"  Sample size: {width}x{height}")
-        print(f"  Calculated PIL bounds: ({left}, {top}, {right}, {bottom})")
-        print(f"  Image dimensions: {image.width}x{image.height}")
-        
         # Clamp to image bounds
         original_bounds = (left, top, right, bottom)
         left = max(0, left)
@@ -431,8 +458,8 @@ class ColorAnalyzer:
         bottom = min(image.height, bottom)
         
         if original_bounds != (left, top, right, bottom):
-            print(f"DEBUG: Bounds were clamped from {original_bounds} to ({left}, {top}, {right}, {bottom})")
-            print(f"  This indicates the sample area extends outside the image boundaries!")
+            # The sample area extends outside the image boundaries
+            count('sample.clamped_areas')
         
         # Check if we have a valid area
         if left >= right or top >= bottom:
@@ -483,18 +510,10 @@ class ColorAnalyzer:
         left, top, right, bottom = bounds
         pixels = []
         
-        # Convert image to RGB if needed with proper color space handling
+        # Convert image to RGB if needed
         if image.mode != 'RGB':
-            # Preserve color profile during conversion if possible
-            if hasattr(image, 'info') and 'icc_profile' in image.info:
-                print(f"DEBUG: Image has ICC profile, preserving during RGB conversion")
             image = image.convert('RGB')
         
-        # Check for common screenshot color issues
-        if hasattr(image, 'filename') and any(term in str(image.filename).lower() 
-                                           for term in ['screenshot', 'screen', 'capture']):
-            print(f"DEBUG: Screenshot detected - applying color correction")
-        
         total_pixels = 0
         total_r = 0
         total_g = 0
@@ -533,30 +552,6 @@ class ColorAnalyzer:
                         total_r += float(r)
                         total_g += float(g)
                         total_b += float(b)
-                        
-                        # Log pixel values for debugging
-                        if total_pixels <= 5:
-                            if self.print_type == PrintType.LINE_ENGRAVED:
-                                if r > 240 and g > 235 and b > 230:
-                                    context = "(paper - slightly aged)"
-                                elif r > 200 and g > 195 and b > 190:
-                                    context = "(very light engraving)"
-                                elif r > 150 and g > 145 and b > 140:
-                                    context = "(light engraving)"
-                                elif r > 80 and g > 75 and b > 70:
-                                    context = "(medium engraving)"
-                                else:
-                                    context = "(deep engraving)"
-                            else:  # SOLID_PRINTED
-                                if r > 240 and g > 235 and b > 230:
-                                    context = "(unprinted area)"
-                                elif r > 200 and g > 195 and b > 190:
-                                    context = "(light ink)"
-                                elif r > 150 and g > 145 and b > 140:
-                                    context = "(medium ink)"
-                                else:
-                                    context = "(solid ink)"
-                            print(f"Sample pixel {total_pixels}: RGB=({r},{g},{b}) {context}")
                 except Exception as e:
                     print(f"Error getting pixel at ({x}, {y}): {e}")
                     continue
@@ -571,8 +566,7 @@ class ColorAnalyzer:
         avg_g = total_g / total_pixels if total_pixels > 0 else 128
         avg_b = total_b / total_pixels if total_pixels > 0 else 128
         
-        print(f"Sample area ({left}, {top}, {right}, {bottom}): {total_pixels} pixels sampled")
-        print(f"Area average RGB: ({avg_r:.1f}, {avg_g:.1f}, {avg_b:.1f})")
+        count('sample.pixels', total_pixels)
         
         # Return the average color as a single pixel value
         return [(int(avg_r), int(avg_g), int(avg_b))]
@@ -601,10 +595,53 @@ class ColorAnalyzer:
         avg_b = total_b / num_pixels
         
         # Return the raw RGB values without any correction
-        print(f"Final average RGB values: R={avg_r:.2f}, G={avg_g:.2f}, B={avg_b:.2f}")
-        
         return (avg_r, avg_g, avg_b)
     
+    @staticmethod
+    def _measurement_rows(measurements: List[ColorMeasurement]) -> List[Dict[str, Any]]:
+        """Database rows for a list of measurements, numbered from point 1."""
+        rows = []
+        for i, measurement in enumerate(measurements):
+            size = measurement.sample_area.get('size', (20, 20))
+            rows.append({
+                'coordinate_point': i + 1,  # 1-based point numbering
+                'x_pos': measurement.position[0],
+                'y_pos': measurement.position[1],
+                'l_value': measurement.lab[0],
+                'a_value': measurement.lab[1],
+                'b_value': measurement.lab[2],
+                'rgb_r': measurement.rgb[0],
+                'rgb_g': measurement.rgb[1],
+                'rgb_b': measurement.rgb[2],
+                'sample_type': measurement.sample_area.get('type', 'circle'),
+                'sample_size': f"{size[0]}x{size[1]}",
+                'sample_anchor': measurement.sample_area.get('anchor', 'center'),
+                'notes': measurement.notes,
+            })
+        return rows
+    
+    def save_color_measurement_batch(self, image_measurements: List[Tuple[str, List[ColorMeasurement]]],
+                                     coordinate_set_name: str, description: str = None) -> Optional[List[int]]:
+        """Save the measurements of many images to the sample set database in one transaction.
+        
+        Args:
+            image_measurements: List of (image_name, measurements) pairs
+            coordinate_set_name: Name of the coordinate set these belong to
+            description: Optional description for newly created measurement sets
+            
+        Returns:
+            Measurement set IDs in the order given, or None if the save failed
+        """
+        try:
+            color_db = ColorAnalysisDB(coordinate_set_name)
+            batch = [(image_name, description, self._measurement_rows(measurements))
+                     for image_name, measurements in image_measurements]
+            return color_db.save_measurement_sets(batch)
+        except Exception as e:
+            print(f"Error saving color measurements: {e}")
+            return None
+    
+    @traced('db.save_color_measurements')
     def save_color_measurements(self, measurements: List[ColorMeasurement], coordinate_set_name: str, image_name: str) -> bool:
         """Save color measurements to the separate sample set database.
         
@@ -616,45 +653,13 @@ class ColorAnalyzer:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Create color analysis database for this sample set
-            color_db = ColorAnalysisDB(coordinate_set_name)
-            
-            # Create a single measurement set for all measurements
-            set_id = color_db.create_measurement_set(image_name)
-            if set_id is None:
-                print("Failed to create measurement set")
-                return False
-
-            # Save each measurement under the same set_id
-            for i, measurement in enumerate(measurements):
-                success = color_db.save_color_measurement(
-                    set_id=set_id,
-                    coordinate_point=i + 1,  # 1-based point numbering
-                    x_pos=measurement.position[0],
-                    y_pos=measurement.position[1],
-                    l_value=measurement.lab[0],
-                    a_value=measurement.lab[1],
-                    b_value=measurement.lab[2],
-                    rgb_r=measurement.rgb[0],
-                    rgb_g=measurement.rgb[1],
-                    rgb_b=measurement.rgb[2],
-                    sample_type=measurement.sample_area.get('type', 'circle'),
-                    sample_size=f"{measurement.sample_area.get('size', (20, 20))[0]}x{measurement.sample_area.get('size', (20, 20))[1]}",
-                    sample_anchor=measurement.sample_area.get('anchor', 'center'),
-                    notes=measurement.notes
-                )
-                
-                if not success:
-                    print(f"Failed to save measurement {i+1}")
-                    return False
-            
-            print(f"Saved {len(measurements)} measurements to {coordinate_set_name} database")
-            return True
-                
-        except Exception as e:
-            print(f"Error saving color measurements: {e}")
+        set_ids = self.save_color_measurement_batch([(image_name, measurements)], coordinate_set_name)
+        if set_ids is None:
+            print("Failed to save color measurements")
             return False
+        
+        print(f"Saved {len(measurements)} measurements to {coordinate_set_name} database")
+        return True
     
     def _extract_sample_identifier_from_filename(self, image_path: str) -> str:
         """Extract a unique sample identifier from the image filename.
@@ -695,65 +700,48 @@ class ColorAnalyzer:
     
     def analyze_image_colors_from_canvas(self, image_path: str, coordinate_set_name: str, 
                                         canvas_coordinates: List[dict], 
-                                        description: str = None) -> Optional[List[ColorMeasurement]]:
+                                        description: str = None,
+                                        progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[List[ColorMeasurement]]:
         """Analyze colors using current canvas coordinates (including fine adjustments).
         
         Args:
             image_path: Path to the image file
             coordinate_set_name: Name of coordinate set (for database naming)
             canvas_coordinates: List of coordinate marker dictionaries from canvas
+            progress_callback: Optional callable(done, total) invoked as markers are sampled
             
         Returns:
             List of ColorMeasurement objects, or None if failed
         """
         try:
-            # Load image
-            image = Image.open(image_path)
-            print(f"Loaded image: {image.size[0]}x{image.size[1]} pixels")
+            from .analysis_cache import get_analysis_cache
             
-            # Extract colors using canvas coordinates
-            measurements = self.extract_sample_colors_from_coordinates(image, canvas_coordinates)
+            # Only the sample areas that aren't cached are read from the image
+            with TiledImage.open(image_path) as image:
+                print(f"Loaded image: {image.size[0]}x{image.size[1]} pixels")
+                
+                # Extract colors using canvas coordinates
+                measurements = self.extract_sample_colors_from_coordinates(
+                    image, canvas_coordinates, progress_callback,
+                    image_key=get_analysis_cache().image_key(image_path)
+                )
             print(f"Extracted {len(measurements)} color measurements using canvas coordinates")
             
             # Create new measurement set using sample identifier from filename
             sample_identifier = self._extract_sample_identifier_from_filename(image_path)
             
-            # Create a new measurement set with the sample identifier
-            db = ColorAnalysisDB(coordinate_set_name)
-            set_id = db.create_measurement_set(sample_identifier, description)
+            # Save all measurements under a measurement set for the sample identifier
+            set_ids = self.save_color_measurement_batch([(sample_identifier, measurements)],
+                                                        coordinate_set_name, description)
             
-            if set_id is not None:
-                print(f"Created measurement set with ID {set_id}")
-                # Save measurements with the new set ID
-                success = True
-                for i, measurement in enumerate(measurements):
-                    if not db.save_color_measurement(
-                        set_id=set_id,
-                        coordinate_point=i + 1,  # Use loop index for 1-based coordinate points
-                        x_pos=measurement.position[0],
-                        y_pos=measurement.position[1],
-                        l_value=measurement.lab[0],
-                        a_value=measurement.lab[1],
-                        b_value=measurement.lab[2],
-                        rgb_r=measurement.rgb[0],
-                        rgb_g=measurement.rgb[1],
-                        rgb_b=measurement.rgb[2],
-                        sample_type=measurement.sample_area.get('type', 'circle'),
-                        sample_size=f"{measurement.sample_area.get('size', (20, 20))[0]}x{measurement.sample_area.get('size', (20, 20))[1]}",
-                        sample_anchor=measurement.sample_area.get('anchor', 'center'),
-                        notes=measurement.notes
-                    ):
-                        print(f"Failed to save measurement {i + 1} to database")
-                        success = False
-                        break
-                
-                if success:
-                    print("Color measurements saved to database (using adjusted coordinates)")
-                    return measurements
-                else:
-                    print("Failed to save color measurements")
-                    return None
-                
+            if set_ids is not None:
+                print(f"Saved measurements to measurement set with ID {set_ids[0]}")
+                print("Color measurements saved to database (using adjusted coordinates)")
+                return measurements
+
+            print("Failed to save color measurements")
+            return None
+
         except Exception as e:
             print(f"Error analyzing image colors from canvas: {e}")
             return None
@@ -769,12 +757,12 @@ class ColorAnalyzer:
             List of ColorMeasurement objects, or None if failed
         """
         try:
-            # Load image
-            image = Image.open(image_path)
-            print(f"Loaded image: {image.size[0]}x{image.size[1]} pixels")
-            
-            # Extract colors
-            measurements = self.extract_sample_colors(image, coordinate_set_name)
+            # Load image; only the sample areas are read
+            with TiledImage.open(image_path) as image:
+                print(f"Loaded image: {image.size[0]}x{image.size[1]} pixels")
+                
+                # Extract colors
+                measurements = self.extract_sample_colors(image, coordinate_set_name)
             print(f"Extracted {len(measurements)} color measurements")
             
             # Save to database with image name
@@ -789,7 +777,45 @@ class ColorAnalyzer:
         except Exception as e:
             print(f"Error analyzing image colors: {e}")
             return None
-    
+
+    def analyze_images(self, image_paths: List[str], coordinate_set_name: str,
+                       batch_size: int = 100) -> Dict[str, List[ColorMeasurement]]:
+        """Analyze many images with a saved template, committing once per batch.
+
+        Images that fail to load or sample are reported and skipped.
+
+        Args:
+            image_paths: Paths to the image files (e.g. all images in a directory)
+            coordinate_set_name: Name of coordinate set to use for sampling
+            batch_size: Number of images written per database transaction
+
+        Returns:
+            Dict mapping each saved image name to its measurements
+        """
+        saved = {}
+        pending = []
+
+        def flush():
+            if pending and self.save_color_measurement_batch(pending, coordinate_set_name) is not None:
+                saved.update(pending)
+            pending.clear()
+
+        for image_path in image_paths:
+            try:
+                with TiledImage.open(image_path) as image:
+                    measurements = self.extract_sample_colors(image, coordinate_set_name)
+            except Exception as e:
+                print(f"Error analyzing image colors for {image_path}: {e}")
+                continue
+
+            pending.append((os.path.splitext(os.path.basename(image_path))[0], measurements))
+            if len(pending) >= batch_size:
+                flush()
+        flush()
+
+        print(f"Saved color measurements for {len(saved)} of {len(image_paths)} images")
+        return saved
+
     def measure_samples_from_canvas(self, image: Image.Image, canvas_coordinates: List[dict]) -> List[dict]:
         """Measure colors directly from canvas coordinates without saving to database.
         
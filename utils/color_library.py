@@ -13,6 +13,10 @@ from typing import List, Tuple, Optional, Dict, Any, Callable
 from dataclasses import dataclass
 from datetime import datetime
 
+import numpy as np
+
+from .instrumentation import traced
+
 # Color space conversion functions - prioritizing CIE L*a*b* and Delta E 2000
 try:
     from colorspacious import cspace_convert, deltaE
@@ -22,6 +26,67 @@ except ImportError:
     print("Warning: colorspacious not installed. Install with: pip install colorspacious")
     print("Delta E calculations will use approximation (less accurate).")
 
+# Libraries with at least this many colors are batch matched through a KD-tree
+SPATIAL_INDEX_MIN_COLORS = 5000
+
+
+def _nearest_points(points: np.ndarray, queries: np.ndarray, k: int,
+                    max_distance: Optional[float] = None, chunk_size: int = 1024,
+                    tree=None) -> Tuple[np.ndarray, np.ndarray]:
+    """k nearest points for every query, by Euclidean distance.
+    
+    Args:
+        points: (M, 3) reference coordinates
+        queries: (N, 3) query coordinates
+        k: Neighbours per query
+        max_distance: Neighbours further than this are dropped
+        chunk_size: Queries per distance block when no tree is given
+        tree: Optional (KD-tree, indices into points it holds), see
+            ColorLibrary._get_spatial_index
+        
+    Returns:
+        (N, k) indices into points (-1 where missing) and distances (inf where missing),
+        nearest first
+    """
+    count = len(queries)
+    indices = np.full((count, k), -1, dtype=np.int64)
+    distances = np.full((count, k), np.inf)
+    found = min(k, len(points))
+    if not count or not found:
+        return indices, distances
+    
+    if tree is not None:
+        # The tree only holds finite points; NaN queries have no neighbours
+        tree, tree_points = tree
+        found = min(found, len(tree_points))
+        valid = np.flatnonzero(np.isfinite(queries).all(axis=1))
+        if len(valid) and found:
+            tree_distances, tree_indices = tree.query(queries[valid], k=found)
+            distances[valid, :found] = tree_distances
+            indices[valid, :found] = tree_points[tree_indices]
+    else:
+        point_norms = (points ** 2).sum(axis=1)
+        for start in range(0, count, chunk_size):
+            block = queries[start:start + chunk_size]
+            if found < len(points):
+                # |q - p|^2 = |q|^2 + |p|^2 - 2 q.p for the whole block as one matrix product
+                squared = (block ** 2).sum(axis=1)[:, None] + point_norms[None, :] - 2.0 * (block @ points.T)
+                nearest = np.argpartition(squared, found - 1, axis=1)[:, :found]
+            else:
+                nearest = np.broadcast_to(np.arange(found), (len(block), found))
+            # Exact distances for the selected colors only
+            nearest_sq = ((block[:, None, :] - points[nearest]) ** 2).sum(axis=-1)
+            # Best first; ties by library order
+            order = np.lexsort((nearest, nearest_sq), axis=1)
+            indices[start:start + len(block), :found] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:start + len(block), :found] = np.sqrt(np.take_along_axis(nearest_sq, order, axis=1))
+    
+    missing = ~(distances <= (np.inf if max_distance is None else max_distance))
+    indices[missing] = -1
+    distances[missing] = np.inf
+    return indices, distances
+
+
 @dataclass
 class LibraryColor:
     """Represents a reference color in the library."""
@@ -68,6 +133,10 @@ class ColorLibrary:
         print(f"DEBUG: ColorLibrary init - library_dir: {library_dir}")
         print(f"DEBUG: ColorLibrary init - db_path: {self.db_path}")
         
+        # (file signature, colors, match-space points), see get_match_data
+        self._match_cache = None
+        self._spatial_index = None  # (colors list it was built for, KD-tree)
+        
         self._init_db()
     
     def _clean_filename(self, name: str) -> str:
@@ -144,6 +213,7 @@ CREATE TABLE IF NOT EXISTS library_colors (
             conn.execute("CREATE INDEX IF NOT EXISTS idx_name ON library_colors(name)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_lab ON library_colors(lab_l, lab_a, lab_b)")
     
+    @traced('convert.library_rgb_to_lab')
     def rgb_to_lab(self, rgb: Tuple[float, float, float]) -> Tuple[float, float, float]:
         """Convert RGB to CIE L*a*b* color space using precise conversion.
         
@@ -455,6 +525,115 @@ CREATE TABLE IF NOT EXISTS library_colors (
             print(f"Error retrieving categories: {e}")
             return []
     
+    @staticmethod
+    @traced('convert.match_space')
+    def to_match_space(lab) -> np.ndarray:
+        """Convert Lab values to the space in which Delta E is a Euclidean distance.
+        
+        This is CAM02-UCS when colorspacious is available (matching
+        calculate_delta_e_2000) and CIE L*a*b* itself otherwise (CIE76).
+        
+        Args:
+            lab: One Lab triple or an (N, 3) array
+            
+        Returns:
+            (N, 3) array of match-space coordinates
+        """
+        lab = np.asarray(lab, dtype=float).reshape(-1, 3)
+        if not HAS_COLORSPACIOUS:
+            return lab
+        
+        def convert(block):
+            try:
+                return cspace_convert(block, "CIELab", "CAM02-UCS")
+            except Exception:
+                # Some colors have no CAM02 appearance: split the block to
+                # isolate them and leave them as NaN so they never match
+                if len(block) == 1:
+                    return np.full(block.shape, np.nan)
+                middle = len(block) // 2
+                return np.concatenate([convert(block[:middle]), convert(block[middle:])])
+        
+        with np.errstate(invalid='ignore'):
+            return convert(lab) if len(lab) else np.empty((0, 3))
+    
+    @staticmethod
+    def match_quality(delta_e_value: float) -> str:
+        """Match quality label for a Delta E value."""
+        if delta_e_value <= 1.0:
+            return "Excellent"  # Imperceptible difference
+        elif delta_e_value <= 2.5:
+            return "Good"       # Perceptible but acceptable
+        elif delta_e_value <= 5.0:
+            return "Fair"       # Clearly perceptible
+        return "Poor"           # Very noticeable difference
+    
+    def _file_signature(self) -> Optional[Tuple]:
+        """Identify the current database contents without reading the table.
+        
+        Includes SQLite's file change counter (header bytes 24-27), which is
+        bumped by every committed write, so changes made through other
+        ColorLibrary instances are noticed too.
+        """
+        try:
+            stat = os.stat(self.db_path)
+            with open(self.db_path, 'rb') as f:
+                header = f.read(28)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, header[24:28])
+    
+    def get_match_data(self) -> Tuple[List[LibraryColor], np.ndarray]:
+        """All library colors with their match-space coordinates, cached until the database changes.
+        
+        Returns:
+            (colors in get_all_colors order, (N, 3) match-space array)
+        """
+        signature = self._file_signature()
+        if self._match_cache is None or self._match_cache[0] != signature:
+            colors = self.get_all_colors()
+            points = self.to_match_space([c.lab for c in colors]) if colors else np.empty((0, 3))
+            self._match_cache = (signature, colors, points)
+        return self._match_cache[1], self._match_cache[2]
+    
+    def _get_spatial_index(self):
+        """(KD-tree, point indices) over the finite match-space points of a large library, or None."""
+        colors, points = self.get_match_data()
+        if len(colors) < SPATIAL_INDEX_MIN_COLORS:
+            return None
+        if self._spatial_index is None or self._spatial_index[0] is not colors:
+            try:
+                from sklearn.neighbors import KDTree
+            except ImportError:
+                return None
+            finite = np.flatnonzero(np.isfinite(points).all(axis=1))
+            self._spatial_index = (colors, (KDTree(points[finite]), finite))
+        return self._spatial_index[1]
+    
+    @traced('match.library_many')
+    def match_many(self, lab_array, k: int = 1, max_delta_e: Optional[float] = None,
+                   chunk_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k closest library colors for many samples at once.
+        
+        Delta E from every sample to every library color is computed in
+        chunked matrix form, or through a KD-tree for large libraries.
+        
+        Args:
+            lab_array: (N, 3) CIE L*a*b* samples
+            k: Matches per sample
+            max_delta_e: Drop matches with a larger Delta E (default: keep all)
+            chunk_size: Samples per distance block
+            
+        Returns:
+            (N, k) indices into get_match_data() colors (-1 where there is no
+            match) and (N, k) Delta E values (inf where there is no match),
+            best first
+        """
+        colors, points = self.get_match_data()
+        queries = self.to_match_space(lab_array) if len(lab_array) else np.empty((0, 3))
+        return _nearest_points(points, queries, k, max_delta_e, chunk_size, self._get_spatial_index())
+    
+    @traced('match.library_closest')
     def find_closest_matches(self, sample_lab: Tuple[float, float, float] = None,
                            sample_rgb: Tuple[float, float, float] = None,
                            max_delta_e: float = 5.0,
@@ -479,37 +658,28 @@ CREATE TABLE IF NOT EXISTS library_colors (
         if sample_lab is None:
             sample_lab = self.rgb_to_lab(sample_rgb)
         
+        library_colors, points = self.get_match_data()
+        if not library_colors:
+            return []
+        
+        # Delta E to every library color at once
+        delta_e = np.sqrt(((points - self.to_match_space(sample_lab)) ** 2).sum(axis=1))
+        
+        # Sort by Delta E 2000 (best matches first), keeping library order for ties
         matches = []
-        library_colors = self.get_all_colors()
+        for index in np.argsort(delta_e, kind='stable')[:max_results]:
+            delta_e_value = float(delta_e[index])
+            # Only include if within threshold (NaN never is)
+            if not delta_e_value <= max_delta_e:
+                break
+            matches.append(ColorMatch(
+                library_color=library_colors[index],
+                delta_e_2000=delta_e_value,
+                match_quality=self.match_quality(delta_e_value),
+                library_name=self.library_name if include_library_name else None
+            ))
         
-        for lib_color in library_colors:
-            # Calculate Delta E 2000 using Lab values
-            delta_e_value = self.calculate_delta_e_2000(sample_lab, lib_color.lab)
-            
-            # Only include if within threshold
-            if delta_e_value <= max_delta_e:
-                # Determine match quality based on Delta E 2000 standards
-                if delta_e_value <= 1.0:
-                    quality = "Excellent"  # Imperceptible difference
-                elif delta_e_value <= 2.5:
-                    quality = "Good"       # Perceptible but acceptable
-                elif delta_e_value <= 5.0:
-                    quality = "Fair"       # Clearly perceptible
-                else:
-                    quality = "Poor"       # Very noticeable difference
-                
-                matches.append(ColorMatch(
-                    library_color=lib_color,
-                    delta_e_2000=delta_e_value,
-                    match_quality=quality,
-                    library_name=self.library_name if include_library_name else None
-                ))
-        
-        # Sort by Delta E 2000 (best matches first)
-        matches.sort(key=lambda m: m.delta_e_2000)
-        
-        # Return top results
-        return matches[:max_results]
+        return matches
     
     def compare_sample_to_library(self, sample_lab: Tuple[float, float, float] = None,
                                  sample_rgb: Tuple[float, float, float] = None,
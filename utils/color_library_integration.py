@@ -10,9 +10,15 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from .color_library import ColorLibrary, ColorMatch, LibraryColor
+from .color_match_index import LibraryMatchIndex
 from .color_analysis_db import ColorAnalysisDB
 from .ods_exporter import ODSExporter
 
+
+class NoAnalysisDataError(Exception):
+    """Exception raised when a sample set has no measurements to export."""
+    pass
+
 @dataclass
 class SampleAnalysisResult:
     """Result of analyzing a color sample against libraries."""
@@ -31,6 +37,7 @@ class ColorLibraryIntegration:
             default_libraries: List of library names to load by default
         """
         self.loaded_libraries = {}  # library_name -> ColorLibrary instance
+        self.match_index = LibraryMatchIndex()  # Merged index over loaded_libraries
         
         # Load default libraries if specified
         if default_libraries:
@@ -49,6 +56,7 @@ class ColorLibraryIntegration:
         try:
             library = ColorLibrary(library_name)
             self.loaded_libraries[library_name] = library
+            self.match_index.add_library(library)
             return True
         except Exception as e:
             print(f"Error loading library '{library_name}': {e}")
@@ -58,6 +66,7 @@ class ColorLibraryIntegration:
         """Unload a library from active matching."""
         if library_name in self.loaded_libraries:
             del self.loaded_libraries[library_name]
+            self.match_index.remove_library(library_name)
     
     def get_loaded_libraries(self) -> List[str]:
         """Get list of currently loaded library names."""
@@ -87,24 +96,15 @@ class ColorLibraryIntegration:
             first_lib = next(iter(self.loaded_libraries.values()))
             sample_rgb = first_lib.lab_to_rgb(sample_lab)
         
-        # Search each loaded library
-        library_matches = {}
-        all_matches = []
-        
-        for lib_name, library in self.loaded_libraries.items():
-            matches = library.find_closest_matches(
-                sample_lab=sample_lab,
-                max_delta_e=threshold,
-                max_results=max_matches_per_library
-            )
-            library_matches[lib_name] = matches
-            
-            # Add to global list with library info
-            for match in matches:
-                all_matches.append((lib_name, match))
-        
-        # Sort all matches by Delta E (best first)
-        all_matches.sort(key=lambda x: x[1].delta_e_2000)
+        # Search all loaded libraries in one pass; the overall best are
+        # drawn from each library's top matches
+        best_matches, library_matches = self.match_index.query(
+            sample_lab,
+            max_delta_e=threshold,
+            top_k=5,
+            per_library_k=max_matches_per_library
+        )
+        all_matches = [(match.library_name, match) for match in best_matches]
         
         # Determine if user action is needed
         has_excellent_match = any(match.delta_e_2000 <= 1.0 for _, match in all_matches)
@@ -117,10 +117,74 @@ class ColorLibraryIntegration:
                 'analysis_date': datetime.now().isoformat()
             },
             library_matches=library_matches,
-            best_matches=all_matches[:5],  # Top 5 overall
+            best_matches=all_matches,  # Top 5 overall
             user_action_needed=user_action_needed
         )
     
+    def analyze_samples_against_libraries(
+        self,
+        sample_labs: List[Tuple[float, float, float]],
+        threshold: float = 5.0,
+        max_matches_per_library: int = 3
+    ) -> List[SampleAnalysisResult]:
+        """Analyze many color samples against all loaded libraries at once.
+        
+        Gives the same results as calling analyze_sample_against_libraries
+        for each sample, but matches the whole batch per library with
+        ColorLibrary.match_many.
+        
+        Args:
+            sample_labs: Lab values of the samples
+            threshold: Delta E threshold for matches
+            max_matches_per_library: Max matches to find per library
+            
+        Returns:
+            One analysis result per sample, in order
+        """
+        import numpy as np
+        
+        labs = np.asarray(sample_labs, dtype=float).reshape(-1, 3)
+        analysis_date = datetime.now().isoformat()
+        
+        per_library = {}
+        for lib_name, library in self.loaded_libraries.items():
+            colors = library.get_match_data()[0]
+            indices, distances = library.match_many(labs, k=max_matches_per_library, max_delta_e=threshold)
+            per_library[lib_name] = (colors, indices, distances)
+        
+        first_lib = next(iter(self.loaded_libraries.values()), None)
+        results = []
+        for row, sample_lab in enumerate(map(tuple, labs.tolist())):
+            library_matches = {}
+            all_matches = []
+            for lib_name, (colors, indices, distances) in per_library.items():
+                matches = [
+                    ColorMatch(
+                        library_color=colors[index],
+                        delta_e_2000=float(delta_e),
+                        match_quality=ColorLibrary.match_quality(delta_e),
+                        library_name=lib_name
+                    )
+                    for index, delta_e in zip(indices[row], distances[row]) if index >= 0
+                ]
+                library_matches[lib_name] = matches
+                all_matches.extend((lib_name, match) for match in matches)
+            
+            # Sort all matches by Delta E (best first)
+            all_matches.sort(key=lambda x: x[1].delta_e_2000)
+            
+            results.append(SampleAnalysisResult(
+                sample_info={
+                    'lab': sample_lab,
+                    'rgb': first_lib.lab_to_rgb(sample_lab) if first_lib else None,
+                    'analysis_date': analysis_date
+                },
+                library_matches=library_matches,
+                best_matches=all_matches[:5],  # Top 5 overall
+                user_action_needed=not any(match.delta_e_2000 <= 1.0 for _, match in all_matches)
+            ))
+        return results
+    
     def add_sample_to_library(
         self,
         library_name: str,
@@ -215,18 +279,12 @@ class ColorLibraryIntegration:
             sample_analyses = []
             unmatched_samples = []
             
-            for measurement in measurements:
-                sample_lab = (
-                    measurement['l_value'],
-                    measurement['a_value'], 
-                    measurement['b_value']
-                )
-                
-                analysis = self.analyze_sample_against_libraries(
-                    sample_lab=sample_lab,
-                    threshold=threshold
-                )
-                
+            analyses = self.analyze_samples_against_libraries(
+                [(m['l_value'], m['a_value'], m['b_value']) for m in measurements],
+                threshold=threshold
+            )
+            
+            for measurement, analysis in zip(measurements, analyses):
                 sample_data = {
                     'measurement': measurement,
                     'analysis': analysis,
@@ -302,60 +360,93 @@ class ColorLibraryIntegration:
         sample_set_name: str,
         output_dir: str = None,
         include_library_matches: bool = True,
-        threshold: float = 5.0
+        threshold: float = 5.0,
+        output_path: str = None,
+        matches_per_sample: int = 3
     ) -> str:
         """Export analysis results with library matches to ODS file.
         
+        All measurements are matched against the loaded libraries in one
+        batch and the best matches are appended as extra columns.
+        
         Args:
             sample_set_name: Sample set to export
             output_dir: Directory for output file (default: data/exports)
             include_library_matches: Whether to include library match columns
             threshold: Delta E threshold for matches
+            output_path: Exact file to write (overrides output_dir)
+            matches_per_sample: Number of best matches to include per measurement
             
         Returns:
             Path to created ODS file
+            
+        Raises:
+            NoAnalysisDataError: If the sample set has no measurements
+            Exception: Whatever prevented the file being written (e.g. OSError)
         """
-        # Get workflow summary
-        workflow = self.get_analysis_workflow_summary(sample_set_name, threshold)
-        
-        if workflow['status'] != 'analyzed':
-            raise ValueError(f"Cannot export: {workflow.get('message', workflow.get('error', 'Unknown error'))}")
-        
         # Standard ODS export
         exporter = ODSExporter(sample_set_name)
         
         # Determine output path
-        if output_dir is None:
-            # Use STAMPZ_DATA_DIR environment variable if available (for packaged apps)
-            stampz_data_dir = os.getenv('STAMPZ_DATA_DIR')
-            if stampz_data_dir:
-                output_dir = os.path.join(stampz_data_dir, "data", "exports")
+        if output_path is None:
+            if output_dir is None:
+                # Use STAMPZ_DATA_DIR environment variable if available (for packaged apps)
+                stampz_data_dir = os.getenv('STAMPZ_DATA_DIR')
+                if stampz_data_dir:
+                    output_dir = os.path.join(stampz_data_dir, "data", "exports")
+                else:
+                    # Fallback to relative path for development
+                    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                    output_dir = os.path.join(current_dir, "data", "exports")
+                os.makedirs(output_dir, exist_ok=True)
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if include_library_matches:
+                filename = f"{sample_set_name}_with_library_matches_{timestamp}.ods"
             else:
-                # Fallback to relative path for development
-                current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                output_dir = os.path.join(current_dir, "data", "exports")
-            os.makedirs(output_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if include_library_matches:
-            filename = f"{sample_set_name}_with_library_matches_{timestamp}.ods"
-        else:
-            filename = f"{sample_set_name}_analysis_{timestamp}.ods"
-        
-        output_path = os.path.join(output_dir, filename)
+                filename = f"{sample_set_name}_analysis_{timestamp}.ods"
+            
+            output_path = os.path.join(output_dir, filename)
         
         # Export with enhanced data
-        success = exporter.export_to_ods(
-            output_path=output_path,
-            include_library_data=include_library_matches,
-            library_integration=self if include_library_matches else None,
-            threshold=threshold
+        count = exporter.write_measurements_ods(
+            output_path,
+            extra_columns=(
+                lambda frame: self._library_match_columns(frame, threshold, matches_per_sample)
+            ) if include_library_matches else None
         )
         
-        if success:
-            return output_path
-        else:
-            raise RuntimeError("Failed to export ODS file")
+        if count == 0:
+            raise NoAnalysisDataError(f"No analysis data found for sample set '{sample_set_name}'")
+        return output_path
+    
+    def _library_match_columns(self, frame, threshold: float, matches_per_sample: int) -> Dict[str, Tuple[List[str], bool]]:
+        """Best library matches for every measurement row, as export columns."""
+        labs = frame[['l_value', 'a_value', 'b_value']].to_numpy(dtype=float)
+        indices, distances = self.match_index.match_many(labs, k=matches_per_sample, max_delta_e=threshold)
+        
+        columns = {}
+        for rank in range(matches_per_sample):
+            prefix = "Best Match" if rank == 0 else f"Match {rank + 1}"
+            names, libraries, delta_es, qualities = [], [], [], []
+            for index, delta_e in zip(indices[:, rank], distances[:, rank]):
+                if index < 0:
+                    names.append('')
+                    libraries.append('')
+                    delta_es.append('')
+                    qualities.append('')
+                    continue
+                match = self.match_index.match_at(index, delta_e)
+                names.append(match.library_color.name)
+                libraries.append(match.library_name)
+                delta_es.append(f"{match.delta_e_2000:.2f}")
+                qualities.append(match.match_quality)
+            columns[prefix] = (names, False)
+            columns[f"{prefix} Library"] = (libraries, False)
+            columns[f"{prefix} ΔE"] = (delta_es, True)
+            if rank == 0:
+                columns["Match Quality"] = (qualities, False)
+        return columns
 
 # Convenience functions for common workflows
 def quick_philatelic_analysis(
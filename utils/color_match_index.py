@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Merged color matching index over several StampZ color libraries.
+
+Colors from every loaded library are held in one array of match-space
+coordinates with a library-id column, so a single distance pass answers
+both the overall best matches and the best matches per library. Libraries
+are added and removed individually, and a library is only re-read when its
+database has changed.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .color_library import ColorLibrary, ColorMatch, LibraryColor, _nearest_points
+from .instrumentation import traced
+
+
+class LibraryMatchIndex:
+    """Nearest-color index across a changing set of ColorLibrary instances."""
+
+    def __init__(self, libraries: Iterable[ColorLibrary] = ()):
+        """Build the index.
+
+        Args:
+            libraries: Libraries to index, in the order matches should tie-break
+        """
+        self._libraries: Dict[str, ColorLibrary] = {}
+        # Library name -> colors list last merged (identity shows whether it changed)
+        self._merged_blocks: Dict[str, List[LibraryColor]] = {}
+        self._library_names: List[str] = []  # Names by library id in the merged arrays
+        self._colors: List[LibraryColor] = []
+        self._library_ids = np.empty(0, dtype=np.int64)
+        self._points = np.empty((0, 3))
+        for library in libraries:
+            self.add_library(library)
+
+    @property
+    def library_names(self) -> List[str]:
+        return list(self._libraries)
+
+    @property
+    def libraries(self) -> List[ColorLibrary]:
+        return list(self._libraries.values())
+
+    def add_library(self, library: ColorLibrary) -> None:
+        """Add (or replace) a library; it is merged on the next query."""
+        self._libraries[library.library_name] = library
+
+    def remove_library(self, library_name: str) -> None:
+        """Drop a library from the index."""
+        self._libraries.pop(library_name, None)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._colors)
+
+    def _refresh(self) -> None:
+        """Re-merge if a library was added, removed or changed on disk."""
+        blocks = {name: library.get_match_data() for name, library in self._libraries.items()}
+        unchanged = (
+            list(blocks) == list(self._merged_blocks) and
+            all(blocks[name][0] is self._merged_blocks[name] for name in blocks)
+        )
+        if unchanged:
+            return
+
+        colors, ids, points = [], [], []
+        for library_id, (library_colors, library_points) in enumerate(blocks.values()):
+            colors.extend(library_colors)
+            ids.append(np.full(len(library_colors), library_id, dtype=np.int64))
+            points.append(library_points)
+        self._colors = colors
+        self._library_ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+        self._points = np.concatenate(points) if points else np.empty((0, 3))
+        self._merged_blocks = {name: block[0] for name, block in blocks.items()}
+        self._library_names = list(blocks)
+
+    @traced('match.index_query')
+    def query(
+        self,
+        sample_lab: Tuple[float, float, float],
+        max_delta_e: float = 5.0,
+        top_k: int = 5,
+        per_library_k: Optional[int] = None
+    ) -> Tuple[List[ColorMatch], Dict[str, List[ColorMatch]]]:
+        """Find the best matches overall and per library in one pass.
+
+        Args:
+            sample_lab: CIE L*a*b* color to match
+            max_delta_e: Maximum Delta E for a match
+            top_k: Number of overall matches to return
+            per_library_k: Matches kept per library (default: top_k); the
+                overall list is drawn from these
+
+        Returns:
+            (overall matches best first, library name -> matches best first),
+            with library_name set on every match
+        """
+        self._refresh()
+        names = self._library_names
+        per_library = {name: [] for name in names}
+        if per_library_k is None:
+            per_library_k = top_k
+        if not self._colors:
+            return [], per_library
+
+        delta_e = np.sqrt(((self._points - ColorLibrary.to_match_space(sample_lab)) ** 2).sum(axis=1))
+        within = np.flatnonzero(delta_e <= max_delta_e)
+        # Best first; ties keep library order, then each library's color order
+        ranked = within[np.argsort(delta_e[within], kind='stable')]
+
+        overall = []
+        open_libraries = len(names)
+        for index in ranked:
+            name = names[self._library_ids[index]]
+            library_matches = per_library[name]
+            if len(library_matches) >= per_library_k:
+                continue
+            delta_e_value = float(delta_e[index])
+            match = ColorMatch(
+                library_color=self._colors[index],
+                delta_e_2000=delta_e_value,
+                match_quality=ColorLibrary.match_quality(delta_e_value),
+                library_name=name
+            )
+            library_matches.append(match)
+            if len(overall) < top_k:
+                overall.append(match)
+            if len(library_matches) == per_library_k:
+                open_libraries -= 1
+                if not open_libraries:
+                    break
+        return overall, per_library
+
+    @traced('match.index_many')
+    def match_many(self, lab_array, k: int = 1, max_delta_e: Optional[float] = None,
+                   chunk_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k closest colors across all libraries for many samples at once.
+
+        Args:
+            lab_array: (N, 3) CIE L*a*b* samples
+            k: Matches per sample
+            max_delta_e: Drop matches with a larger Delta E (default: keep all)
+            chunk_size: Samples per distance block
+
+        Returns:
+            (N, k) merged indices for match_at (-1 where there is no match)
+            and (N, k) Delta E values (inf where there is no match), best first
+        """
+        self._refresh()
+        queries = ColorLibrary.to_match_space(lab_array)
+        return _nearest_points(self._points, queries, k, max_delta_e, chunk_size)
+
+    def match_at(self, index: int, delta_e_value: float) -> ColorMatch:
+        """ColorMatch for a merged index returned by match_many."""
+        delta_e_value = float(delta_e_value)
+        return ColorMatch(
+            library_color=self._colors[index],
+            delta_e_2000=delta_e_value,
+            match_quality=ColorLibrary.match_quality(delta_e_value),
+            library_name=self._library_names[self._library_ids[index]]
+        )
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Search index for color library browsing in StampZ
+Filters library colors by name, notes and category without re-scanning
+and lower-casing every color on each keystroke.
+"""
+
+from typing import Dict, List, Sequence
+
+from .color_library import LibraryColor
+
+
+class ColorSearchIndex:
+    """Trigram index over the searchable text of a list of library colors.
+
+    The lower-cased text of each color is computed once when the index is
+    built. Queries of three or more characters are answered by intersecting
+    trigram posting lists and verifying the few remaining candidates;
+    shorter queries scan the precomputed text. A query that extends the
+    previous one only re-checks the previous results.
+    """
+
+    def __init__(self, colors: Sequence[LibraryColor]):
+        """Build the index.
+
+        Args:
+            colors: Colors in the order they should be returned by searches
+        """
+        self.colors = list(colors)
+        self._haystacks = [self._searchable_text(color) for color in self.colors]
+        self._trigrams: Dict[str, List[int]] = {}
+
+        for index, text in enumerate(self._haystacks):
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                self._trigrams.setdefault(trigram, []).append(index)
+
+        self._last_term = ""
+        self._last_result = list(range(len(self.colors)))
+
+    @staticmethod
+    def _searchable_text(color: LibraryColor) -> str:
+        """Lower-cased text a search term is matched against."""
+        # Newlines keep a term from matching across field boundaries
+        return "\n".join((color.name or "", color.notes or "", color.category or "")).lower()
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def search_indices(self, term: str) -> List[int]:
+        """Return the positions of colors whose name, notes or category contain term.
+
+        Args:
+            term: Case-insensitive substring to look for
+
+        Returns:
+            Sorted list of indices into self.colors
+        """
+        term = term.strip().lower()
+        if not term:
+            result = list(range(len(self.colors)))
+        else:
+            if self._last_term and self._last_term in term:
+                # Every match for the longer term also matched the previous one
+                candidates = self._last_result
+            elif len(term) >= 3:
+                candidates = self._trigram_candidates(term)
+            else:
+                candidates = range(len(self.colors))
+
+            haystacks = self._haystacks
+            result = [index for index in candidates if term in haystacks[index]]
+
+        self._last_term = term
+        self._last_result = result
+        return result
+
+    def search(self, term: str) -> List[LibraryColor]:
+        """Return the colors whose name, notes or category contain term."""
+        return [self.colors[index] for index in self.search_indices(term)]
+
+    def _trigram_candidates(self, term: str) -> List[int]:
+        """Indices containing every trigram of term (a superset of the matches)."""
+        postings = []
+        for trigram in {term[i:i + 3] for i in range(len(term) - 2)}:
+            posting = self._trigrams.get(trigram)
+            if not posting:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return sorted(candidates)
@@ -3,13 +3,16 @@
 Database utilities for storing and retrieving coordinate sample locations.
 """
 
+import hashlib
 import sqlite3
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import os
 from datetime import datetime
 
+from .instrumentation import traced
+
 class SampleAreaType(Enum):
     """Type of sample area for a coordinate point."""
     RECTANGLE = "rectangle"
@@ -37,6 +40,15 @@ class CoordinateDB:
 
     _instance = None
     _initialized = False
+    # Compiled templates by set name; each carries the version it was built from
+    _compiled_templates = {}
+    
+    _INSERT_COORDINATES = """
+        INSERT INTO coordinates (
+            set_id, x, y, sample_type, sample_width, sample_height,
+            anchor_position, point_order, temporary
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
 
     def __new__(cls):
         if cls._instance is None:
@@ -110,6 +122,11 @@ class CoordinateDB:
                 )
             """)
             
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_coordinates_set_id
+                ON coordinates(set_id)
+            """)
+            
             # Migration: Add temporary column if it doesn't exist
             try:
                 conn.execute("ALTER TABLE coordinates ADD COLUMN temporary INTEGER DEFAULT 0")
@@ -120,6 +137,9 @@ class CoordinateDB:
                 else:
                     print(f"DEBUG: Error adding temporary column: {e}")
             
+            self._ensure_content_hash_column(conn)
+            self._backfill_content_hashes(conn)
+            
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS color_data (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -136,6 +156,7 @@ class CoordinateDB:
                 )
             """)
     
+    @traced('db.save_coordinate_set')
     def save_coordinate_set(
         self,
         name: str,
@@ -162,59 +183,191 @@ class CoordinateDB:
         # Standardize the name
         standardized_name = standardize_name(name)
         
+        content_hash = self._content_hash(coordinates)
+        
         try:
-            print(f"DEBUG: Attempting to save coordinate set '{standardized_name}' to database")
-            print(f"DEBUG: Database path: {self.db_path}")
-            print(f"DEBUG: Number of coordinates to save: {len(coordinates)}")
-            
             with sqlite3.connect(self.db_path) as conn:
-                # First, check if set already exists
-                cursor = conn.execute(
-                    "SELECT id FROM coordinate_sets WHERE name = ?",
-                    (standardized_name,)
-                )
-                existing_set = cursor.fetchone()
-                print(f"DEBUG: Existing set found: {existing_set is not None}")
-                
-                if existing_set:
-                    # Update existing set
-                    set_id = existing_set[0]
-                    conn.execute(
-                        "DELETE FROM coordinates WHERE set_id = ?",
-                        (set_id,)
-                    )
+                set_id, unchanged = self._write_coordinate_set(
+                    conn, standardized_name, image_path, coordinates, content_hash)
+                if unchanged:
+                    print(f"DEBUG: Coordinate set '{standardized_name}' unchanged, skipping save")
                 else:
-                    # Insert new set
-                    cursor = conn.execute(
-                        "INSERT INTO coordinate_sets (name, image_path) VALUES (?, ?)",
-                        (standardized_name, image_path)
-                    )
-                    set_id = cursor.lastrowid
-                
-                # Insert all coordinates with proper order
-                for i, coord in enumerate(coordinates):
-                    conn.execute("""
-                        INSERT INTO coordinates (
-                            set_id, x, y, sample_type, sample_width, sample_height,
-                            anchor_position, point_order, temporary
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
-                    """, (
-                        set_id,
-                        coord.x,  # x is correct (increases right)
-                        coord.y,  # y is correct (increases up)
-                        coord.sample_type.value,
-                        coord.sample_size[0],
-                        coord.sample_size[1],
-                        coord.anchor_position,
-                        i,  # Maintain point order
-                    ))
-                
+                    print(f"DEBUG: Saved {len(coordinates)} coordinates to set '{standardized_name}'")
                 return True, standardized_name
         except sqlite3.Error as e:
             return False, f"Database error: {str(e)}"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
+    @staticmethod
+    def _ensure_content_hash_column(conn: sqlite3.Connection) -> None:
+        """Add the content_hash column to databases created before it existed."""
+        try:
+            conn.execute("ALTER TABLE coordinate_sets ADD COLUMN content_hash TEXT")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e).lower():
+                raise
+    
+    @staticmethod
+    def _point_key(x, y, sample_type: str, width, height, anchor_position: str) -> str:
+        """Canonical text for one point, shared by objects and database rows."""
+        return f"{float(x)!r},{float(y)!r},{sample_type},{float(width)!r},{float(height)!r},{anchor_position}"
+    
+    @classmethod
+    def _content_hash(cls, coordinates: List[CoordinatePoint]) -> str:
+        """Hash of a template's points in order, used to skip unchanged saves."""
+        digest = hashlib.sha1()
+        for coord in coordinates:
+            digest.update(cls._point_key(
+                coord.x, coord.y, coord.sample_type.value,
+                coord.sample_size[0], coord.sample_size[1], coord.anchor_position
+            ).encode('utf-8'))
+            digest.update(b';')
+        return digest.hexdigest()
+    
+    @classmethod
+    def _hashes_from_rows(cls, conn: sqlite3.Connection, set_ids: Optional[List[int]] = None) -> Dict[int, str]:
+        """Content hashes of stored sets, computed from their permanent coordinate rows."""
+        query = """
+            SELECT set_id, x, y, sample_type, sample_width, sample_height, anchor_position
+            FROM coordinates
+            WHERE (temporary = 0 OR temporary IS NULL)
+        """
+        params = []
+        if set_ids is not None:
+            query += " AND set_id IN ({})".format(','.join('?' * len(set_ids)))
+            params = list(set_ids)
+        query += " ORDER BY set_id, point_order"
+        
+        digests = {}
+        for set_id, *point in conn.execute(query, params):
+            digest = digests.get(set_id)
+            if digest is None:
+                digest = digests[set_id] = hashlib.sha1()
+            digest.update(cls._point_key(*point).encode('utf-8'))
+            digest.update(b';')
+        return {set_id: digest.hexdigest() for set_id, digest in digests.items()}
+    
+    @classmethod
+    def _backfill_content_hashes(cls, conn: sqlite3.Connection) -> int:
+        """Store content hashes for sets saved before hashing was added.
+        
+        Returns:
+            Number of sets updated
+        """
+        set_ids = [row[0] for row in conn.execute(
+            "SELECT id FROM coordinate_sets WHERE content_hash IS NULL")]
+        if not set_ids:
+            return 0
+        hashes = cls._hashes_from_rows(conn, set_ids)
+        conn.executemany(
+            "UPDATE coordinate_sets SET content_hash = ? WHERE id = ?",
+            [(content_hash, set_id) for set_id, content_hash in hashes.items()]
+        )
+        return len(hashes)
+    
+    @staticmethod
+    def _coordinate_rows(set_id: int, coordinates: List[CoordinatePoint], temporary: int) -> List[tuple]:
+        """Rows for an executemany INSERT into coordinates, in point order."""
+        return [(
+            set_id,
+            coord.x,  # x increases right
+            coord.y,  # y increases up
+            coord.sample_type.value,
+            coord.sample_size[0],
+            coord.sample_size[1],
+            coord.anchor_position,
+            i,  # Maintain point order
+            temporary,
+        ) for i, coord in enumerate(coordinates)]
+    
+    @classmethod
+    def _write_coordinate_set(
+        cls,
+        conn: sqlite3.Connection,
+        name: str,
+        image_path: str,
+        coordinates: List[CoordinatePoint],
+        content_hash: str
+    ) -> Tuple[int, bool]:
+        """Create or replace a permanent set within the caller's transaction.
+        
+        Returns:
+            (set ID, True if the stored set already had this content and was left untouched)
+        """
+        existing_set = conn.execute(
+            "SELECT id, content_hash FROM coordinate_sets WHERE name = ?",
+            (name,)
+        ).fetchone()
+        
+        if existing_set:
+            set_id, stored_hash = existing_set
+            if stored_hash == content_hash:
+                return set_id, True
+            conn.execute("DELETE FROM coordinates WHERE set_id = ?", (set_id,))
+            conn.execute(
+                "UPDATE coordinate_sets SET content_hash = ? WHERE id = ?",
+                (content_hash, set_id)
+            )
+        else:
+            set_id = conn.execute(
+                "INSERT INTO coordinate_sets (name, image_path, content_hash) VALUES (?, ?, ?)",
+                (name, image_path, content_hash)
+            ).lastrowid
+        
+        conn.executemany(cls._INSERT_COORDINATES, cls._coordinate_rows(set_id, coordinates, 0))
+        return set_id, False
+    
+    @classmethod
+    def import_coordinate_sets(cls, source_db: str, target_db: str) -> Tuple[int, int, List[str]]:
+        """Copy the permanent templates the target doesn't have from one coordinates.db into another.
+        
+        Templates already in the target are never overwritten: those with the
+        same content are skipped, and those with the same name but different
+        points are left as they are and reported as conflicts. Everything is
+        written in a single transaction.
+        
+        Args:
+            source_db: Path to the coordinates.db to import from
+            target_db: Path to the coordinates.db to import into (must already be initialized)
+            
+        Returns:
+            Tuple of (imported count, skipped count, names of conflicting templates)
+        """
+        source_sets: Dict[str, Tuple[str, List[CoordinatePoint]]] = {}
+        with sqlite3.connect(source_db) as source:
+            cursor = source.execute("""
+                SELECT s.name, s.image_path, c.x, c.y, c.sample_type,
+                       c.sample_width, c.sample_height, c.anchor_position
+                FROM coordinates c
+                JOIN coordinate_sets s ON c.set_id = s.id
+                WHERE (c.temporary = 0 OR c.temporary IS NULL)
+                ORDER BY s.id, c.point_order
+            """)
+            for name, image_path, x, y, sample_type, width, height, anchor in cursor:
+                entry = source_sets.setdefault(name, (image_path, []))
+                entry[1].append(CoordinatePoint(x, y, SampleAreaType(sample_type), (width, height), anchor))
+        
+        imported = skipped = 0
+        conflicts = []
+        with sqlite3.connect(target_db) as conn:
+            cls._ensure_content_hash_column(conn)
+            cls._backfill_content_hashes(conn)
+            target_hashes = dict(conn.execute("SELECT name, content_hash FROM coordinate_sets"))
+            for name, (image_path, coordinates) in source_sets.items():
+                content_hash = cls._content_hash(coordinates)
+                if name not in target_hashes:
+                    cls._write_coordinate_set(conn, name, image_path, coordinates, content_hash)
+                    imported += 1
+                elif target_hashes[name] == content_hash:
+                    skipped += 1
+                else:
+                    conflicts.append(name)
+        
+        CoordinateDB._compiled_templates.clear()
+        return imported, skipped, conflicts
+    
+    @traced('db.load_coordinate_set')
     def load_coordinate_set(self, name: str) -> Optional[List[CoordinatePoint]]:
         """Load a coordinate set by name.
         
@@ -251,6 +404,52 @@ class CoordinateDB:
         except sqlite3.Error:
             return None
     
+    def get_template_version(self, name: str) -> Optional[Tuple[int, int]]:
+        """Version token of a coordinate set: its point count and newest row ID.
+        
+        Saving a set replaces its coordinate rows, and row IDs only grow, so
+        the token changes whenever the template does.
+        
+        Returns:
+            (point count, max row ID), or None if the set has no permanent points
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                count, max_id = conn.execute("""
+                    SELECT COUNT(c.id), MAX(c.id)
+                    FROM coordinates c
+                    JOIN coordinate_sets s ON c.set_id = s.id
+                    WHERE s.name = ? AND (c.temporary = 0 OR c.temporary IS NULL)
+                """, (name,)).fetchone()
+                return (count, max_id) if count else None
+        except sqlite3.Error:
+            return None
+    
+    def get_compiled_template(self, name: str):
+        """Return the compiled sampling plan for a coordinate set, cached by name and version.
+        
+        Args:
+            name: Name of the coordinate set
+            
+        Returns:
+            CompiledTemplate, or None if the set is not found
+        """
+        from .coordinate_template import CompiledTemplate
+        
+        version = self.get_template_version(name)
+        if version is None:
+            CoordinateDB._compiled_templates.pop(name, None)
+            return None
+        
+        compiled = CoordinateDB._compiled_templates.get(name)
+        if compiled is None or compiled.version != version:
+            coords = self.load_coordinate_set(name)
+            if not coords:
+                return None
+            compiled = CompiledTemplate.compile(name, version, coords)
+            CoordinateDB._compiled_templates[name] = compiled
+        return compiled
+    
     def get_sets_for_image(self, image_path: str) -> List[str]:
         """Get names of all coordinate sets for a specific image.
         
@@ -318,22 +517,7 @@ class CoordinateDB:
                 set_id = cursor.lastrowid
                 
                 # Insert coordinates as temporary
-                for i, coord in enumerate(coordinates):
-                    conn.execute("""
-                        INSERT INTO coordinates (
-                            set_id, x, y, sample_type, sample_width, sample_height,
-                            anchor_position, point_order, temporary
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
-                    """, (
-                        set_id,
-                        coord.x,
-                        coord.y,
-                        coord.sample_type.value,
-                        coord.sample_size[0],
-                        coord.sample_size[1],
-                        coord.anchor_position,
-                        i
-                    ))
+                conn.executemany(self._INSERT_COORDINATES, self._coordinate_rows(set_id, coordinates, 1))
                 
                 return True, standardized_name
                 
@@ -502,8 +686,8 @@ class CoordinateDB:
         
         db_path = os.path.join(selected_folder, 'coordinates.db')
         
-        # If we found an existing database, offer to migrate it
-        if existing_db and not os.path.exists(db_path):
+        # If we found an existing database, offer to migrate (or merge) it
+        if existing_db and os.path.abspath(existing_db) != os.path.abspath(db_path):
             self._migrate_existing_database(existing_db, selected_folder, root)
         
         print(f"DEBUG: Using templates folder: {selected_folder}")
@@ -647,9 +831,22 @@ class CoordinateDB:
         
         if migrate:
             try:
-                # Copy the database file
-                shutil.copy2(source_db, target_db)
-                print(f"DEBUG: Successfully migrated database from {source_db} to {target_db}")
+                if os.path.exists(target_db):
+                    # Merge into the existing database, skipping templates it already has
+                    imported, skipped, conflicts = self.import_coordinate_sets(source_db, target_db)
+                    print(f"DEBUG: Imported {imported} templates from {source_db} ({skipped} unchanged)")
+                    if conflicts:
+                        messagebox.showwarning(
+                            "Templates Not Copied",
+                            "These templates already exist in your new templates folder with "
+                            "different points, so they were kept as they are:\n\n"
+                            + "\n".join(conflicts),
+                            parent=parent_window
+                        )
+                else:
+                    # Copy the database file
+                    shutil.copy2(source_db, target_db)
+                    print(f"DEBUG: Successfully migrated database from {source_db} to {target_db}")
                 
                 # Inform user of successful migration
                 messagebox.showinfo(
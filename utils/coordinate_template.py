@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compiled coordinate templates for repeated sampling.
+
+A coordinate set is turned once into arrays of positions, sizes, shape codes
+and anchor offsets. Sample boxes are then resolved for all points at once per
+image size, and circular masks are built once per box size, so sampling many
+images with the same template does no per-point anchor or size work.
+
+Bounds and masks match ColorAnalyzer._get_rectangle_bounds,
+_get_circle_bounds and _extract_pixels_from_bounds exactly.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .coordinate_db import CoordinatePoint, SampleAreaType
+
+SHAPE_RECTANGLE = 0
+SHAPE_CIRCLE = 1
+
+# Sample box edges relative to the anchor point, as fractions of the box
+# size, in PIL orientation (y grows downwards): (left, right, top, bottom)
+ANCHOR_FRACTIONS = {
+    'center': (-0.5, 0.5, -0.5, 0.5),
+    'top_left': (0.0, 1.0, -1.0, 0.0),
+    'top_right': (-1.0, 0.0, -1.0, 0.0),
+    'bottom_left': (0.0, 1.0, 0.0, 1.0),
+    'bottom_right': (-1.0, 0.0, 0.0, 1.0),
+}
+_DEFAULT_FRACTIONS = ANCHOR_FRACTIONS['bottom_right']  # Fallback used by _get_rectangle_bounds
+
+# Gray used when a sample area contains no pixels
+FALLBACK_RGB = (128, 128, 128)
+
+
+@dataclass
+class CompiledTemplate:
+    """Array-backed sampling plan for one version of a coordinate set."""
+    name: str
+    version: Tuple
+    points: List[CoordinatePoint]
+    x: np.ndarray
+    y: np.ndarray
+    box_width: np.ndarray
+    box_height: np.ndarray
+    shape: np.ndarray
+    fractions: np.ndarray  # (N, 4) left, right, top, bottom
+    _bounds: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, repr=False)
+    _masks: Dict[Tuple[int, int], np.ndarray] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def compile(cls, name: str, version: Tuple, points: Sequence[CoordinatePoint]) -> 'CompiledTemplate':
+        """Build the arrays for a list of coordinate points."""
+        points = list(points)
+        circle = np.array([p.sample_type == SampleAreaType.CIRCLE for p in points], dtype=bool)
+        width = np.array([float(p.sample_size[0]) for p in points])
+        height = np.array([float(p.sample_size[1]) for p in points])
+        fractions = np.array([
+            ANCHOR_FRACTIONS['center'] if is_circle else ANCHOR_FRACTIONS.get(p.anchor_position, _DEFAULT_FRACTIONS)
+            for p, is_circle in zip(points, circle)
+        ], dtype=float).reshape(len(points), 4)
+        return cls(
+            name=name,
+            version=version,
+            points=points,
+            x=np.array([float(p.x) for p in points]),
+            y=np.array([float(p.y) for p in points]),
+            box_width=width,
+            # Circles use their width (diameter) in both directions
+            box_height=np.where(circle, width, height),
+            shape=np.where(circle, SHAPE_CIRCLE, SHAPE_RECTANGLE).astype(np.int8),
+            fractions=fractions,
+        )
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def bounds(self, image_width: int, image_height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Clamped (left, top, right, bottom) boxes for an image size, and which are non-empty."""
+        key = (image_width, image_height)
+        if key not in self._bounds:
+            # Cartesian (0,0 at bottom-left) to PIL (0,0 at top-left)
+            pil_y = image_height - self.y
+            left = np.trunc(self.x + self.fractions[:, 0] * self.box_width)
+            right = np.trunc(self.x + self.fractions[:, 1] * self.box_width)
+            top = np.trunc(pil_y + self.fractions[:, 2] * self.box_height)
+            bottom = np.trunc(pil_y + self.fractions[:, 3] * self.box_height)
+            boxes = np.stack([
+                np.maximum(0, left), np.maximum(0, top),
+                np.minimum(image_width, right), np.minimum(image_height, bottom),
+            ], axis=1).astype(np.int64)
+            valid = (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+            self._bounds[key] = (boxes, valid)
+        return self._bounds[key]
+
+    def circle_mask(self, width: int, height: int) -> np.ndarray:
+        """Pixels of a width x height box inside its inscribed circle."""
+        key = (width, height)
+        if key not in self._masks:
+            radius = min(width, height) / 2
+            dy = np.arange(height)[:, None] - height / 2
+            dx = np.arange(width)[None, :] - width / 2
+            self._masks[key] = dx * dx + dy * dy <= radius * radius
+        return self._masks[key]
+
+    def sample(self, rgb) -> List[Optional[Tuple[int, int, int]]]:
+        """Average color of every sample area in an (H, W, 3) RGB array.
+
+        Args:
+            rgb: The RGB array, or a TiledImage, from which only the sample
+                areas are read
+
+        Returns:
+            Per point, the truncated average RGB, FALLBACK_RGB for an area
+            without pixels, or None if the area lies outside the image
+        """
+        boxes, valid = self.bounds(rgb.shape[1], rgb.shape[0])
+        if hasattr(rgb, 'region'):
+            read_area = rgb.region
+        else:
+            read_area = lambda box: rgb[box[1]:box[3], box[0]:box[2], :3]
+        results = []
+        for (left, top, right, bottom), is_valid, shape in zip(boxes, valid, self.shape):
+            if not is_valid:
+                results.append(None)
+                continue
+            area = read_area((left, top, right, bottom))
+            if shape == SHAPE_CIRCLE:
+                area = area[self.circle_mask(right - left, bottom - top)]
+            else:
+                area = area.reshape(-1, area.shape[-1])
+            count = len(area)
+            if not count:
+                results.append(FALLBACK_RGB)
+                continue
+            totals = area.sum(axis=0, dtype=np.int64)
+            results.append(tuple(int(total / count) for total in totals))
+        return results
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Maintenance for StampZ sample set databases.
+
+Removes repeated measurements (keeping the latest per image/point), refreshes
+query statistics and vacuums every color analysis database, reporting the
+rows and bytes reclaimed. Meant to be scheduled, e.g. with cron:
+
+    0 3 * * * cd /path/to/StampZ && python -m utils.db_maintenance
+"""
+
+import os
+import sqlite3
+from typing import Dict, List
+
+from utils.color_analysis_db import ColorAnalysisDB
+
+
+def maintain_all_databases(data_dir: str = None, vacuum: bool = True, analyze: bool = True) -> List[Dict]:
+    """Compact every sample set database in the color analysis directory.
+
+    Args:
+        data_dir: Directory with the .db files (default: the color analysis directory)
+        vacuum: VACUUM each database after removing duplicates
+        analyze: ANALYZE each database after removing duplicates
+
+    Returns:
+        One dict per database with name, rows_removed, bytes_reclaimed and error
+    """
+    if data_dir is None:
+        data_dir = ColorAnalysisDB.get_color_analysis_directory()
+
+    results = []
+    for name in ColorAnalysisDB.get_all_sample_set_databases(data_dir):
+        result = {'name': name, 'rows_removed': 0, 'bytes_reclaimed': 0, 'error': None}
+        try:
+            result['rows_removed'], result['bytes_reclaimed'] = ColorAnalysisDB.compact_database(
+                os.path.join(data_dir, f"{name}.db"), vacuum=vacuum, analyze=analyze)
+        except (sqlite3.Error, OSError) as e:
+            result['error'] = str(e)
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    """Run maintenance over all sample set databases and print a report."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compact StampZ sample set databases")
+    parser.add_argument("--data-dir", help="Directory with the sample set databases")
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM")
+    parser.add_argument("--no-analyze", action="store_true", help="Skip ANALYZE")
+    args = parser.parse_args(argv)
+
+    results = maintain_all_databases(args.data_dir, vacuum=not args.no_vacuum, analyze=not args.no_analyze)
+    if not results:
+        print("No sample set databases found")
+        return results
+
+    width = max(len(r['name']) for r in results)
+    for r in results:
+        if r['error']:
+            print(f"{r['name']:<{width}}  error: {r['error']}")
+        else:
+            print(f"{r['name']:<{width}}  {r['rows_removed']:>8} rows  {r['bytes_reclaimed']:>12} bytes")
+
+    print(f"Reclaimed {sum(r['rows_removed'] for r in results)} rows and "
+          f"{sum(r['bytes_reclaimed'] for r in results)} bytes across {len(results)} databases")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,9 @@ from typing import List, Dict, Optional, Tuple
 import ezodf
 import time
 
+from utils.plot3d_append import append_rows, get_plot3d_index
+from utils.instrumentation import traced
+
 class DirectPlot3DExporter:
     """Direct exporter from StampZ databases to Plot_3D format."""
     
@@ -156,8 +159,10 @@ class DirectPlot3DExporter:
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             return []
     
+    @traced('export.plot3d')
     def export_to_plot3d(self, sample_set_name: str, output_dir: str = None, 
-                        export_individual: bool = True, export_averages: bool = True) -> List[str]:
+                        export_individual: bool = True, export_averages: bool = True,
+                        file_prefix: str = None) -> List[str]:
         """Export sample set data directly to Plot_3D format.
         
         Args:
@@ -165,6 +170,7 @@ class DirectPlot3DExporter:
             output_dir: Directory to save files (default: ~/Desktop/Color Analysis spreadsheets)
             export_individual: Whether to export individual measurements
             export_averages: Whether to export averaged measurements
+            file_prefix: Prefix for the output file names (default: the sample set base name)
             
         Returns:
             List of created file paths
@@ -193,6 +199,9 @@ class DirectPlot3DExporter:
                 base_name = sample_set_name
                 actual_sample_set = sample_set_name
             
+            if file_prefix:
+                base_name = file_prefix
+            
             # Export individual measurements (only if not an averages-only database)
             if export_individual:
                 individual_data = self.get_sample_data(actual_sample_set, use_averages=False)
@@ -267,103 +276,35 @@ class DirectPlot3DExporter:
             
             self.logger.info(f"Copied template to: {output_path}")
             
-            # Open the copied file and insert data
-            doc = ezodf.opendoc(output_path)
-            sheet = doc.sheets[0]
-            
-            # Insert data starting at row 8 (index 7), columns A-D (indices 0-3)
-            start_row_idx = 7  # Row 8 in 0-based indexing
-            
-            for row_offset, data_row in enumerate(data):
-                sheet_row_idx = start_row_idx + row_offset
-                
-                # Column A (index 0): Xnorm (L*_norm)
-                sheet[sheet_row_idx, 0].set_value(data_row['L_norm'])
-                
-                # Column B (index 1): Ynorm (a*_norm)
-                sheet[sheet_row_idx, 1].set_value(data_row['a_norm'])
-                
-                # Column C (index 2): Znorm (b*_norm)
-                sheet[sheet_row_idx, 2].set_value(data_row['b_norm'])
-                
-                # Column D (index 3): DataID
-                sheet[sheet_row_idx, 3].set_value(data_row['DataID'])
-                
-                # Leave other columns (E-L) as they are in the template
-                # Plot_3D will fill these during analysis (Cluster, ∆E, etc.)
+            # Insert data starting at row 8, columns A-D (Xnorm, Ynorm, Znorm, DataID);
+            # other columns keep the template's contents for Plot_3D to fill
+            count = append_rows(output_path, self._plot3d_rows(data))
             
-            # Save the document
-            temp_path = f"{output_path}.temp"
-            doc.saveas(temp_path)
-            os.replace(temp_path, output_path)
-            
-            self.logger.info(f"Successfully inserted {len(data)} rows of data into {output_path}")
+            self.logger.info(f"Successfully inserted {count} rows of data into {output_path}")
             return True
             
         except Exception as e:
             self.logger.error(f"Error creating Plot_3D file {output_path}: {e}")
             return False
     
-    def _find_next_empty_row(self, sheet, start_row_idx: int = 7) -> int:
-        """Find the next empty row in the sheet where we can append new data.
-        
-        Args:
-            sheet: ezodf sheet object
-            start_row_idx: Starting row index to search from (default: 7 for row 8)
-            
-        Returns:
-            Row index of the next empty row
-        """
-        try:
-            max_rows = sheet.nrows()
-            
-            # Search for the first row where columns A-D are all empty
-            for row_idx in range(start_row_idx, max_rows):
-                # Check if row is empty in the first 4 columns (A-D)
-                empty_row = True
-                for col_idx in range(4):
-                    cell_value = sheet[row_idx, col_idx].value
-                    if cell_value is not None and str(cell_value).strip():
-                        empty_row = False
-                        break
-                
-                if empty_row:
-                    self.logger.debug(f"Found empty row at index {row_idx} (row {row_idx + 1})")
-                    return row_idx
-            
-            # If no empty row found within existing sheet, return the next row after the last one
-            next_row = max_rows
-            self.logger.debug(f"No empty row found, will append at row index {next_row} (row {next_row + 1})")
-            return next_row
-            
-        except Exception as e:
-            self.logger.error(f"Error finding next empty row: {e}")
-            # Fallback to start_row_idx if there's an error
-            return start_row_idx
+    @staticmethod
+    def _plot3d_rows(data: List[Dict]) -> List[Tuple]:
+        """Convert data dictionaries to (Xnorm, Ynorm, Znorm, DataID) rows."""
+        return [(row['L_norm'], row['a_norm'], row['b_norm'], row['DataID']) for row in data]
     
     def _get_existing_dataids_from_file(self, file_path: str) -> set:
         """Get set of DataIDs that already exist in the Plot_3D file.
         
+        Uses the file's sidecar index, rebuilding it if the file changed since it was written.
+        
         Args:
             file_path: Path to existing Plot_3D file
             
         Returns:
             Set of DataID strings already present in the file
         """
-        existing_dataids = set()
         try:
-            doc = ezodf.opendoc(file_path)
-            sheet = doc.sheets[0]
-            
-            # Check DataID column (column D, index 3) starting from row 8
-            for row_idx in range(7, sheet.nrows()):
-                dataid_cell = sheet[row_idx, 3].value  # Column D
-                if dataid_cell and str(dataid_cell).strip():
-                    existing_dataids.add(str(dataid_cell).strip())
-            
-            self.logger.debug(f"Found {len(existing_dataids)} existing DataIDs in {file_path}")
-            return existing_dataids
-            
+            return set(get_plot3d_index(file_path).data_ids)
         except Exception as e:
             self.logger.error(f"Error reading existing DataIDs from {file_path}: {e}")
             return set()
@@ -391,60 +332,23 @@ class DirectPlot3DExporter:
                 self.logger.warning(f"No data found for {sample_set_name}")
                 return False
             
-            # Get existing DataIDs from the file
-            existing_dataids = self._get_existing_dataids_from_file(file_path)
-            
-            # Filter out data that already exists in the file
-            new_data = []
-            for data_row in all_data:
-                if data_row['DataID'] not in existing_dataids:
-                    new_data.append(data_row)
+            # The sidecar index holds the file's DataIDs and next free row,
+            # so only the new rows are written into the sheet
+            index = get_plot3d_index(file_path)
+            new_data = [row for row in all_data if row['DataID'] not in index.data_ids]
             
             if not new_data:
                 self.logger.info(f"No new data to append for {sample_set_name} - all data already exists in file")
                 return True  # Not an error, just nothing new to add
             
             self.logger.info(f"Found {len(new_data)} new data points to append (out of {len(all_data)} total)")
+            start_row = index.next_row
             
-            # Create backup
-            backup_path = f"{file_path}.backup_{int(time.time())}"
-            shutil.copy2(file_path, backup_path)
-            self.logger.info(f"Created backup: {backup_path}")
-            
-            # Open file and find where to append new data
-            doc = ezodf.opendoc(file_path)
-            sheet = doc.sheets[0]
-            
-            # Find the next empty row to start appending
-            start_append_row = self._find_next_empty_row(sheet, start_row_idx=7)
-            
-            self.logger.info(f"Appending {len(new_data)} rows starting at row {start_append_row + 1}")
-            
-            # Append new data without disturbing existing data
-            for row_offset, data_row in enumerate(new_data):
-                sheet_row_idx = start_append_row + row_offset
-                
-                # Only set the first 4 columns (A-D), preserving any existing data in columns E-M
-                sheet[sheet_row_idx, 0].set_value(data_row['L_norm'])
-                sheet[sheet_row_idx, 1].set_value(data_row['a_norm'])
-                sheet[sheet_row_idx, 2].set_value(data_row['b_norm'])
-                sheet[sheet_row_idx, 3].set_value(data_row['DataID'])
-                
-                # Do NOT touch columns 4-12 (E-M) - these may contain user data
-                # Plot_3D fills these during analysis (Cluster, ∆E, etc.)
-            
-            # Save
-            temp_path = f"{file_path}.temp"
-            doc.saveas(temp_path)
-            os.replace(temp_path, file_path)
-            
-            # Clean up backup on success
-            try:
-                os.remove(backup_path)
-            except Exception:
-                pass  # Keep backup if cleanup fails
+            # Only columns A-D are written, preserving any existing data in columns E-M;
+            # the file is replaced atomically so a failure leaves it untouched
+            count = append_rows(file_path, self._plot3d_rows(new_data), index)
             
-            self.logger.info(f"Successfully appended {len(new_data)} rows to {file_path} starting at row {start_append_row + 1}")
+            self.logger.info(f"Successfully appended {count} rows to {file_path} starting at row {start_row + 1}")
             return True
             
         except Exception as e:
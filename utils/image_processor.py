@@ -7,14 +7,12 @@ from pathlib import Path
 from typing import Tuple, Optional, Union
 from PIL import Image, ImageTk
 import logging
-import numpy as np
+import importlib.util
 
-# Import 16-bit TIFF loader
-try:
-    from .true_16bit_loader import load_16bit_tiff
-    HAS_16BIT_LOADER = True
-except ImportError:
-    HAS_16BIT_LOADER = False
+from .instrumentation import traced
+
+# The 16-bit TIFF loader (numpy + tifffile) is imported on first TIFF load
+HAS_16BIT_LOADER = importlib.util.find_spec('tifffile') is not None
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -27,6 +25,7 @@ class ImageSaveError(Exception):
     """Exception raised when image saving fails."""
     pass
 
+@traced('image.load')
 def load_image(file_path: Union[str, Path]) -> Tuple[Image.Image, dict]:
     """
     Load an image file and return a PIL Image object with proper color profile handling.
@@ -54,6 +53,8 @@ def load_image(file_path: Union[str, Path]) -> Tuple[Image.Image, dict]:
         # Handle TIFF files with 16-bit loader if available
         if file_path.suffix.lower() in ['.tif', '.tiff'] and HAS_16BIT_LOADER:
             try:
+                import numpy as np
+                from .true_16bit_loader import load_16bit_tiff
                 img_array, tiff_metadata = load_16bit_tiff(str(file_path), preserve_16bit=True)
                 
                 # Update our metadata
@@ -69,7 +70,9 @@ def load_image(file_path: Union[str, Path]) -> Tuple[Image.Image, dict]:
                 if tiff_metadata.get('true_16bit', False):
                     # For 16-bit data, we need to scale down to 8-bit for display
                     # but preserve the original precision info
-                    img_array_8bit = (img_array / 65535.0 * 255.0).astype(np.uint8)
+                    # (integer division by 257 gives the same values as scaling by
+                    # 255/65535 without a float64 copy of the image)
+                    img_array_8bit = (img_array // 257).astype(np.uint8)
                     image = Image.fromarray(img_array_8bit)
                     logger.info(f"Loaded 16-bit TIFF with full precision: {file_path}")
                 else:
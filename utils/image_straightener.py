@@ -4,7 +4,6 @@ Handles image rotation and skew correction for philatelic analysis.
 """
 
 import math
-import numpy as np
 from PIL import Image, ImageDraw
 from typing import Tuple, Optional, List
 import logging
@@ -12,6 +11,12 @@ import logging
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Rows analysed at a time when cropping away rotation padding
+CROP_STRIP_ROWS = 256
+
+# Rows each strip borrows from its neighbours for the Sobel filter
+_CROP_STRIP_OVERLAP = 1
+
 class ImageStraightener:
     """Handles image straightening and skew correction."""
     
@@ -154,6 +159,12 @@ class ImageStraightener:
         Automatically crop background padding from a rotated image.
         Uses multiple detection methods for better padding removal.
         
+        The color analysis runs in strips of CROP_STRIP_ROWS rows, so its
+        floating-point working arrays stay small however large the scan is;
+        only the boolean content mask (one byte per pixel) covers the whole
+        image. Strips overlap by a row so the edge filter gives the same
+        result as on the whole image.
+        
         Args:
             image: PIL Image with background padding
             background_color: Background color to detect and crop
@@ -162,76 +173,74 @@ class ImageStraightener:
             Cropped PIL Image with padding removed
         """
         try:
-            # Convert image to numpy array for analysis
-            img_array = np.array(image)
+            import numpy as np  # Deferred: only needed once an image is straightened
+            from scipy import ndimage
             
-            # Handle different image modes
-            if image.mode == 'RGBA':
-                # For RGBA, check alpha channel first, then color
-                alpha_channel = img_array[:, :, 3]
-                mask = alpha_channel > 0  # Non-transparent pixels
-                
-                # Also check color if alpha is opaque
-                if background_color.lower() == 'white':
-                    bg_color = np.array([255, 255, 255])
-                elif background_color.lower() == 'black':
-                    bg_color = np.array([0, 0, 0])
-                else:
-                    bg_color = np.array([255, 255, 255])
-                
-                # Check RGB channels for background color (with more aggressive tolerance)
-                rgb_diff = np.abs(img_array[:, :, :3].astype(int) - bg_color)
-                color_mask = np.any(rgb_diff > 10, axis=2)  # More aggressive: 10 instead of 3
-                
-                # Combine alpha and color masks
-                mask = mask & color_mask
-                
-            elif image.mode == 'RGB':
-                # For RGB, use multiple detection strategies
-                if background_color.lower() == 'white':
-                    bg_color = np.array([255, 255, 255])
-                elif background_color.lower() == 'black':
-                    bg_color = np.array([0, 0, 0])
-                else:
-                    bg_color = np.array([255, 255, 255])
-                
-                # Method 1: Direct color comparison with aggressive tolerance
-                diff = np.abs(img_array.astype(int) - bg_color)
-                mask1 = np.any(diff > 15, axis=2)  # Very aggressive: 15 pixel tolerance
-                
-                # Method 2: Statistical approach - detect outliers
-                # Calculate mean and std for each channel
-                mean_vals = np.mean(img_array, axis=(0, 1))
-                std_vals = np.std(img_array, axis=(0, 1))
-                
-                # Pixels that deviate significantly from background
-                bg_threshold = 2.0  # 2 standard deviations
-                mask2 = np.any(np.abs(img_array - mean_vals) > bg_threshold * std_vals, axis=2)
-                
-                # Method 3: Edge detection approach
+            if image.mode not in ('RGB', 'RGBA'):
+                # For other modes, convert to RGB first
+                rgb_image = image.convert('RGB')
+                return ImageStraightener._crop_background_padding(rgb_image, background_color)
+            
+            bg_color = _background_rgb(background_color)
+            width, height = image.size
+            
+            def gradient_magnitude(strip):
                 # Look for significant brightness changes
-                gray = np.mean(img_array, axis=2)
-                
-                # Detect edges using gradient
-                from scipy import ndimage
+                gray = np.mean(strip[:, :, :3], axis=2)
                 gradient_x = ndimage.sobel(gray, axis=1)
                 gradient_y = ndimage.sobel(gray, axis=0)
-                gradient_magnitude = np.sqrt(gradient_x**2 + gradient_y**2)
-                
-                # Areas with significant edges are likely content
-                edge_threshold = np.std(gradient_magnitude) * 0.5
-                mask3 = gradient_magnitude > edge_threshold
-                
-                # Combine all methods (union of detections)
-                mask = mask1 | mask2 | mask3
-                
+                return np.sqrt(gradient_x**2 + gradient_y**2)
+            
+            if image.mode == 'RGBA':
+                # For RGBA, check alpha channel first, then color
+                def content_mask(strip):
+                    mask = strip[:, :, 3] > 0  # Non-transparent pixels
+                    # Check RGB channels for background color (with more aggressive tolerance)
+                    rgb_diff = np.abs(strip[:, :, :3] - bg_color)
+                    return mask & np.any(rgb_diff > 10, axis=2)  # More aggressive: 10 instead of 3
             else:
-                # For other modes, convert to RGB first
-                rgb_image = image.convert('RGB')
-                return ImageStraightener._crop_background_padding(rgb_image, background_color)
+                # For RGB, use multiple detection strategies. The statistical
+                # and edge methods need whole-image figures, gathered first.
+                pixel_count = width * height
+                sums = np.zeros(3)
+                squares = np.zeros(3)
+                gradient_sum = gradient_squares = 0.0
+                for top, bottom, read_top, read_bottom in _strips(height, 1):
+                    strip = np.asarray(image.crop((0, read_top, width, read_bottom)), dtype=np.float64)
+                    core = slice(top - read_top, bottom - read_top)
+                    sums += strip[core].sum(axis=(0, 1))
+                    squares += np.square(strip[core]).sum(axis=(0, 1))
+                    gradient = gradient_magnitude(strip)[core]
+                    gradient_sum += gradient.sum()
+                    gradient_squares += np.square(gradient).sum()
+                mean_vals = sums / pixel_count
+                std_vals = np.sqrt(np.maximum(squares / pixel_count - mean_vals**2, 0))
+                gradient_mean = gradient_sum / pixel_count
+                gradient_std = math.sqrt(max(gradient_squares / pixel_count - gradient_mean**2, 0))
+                
+                def content_mask(strip):
+                    # Method 1: Direct color comparison with aggressive tolerance
+                    diff = np.abs(strip - bg_color)
+                    mask1 = np.any(diff > 15, axis=2)  # Very aggressive: 15 pixel tolerance
+                    
+                    # Method 2: Statistical approach - pixels that deviate
+                    # significantly (2 standard deviations) from the image
+                    bg_threshold = 2.0
+                    mask2 = np.any(np.abs(strip - mean_vals) > bg_threshold * std_vals, axis=2)
+                    
+                    # Method 3: Areas with significant edges are likely content
+                    edge_threshold = gradient_std * 0.5
+                    mask3 = gradient_magnitude(strip) > edge_threshold
+                    
+                    # Combine all methods (union of detections)
+                    return mask1 | mask2 | mask3
+            
+            mask = np.empty((height, width), dtype=bool)
+            for top, bottom, read_top, read_bottom in _strips(height, _CROP_STRIP_OVERLAP):
+                strip = np.asarray(image.crop((0, read_top, width, read_bottom)), dtype=np.float64)
+                mask[top:bottom] = content_mask(strip)[top - read_top:bottom - read_top]
             
             # Apply morphological operations to clean up the mask
-            from scipy import ndimage
             
             # Fill small holes
             mask = ndimage.binary_fill_holes(mask)
@@ -240,9 +249,6 @@ class ImageStraightener:
             struct_elem = np.ones((3, 3))
             mask = ndimage.binary_opening(mask, structure=struct_elem)
             
-            # Dilate slightly to ensure we don't cut into content
-            mask = ndimage.binary_dilation(mask, structure=struct_elem, iterations=2)
-            
             # Find bounding box of content
             rows = np.any(mask, axis=1)
             cols = np.any(mask, axis=0)
@@ -256,8 +262,9 @@ class ImageStraightener:
             top, bottom = np.where(rows)[0][[0, -1]]
             left, right = np.where(cols)[0][[0, -1]]
             
-            # Add small margin to avoid cutting content (but keep aggressive)
-            margin = 2
+            # Grow the box as two 3x3 dilations of the mask would, so we don't
+            # cut into content, plus a small margin (but keep aggressive)
+            margin = 2 + 2
             top = max(0, top - margin)
             left = max(0, left - margin)
             bottom = min(image.height - 1, bottom + margin)
@@ -289,24 +296,20 @@ class ImageStraightener:
             Cropped PIL Image with padding removed
         """
         try:
-            # Convert to numpy for simple analysis
-            img_array = np.array(image.convert('RGB'))
-            
-            # Define background color
-            if background_color.lower() == 'white':
-                bg_color = np.array([255, 255, 255])
-            elif background_color.lower() == 'black':
-                bg_color = np.array([0, 0, 0])
-            else:
-                bg_color = np.array([255, 255, 255])
+            import numpy as np
             
-            # Simple threshold-based detection
-            diff = np.abs(img_array.astype(int) - bg_color)
-            mask = np.any(diff > 20, axis=2)  # Simple 20-pixel threshold
+            rgb_image = image.convert('RGB')
+            bg_color = _background_rgb(background_color).astype(np.int16)
+            width, height = image.size
             
-            # Find bounding box
-            rows = np.any(mask, axis=1)
-            cols = np.any(mask, axis=0)
+            # Simple threshold-based detection, a strip at a time
+            rows = np.zeros(height, dtype=bool)
+            cols = np.zeros(width, dtype=bool)
+            for top, bottom, _, _ in _strips(height, 0):
+                strip = np.asarray(rgb_image.crop((0, top, width, bottom)), dtype=np.int16)
+                mask = np.any(np.abs(strip - bg_color) > 20, axis=2)  # Simple 20-pixel threshold
+                rows[top:bottom] = np.any(mask, axis=1)
+                cols |= np.any(mask, axis=0)
             
             if not np.any(rows) or not np.any(cols):
                 return image
@@ -328,6 +331,25 @@ class ImageStraightener:
             return image
 
 
+def _background_rgb(background_color: str):
+    """RGB value of a named padding color; anything but black is treated as white."""
+    import numpy as np
+    if background_color.lower() == 'black':
+        return np.array([0, 0, 0])
+    return np.array([255, 255, 255])
+
+
+def _strips(height: int, overlap: int):
+    """Yield (top, bottom, read_top, read_bottom) rows for each auto-crop strip.
+
+    Rows top..bottom are the strip's own; read_top..read_bottom add up to
+    overlap rows from each neighbour as context for the filters.
+    """
+    for top in range(0, height, CROP_STRIP_ROWS):
+        bottom = min(height, top + CROP_STRIP_ROWS)
+        yield top, bottom, max(0, top - overlap), min(height, bottom + overlap)
+
+
 class StraighteningTool:
     """Interactive tool for image straightening."""
     
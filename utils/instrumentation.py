@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Hot-path instrumentation for StampZ.
+
+Named spans time a block of work (image load, sampling, conversion,
+matching, database I/O, export) and counters record how much was done
+(pixels sampled, rows exported...). When tracing is off, span() returns a
+shared no-op context manager and count() returns after a single flag test,
+so instrumented code costs next to nothing. When it is on, events are
+collected in memory and written at exit in the Chrome trace event format,
+which chrome://tracing, Perfetto and speedscope open directly.
+
+Tracing is enabled by the STAMPZ_TRACE environment variable - "1" writes
+to the traces folder of the data directory, any other value is used as
+the trace file path - or by the Diagnostics preference.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+TRACE_ENV_VAR = 'STAMPZ_TRACE'
+
+# Events beyond this are dropped so a long session can't exhaust memory
+MAX_EVENTS = 1_000_000
+
+_enabled = False
+_trace_path: Optional[str] = None
+_events = []
+_counters: Dict[str, float] = {}
+_dropped = 0
+_lock = threading.Lock()
+_atexit_registered = False
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000
+
+
+def _record(event: dict) -> None:
+    global _dropped
+    with _lock:
+        if len(_events) < MAX_EVENTS:
+            _events.append(event)
+        else:
+            _dropped += 1
+
+
+class _Span:
+    """Records one complete ("X") event when the block exits."""
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name: str, args: Optional[dict]):
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        event = {'name': self.name, 'cat': self.name.split('.', 1)[0], 'ph': 'X',
+                 'ts': self.start, 'dur': end - self.start,
+                 'pid': os.getpid(), 'tid': threading.get_ident()}
+        if self.args or exc_type is not None:
+            event['args'] = dict(self.args or {})
+            if exc_type is not None:
+                event['args']['error'] = exc_type.__name__
+        _record(event)
+        return False
+
+
+def span(name: str, **args):
+    """Context manager timing a block as a named span.
+
+    Args:
+        name: Dotted span name; the part before the first dot is its category
+        **args: Values shown with the span in the trace viewer
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add value to a named counter."""
+    if not _enabled:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+    _record({'name': name, 'ph': 'C', 'ts': _now_us(), 'pid': os.getpid(),
+             'args': {name: total}})
+
+
+def traced(name: Optional[str] = None):
+    """Decorator timing every call of a function as a span.
+
+    Args:
+        name: Span name (default: the function's qualified name)
+    """
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def counters() -> Dict[str, float]:
+    """Current counter totals."""
+    with _lock:
+        return dict(_counters)
+
+
+def default_trace_path() -> str:
+    """A new timestamped trace file in the data directory's traces folder."""
+    from .path_utils import get_base_data_dir
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(get_base_data_dir(), 'traces', f'trace_{timestamp}_{os.getpid()}.json')
+
+
+def enable(path: Optional[str] = None) -> str:
+    """Start collecting events; they are written to path at exit.
+
+    Args:
+        path: Trace file (default: a timestamped file from default_trace_path)
+
+    Returns:
+        The trace file path
+    """
+    global _enabled, _trace_path, _atexit_registered
+    _trace_path = path or _trace_path or default_trace_path()
+    if not _atexit_registered:
+        atexit.register(_write_at_exit)
+        _atexit_registered = True
+    _enabled = True
+    return _trace_path
+
+
+def disable() -> None:
+    """Stop collecting events; those already collected are kept."""
+    global _enabled
+    _enabled = False
+
+
+def reset() -> None:
+    """Discard collected events and counters."""
+    global _dropped
+    with _lock:
+        _events.clear()
+        _counters.clear()
+        _dropped = 0
+
+
+def write_trace(path: Optional[str] = None) -> Optional[str]:
+    """Write the collected events as a Chrome trace JSON file.
+
+    Args:
+        path: Output file (default: the path given to enable)
+
+    Returns:
+        The path written, or None if there was nothing to write
+    """
+    path = path or _trace_path
+    with _lock:
+        events = list(_events)
+        dropped = _dropped
+    if not path or not events:
+        return None
+
+    # Name the threads so the viewer shows "MainThread", worker names etc.
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    pid = os.getpid()
+    metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': names[tid]}}
+                for tid in {e['tid'] for e in events if 'tid' in e} if tid in names]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'traceEvents': metadata + events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'counters': counters(), 'dropped_events': dropped},
+        }, f)
+    return path
+
+
+def _write_at_exit() -> None:
+    try:
+        path = write_trace()
+        if path:
+            print(f"Trace written to: {path}")
+    except Exception as e:
+        print(f"Error writing trace: {e}")
+
+
+def configure(preference_enabled: bool = False) -> bool:
+    """Enable tracing from the environment variable or the preference.
+
+    Runs on import for the environment variable, and again when the app
+    starts with the preference. STAMPZ_TRACE=0 turns tracing off even when
+    the preference is on.
+
+    Returns:
+        True if tracing is enabled
+    """
+    setting = os.environ.get(TRACE_ENV_VAR, '').strip()
+    if setting.lower() in ('0', 'false', 'no', 'off'):
+        return False
+    if setting:
+        enable(None if setting.lower() in ('1', 'true', 'yes', 'on') else setting)
+    elif preference_enabled:
+        enable()
+    return _enabled
+
+
+# Any process started with STAMPZ_TRACE set - the app, CLI tools, worker
+# processes - is traced from the first instrumented import
+configure()
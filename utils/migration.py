@@ -195,21 +195,34 @@ class StampZMigration:
                         migrated_files.append(f"Analysis: {analysis_file.stem}")
                         logger.info(f"Migrated analysis: {analysis_file.name}")
             
-            # Migrate coordinate databases (only if new one doesn't exist)
+            # Migrate coordinate databases: copy if the new one doesn't exist,
+            # otherwise merge in templates it doesn't already have
             new_coord_file = self.new_base_dir / 'coordinates.db'
-            if not new_coord_file.exists():
-                # Try both possible locations for old coordinates
-                old_coord_files = [
-                    self.old_base_dir / 'coordinates.db',
-                    self.old_base_dir / 'data' / 'coordinates.db'
-                ]
-                
-                for old_coord_file in old_coord_files:
-                    if old_coord_file.exists():
+            # Try both possible locations for old coordinates
+            old_coord_files = [
+                self.old_base_dir / 'coordinates.db',
+                self.old_base_dir / 'data' / 'coordinates.db'
+            ]
+            
+            for old_coord_file in old_coord_files:
+                if old_coord_file.exists():
+                    if not new_coord_file.exists():
                         shutil.copy2(old_coord_file, new_coord_file)
                         migrated_files.append("Coordinate templates")
-                        logger.info(f"Migrated coordinates: {old_coord_file}")
-                        break  # Only migrate the first one found
+                    else:
+                        from utils.coordinate_db import CoordinateDB
+                        imported, skipped, conflicts = CoordinateDB.import_coordinate_sets(
+                            str(old_coord_file), str(new_coord_file))
+                        if imported:
+                            migrated_files.append(f"Coordinate templates ({imported} merged)")
+                        if conflicts:
+                            # Never overwrite a template the user already has
+                            migrated_files.append(
+                                f"Coordinate templates not merged (name already in use): {', '.join(conflicts)}")
+                            logger.warning(f"Kept existing coordinate templates: {conflicts}")
+                        logger.info(f"Skipped {skipped} unchanged coordinate templates")
+                    logger.info(f"Migrated coordinates: {old_coord_file}")
+                    break  # Only migrate the first one found
             
             # Migrate recent files
             old_recent_dir = self.old_base_dir / 'recent'
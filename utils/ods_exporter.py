@@ -9,8 +9,14 @@ import os
 import subprocess
 import csv
 from datetime import datetime
-from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Optional, Set
+from dataclasses import asdict, dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import count, traced
+from utils.ods_stream_writer import write_ods
 
 try:
     from odf.opendocument import OpenDocumentSpreadsheet
@@ -45,6 +51,25 @@ class ColorMeasurement:
     source_samples_count: Optional[int] = None
     source_sample_ids: Optional[str] = None
 
+def _format_fixed(values, decimals: int) -> np.ndarray:
+    """Format a numeric column as strings with a fixed number of decimals."""
+    return np.char.mod(f"%.{decimals}f", np.asarray(values, dtype=float))
+
+
+def _measurements_to_frame(measurements: Iterable[ColorMeasurement]) -> pd.DataFrame:
+    """Convert ColorMeasurement objects into the frame used by the exporters."""
+    columns = [f.name for f in fields(ColorMeasurement)]
+    return pd.DataFrame([asdict(m) for m in measurements], columns=columns)
+
+
+# Plot_3D expected columns - includes Radius column which is required
+PLOT3D_HEADERS = ['Xnorm', 'Ynorm', 'Znorm', 'DataID', 'Cluster', '∆E', 'Marker',
+                  'Color', 'Centroid_X', 'Centroid_Y', 'Centroid_Z', 'Sphere', 'Radius']
+# Xnorm, Ynorm, Znorm are written as numbers
+PLOT3D_NUMERIC_COLUMNS = {0, 1, 2}
+# Rows 2-7 stay empty; Plot_3D data starts at row 8
+PLOT3D_RESERVED_ROWS = 6
+
 class ODSExporter:
     """Export StampZ color analysis data to ODS format."""
     
@@ -81,261 +106,156 @@ class ODSExporter:
         if not ODF_AVAILABLE:
             raise ImportError("odfpy library not available. Install with: pip install odfpy==1.4.1")
     
-    def get_color_measurements(self, deduplicate: bool = True) -> List[ColorMeasurement]:
-        """Retrieve all color measurements from separate sample set databases.
+    def _get_export_sample_sets(self) -> List[str]:
+        """Names of the sample set databases to export, filtered by sample_set_name."""
+        from utils.color_analysis_db import ColorAnalysisDB
+        
+        # Get all sample set databases - use the persistent directory
+        color_data_dir = self.color_data_dir
+        print(f"DEBUG ODSExporter: Using color_data_dir = {color_data_dir}")
+        
+        if not os.path.exists(color_data_dir):
+            print(f"DEBUG ODSExporter: Directory does not exist, returning empty list")
+            return []
+        
+        sample_sets = ColorAnalysisDB.get_all_sample_set_databases(color_data_dir)
+        print(f"DEBUG ODSExporter: Found sample sets: {sample_sets}")
+        
+        if self.sample_set_name:
+            # Try both exact match and the standardized name used by ColorAnalysisDB
+            from utils.naming_utils import standardize_name
+            standardized_target = standardize_name(self.sample_set_name)
+            sample_sets = [s for s in sample_sets if s in (self.sample_set_name, standardized_target)]
+            print(f"DEBUG ODSExporter: After filtering for '{self.sample_set_name}': {sample_sets}")
+        
+        return sample_sets
+    
+    @staticmethod
+    def _data_id_parts(image_names: pd.Series, dates: pd.Series, keep_directory: bool = False):
+        """Vectorized image basename and compact timestamp used to build DataIDs.
+        
+        measurement_date is usually "2025-07-21 17:36:02" and becomes "20250721_173602";
+        dates in any other format fall back to stripping separators.
+        """
+        # Basenames are computed once per distinct image, not per row
+        strip = (lambda n: os.path.splitext(n)[0]) if keep_directory else \
+                (lambda n: os.path.splitext(os.path.basename(n))[0])
+        unique_names = pd.unique(image_names)
+        basenames = image_names.map(dict(zip(unique_names, map(strip, unique_names))))
+        
+        dates = dates.astype(str)
+        parsed = pd.to_datetime(dates, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        fallback = dates.str.replace(' ', '_').str.replace(':', '').str.replace('-', '')
+        timestamps = parsed.dt.strftime('%Y%m%d_%H%M%S').where(parsed.notna(), fallback)
+        return basenames, timestamps
+    
+    @staticmethod
+    def _display_sample_size(sizes: pd.Series) -> pd.Series:
+        """Sample sizes like "20x20" show only the first dimension; missing sizes default to 20."""
+        sizes = sizes.where(sizes.notna() & (sizes.astype(str) != ''), '20').astype(str)
+        return sizes.str.split('x').str[0]
+    
+    def get_measurement_frame(self, deduplicate: bool = True) -> pd.DataFrame:
+        """Retrieve color measurements from the sample set databases as one DataFrame.
+        
+        Columns are the ColorMeasurement fields plus image_name. Rows come from the
+        columnar database queries and every derived column is computed per column,
+        so no per-row Python objects are created.
         
         Args:
-            deduplicate: If True, removes duplicates by keeping only the most recent measurement
+            deduplicate: If True, keeps only the most recent measurement for each image/point
                         If False, returns all measurements for accumulation in spreadsheet
         """
-        measurements = []
+        from utils.color_analysis_db import ColorAnalysisDB
+        
+        columns = [f.name for f in fields(ColorMeasurement)] + ['image_name']
+        frames = []
         
         try:
-            print(f"DEBUG ODSExporter: Starting get_color_measurements, deduplicate={deduplicate}")
-            print(f"DEBUG ODSExporter: self.sample_set_name = {repr(self.sample_set_name)}")
-            
-            from utils.color_analysis_db import ColorAnalysisDB
-            
-            # Get all sample set databases - use the persistent directory
-            color_data_dir = self.color_data_dir
-            print(f"DEBUG ODSExporter: Using color_data_dir = {color_data_dir}")
-            print(f"DEBUG ODSExporter: Directory exists = {os.path.exists(color_data_dir)}")
-            
-            if not os.path.exists(color_data_dir):
-                print(f"DEBUG ODSExporter: Directory does not exist, returning empty list")
-                return measurements
-            
-            # Get sample set databases - filter by specific sample set if provided
-            sample_sets = ColorAnalysisDB.get_all_sample_set_databases(color_data_dir)
-            print(f"DEBUG ODSExporter: Found sample sets: {sample_sets}")
-            
-            if self.sample_set_name:
-                print(f"DEBUG ODSExporter: Filtering for sample_set_name = {repr(self.sample_set_name)} (type: {type(self.sample_set_name)})")
-                print(f"DEBUG ODSExporter: Available sample sets for comparison: {[repr(s) for s in sample_sets]}")
+            sample_sets = self._get_export_sample_sets()
+        except Exception as e:
+            print(f"Error retrieving color measurements: {e}")
+            sample_sets = []
+        
+        sample_set_counter = 1
+        for sample_set_name in sample_sets:
+            try:
+                color_db = ColorAnalysisDB(sample_set_name)
                 
-                # Standardize the target name using the same function as ColorAnalysisDB
-                from utils.naming_utils import standardize_name
-                standardized_target = standardize_name(self.sample_set_name)
-                print(f"DEBUG ODSExporter: Standardized target name: '{self.sample_set_name}' -> '{standardized_target}'")
+                if sample_set_name.endswith('_averages'):
+                    # For averages databases, treat averaged measurements (Point 999) as individual ones
+                    db_frame = color_db.get_measurements_dataframe(averaged=True)
+                else:
+                    # Individual measurements only, without Point 999 placeholders
+                    db_frame = color_db.get_measurements_dataframe(
+                        latest_only=deduplicate, averaged=False, exclude_point=999)
+                count('export.measurements_read', len(db_frame))
                 
-                # Debug the filtering process
-                filtered = []
-                for s in sample_sets:
-                    # Try both exact match and standardized match
-                    exact_match = (s == self.sample_set_name)
-                    standardized_match = (s == standardized_target)
-                    matches = exact_match or standardized_match
-                    print(f"DEBUG ODSExporter: '{s}' == '{self.sample_set_name}' ? {exact_match}")
-                    print(f"DEBUG ODSExporter: '{s}' == '{standardized_target}' ? {standardized_match}")
-                    print(f"DEBUG ODSExporter: Overall match for '{s}': {matches}")
-                    if matches:
-                        filtered.append(s)
+                basenames, timestamps = self._data_id_parts(db_frame['image_name'], db_frame['measurement_date'])
+                frame = pd.DataFrame({
+                    'data_id': basenames + '_' + timestamps + '_sample' + db_frame['coordinate_point'].astype(str),
+                    'sample_set_number': sample_set_counter,
+                    'coordinate_point': db_frame['coordinate_point'],
+                    'l_value': db_frame['l_value'],
+                    'a_value': db_frame['a_value'],
+                    'b_value': db_frame['b_value'],
+                    'rgb_r': db_frame['rgb_r'],
+                    'rgb_g': db_frame['rgb_g'],
+                    'rgb_b': db_frame['rgb_b'],
+                    'x_position': db_frame['x_position'],
+                    'y_position': db_frame['y_position'],
+                    'sample_shape': db_frame['sample_type'],
+                    'sample_size': self._display_sample_size(db_frame['sample_size']),
+                    'sample_anchor': db_frame['sample_anchor'],
+                    'measurement_date': db_frame['measurement_date'],
+                    'notes': db_frame['notes'],
+                    'is_averaged': db_frame['is_averaged'],
+                    'source_samples_count': db_frame['source_samples_count'],
+                    'source_sample_ids': db_frame['source_sample_ids'],
+                    'image_name': db_frame['image_name'],
+                }, columns=columns)
                 
-                sample_sets = filtered
-                print(f"DEBUG ODSExporter: After filtering: {sample_sets}")
-            else:
-                print(f"DEBUG ODSExporter: No filtering (sample_set_name is {repr(self.sample_set_name)})")
-            
-            print(f"DEBUG ODSExporter: Processing {len(sample_sets)} sample sets")
-            
-            sample_set_counter = 1
-            for sample_set_name in sample_sets:
-                try:
-                    # Create color analysis DB for this sample set
-                    color_db = ColorAnalysisDB(sample_set_name)
-                    
-                    # Get all measurements for this sample set
-                    all_measurements = color_db.get_all_measurements()
-                    
-                    # Separate individual measurements from averaged measurements
-                    individual_measurements = [m for m in all_measurements if not m.get('is_averaged', False)]
-                    averaged_measurements = [m for m in all_measurements if m.get('is_averaged', False)]
-                    
-                    # For Plot_3D export, handle both individual and averaged measurements
-                    # If this is an averages database (_averages suffix), include Point 999 measurements
-                    if sample_set_name.endswith('_averages'):
-                        # Keep Point 999 measurements for averages databases
-                        print(f"DEBUG ODSExporter: Averages database detected, keeping Point 999 entries")
-                        print(f"DEBUG ODSExporter: Have {len(individual_measurements)} individual + {len(averaged_measurements)} averaged measurements")
-                    else:
-                        # Filter out Point 999 measurements for regular databases
-                        individual_measurements = [m for m in individual_measurements if m.get('coordinate_point', 0) != 999]
-                        print(f"DEBUG ODSExporter: Filtered out Point 999 entries, now have {len(individual_measurements)} individual measurements")
-                    
-                    print(f"DEBUG ODSExporter: Found {len(individual_measurements)} individual + {len(averaged_measurements)} averaged measurements")
-                    
-                    # Calculate averaged values for this sample set (if any exist)
-                    averaged_values = {}
-                    if averaged_measurements:
-                        # Use the most recent averaged measurement for each image
-                        latest_averages = {}
-                        for avg_m in averaged_measurements:
-                            image_name = avg_m['image_name']
-                            if image_name not in latest_averages or avg_m['measurement_date'] > latest_averages[image_name]['measurement_date']:
-                                latest_averages[image_name] = avg_m
-                        
-                        # Store averaged values by image name
-                        for image_name, avg_m in latest_averages.items():
-                            averaged_values[image_name] = {
-                                'l_avg': avg_m['l_value'],
-                                'a_avg': avg_m['a_value'], 
-                                'b_avg': avg_m['b_value'],
-                                'r_avg': avg_m['rgb_r'],
-                                'g_avg': avg_m['rgb_g'],
-                                'b_avg': avg_m['rgb_b']
-                            }
-                    
-                    # Process measurements - for _averages databases, use averaged measurements as if they were individual measurements
-                    if sample_set_name.endswith('_averages'):
-                        # For averages databases, treat averaged measurements as individual measurements
-                        print(f"DEBUG ODSExporter: Processing {len(averaged_measurements)} averaged measurements as individual measurements")
-                        measurements_to_process = averaged_measurements
-                    else:
-                        # Process individual measurements for regular databases
-                        if deduplicate:
-                            # Remove duplicates by keeping only the most recent measurement for each coordinate point
-                            # Sort by measurement_date to ensure we get the latest one
-                            sorted_measurements = sorted(individual_measurements, key=lambda x: x['measurement_date'])
-                            
-                            unique_measurements = {}
-                            for measurement in sorted_measurements:
-                                coord_point = measurement['coordinate_point']
-                                # Always keep the latest measurement (due to sorting, later ones overwrite earlier)
-                                unique_measurements[coord_point] = measurement
-                            
-                            measurements_to_process = unique_measurements.values()
-                        else:
-                            # Return all individual measurements for accumulation (no averaged rows)
-                            measurements_to_process = individual_measurements
-                    
-                    # Get coordinate template information for this sample set
+                # Rows without stored sample info fall back to the coordinate template
+                missing = frame['sample_shape'].isna() | frame['sample_shape'].isin(['unknown', ''])
+                if missing.any():
                     coordinate_info = self._get_coordinate_info(sample_set_name)
-                    
-                    # Track which images have already shown their averaged values
-                    images_with_averages_shown = set()
-                    
-                    # Sort measurements by image name and coordinate point to ensure consistent ordering
-                    measurements_to_process = sorted(measurements_to_process, 
-                                                    key=lambda x: (x['image_name'], x['coordinate_point']))
-                    
-                    # Convert to our ColorMeasurement objects and add averaged values
-                    for measurement in measurements_to_process:
-                        # Create data_id from image filename + timestamp + sample number
-                        image_basename = os.path.splitext(os.path.basename(measurement['image_name']))[0]
-                        
-                        # Extract timestamp from measurement_date and format it
-                        # measurement_date format is usually "2025-07-21 17:36:02"
-                        try:
-                            from datetime import datetime
-                            # Parse the measurement date
-                            date_obj = datetime.strptime(measurement['measurement_date'], '%Y-%m-%d %H:%M:%S')
-                            # Format as compact timestamp: YYYYMMDD_HHMMSS
-                            timestamp = date_obj.strftime('%Y%m%d_%H%M%S')
-                        except:
-                            # Fallback if date parsing fails
-                            timestamp = measurement['measurement_date'].replace(' ', '_').replace(':', '').replace('-', '')
-                        
-                        data_id = f"{image_basename}_{timestamp}_sample{measurement['coordinate_point']}"
-                        
-                        # Get coordinate details - FIRST try from the measurement itself (has actual values)
-                        coord_point = measurement['coordinate_point']
-                        
-                        # Try to get sample info from the measurement data itself
-                        sample_size_raw = measurement.get('sample_size', '20')
-                        # Handle both "20x20" format and single "20" format
-                        if sample_size_raw and 'x' in str(sample_size_raw):
-                            # Format like "20x20" - use just the first dimension for display
-                            size_parts = str(sample_size_raw).split('x')
-                            formatted_size = size_parts[0] if size_parts else '20'
-                        else:
-                            # Single dimension or fallback
-                            formatted_size = str(sample_size_raw) if sample_size_raw else '20'
-                        
-                        coord_details = {
-                            'shape': measurement.get('sample_type', 'circle'),  # Default to circle if None
-                            'size': formatted_size,      # Properly formatted size
-                            'anchor': measurement.get('sample_anchor', 'center') # Default anchor if None
-                        }
-                        
-                        # If we still don't have sample info, fall back to coordinate template
-                        if coord_details['shape'] in ['unknown', None, ''] or not coord_details['shape']:
-                            template_details = coordinate_info.get(coord_point, {})
-                            if template_details:
-                                coord_details = {
-                                    'shape': template_details.get('shape', 'circle'),
-                                    'size': template_details.get('size', '20'),
-                                    'anchor': template_details.get('anchor', 'center')
-                                }
-                        
-                        # Get the averaged values for this image (if they exist)
-                        image_name = measurement['image_name']
-                        avg_values = averaged_values.get(image_name, {})
-                        
-                        # Only show averaged values on the first sample (coordinate_point 1) for each image
-                        show_averages = (image_name not in images_with_averages_shown and 
-                                       measurement['coordinate_point'] == 1 and 
-                                       avg_values)
-                        
-                        if show_averages:
-                            images_with_averages_shown.add(image_name)
-                        
-                        # Create ColorMeasurement with averaged values stored as additional attributes
-                        color_measurement = ColorMeasurement(
-                            data_id=data_id,
-                            sample_set_number=sample_set_counter,
-                            coordinate_point=measurement['coordinate_point'],
-                            l_value=measurement['l_value'],
-                            a_value=measurement['a_value'],
-                            b_value=measurement['b_value'],
-                            rgb_r=measurement['rgb_r'],
-                            rgb_g=measurement['rgb_g'],
-                            rgb_b=measurement['rgb_b'],
-                            x_position=measurement['x_position'],
-                            y_position=measurement['y_position'],
-                            sample_shape=coord_details['shape'],
-                            sample_size=coord_details['size'],
-                            sample_anchor=coord_details['anchor'],
-                            measurement_date=measurement['measurement_date'],
-                            notes=measurement['notes'],
-                            is_averaged=measurement.get('is_averaged', False),
-                            source_samples_count=measurement.get('source_samples_count'),
-                            source_sample_ids=measurement.get('source_sample_ids')
-                        )
-                        
-                        # Add averaged values as attributes for export formatting (only on first sample for each image)
-                        if show_averages:
-                            color_measurement.l_avg = avg_values.get('l_avg', '')
-                            color_measurement.a_avg = avg_values.get('a_avg', '')
-                            color_measurement.b_avg = avg_values.get('b_avg', '')
-                            color_measurement.r_avg = avg_values.get('r_avg', '')
-                            color_measurement.g_avg = avg_values.get('g_avg', '')
-                            color_measurement.rgb_b_avg = avg_values.get('b_avg', '')  # This is the blue channel average
-                            # Create DataID for averaged data (filename_timestamp without sample suffix)
-                            color_measurement.avg_data_id = f"{image_basename}_{timestamp}"
-                        else:
-                            # Leave averaged values empty for subsequent samples of the same image
-                            color_measurement.l_avg = ''
-                            color_measurement.a_avg = ''
-                            color_measurement.b_avg = ''
-                            color_measurement.r_avg = ''
-                            color_measurement.g_avg = ''
-                            color_measurement.rgb_b_avg = ''
-                            color_measurement.avg_data_id = ''
-                        
-                        measurements.append(color_measurement)
-                    
-                    sample_set_counter += 1
-                    
-                except Exception as e:
-                    print(f"Error reading color data for sample set '{sample_set_name}': {e}")
-                    continue
-                    
-        except ImportError as e:
-            print(f"Import error: {e}")
-        except Exception as e:
-            print(f"Error retrieving color measurements: {e}")
-            
-        return measurements
+                    if coordinate_info:
+                        template = pd.DataFrame.from_dict(coordinate_info, orient='index')
+                        points = frame.loc[missing, 'coordinate_point']
+                        found = points.isin(template.index)
+                        rows = points[found]
+                        for field, key, default in (('sample_shape', 'shape', 'circle'),
+                                                    ('sample_size', 'size', '20'),
+                                                    ('sample_anchor', 'anchor', 'center')):
+                            values = template[key].reindex(rows.values).fillna(default) \
+                                if key in template else pd.Series(default, index=rows.values)
+                            frame.loc[rows.index, field] = values.values
+                
+                frames.append(frame)
+                sample_set_counter += 1
+                
+            except Exception as e:
+                print(f"Error reading color data for sample set '{sample_set_name}': {e}")
+                continue
+        
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+    
+    def get_color_measurements(self, deduplicate: bool = True) -> List[ColorMeasurement]:
+        """Retrieve all color measurements from separate sample set databases.
+        
+        Exports work on get_measurement_frame directly; this wraps the same rows
+        in ColorMeasurement objects for callers that want them.
+        
+        Args:
+            deduplicate: If True, removes duplicates by keeping only the most recent measurement
+                        If False, returns all measurements for accumulation in spreadsheet
+        """
+        frame = self.get_measurement_frame(deduplicate)
+        field_names = [f.name for f in fields(ColorMeasurement)]
+        frame = frame[field_names].astype(object).where(frame[field_names].notna(), None)
+        return [ColorMeasurement(**record) for record in frame.to_dict('records')]
     
     def _get_coordinate_info(self, sample_set_name: str) -> dict:
         """Get coordinate template information for a sample set.
@@ -360,16 +280,16 @@ class ODSExporter:
                 # For manual mode, try to get temporary coordinates
                 from utils.color_analysis_db import ColorAnalysisDB
                 color_db = ColorAnalysisDB(sample_set_name)
-                color_measurements = color_db.get_all_measurements()
+                measurement_count = color_db.count_measurements()
                 
-                if color_measurements:
-                    for i, measurement in enumerate(color_measurements, 1):
+                if measurement_count:
+                    for i in range(1, measurement_count + 1):
                         coordinate_info[i] = {
                             'shape': 'circle',  # Default to circle for manual mode
                             'size': '20',      # Default size
                             'anchor': 'center' # Default anchor
                         }
-                    print(f"Retrieved manual mode coordinate info for {len(color_measurements)} points")
+                    print(f"Retrieved manual mode coordinate info for {measurement_count} points")
                     return coordinate_info
             
             # For non-manual mode, try exact match first
@@ -448,11 +368,7 @@ class ODSExporter:
         headers = []
         
         # Get color space preferences
-        include_rgb = True
-        include_lab = True
-        if self.prefs_manager:
-            include_rgb = self.prefs_manager.get_export_include_rgb()
-            include_lab = self.prefs_manager.get_export_include_lab()
+        include_lab, include_rgb = self._get_export_color_spaces()
         
         # Individual measurement columns
         if include_lab:
@@ -475,272 +391,277 @@ class ODSExporter:
         
         return headers
     
-    def _format_measurement_values(self, measurement: ColorMeasurement, use_normalized: bool) -> List[str]:
-        """Format measurement values based on normalization and color space preferences.
+    def _format_lab_columns(self, frame: pd.DataFrame, use_normalized: bool) -> List[np.ndarray]:
+        """Format the L*, a*, b* columns, normalized to 0.0-1.0 if requested."""
+        if use_normalized:
+            # Same scaling as _normalize_lab_l and _normalize_lab_ab
+            return [
+                _format_fixed(frame['l_value'] / 100.0, 4),
+                _format_fixed((frame['a_value'] + 128.0) / 255.0, 4),
+                _format_fixed((frame['b_value'] + 128.0) / 255.0, 4),
+            ]
+        return [_format_fixed(frame[column], 2) for column in ('l_value', 'a_value', 'b_value')]
+    
+    def _format_rgb_columns(self, frame: pd.DataFrame, use_normalized: bool) -> List[np.ndarray]:
+        """Format the R, G, B columns, normalized to 0.0-1.0 if requested."""
+        if use_normalized:
+            return [_format_fixed(frame[column] / 255.0, 4) for column in ('rgb_r', 'rgb_g', 'rgb_b')]
+        return [_format_fixed(frame[column], 2) for column in ('rgb_r', 'rgb_g', 'rgb_b')]
+    
+    def _format_measurement_frame(self, frame: pd.DataFrame, use_normalized: bool,
+                                  include_lab: bool, include_rgb: bool) -> pd.DataFrame:
+        """Format measurements column by column for export.
         
         Clean format with only individual measurement columns.
         Averaged data is now exported to separate spreadsheets.
-        """
         
-        # Get color space preferences
-        include_rgb = True
-        include_lab = True
-        if self.prefs_manager:
-            include_rgb = self.prefs_manager.get_export_include_rgb()
-            include_lab = self.prefs_manager.get_export_include_lab()
+        Returns:
+            DataFrame of display strings whose columns are _get_export_headers
+        """
+        def text(column):
+            return frame[column].fillna('').astype(str).to_numpy()
         
-        # Build row data dynamically based on preferences
-        row_data = []
+        columns = []
         
         # Individual measurement L*a*b* values
         if include_lab:
-            if use_normalized:
-                row_data.extend([
-                    self._normalize_lab_l(measurement.l_value),
-                    self._normalize_lab_ab(measurement.a_value),
-                    self._normalize_lab_ab(measurement.b_value)
-                ])
-            else:
-                row_data.extend([
-                    f"{measurement.l_value:.2f}",
-                    f"{measurement.a_value:.2f}",
-                    f"{measurement.b_value:.2f}"
-                ])
-        
-        # Common columns
-        row_data.extend([
-            measurement.data_id,  # DataID
-            f"{measurement.x_position:.1f}",  # X
-            f"{measurement.y_position:.1f}",  # Y
-            measurement.sample_shape,         # Shape
-            measurement.sample_size,          # Size
-            measurement.sample_anchor         # Anchor
+            columns.extend(self._format_lab_columns(frame, use_normalized))
+        
+        # Common columns: DataID, X, Y, Shape, Size, Anchor
+        columns.extend([
+            text('data_id'),
+            _format_fixed(frame['x_position'], 1),
+            _format_fixed(frame['y_position'], 1),
+            text('sample_shape'),
+            text('sample_size'),
+            text('sample_anchor'),
         ])
         
         # Individual measurement RGB values
         if include_rgb:
-            if use_normalized:
-                row_data.extend([
-                    self._normalize_rgb(measurement.rgb_r),
-                    self._normalize_rgb(measurement.rgb_g),
-                    self._normalize_rgb(measurement.rgb_b)
-                ])
-            else:
-                row_data.extend([
-                    f"{measurement.rgb_r:.2f}",
-                    f"{measurement.rgb_g:.2f}",
-                    f"{measurement.rgb_b:.2f}"
-                ])
+            columns.extend(self._format_rgb_columns(frame, use_normalized))
         
-        # Final columns
-        row_data.extend([
-            measurement.measurement_date,     # Date
-            measurement.notes or '',          # Notes
-            ''                               # Analysis (empty for user notes)
-        ])
+        # Final columns: Date, Notes, Analysis (empty for user notes)
+        columns.extend([text('measurement_date'), text('notes'), np.full(len(frame), '', dtype=object)])
         
-        return row_data
+        headers = self._get_export_headers(use_normalized)
+        return pd.DataFrame(dict(zip(headers, columns)), columns=headers)
     
-    def create_ods_document(self, measurements: List[ColorMeasurement]) -> OpenDocumentSpreadsheet:
-        """Create an ODS document with the color measurements."""
+    def _get_export_color_spaces(self) -> Tuple[bool, bool]:
+        """Return (include_lab, include_rgb) from the export preferences."""
+        if self.prefs_manager:
+            return (self.prefs_manager.get_export_include_lab(),
+                    self.prefs_manager.get_export_include_rgb())
+        return True, True
+    
+    def _get_use_normalized(self) -> bool:
+        """Return True if normalized (0.0-1.0) export is enabled."""
+        if self.prefs_manager:
+            return self.prefs_manager.get_export_normalized_values()
+        return False
+    
+    @staticmethod
+    def _get_numeric_export_columns(include_lab: bool, include_rgb: bool) -> Set[int]:
+        """Column indices holding numbers in the individual measurement layout.
+        
+        L*, a*, b*, X, Y, R, G, B - positions depend on the Lab/RGB preferences.
+        """
+        numeric_columns = set()
+        col_index = 0
+        
+        # L*a*b* columns (0,1,2)
+        if include_lab:
+            numeric_columns.update((col_index, col_index + 1, col_index + 2))
+            col_index += 3
+        
+        # Skip DataID column
+        col_index += 1
+        
+        # X, Y columns
+        numeric_columns.update((col_index, col_index + 1))
+        col_index += 2
+        
+        # Skip Shape, Size, Anchor columns
+        col_index += 3
+        
+        # RGB columns
+        if include_rgb:
+            numeric_columns.update((col_index, col_index + 1, col_index + 2))
+        
+        return numeric_columns
+    
+    def _measurement_table(self, frame: pd.DataFrame):
+        """Resolve headers, numeric columns and formatted rows for the main export."""
+        use_normalized = self._get_use_normalized()
+        if use_normalized:
+            print("DEBUG: Using normalized export format (0.0-1.0 range)")
+        else:
+            print("DEBUG: Using standard export format")
+        include_lab, include_rgb = self._get_export_color_spaces()
+        
+        table = self._format_measurement_frame(frame, use_normalized, include_lab, include_rgb)
+        numeric_columns = self._get_numeric_export_columns(include_lab, include_rgb)
+        return list(table.columns), numeric_columns, table
+    
+    @staticmethod
+    def _build_odf_document(table_name: str, headers: List[str], rows: Iterable[List[str]],
+                            numeric_columns: Set[int], blank_rows: int = 0) -> OpenDocumentSpreadsheet:
+        """Build an in-memory odfpy document for one table."""
         if not ODF_AVAILABLE:
             raise RuntimeError("odfpy library not available. Cannot create ODS document.")
         
-        # Check if normalized export is enabled
-        use_normalized = False
-        if self.prefs_manager:
-            use_normalized = self.prefs_manager.get_export_normalized_values()
-            if use_normalized:
-                print("DEBUG: Using normalized export format (0.0-1.0 range)")
-            else:
-                print("DEBUG: Using standard export format")
+        def make_cell(value, numeric):
+            cell = TableCell()
+            text = str(value)
+            numeric_value = None
+            if numeric and text:
+                try:
+                    numeric_value = float(text)
+                except (ValueError, TypeError):
+                    pass
+            if numeric_value is not None:
+                # Store as a number; the paragraph keeps the display text
+                cell.setAttribute('valuetype', 'float')
+                cell.setAttribute('value', str(numeric_value))
+            elif text:
+                cell.setAttribute('valuetype', 'string')
+            cell.addElement(P(text=text))  # Display text
+            return cell
         
-        # Create new document
         doc = OpenDocumentSpreadsheet()
+        table = Table(name=table_name)
         
-        # Create table
-        table = Table(name="Color Analysis Data")
-        
-        # Add header row
         header_row = TableRow()
-        headers = self._get_export_headers(use_normalized)
-        
         for header in headers:
-            cell = TableCell()
-            cell.addElement(P(text=header))
-            header_row.addElement(cell)
-        
+            header_row.addElement(make_cell(header, False))
         table.addElement(header_row)
         
-        # Add data rows
-        for measurement in measurements:
+        for _ in range(blank_rows):
+            blank_row = TableRow()
+            for _ in headers:
+                blank_row.addElement(make_cell('', False))
+            table.addElement(blank_row)
+        
+        for data in rows:
             row = TableRow()
-            
-            # Create cells for each column using normalized or standard formatting
-            data = self._format_measurement_values(measurement, use_normalized)
-            
-            # Define which columns contain numeric data based on new clean structure
-            # L*, a*, b*, X, Y, R, G, B (positions depend on Lab/RGB preferences)
-            numeric_columns = []
-            col_index = 0
-            
-            # Get preferences for dynamic column mapping
-            include_rgb = True
-            include_lab = True
-            if self.prefs_manager:
-                include_rgb = self.prefs_manager.get_export_include_rgb()
-                include_lab = self.prefs_manager.get_export_include_lab()
-            
-            # L*a*b* columns (0,1,2)
-            if include_lab:
-                numeric_columns.extend([col_index, col_index+1, col_index+2])
-                col_index += 3
-            
-            # Skip DataID column
-            col_index += 1
-            
-            # X, Y columns
-            numeric_columns.extend([col_index, col_index+1])
-            col_index += 2
-            
-            # Skip Shape, Size, Anchor columns
-            col_index += 3
-            
-            # RGB columns
-            if include_rgb:
-                numeric_columns.extend([col_index, col_index+1, col_index+2])
-            
             for i, value in enumerate(data):
-                cell = TableCell()
-                
-                # Set proper value type for numeric columns
-                if i in numeric_columns and value and value != "":
-                    try:
-                        # Convert to float and set as numeric value
-                        numeric_value = float(value)
-                        cell.setAttribute('valuetype', 'float')
-                        cell.setAttribute('value', str(numeric_value))
-                        cell.addElement(P(text=value))  # Display text
-                    except (ValueError, TypeError):
-                        # If conversion fails, treat as text
-                        cell.addElement(P(text=str(value)))
-                else:
-                    # Text columns or empty values
-                    cell.addElement(P(text=str(value)))
-                
-                row.addElement(cell)
-            
+                row.addElement(make_cell(value, i in numeric_columns))
             table.addElement(row)
         
-        # Add table to document
         doc.spreadsheet.addElement(table)
-        
         return doc
     
-    def export_to_ods(self, output_path: str) -> bool:
+    def create_ods_document(self, measurements: List[ColorMeasurement]) -> OpenDocumentSpreadsheet:
+        """Create an in-memory ODS document with the color measurements.
+        
+        Exports write through the streaming writer instead; this is kept for
+        callers that need an odfpy document to modify before saving.
+        """
+        headers, numeric_columns, table = self._measurement_table(_measurements_to_frame(measurements))
+        return self._build_odf_document("Color Analysis Data", headers,
+                                        table.itertuples(index=False, name=None), numeric_columns)
+    
+    def _get_export_frame(self) -> pd.DataFrame:
+        """All measurements (no deduplication, for accumulation) in chronological order."""
+        frame = self.get_measurement_frame(deduplicate=False)
+        return frame.sort_values('measurement_date', kind='stable', ignore_index=True)
+    
+    @traced('export.ods')
+    def export_to_ods(self, output_path: str,
+                      extra_columns: Optional[Callable[[pd.DataFrame], Dict[str, Tuple[Sequence, bool]]]] = None) -> bool:
         """Export color analysis data to an ODS file.
         For accumulation mode, includes ALL measurements from database (no deduplication).
+        Rows are streamed into the file one at a time.
+        
+        Args:
+            output_path: Path of the .ods file to write
+            extra_columns: Optional callback given the measurement frame, returning
+                header -> (display values per row, is_numeric) to append
         """
         try:
-            # Get ALL measurements from database (no deduplication for accumulation)
-            measurements = self.get_color_measurements(deduplicate=False)
+            count = self.write_measurements_ods(output_path, extra_columns)
             
-            if not measurements:
+            if count == 0:
                 print("No color measurements found in database")
                 return False
             
-            # Sort measurements by date for chronological order in spreadsheet
-            measurements.sort(key=lambda x: x.measurement_date)
-            
-            # Create ODS document
-            doc = self.create_ods_document(measurements)
-            
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Save document
-            doc.save(output_path)
-            
-            print(f"Successfully exported {len(measurements)} measurements to: {output_path}")
+            print(f"Successfully exported {count} measurements to: {output_path}")
             return True
             
         except Exception as e:
             print(f"Error exporting to ODS: {e}")
             return False
     
+    def write_measurements_ods(self, output_path: str,
+                               extra_columns: Optional[Callable[[pd.DataFrame], Dict[str, Tuple[Sequence, bool]]]] = None) -> int:
+        """Write the export_to_ods spreadsheet, letting errors propagate.
+        
+        Args:
+            output_path: Path of the .ods file to write
+            extra_columns: As for export_to_ods
+            
+        Returns:
+            Number of measurements written; 0 if there were none, in which
+            case no file is written
+        """
+        frame = self._get_export_frame()
+        if frame.empty:
+            return 0
+        
+        headers, numeric_columns, table = self._measurement_table(frame)
+        if extra_columns is not None:
+            for header, (values, numeric) in extra_columns(frame).items():
+                if numeric:
+                    numeric_columns.add(len(table.columns))
+                table[header] = values
+            headers = list(table.columns)
+        return write_ods(output_path, "Color Analysis Data", headers,
+                         table.itertuples(index=False, name=None), numeric_columns)
+    
+    @staticmethod
+    def _write_xlsx(table: pd.DataFrame, output_path: str, sheet_name: str):
+        """Write a formatted table to Excel with auto-sized columns."""
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            table.to_excel(writer, sheet_name=sheet_name, index=False)
+            
+            # Auto-adjust column widths
+            worksheet = writer.sheets[sheet_name]
+            for column in worksheet.columns:
+                max_length = max((len(str(cell.value)) for cell in column if cell.value is not None), default=0)
+                column_letter = column[0].column_letter
+                worksheet.column_dimensions[column_letter].width = min(max_length + 2, 50)  # Cap at 50 characters
+    
+    @staticmethod
+    def _write_csv(table: pd.DataFrame, output_path: str):
+        """Write a formatted table to CSV."""
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(table.columns)
+            writer.writerows(table.itertuples(index=False, name=None))
+    
     def export_to_xlsx(self, output_path: str) -> bool:
         """Export color analysis data to an Excel (.xlsx) file using pandas.
         For accumulation mode, includes ALL measurements from database (no deduplication).
         """
         try:
-            # Check if pandas is available
-            try:
-                import pandas as pd
-            except ImportError:
-                print("Error: pandas library not available. Install with: pip install pandas")
-                return False
+            frame = self._get_export_frame()
             
-            # Get ALL measurements from database (no deduplication for accumulation)
-            measurements = self.get_color_measurements(deduplicate=False)
-            
-            if not measurements:
+            if frame.empty:
                 print("No color measurements found in database")
                 return False
             
-            # Sort measurements by date for chronological order in spreadsheet
-            measurements.sort(key=lambda x: x.measurement_date)
-            
-            # Check if normalized export is enabled
-            use_normalized = False
-            if self.prefs_manager:
-                use_normalized = self.prefs_manager.get_export_normalized_values()
-                if use_normalized:
-                    print("DEBUG: Using normalized export format (0.0-1.0 range) for XLSX")
-                else:
-                    print("DEBUG: Using standard export format for XLSX")
-            
-            # Convert measurements to DataFrame using clean header structure
-            data = []
-            for measurement in measurements:
-                # Create row using same format as cleaned headers
-                formatted_data = self._format_measurement_values(measurement, use_normalized)
-                headers = self._get_export_headers(use_normalized)
-                
-                row_dict = {}
-                for header, value in zip(headers, formatted_data):
-                    row_dict[header] = value
-                
-                data.append(row_dict)
-            
-            df = pd.DataFrame(data)
+            _, _, table = self._measurement_table(frame)
             
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            self._write_xlsx(table, output_path, 'Color Analysis Data')
             
-            # Save to Excel with proper formatting
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Color Analysis Data', index=False)
-                
-                # Get the workbook and worksheet to apply formatting
-                workbook = writer.book
-                worksheet = writer.sheets['Color Analysis Data']
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            print(f"Successfully exported {len(measurements)} measurements to: {output_path}")
+            print(f"Successfully exported {len(table)} measurements to: {output_path}")
             return True
             
+        except ImportError:
+            print("Error: openpyxl library not available. Install with: pip install openpyxl")
+            return False
         except Exception as e:
             print(f"Error exporting to XLSX: {e}")
             return False
@@ -750,61 +671,70 @@ class ODSExporter:
         For accumulation mode, includes ALL measurements from database (no deduplication).
         """
         try:
-            # Get ALL measurements from database (no deduplication for accumulation)
-            measurements = self.get_color_measurements(deduplicate=False)
+            frame = self._get_export_frame()
             
-            if not measurements:
+            if frame.empty:
                 print("No color measurements found in database")
                 return False
             
-            # Sort measurements by date for chronological order in spreadsheet
-            measurements.sort(key=lambda x: x.measurement_date)
+            _, _, table = self._measurement_table(frame)
             
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            self._write_csv(table, output_path)
             
-            # Check if normalized export is enabled
-            use_normalized = False
-            if self.prefs_manager:
-                use_normalized = self.prefs_manager.get_export_normalized_values()
-                if use_normalized:
-                    print("DEBUG: Using normalized export format (0.0-1.0 range) for CSV")
-                else:
-                    print("DEBUG: Using standard export format for CSV")
+            print(f"Successfully exported {len(table)} measurements to: {output_path}")
+            return True
             
-            # Define headers based on normalization preference
-            headers = self._get_export_headers(use_normalized)
+        except Exception as e:
+            print(f"Error exporting to CSV: {e}")
+            return False
+    
+    def export_to_columnar(self, output_path: str) -> bool:
+        """Export color analysis data to a Parquet (.parquet) or Arrow IPC (.arrow/.feather) file.
+        For accumulation mode, includes ALL measurements from database (no deduplication).
+        Values keep their numeric types rather than the formatted text of the spreadsheet exports.
+        """
+        try:
+            from utils.arrow_io import write_measurements
             
-            # Write CSV file
-            with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write header row
-                writer.writerow(headers)
-                
-                # Write data rows
-                for measurement in measurements:
-                    row = self._format_measurement_values(measurement, use_normalized)
-                    writer.writerow(row)
+            frame = self._get_export_frame()
+            
+            if frame.empty:
+                print("No color measurements found in database")
+                return False
+            
+            count = write_measurements(frame, output_path)
             
-            print(f"Successfully exported {len(measurements)} measurements to: {output_path}")
+            print(f"Successfully exported {count} measurements to: {output_path}")
             return True
             
+        except ImportError as e:
+            print(f"Error: {e}")
+            return False
         except Exception as e:
-            print(f"Error exporting to CSV: {e}")
+            print(f"Error exporting to {os.path.splitext(output_path)[1]}: {e}")
             return False
     
+    def export_to_parquet(self, output_path: str) -> bool:
+        """Export color analysis data to a Parquet file."""
+        return self.export_to_columnar(output_path)
+    
+    def export_to_arrow(self, output_path: str) -> bool:
+        """Export color analysis data to an Arrow IPC file that can be memory-mapped on load."""
+        return self.export_to_columnar(output_path)
+    
     def export_to_sample_set_file(self, base_filename: str = None, format_type: str = "ods") -> str:
         """Export to a single file per sample set using user preferences.
         
         Args:
             base_filename: Optional base filename. If None, uses sample set name or default
-            format_type: Export format ('ods', 'xlsx', or 'csv')
+            format_type: Export format ('ods', 'xlsx', 'csv', 'parquet' or 'arrow')
         """
         try:
             # Validate format type
-            if format_type not in ['ods', 'xlsx', 'csv']:
-                print(f"Error: Unsupported format type '{format_type}'. Use 'ods', 'xlsx', or 'csv'.")
+            if format_type not in ['ods', 'xlsx', 'csv', 'parquet', 'arrow']:
+                print(f"Error: Unsupported format type '{format_type}'. Use 'ods', 'xlsx', 'csv', 'parquet' or 'arrow'.")
                 return None
             
             # Determine file extension
@@ -850,6 +780,8 @@ class ODSExporter:
                 success = self.export_to_xlsx(output_path)
             elif format_type == "csv":
                 success = self.export_to_csv(output_path)
+            elif format_type in ("parquet", "arrow"):
+                success = self.export_to_columnar(output_path)
             
             if success:
                 self.last_saved_file = output_path  # Store for potential opening
@@ -980,73 +912,43 @@ class ODSExporter:
             averaged_db_name = f"{sample_set_name}_averages"
             print(f"DEBUG: Reading averaged measurements from database: {averaged_db_name}")
             color_db = ColorAnalysisDB(averaged_db_name)
-            all_measurements = color_db.get_all_measurements()
+            db_frame = color_db.get_measurements_dataframe(averaged=True)
             
-            # Filter for averaged measurements only
-            averaged_measurements = [m for m in all_measurements if m.get('is_averaged', False)]
-            
-            if not averaged_measurements:
+            if db_frame.empty:
                 print(f"No averaged measurements found for sample set '{sample_set_name}'")
                 return None
             
-            print(f"Found {len(averaged_measurements)} averaged measurements")
-            
-            # Convert to ColorMeasurement objects
-            color_measurements = []
-            for i, measurement in enumerate(averaged_measurements):
-                # Extract proper image name (preserve full name like "138-S1-crp_1")
-                image_name = measurement['image_name']
-                # Keep the full image name, just remove file extension if present
-                if '.' in image_name:
-                    image_basename = os.path.splitext(image_name)[0]
-                else:
-                    image_basename = image_name
-                
-                # Extract timestamp from measurement_date
-                try:
-                    from datetime import datetime
-                    date_obj = datetime.strptime(measurement['measurement_date'], '%Y-%m-%d %H:%M:%S')
-                    timestamp = date_obj.strftime('%Y%m%d_%H%M%S')
-                except:
-                    timestamp = measurement['measurement_date'].replace(' ', '_').replace(':', '').replace('-', '')
-                
-                # Create single DataID with proper formatting: ImageName_Timestamp_Averaged
-                data_id = f"{image_basename}_{timestamp}_Averaged"
-                
-                # Get coordinate details
-                sample_size_raw = measurement.get('sample_size', '20')
-                if sample_size_raw and 'x' in str(sample_size_raw):
-                    size_parts = str(sample_size_raw).split('x')
-                    formatted_size = size_parts[0] if size_parts else '20'
-                else:
-                    formatted_size = str(sample_size_raw) if sample_size_raw else '20'
-                
-                color_measurement = ColorMeasurement(
-                    data_id=data_id,
-                    sample_set_number=1,  # Always 1 for averaged data
-                    coordinate_point=999,  # Special coordinate point for averages
-                    l_value=measurement['l_value'],
-                    a_value=measurement['a_value'],
-                    b_value=measurement['b_value'],
-                    rgb_r=measurement['rgb_r'],
-                    rgb_g=measurement['rgb_g'],
-                    rgb_b=measurement['rgb_b'],
-                    x_position=measurement.get('x_position', 0.0),
-                    y_position=measurement.get('y_position', 0.0),
-                    sample_shape=measurement.get('sample_type', 'averaged'),
-                    sample_size=formatted_size,
-                    sample_anchor=measurement.get('sample_anchor', 'center'),
-                    measurement_date=measurement['measurement_date'],
-                    notes=measurement.get('notes', 'Averaged measurement'),
-                    is_averaged=True,
-                    source_samples_count=measurement.get('source_samples_count'),
-                    source_sample_ids=measurement.get('source_sample_ids')
-                )
-                
-                color_measurements.append(color_measurement)
+            print(f"Found {len(db_frame)} averaged measurements")
+            
+            # Single DataID per image with proper formatting: ImageName_Timestamp_Averaged
+            # (keeps the full image name like "138-S1-crp_1", minus any file extension)
+            image_basenames, timestamps = self._data_id_parts(
+                db_frame['image_name'], db_frame['measurement_date'], keep_directory=True)
+            color_measurements = pd.DataFrame({
+                'data_id': image_basenames + '_' + timestamps + '_Averaged',
+                'sample_set_number': 1,  # Always 1 for averaged data
+                'coordinate_point': 999,  # Special coordinate point for averages
+                'l_value': db_frame['l_value'],
+                'a_value': db_frame['a_value'],
+                'b_value': db_frame['b_value'],
+                'rgb_r': db_frame['rgb_r'],
+                'rgb_g': db_frame['rgb_g'],
+                'rgb_b': db_frame['rgb_b'],
+                'x_position': db_frame['x_position'],
+                'y_position': db_frame['y_position'],
+                'sample_shape': db_frame['sample_type'],
+                'sample_size': self._display_sample_size(db_frame['sample_size']),
+                'sample_anchor': db_frame['sample_anchor'],
+                'measurement_date': db_frame['measurement_date'],
+                'notes': db_frame['notes'],
+                'is_averaged': True,
+                'source_samples_count': db_frame['source_samples_count'],
+                'source_sample_ids': db_frame['source_sample_ids'],
+            })
             
             # Sort by date
-            color_measurements.sort(key=lambda x: x.measurement_date)
+            color_measurements = color_measurements.sort_values('measurement_date', kind='stable',
+                                                                ignore_index=True)
             
             # Determine output filename with _averages suffix
             base_filename = f"{sample_set_name}_averages"
@@ -1072,21 +974,20 @@ class ODSExporter:
                     current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
                     output_path = os.path.join(current_dir, "exports", f"{base_filename}{extension}")
             
-            # Create the document
-            doc = self._create_averaged_document(color_measurements)
-            
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
             # Export using the appropriate method
             success = False
+            headers, numeric_columns, table = self._averaged_table(color_measurements)
             if format_type == "ods":
-                doc.save(output_path)
+                write_ods(output_path, "Averaged Color Analysis", headers,
+                          table.itertuples(index=False, name=None), numeric_columns)
                 success = True
             elif format_type == "xlsx":
-                success = self._export_averaged_to_xlsx(color_measurements, output_path)
+                success = self._export_averaged_to_xlsx(table, output_path)
             elif format_type == "csv":
-                success = self._export_averaged_to_csv(color_measurements, output_path)
+                success = self._export_averaged_to_csv(table, output_path)
             
             if success:
                 print(f"Successfully exported {len(color_measurements)} averaged measurements to: {output_path}")
@@ -1101,72 +1002,28 @@ class ODSExporter:
             traceback.print_exc()
             return None
     
+    def _averaged_table(self, frame: pd.DataFrame):
+        """Resolve headers, numeric columns and formatted rows for averaged measurements."""
+        use_normalized = self._get_use_normalized()
+        include_lab, include_rgb = self._get_export_color_spaces()
+        
+        table = self._format_averaged_frame(frame, use_normalized, include_lab, include_rgb)
+        # L*, a*, b*, R, G, B lead the row, whichever of them are included
+        numeric_columns = set(range(3 * (int(include_lab) + int(include_rgb))))
+        return list(table.columns), numeric_columns, table
+    
     def _create_averaged_document(self, measurements: List[ColorMeasurement]) -> OpenDocumentSpreadsheet:
-        """Create an ODS document specifically for averaged measurements."""
-        if not ODF_AVAILABLE:
-            raise RuntimeError("odfpy library not available. Cannot create ODS document.")
-        
-        # Check normalization preference
-        use_normalized = False
-        if self.prefs_manager:
-            use_normalized = self.prefs_manager.get_export_normalized_values()
-        
-        # Create new document
-        doc = OpenDocumentSpreadsheet()
-        
-        # Create table
-        table = Table(name="Averaged Color Analysis")
-        
-        # Define headers for averaged measurements
-        headers = self._get_averaged_export_headers(use_normalized)
-        
-        # Add header row
-        header_row = TableRow()
-        for header in headers:
-            cell = TableCell()
-            cell.addElement(P(text=header))
-            header_row.addElement(cell)
-        table.addElement(header_row)
-        
-        # Add data rows
-        for measurement in measurements:
-            row = TableRow()
-            data = self._format_averaged_measurement_values(measurement, use_normalized)
-            
-            for i, value in enumerate(data):
-                cell = TableCell()
-                
-                # Set proper value type for numeric columns
-                if i < 6 and value and value != "":  # L*, a*, b*, R, G, B are first 6 columns
-                    try:
-                        numeric_value = float(value)
-                        cell.setAttribute('valuetype', 'float')
-                        cell.setAttribute('value', str(numeric_value))
-                        cell.addElement(P(text=value))
-                    except (ValueError, TypeError):
-                        cell.addElement(P(text=str(value)))
-                else:
-                    cell.addElement(P(text=str(value)))
-                
-                row.addElement(cell)
-            
-            table.addElement(row)
-        
-        # Add table to document
-        doc.spreadsheet.addElement(table)
-        
-        return doc
+        """Create an in-memory ODS document specifically for averaged measurements."""
+        headers, numeric_columns, table = self._averaged_table(_measurements_to_frame(measurements))
+        return self._build_odf_document("Averaged Color Analysis", headers,
+                                        table.itertuples(index=False, name=None), numeric_columns)
     
     def _get_averaged_export_headers(self, use_normalized: bool) -> List[str]:
         """Get column headers for averaged measurements export."""
         headers = []
         
         # Get color space preferences
-        include_rgb = True
-        include_lab = True
-        if self.prefs_manager:
-            include_rgb = self.prefs_manager.get_export_include_rgb()
-            include_lab = self.prefs_manager.get_export_include_lab()
+        include_lab, include_rgb = self._get_export_color_spaces()
         
         # L*a*b* values
         if include_lab:
@@ -1193,127 +1050,54 @@ class ODSExporter:
         
         return headers
     
-    def _format_averaged_measurement_values(self, measurement: ColorMeasurement, use_normalized: bool) -> List[str]:
-        """Format averaged measurement values for export."""
-        row_data = []
+    def _format_averaged_frame(self, frame: pd.DataFrame, use_normalized: bool,
+                               include_lab: bool, include_rgb: bool) -> pd.DataFrame:
+        """Format averaged measurements column by column for export.
         
-        # Get color space preferences
-        include_rgb = True
-        include_lab = True
-        if self.prefs_manager:
-            include_rgb = self.prefs_manager.get_export_include_rgb()
-            include_lab = self.prefs_manager.get_export_include_lab()
+        Returns:
+            DataFrame of display strings whose columns are _get_averaged_export_headers
+        """
+        columns = []
         
         # L*a*b* values
         if include_lab:
-            if use_normalized:
-                row_data.extend([
-                    self._normalize_lab_l(measurement.l_value),
-                    self._normalize_lab_ab(measurement.a_value),
-                    self._normalize_lab_ab(measurement.b_value)
-                ])
-            else:
-                row_data.extend([
-                    f"{measurement.l_value:.2f}",
-                    f"{measurement.a_value:.2f}",
-                    f"{measurement.b_value:.2f}"
-                ])
+            columns.extend(self._format_lab_columns(frame, use_normalized))
         
         # RGB values
         if include_rgb:
-            if use_normalized:
-                row_data.extend([
-                    self._normalize_rgb(measurement.rgb_r),
-                    self._normalize_rgb(measurement.rgb_g),
-                    self._normalize_rgb(measurement.rgb_b)
-                ])
-            else:
-                row_data.extend([
-                    f"{measurement.rgb_r:.2f}",
-                    f"{measurement.rgb_g:.2f}",
-                    f"{measurement.rgb_b:.2f}"
-                ])
+            columns.extend(self._format_rgb_columns(frame, use_normalized))
         
         # Other columns
-        sample_count_text = f"{measurement.source_samples_count} samples" if measurement.source_samples_count else "Multiple samples"
-        
-        row_data.extend([
-            measurement.data_id,
-            sample_count_text,
-            measurement.measurement_date,
-            measurement.notes or 'Averaged color measurement',
-            ''  # Analysis column for user notes
+        counts = frame['source_samples_count']
+        has_count = counts.notna() & (counts.fillna(0) != 0)
+        sample_count_text = (counts.astype(object).astype(str) + ' samples').where(has_count, 'Multiple samples')
+        notes = frame['notes'].where(frame['notes'].notna() & (frame['notes'] != ''),
+                                     'Averaged color measurement')
+        
+        columns.extend([
+            frame['data_id'].astype(str).to_numpy(),
+            sample_count_text.to_numpy(),
+            frame['measurement_date'].astype(str).to_numpy(),
+            notes.astype(str).to_numpy(),
+            np.full(len(frame), '', dtype=object),  # Analysis column for user notes
         ])
         
-        return row_data
+        headers = self._get_averaged_export_headers(use_normalized)
+        return pd.DataFrame(dict(zip(headers, columns)), columns=headers)
     
-    def _export_averaged_to_xlsx(self, measurements: List[ColorMeasurement], output_path: str) -> bool:
-        """Export averaged measurements to Excel format."""
-        try:
-            import pandas as pd
-        except ImportError:
-            print("Error: pandas library not available for XLSX export")
-            return False
-        
+    def _export_averaged_to_xlsx(self, table: pd.DataFrame, output_path: str) -> bool:
+        """Export formatted averaged measurements to XLSX format."""
         try:
-            use_normalized = False
-            if self.prefs_manager:
-                use_normalized = self.prefs_manager.get_export_normalized_values()
-            
-            # Convert measurements to DataFrame
-            data = []
-            for measurement in measurements:
-                row_dict = {}
-                formatted_data = self._format_averaged_measurement_values(measurement, use_normalized)
-                headers = self._get_averaged_export_headers(use_normalized)
-                
-                for header, value in zip(headers, formatted_data):
-                    row_dict[header] = value
-                
-                data.append(row_dict)
-            
-            df = pd.DataFrame(data)
-            
-            # Save to Excel
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Averaged Color Analysis', index=False)
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets['Averaged Color Analysis']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-            
+            self._write_xlsx(table, output_path, 'Averaged Color Analysis')
             return True
         except Exception as e:
             print(f"Error exporting averaged measurements to XLSX: {e}")
             return False
     
-    def _export_averaged_to_csv(self, measurements: List[ColorMeasurement], output_path: str) -> bool:
-        """Export averaged measurements to CSV format."""
+    def _export_averaged_to_csv(self, table: pd.DataFrame, output_path: str) -> bool:
+        """Export formatted averaged measurements to CSV format."""
         try:
-            use_normalized = False
-            if self.prefs_manager:
-                use_normalized = self.prefs_manager.get_export_normalized_values()
-            
-            headers = self._get_averaged_export_headers(use_normalized)
-            
-            with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-                
-                for measurement in measurements:
-                    row = self._format_averaged_measurement_values(measurement, use_normalized)
-                    writer.writerow(row)
-            
+            self._write_csv(table, output_path)
             return True
         except Exception as e:
             print(f"Error exporting averaged measurements to CSV: {e}")
@@ -1392,9 +1176,9 @@ class ODSExporter:
         """
         try:
             # Get measurements for this sample set
-            measurements = self.get_color_measurements(deduplicate=False)
+            measurements = self.get_measurement_frame(deduplicate=False)
             
-            if not measurements:
+            if measurements.empty:
                 error_msg = f"No measurements found for sample set '{self.sample_set_name}'"
                 print(error_msg)
                 return False, error_msg
@@ -1419,11 +1203,9 @@ class ODSExporter:
                 filename = f"{base_name}_Plot3D.ods"
                 output_path = os.path.join(export_dir, filename)
             
-            # Create Plot_3D compatible ODS document
-            doc = self._create_plot3d_document(measurements)
-            
-            # Save document
-            doc.save(output_path)
+            # Stream the Plot_3D compatible layout straight to disk
+            write_ods(output_path, "Plot_3D Data", PLOT3D_HEADERS, self._plot3d_rows(measurements),
+                      PLOT3D_NUMERIC_COLUMNS, blank_rows=PLOT3D_RESERVED_ROWS)
             
             print(f"Successfully exported {len(measurements)} measurements for Plot_3D: {output_path}")
             return True, output_path
@@ -1435,103 +1217,57 @@ class ODSExporter:
             traceback.print_exc()
             return False, error_msg
     
+    def _plot3d_rows(self, frame: pd.DataFrame):
+        """Plot_3D data rows; StampZ only populates the first 4 columns."""
+        count = len(frame)
+        empty = np.full(count, '', dtype=object)
+        xnorm, ynorm, znorm = self._format_lab_columns(frame, use_normalized=True)
+        columns = [
+            xnorm,                                      # Xnorm (L* normalized)
+            ynorm,                                      # Ynorm (a* normalized)
+            znorm,                                      # Znorm (b* normalized)
+            frame['data_id'].astype(str).to_numpy(),    # DataID
+            empty,                                      # Cluster (empty, will be filled by K-means)
+            empty,                                      # ∆E (empty, will be calculated by Plot_3D)
+            np.full(count, '.', dtype=object),          # Marker (default dot marker)
+            np.full(count, 'black', dtype=object),      # Color (default color)
+            empty,                                      # Centroid_X (empty, will be filled by K-means)
+            empty,                                      # Centroid_Y (empty, will be filled by K-means)
+            empty,                                      # Centroid_Z (empty, will be filled by K-means)
+            empty,                                      # Sphere (empty, for user use)
+            empty,                                      # Radius (empty, for user use)
+        ]
+        return zip(*columns)
+    
     def _create_plot3d_document(self, measurements: List[ColorMeasurement]) -> OpenDocumentSpreadsheet:
-        """Create an ODS document formatted specifically for Plot_3D.
+        """Create an in-memory ODS document formatted specifically for Plot_3D.
         
         Plot_3D expects all these columns:
-        ['Xnorm', 'Ynorm', 'Znorm', 'DataID', 'Cluster', '∆E', 'Marker', 'Color', 'Sphere', 'Centroid_X', 'Centroid_Y', 'Centroid_Z']
+        ['Xnorm', 'Ynorm', 'Znorm', 'DataID', 'Cluster', '∆E', 'Marker', 'Color', 'Centroid_X', 'Centroid_Y', 'Centroid_Z', 'Sphere', 'Radius']
         - Headers in row 1
         - Data starts at row 8 (rows 2-7 are blank/reserved for Plot_3D metadata)
         - Normalized values (0.0-1.0 range)
         """
-        if not ODF_AVAILABLE:
-            raise RuntimeError("odfpy library not available. Cannot create ODS document.")
-        
-        # Create new document
-        doc = OpenDocumentSpreadsheet()
-        
-        # Create table
-        table = Table(name="Plot_3D Data")
-        
-        # Plot_3D expected columns - includes Radius column which is required
-        # StampZ only populates first 4 columns, Plot_3D manages the rest
-        headers = ['Xnorm', 'Ynorm', 'Znorm', 'DataID', 'Cluster', '∆E', 'Marker', 
-                   'Color', 'Centroid_X', 'Centroid_Y', 'Centroid_Z', 'Sphere', 'Radius']
-        
-        # Add header row at row 1
-        header_row = TableRow()
-        
-        for header in headers:
-            cell = TableCell()
-            cell.addElement(P(text=header))
-            header_row.addElement(cell)
-        
-        table.addElement(header_row)
+        return self._build_odf_document("Plot_3D Data", PLOT3D_HEADERS,
+                                        self._plot3d_rows(_measurements_to_frame(measurements)),
+                                        PLOT3D_NUMERIC_COLUMNS, blank_rows=PLOT3D_RESERVED_ROWS)
+    
+    def export_and_open(self, output_path: str) -> bool:
+        """Export all measurements to an ODS file and open it.
         
-        # Add empty rows 2-7 reserved for Plot_3D metadata/data validity tables
-        # The data validity tables should appear as dropdown lists in LibreOffice Calc
-        # when the user clicks on the appropriate columns (G, H, L)
-        # Data from RTF file: 
-        # Marker Type table (column G): ^, <, >, v, o, s, p, h, x, *, D, +
-        # Color tables H (column H): red, green, blue, lime, blueviolet, purple, darkorange, black, orchid, deeppink
-        # Color table L (column L): red, green, blue, yellow, blueviolet, cyan, magenta, orange, purple, brown, pink, lime, navy, teal
-        
-        for i in range(6):
-            validity_row = TableRow()
-            # All cells in rows 2-7 should be empty - data validity tables are dropdown selections only
-            validity_values = ['', '', '', '', '', '', '', '', '', '', '', '', '']  # 13 empty cells
-            
-            for value in validity_values:
-                cell = TableCell()
-                cell.addElement(P(text=value))
-                validity_row.addElement(cell)
-            table.addElement(validity_row)
-        
-        # Add data rows starting from row 8 (after 6 blank rows + header)
-        for measurement in measurements:
-            row = TableRow()
-            
-            # Create all the values for Plot_3D in the correct column order
-            values = [
-                self._normalize_lab_l(measurement.l_value),    # Xnorm (L* normalized)
-                self._normalize_lab_ab(measurement.a_value),   # Ynorm (a* normalized)
-                self._normalize_lab_ab(measurement.b_value),   # Znorm (b* normalized)
-                measurement.data_id,                           # DataID
-                "",                                           # Cluster (empty, will be filled by K-means)
-                "",                                           # ∆E (empty, will be calculated by Plot_3D)
-                ".",                                          # Marker (default dot marker)
-                "black",                                      # Color (default color)
-                "",                                           # Centroid_X (empty, will be filled by K-means)
-                "",                                           # Centroid_Y (empty, will be filled by K-means)
-                "",                                           # Centroid_Z (empty, will be filled by K-means)
-                "",                                           # Sphere (empty, for user use)
-                ""                                            # Radius (empty, for user use)
-            ]
-            
-            for i, value in enumerate(values):
-                cell = TableCell()
-                
-                # Set proper value type for numeric columns (first 3 are normalized coordinates)
-                if i < 3 and value and value != "":
-                    try:
-                        numeric_value = float(value)
-                        cell.setAttribute('valuetype', 'float')
-                        cell.setAttribute('value', str(numeric_value))
-                        cell.addElement(P(text=str(value)))
-                    except (ValueError, TypeError):
-                        cell.addElement(P(text=str(value)))
-                else:
-                    # Non-numeric columns or empty values
-                    cell.addElement(P(text=str(value)))
-                
-                row.addElement(cell)
+        Args:
+            output_path: Path of the ODS file to write
             
-            table.addElement(row)
-        
-        # Add table to document
-        doc.spreadsheet.addElement(table)
+        Returns:
+            True if export and open succeeded, False otherwise
+        """
+        if not self.export_to_ods(output_path):
+            return False
         
-        return doc
+        # Check user preferences for auto-opening
+        if self.prefs_manager and not self.prefs_manager.preferences.export_prefs.auto_open_after_export:
+            return True  # Export was successful, just didn't open
+        return self.open_file_with_default_app(output_path)
     
     def export_and_open_averaged_measurements(self, sample_set_name: str = None) -> bool:
         """Export averaged measurements to separate spreadsheet and open it.
@@ -140,16 +140,64 @@ class ODSImporter:
             print(f"Error parsing ODS file: {e}")
             raise
     
-    def import_to_database(self, measurements: List[Dict], sample_set_name: str) -> bool:
+    def parse_columnar_file(self, path: str) -> List[Dict]:
+        """Parse a Parquet or Arrow IPC export (ODSExporter.export_to_columnar).
+        
+        The file carries typed columns, including image_name and coordinate_point,
+        so no text parsing or data_id splitting is needed.
+        
+        Args:
+            path: Path to the .parquet, .arrow or .feather file
+            
+        Returns:
+            List of measurement dictionaries, as returned by parse_ods_file
+        """
+        from utils.arrow_io import read_frame
+        
+        columns = ['data_id', 'image_name', 'coordinate_point', 'l_value', 'a_value', 'b_value',
+                   'x_position', 'y_position', 'sample_shape', 'sample_size', 'sample_anchor',
+                   'rgb_r', 'rgb_g', 'rgb_b', 'measurement_date', 'notes']
+        try:
+            frame = read_frame(path, columns)
+            print(f"Found {len(frame)} data rows in {os.path.basename(path)}")
+            
+            numeric = ['l_value', 'a_value', 'b_value', 'x_position', 'y_position', 'rgb_r', 'rgb_g', 'rgb_b']
+            frame[numeric] = frame[numeric].fillna(0.0)
+            text = ['sample_shape', 'sample_size', 'sample_anchor', 'measurement_date', 'notes']
+            frame[text] = frame[text].fillna('')
+            
+            measurements = frame.to_dict('records')
+            print(f"Successfully parsed {len(measurements)} measurements from {os.path.basename(path)}")
+            return measurements
+            
+        except Exception as e:
+            print(f"Error parsing columnar file: {e}")
+            raise
+    
+    def parse_file(self, path: str) -> List[Dict]:
+        """Parse an ODS, Parquet or Arrow IPC file, chosen by extension."""
+        from utils.arrow_io import is_columnar_file
+        
+        if is_columnar_file(path):
+            return self.parse_columnar_file(path)
+        return self.parse_ods_file(path)
+    
+    def import_to_database(self, measurements: List[Dict], sample_set_name: str,
+                           incremental: bool = False) -> bool:
         """Import measurements to the specified database, completely overwriting existing data.
         
         Args:
             measurements: List of measurement dictionaries
             sample_set_name: Name of the sample set (database name)
+            incremental: If True, keep existing data and only add rows not already
+                         in the database (see import_new_measurements)
             
         Returns:
             True if import was successful
         """
+        if incremental:
+            return self.import_new_measurements(measurements, sample_set_name)
+        
         try:
             # Get database path using same logic as ColorAnalysisDB
             from utils.naming_utils import standardize_name
@@ -211,6 +259,7 @@ class ODSImporter:
                         sample_anchor TEXT,
                         measurement_date TIMESTAMP DEFAULT (datetime('now', 'localtime')),
                         notes TEXT,
+                        row_hash TEXT,
                         FOREIGN KEY(set_id) REFERENCES measurement_sets(set_id)
                     )
                 """)
@@ -219,6 +268,10 @@ class ODSImporter:
                     CREATE INDEX idx_set_point 
                     ON color_measurements(set_id, coordinate_point)
                 """)
+                conn.execute("""
+                    CREATE INDEX idx_row_hash
+                    ON color_measurements(row_hash)
+                """)
                 
                 # Group measurements by image name
                 image_groups = {}
@@ -248,15 +301,16 @@ class ODSImporter:
                                 set_id, coordinate_point, x_position, y_position,
                                 l_value, a_value, b_value, rgb_r, rgb_g, rgb_b,
                                 sample_type, sample_size, sample_anchor,
-                                measurement_date, notes
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                measurement_date, notes, row_hash
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                         """, (
                             set_id, measurement['coordinate_point'],
                             measurement['x_position'], measurement['y_position'],
                             measurement['l_value'], measurement['a_value'], measurement['b_value'],
                             measurement['rgb_r'], measurement['rgb_g'], measurement['rgb_b'],
                             measurement['sample_shape'], measurement['sample_size'], measurement['sample_anchor'],
-                            measurement['measurement_date'], measurement['notes']
+                            measurement['measurement_date'], measurement['notes'],
+                            self._row_hash(measurement)
                         ))
                         total_inserted += 1
                 
@@ -274,6 +328,91 @@ class ODSImporter:
             print(f"Error importing to database: {e}")
             return False
     
+    @staticmethod
+    def _row_hash(measurement: Dict) -> str:
+        from utils.color_analysis_db import ColorAnalysisDB
+        return ColorAnalysisDB.measurement_row_hash(
+            measurement['image_name'], measurement['coordinate_point'],
+            measurement['l_value'], measurement['a_value'], measurement['b_value'],
+            measurement['measurement_date'])
+    
+    def import_new_measurements(self, measurements: List[Dict], sample_set_name: str) -> bool:
+        """Add only the measurements the database does not already contain.
+        
+        Each row is identified by a hash of (image, point, L*a*b*, date) kept in
+        the indexed row_hash column, so re-importing an updated spreadsheet adds
+        just its new rows, in a single transaction, and creates no duplicates.
+        Existing data is left untouched.
+        
+        Args:
+            measurements: List of measurement dictionaries
+            sample_set_name: Name of the sample set (database name)
+            
+        Returns:
+            True if import was successful
+        """
+        try:
+            from utils.color_analysis_db import ColorAnalysisDB
+            
+            # Opening the database creates or migrates the schema, including row_hash
+            color_db = ColorAnalysisDB(sample_set_name)
+            
+            # Identical rows within the sheet are imported once
+            incoming = {}
+            for measurement in measurements:
+                incoming.setdefault(self._row_hash(measurement), measurement)
+            
+            with sqlite3.connect(color_db.db_path) as conn:
+                backfilled = color_db.backfill_row_hashes(conn)
+                if backfilled:
+                    print(f"Hashed {backfilled} existing measurements")
+                
+                # Look the incoming hashes up against the row_hash index in one join
+                conn.execute("CREATE TEMP TABLE import_hashes (row_hash TEXT PRIMARY KEY)")
+                conn.executemany("INSERT INTO import_hashes VALUES (?)", ((h,) for h in incoming))
+                existing = {h for (h,) in conn.execute("""
+                    SELECT i.row_hash FROM import_hashes i
+                    WHERE EXISTS (SELECT 1 FROM color_measurements m WHERE m.row_hash = i.row_hash)
+                """)}
+                conn.execute("DROP TABLE import_hashes")
+                
+                new_rows = [(h, m) for h, m in incoming.items() if h not in existing]
+                
+                set_ids = dict(conn.execute(
+                    "SELECT image_name, MIN(set_id) FROM measurement_sets GROUP BY image_name"))
+                for _, measurement in new_rows:
+                    image_name = measurement['image_name']
+                    if image_name not in set_ids:
+                        set_ids[image_name] = conn.execute("""
+                            INSERT INTO measurement_sets (image_name, description)
+                            VALUES (?, ?)
+                        """, (image_name, "Imported from ODS file")).lastrowid
+                
+                conn.executemany("""
+                    INSERT INTO color_measurements (
+                        set_id, coordinate_point, x_position, y_position,
+                        l_value, a_value, b_value, rgb_r, rgb_g, rgb_b,
+                        sample_type, sample_size, sample_anchor,
+                        measurement_date, notes, row_hash
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                              COALESCE(NULLIF(?, ''), datetime('now', 'localtime')), ?, ?)
+                """, [(
+                    set_ids[m['image_name']], m['coordinate_point'],
+                    m['x_position'], m['y_position'],
+                    m['l_value'], m['a_value'], m['b_value'],
+                    m['rgb_r'], m['rgb_g'], m['rgb_b'],
+                    m['sample_shape'], m['sample_size'], m['sample_anchor'],
+                    m['measurement_date'], m['notes'], h
+                ) for h, m in new_rows])
+            
+            print(f"Imported {len(new_rows)} new measurements; "
+                  f"{len(measurements) - len(new_rows)} already present")
+            return True
+            
+        except Exception as e:
+            print(f"Error importing to database: {e}")
+            return False
+    
     def _clean_filename(self, name: str) -> str:
         """Clean a name to be safe for use as a filename."""
         # Replace spaces and special characters with underscores
@@ -289,8 +428,10 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Import corrected ODS file back to StampZ database")
-    parser.add_argument("ods_file", help="Path to the corrected ODS file")
+    parser.add_argument("ods_file", help="Path to the corrected ODS (or Parquet/Arrow) file")
     parser.add_argument("--sample-set", default="Semeuse_137", help="Sample set name (default: Semeuse_137)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only add rows not already in the database instead of overwriting it")
     
     args = parser.parse_args()
     
@@ -302,14 +443,14 @@ def main():
         importer = ODSImporter()
         
         print(f"Parsing ODS file: {args.ods_file}")
-        measurements = importer.parse_ods_file(args.ods_file)
+        measurements = importer.parse_file(args.ods_file)
         
         if not measurements:
             print("No measurements found in ODS file")
             return False
         
         print(f"Importing {len(measurements)} measurements to sample set: {args.sample_set}")
-        success = importer.import_to_database(measurements, args.sample_set)
+        success = importer.import_to_database(measurements, args.sample_set, incremental=args.incremental)
         
         if success:
             print("Import completed successfully!")
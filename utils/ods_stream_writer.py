@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Streaming ODS writer for StampZ exports.
+Writes a single-sheet .ods file row by row straight into the zip container,
+so large exports never hold a full odfpy document tree in memory.
+"""
+
+import math
+import os
+import zipfile
+from typing import Iterable, Optional, Sequence, Set
+from xml.sax.saxutils import escape, quoteattr
+
+from .instrumentation import traced
+
+ODS_MIMETYPE = "application/vnd.oasis.opendocument.spreadsheet"
+
+_NAMESPACES = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+    'xmlns:meta="urn:oasis:names:tc:opendocument:xmlns:meta:1.0" '
+    'office:version="1.2"'
+)
+
+_MANIFEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" '
+    'manifest:version="1.2">'
+    f'<manifest:file-entry manifest:full-path="/" manifest:version="1.2" manifest:media-type="{ODS_MIMETYPE}"/>'
+    '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+    '<manifest:file-entry manifest:full-path="styles.xml" manifest:media-type="text/xml"/>'
+    '<manifest:file-entry manifest:full-path="meta.xml" manifest:media-type="text/xml"/>'
+    '</manifest:manifest>'
+)
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    f'<office:document-styles {_NAMESPACES}>'
+    '<office:styles/><office:automatic-styles/><office:master-styles/>'
+    '</office:document-styles>'
+)
+
+_META = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    f'<office:document-meta {_NAMESPACES}>'
+    '<office:meta><meta:generator>StampZ</meta:generator></office:meta>'
+    '</office:document-meta>'
+)
+
+_EMPTY_CELL = '<table:table-cell/>'
+
+
+def _cell_xml(value, numeric: bool) -> str:
+    """Serialize one cell; numeric columns become float cells when they parse."""
+    text = "" if value is None else str(value)
+    if not text:
+        return _EMPTY_CELL
+    if numeric:
+        try:
+            number = float(text)
+        except (ValueError, TypeError):
+            number = None
+        if number is not None and math.isfinite(number):
+            return (f'<table:table-cell office:value-type="float" office:value="{number!r}">'
+                    f'<text:p>{escape(text)}</text:p></table:table-cell>')
+    return (f'<table:table-cell office:value-type="string">'
+            f'<text:p>{escape(text)}</text:p></table:table-cell>')
+
+
+@traced('export.write_ods')
+def write_ods(output_path: str, table_name: str, headers: Sequence[str],
+              rows: Iterable[Sequence], numeric_columns: Optional[Set[int]] = None,
+              blank_rows: int = 0) -> int:
+    """Stream a single-table ODS file to disk.
+
+    The file is written to a temporary name next to output_path and moved
+    into place once complete, so a failed export never leaves a truncated file.
+
+    Args:
+        output_path: Destination .ods path
+        table_name: Name of the sheet
+        headers: Header row values
+        rows: Iterable of row value sequences, consumed lazily
+        numeric_columns: Column indices written as float cells
+        blank_rows: Number of empty rows between the header and the data
+
+    Returns:
+        Number of data rows written
+    """
+    numeric_columns = frozenset(numeric_columns or ())
+    width = len(headers)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    temp_path = f"{output_path}.partial"
+    count = 0
+    try:
+        with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            # The mimetype must be the first entry and stored uncompressed
+            archive.writestr(zipfile.ZipInfo('mimetype'), ODS_MIMETYPE, compress_type=zipfile.ZIP_STORED)
+            archive.writestr('META-INF/manifest.xml', _MANIFEST)
+            archive.writestr('styles.xml', _STYLES)
+            archive.writestr('meta.xml', _META)
+
+            with archive.open('content.xml', 'w', force_zip64=True) as content:
+                def write(chunk: str):
+                    content.write(chunk.encode('utf-8'))
+
+                write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                write(f'<office:document-content {_NAMESPACES}>'
+                      '<office:automatic-styles/><office:body><office:spreadsheet>')
+                write(f'<table:table table:name={quoteattr(table_name)}>')
+                write(f'<table:table-column table:number-columns-repeated="{max(width, 1)}"/>')
+
+                write('<table:table-row>'
+                      + ''.join(_cell_xml(header, False) for header in headers)
+                      + '</table:table-row>')
+                if blank_rows:
+                    write(f'<table:table-row table:number-rows-repeated="{blank_rows}">'
+                          f'<table:table-cell table:number-columns-repeated="{max(width, 1)}"/>'
+                          '</table:table-row>')
+
+                for row in rows:
+                    write('<table:table-row>'
+                          + ''.join(_cell_xml(value, i in numeric_columns) for i, value in enumerate(row))
+                          + '</table:table-row>')
+                    count += 1
+
+                write('</table:table></office:spreadsheet></office:body></office:document-content>')
+
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
@@ -177,22 +177,18 @@ def run_spectral_analysis(measurements: List[ColorMeasurement], dataset_name: st
         spectral_data = spectral_analyzer.analyze_spectral_response(measurements, illuminant)
         spectral_results[illuminant] = spectral_data
         
-        sample_count = len(set(m.sample_id for m in spectral_data))
-        wavelength_count = len(set(m.wavelength for m in spectral_data))
+        sample_count = spectral_data.sample_count
+        wavelength_count = len(spectral_data.wavelengths)
         
         print(f"Generated {len(spectral_data)} spectral measurements")
         print(f"Covers {sample_count} samples across {wavelength_count} wavelength points")
         
-        if spectral_data:
-            sample_1_data = [m for m in spectral_data if m.sample_id == 'sample_1']
-            if sample_1_data:
-                print(f"Spectral range: {min(m.wavelength for m in sample_1_data):.0f}-{max(m.wavelength for m in sample_1_data):.0f}nm")
-                
-                max_r = max(sample_1_data, key=lambda m: m.rgb_response[0])
-                max_g = max(sample_1_data, key=lambda m: m.rgb_response[1]) 
-                max_b = max(sample_1_data, key=lambda m: m.rgb_response[2])
-                
-                print(f"Peak responses - R: {max_r.wavelength:.0f}nm, G: {max_g.wavelength:.0f}nm, B: {max_b.wavelength:.0f}nm")
+        if sample_count:
+            wavelengths = spectral_data.wavelengths
+            print(f"Spectral range: {wavelengths.min():.0f}-{wavelengths.max():.0f}nm")
+            
+            peak_r, peak_g, peak_b = spectral_data.peak_wavelengths(0)
+            print(f"Peak responses - R: {peak_r:.0f}nm, G: {peak_g:.0f}nm, B: {peak_b:.0f}nm")
     
     # 3. Metamerism analysis
     print(f"\n3. METAMERISM ANALYSIS")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark for the StampZ analysis pipeline.
+
+Generates synthetic stamp scans and a coordinate template, then runs the
+full workflow for every image - load, sample with the template, save to
+the sample set database and save the averaged measurement - followed by
+the ODS and Plot_3D exports of the whole set. Each configuration runs in
+a fresh process with 1, 4 and all cores, and reports images per second,
+p50/p95 latency per image, time per stage and peak resident memory.
+
+Usage:
+    python -m utils.pipeline_benchmark [--images 200] [--workers 1 4 0]
+                                       [--size 1600x1200] [--output pipeline.json]
+
+A worker count of 0 means all cores.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.benchmarks import environment_info, quiet, use_scratch_data_dir, PROJECT_ROOT
+
+TEMPLATE_NAME = 'PipelineBenchmark'
+SAMPLE_SET_NAME = 'PipelineBenchmark'
+DEFAULT_IMAGES = 200
+DEFAULT_IMAGE_SIZE = (1600, 1200)
+DEFAULT_WORKER_COUNTS = (1, 4, 0)
+
+# Per-image stages, in pipeline order
+IMAGE_STAGES = ('load', 'sample', 'save', 'average')
+
+
+@dataclass
+class PipelineRun:
+    """Results of the pipeline at one worker count."""
+    workers: int
+    images: int
+    wall_seconds: float             # Per-image stages, including worker start-up
+    images_per_second: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    stage_seconds: Dict[str, float] = field(default_factory=dict)  # Summed over images
+    export_seconds: Dict[str, float] = field(default_factory=dict)
+    peak_rss_mb: Optional[float] = None
+
+
+def generate_stamp_images(folder: str, count: int, size: Tuple[int, int] = DEFAULT_IMAGE_SIZE,
+                          seed: int = 2024) -> List[str]:
+    """Write count synthetic stamp scans: paper margin, ink field and noise.
+
+    Returns:
+        Paths of the images
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        paper = rng.uniform(225, 245, 3)
+        ink = rng.uniform(20, 200, 3)
+        array = np.empty((height, width, 3), dtype=np.float32)
+        array[:] = paper
+        array[height // 8: -height // 8, width // 8: -width // 8] = ink
+        array += rng.normal(0, 6, (height, width, 1))
+        path = os.path.join(folder, f"Stamp_S{i + 1:04d}.png")
+        Image.fromarray(np.clip(array, 0, 255).astype(np.uint8), 'RGB').save(path)
+        paths.append(path)
+    return paths
+
+
+def template_points(size: Tuple[int, int]):
+    """Ten sample areas inside the ink field, mixing shapes and sizes."""
+    from utils.coordinate_db import CoordinatePoint, SampleAreaType
+
+    width, height = size
+    points = []
+    for i in range(10):
+        x = width * (0.2 + 0.6 * (i % 5) / 4)
+        y = height * (0.3 if i < 5 else 0.7)
+        shape = SampleAreaType.CIRCLE if i % 2 else SampleAreaType.RECTANGLE
+        points.append(CoordinatePoint(x, y, shape, (20 + 4 * i, 20 + 4 * i), 'center'))
+    return points
+
+
+def _process_image(image_path: str) -> Dict[str, float]:
+    """Run one image through the per-image stages, returning seconds per stage."""
+    from utils.color_analyzer import ColorAnalyzer
+
+    timings = {}
+    with quiet():
+        analyzer = ColorAnalyzer()
+        image_name = os.path.splitext(os.path.basename(image_path))[0]
+
+        start = time.perf_counter()
+        with Image.open(image_path) as image:
+            image.load()
+            timings['load'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            measurements = analyzer.extract_sample_colors(image, TEMPLATE_NAME)
+            timings['sample'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if not analyzer.save_color_measurements(measurements, SAMPLE_SET_NAME, image_name):
+            raise RuntimeError(f"Saving measurements for {image_name} failed")
+        timings['save'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        samples = [
+            {'l_value': m.lab[0], 'a_value': m.lab[1], 'b_value': m.lab[2],
+             'rgb_r': m.rgb[0], 'rgb_g': m.rgb[1], 'rgb_b': m.rgb[2]}
+            for m in measurements
+        ]
+        if not analyzer.save_averaged_measurement_from_samples(samples, SAMPLE_SET_NAME, image_name):
+            raise RuntimeError(f"Saving the average for {image_name} failed")
+        timings['average'] = time.perf_counter() - start
+    return timings
+
+
+def _init_worker(data_dir: str) -> None:
+    use_scratch_data_dir(data_dir)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Largest resident set of this process or any of its finished workers."""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_configuration(image_paths: List[str], image_size: Tuple[int, int], workers: int,
+                       data_dir: str) -> Dict:
+    """Run the whole pipeline at one worker count; called in a fresh process."""
+    import logging
+    from utils.coordinate_db import CoordinateDB
+    from utils.direct_plot3d_exporter import DirectPlot3DExporter
+    from utils.ods_exporter import ODSExporter
+
+    use_scratch_data_dir(data_dir)
+    template_dir = os.path.join(data_dir, 'data', 'templates', 'plot3d')
+    os.makedirs(template_dir, exist_ok=True)
+    shutil.copy(os.path.join(PROJECT_ROOT, 'data', 'templates', 'plot3d', 'Plot3D_Template.ods'), template_dir)
+
+    with quiet():
+        saved, _ = CoordinateDB().save_coordinate_set(TEMPLATE_NAME, image_paths[0], template_points(image_size))
+    if not saved:
+        raise RuntimeError("Could not save the benchmark coordinate template")
+
+    start = time.perf_counter()
+    if workers == 1:
+        per_image = [_process_image(path) for path in image_paths]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+            per_image = pool.map(_process_image, image_paths, chunksize=1)
+    wall = time.perf_counter() - start
+
+    export_dir = os.path.join(data_dir, 'exports')
+    os.makedirs(export_dir, exist_ok=True)
+    exports = {}
+    with quiet():
+        start = time.perf_counter()
+        if not ODSExporter(SAMPLE_SET_NAME).export_to_ods(os.path.join(export_dir, 'pipeline.ods')):
+            raise RuntimeError("ODS export failed")
+        exports['ods_export'] = time.perf_counter() - start
+
+        logger = logging.getLogger('pipeline_benchmark.plot3d')
+        logger.setLevel(logging.WARNING)
+        start = time.perf_counter()
+        if not DirectPlot3DExporter(logger=logger).export_to_plot3d(SAMPLE_SET_NAME, output_dir=export_dir):
+            raise RuntimeError("Plot_3D export failed")
+        exports['plot3d_export'] = time.perf_counter() - start
+
+    latencies = np.array([sum(t.values()) for t in per_image]) * 1000
+    return asdict(PipelineRun(
+        workers=workers,
+        images=len(image_paths),
+        wall_seconds=wall,
+        images_per_second=len(image_paths) / wall,
+        latency_p50_ms=float(np.percentile(latencies, 50)),
+        latency_p95_ms=float(np.percentile(latencies, 95)),
+        stage_seconds={stage: sum(t[stage] for t in per_image) for stage in IMAGE_STAGES},
+        export_seconds=exports,
+        peak_rss_mb=_peak_rss_mb(),
+    ))
+
+
+def _configuration_main(queue, *args) -> None:
+    try:
+        queue.put(_run_configuration(*args))
+    except BaseException as e:
+        queue.put(e)
+        raise
+
+
+def run_pipeline_benchmark(images: int = DEFAULT_IMAGES, worker_counts=DEFAULT_WORKER_COUNTS,
+                           image_size: Tuple[int, int] = DEFAULT_IMAGE_SIZE,
+                           folder: Optional[str] = None, progress=None) -> List[PipelineRun]:
+    """Generate fixtures and run the pipeline at each worker count.
+
+    Args:
+        images: Number of synthetic stamp images
+        worker_counts: Process counts to run with; 0 means all cores
+        image_size: (width, height) of the images
+        folder: Scratch directory (default: a temporary directory, removed afterwards)
+        progress: Optional callable receiving a line per finished configuration
+
+    Returns:
+        One PipelineRun per distinct worker count
+    """
+    counts = sorted({count or os.cpu_count() or 1 for count in worker_counts})
+    owns_folder = folder is None
+    folder = folder or tempfile.mkdtemp(prefix='stampz_pipeline_')
+    runs = []
+    try:
+        image_dir = os.path.join(folder, 'images')
+        os.makedirs(image_dir, exist_ok=True)
+        image_paths = generate_stamp_images(image_dir, images, image_size)
+
+        context = multiprocessing.get_context('spawn')
+        for workers in counts:
+            # A fresh process and database per configuration keeps peak RSS
+            # and database size independent of the runs before it
+            queue = context.Queue()
+            data_dir = os.path.join(folder, f"run_{workers}")
+            process = context.Process(target=_configuration_main,
+                                      args=(queue, image_paths, image_size, workers, data_dir))
+            process.start()
+            result = queue.get()
+            process.join()
+            if isinstance(result, BaseException):
+                raise RuntimeError(f"Pipeline run with {workers} workers failed") from result
+            run = PipelineRun(**result)
+            runs.append(run)
+            if progress:
+                progress(format_run(run))
+    finally:
+        if owns_folder:
+            shutil.rmtree(folder, ignore_errors=True)
+    return runs
+
+
+def format_run(run: PipelineRun) -> str:
+    stages = "  ".join(f"{stage} {run.stage_seconds[stage] / run.images * 1000:.1f}ms"
+                       for stage in IMAGE_STAGES)
+    exports = "  ".join(f"{name} {seconds:.2f}s" for name, seconds in run.export_seconds.items())
+    rss = f"{run.peak_rss_mb:.0f} MB" if run.peak_rss_mb is not None else "n/a"
+    return (f"{run.workers:>3} workers: {run.images_per_second:7.1f} images/s  "
+            f"p50 {run.latency_p50_ms:.1f}ms  p95 {run.latency_p95_ms:.1f}ms  peak RSS {rss}\n"
+            f"             per image: {stages}\n"
+            f"             exports:   {exports}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the StampZ end-to-end pipeline benchmark")
+    parser.add_argument('--images', type=int, default=DEFAULT_IMAGES, help="Number of synthetic images")
+    parser.add_argument('--workers', type=int, nargs='+', default=list(DEFAULT_WORKER_COUNTS),
+                        help="Worker process counts; 0 means all cores (default: 1 4 0)")
+    parser.add_argument('--size', default='x'.join(map(str, DEFAULT_IMAGE_SIZE)),
+                        help="Image size as WIDTHxHEIGHT (default: 1600x1200)")
+    parser.add_argument('--output', help="JSON file for the results")
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    runs = run_pipeline_benchmark(args.images, args.workers, (width, height), progress=print)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'environment': environment_info(),
+                'images': args.images,
+                'image_size': [width, height],
+                'runs': [asdict(run) for run in runs],
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
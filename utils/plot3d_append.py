@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Append-only writes for Plot_3D .ods files.
+
+Each Plot_3D file gets a sidecar index (``<file>.index.json``) holding the
+DataIDs already present and the next free data row. Appending new
+measurements then patches only the first sheet of content.xml and copies
+every other zip entry through unchanged, instead of loading and re-saving
+the whole document with ezodf.
+
+The index records the CRC of content.xml it was built from; if Plot_3D or
+LibreOffice has rewritten the file since, the index is rebuilt with a
+single scan of the sheet.
+"""
+
+import copy
+import json
+import os
+import zipfile
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence, Set
+
+from lxml import etree
+
+# Data starts at row 8 (index 7); StampZ owns columns A-D (Xnorm, Ynorm, Znorm, DataID)
+DATA_START_ROW = 7
+DATA_COLUMNS = 4
+DATAID_COLUMN = 3
+
+INDEX_SUFFIX = '.index.json'
+INDEX_VERSION = 1
+
+_OFFICE = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+_TABLE = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+_TEXT = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+_CALCEXT = '{urn:org:documentfoundation:names:experimental:calc:xmlns:calcext:1.0}'
+
+_ROW = _TABLE + 'table-row'
+_CELLS = (_TABLE + 'table-cell', _TABLE + 'covered-table-cell')
+_ROW_CONTAINERS = (_TABLE + 'table-header-rows', _TABLE + 'table-rows', _TABLE + 'table-row-group')
+_ROWS_REPEATED = _TABLE + 'number-rows-repeated'
+_COLUMNS_REPEATED = _TABLE + 'number-columns-repeated'
+
+
+@dataclass
+class Plot3DIndex:
+    """DataIDs and next free row of one Plot_3D file."""
+    data_ids: Set[str] = field(default_factory=set)
+    next_row: int = DATA_START_ROW
+    content_crc: Optional[int] = None
+
+    @staticmethod
+    def path_for(file_path: str) -> str:
+        return file_path + INDEX_SUFFIX
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional['Plot3DIndex']:
+        """Load the sidecar index, or None if it is missing or unreadable."""
+        try:
+            with open(cls.path_for(file_path), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                return None
+            return cls(set(data['data_ids']), int(data['next_row']), data.get('content_crc'))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, file_path: str):
+        """Write the sidecar index atomically."""
+        index_path = self.path_for(file_path)
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'content_crc': self.content_crc,
+                'next_row': self.next_row,
+                'data_ids': sorted(self.data_ids),
+            }, f)
+        os.replace(temp_path, index_path)
+
+
+def _content_crc(file_path: str) -> int:
+    """CRC of content.xml from the zip directory, without decompressing anything."""
+    with zipfile.ZipFile(file_path) as archive:
+        return archive.getinfo('content.xml').CRC
+
+
+def _rows(container):
+    """Yield the rows of a table in order, descending into row groups."""
+    for child in container:
+        if child.tag == _ROW:
+            yield child
+        elif child.tag in _ROW_CONTAINERS:
+            yield from _rows(child)
+
+
+def _isolate(element, attr: str, offset: int):
+    """Split a repeated row or cell so repetition `offset` is its own element."""
+    count = int(element.get(attr, '1'))
+    if count <= 1:
+        return element
+
+    def piece(size):
+        clone = copy.deepcopy(element)
+        if size > 1:
+            clone.set(attr, str(size))
+        else:
+            clone.attrib.pop(attr, None)
+        return clone
+
+    target = piece(1)
+    pieces = [target]
+    if offset:
+        pieces.insert(0, piece(offset))
+    if count - offset - 1:
+        pieces.append(piece(count - offset - 1))
+
+    for piece in reversed(pieces):
+        element.addnext(piece)
+    element.getparent().remove(element)
+    return target
+
+
+def _first_table(root):
+    """First sheet of the spreadsheet body; Plot_3D only reads this one."""
+    table = root.find(f'.//{_TABLE}table')
+    if table is None:
+        raise ValueError("No table found in content.xml")
+    return table
+
+
+def _cell_at(row, column: int):
+    """Return the standalone cell at `column`, creating empty cells as needed."""
+    position = 0
+    for cell in row:
+        if cell.tag not in _CELLS:
+            continue
+        count = int(cell.get(_COLUMNS_REPEATED, '1'))
+        if column < position + count:
+            return _isolate(cell, _COLUMNS_REPEATED, column - position)
+        position += count
+    if column > position:
+        filler = etree.SubElement(row, _CELLS[0])
+        if column - position > 1:
+            filler.set(_COLUMNS_REPEATED, str(column - position))
+    return etree.SubElement(row, _CELLS[0])
+
+
+def _cell_text(cell) -> str:
+    """Value of a cell as text, preferring the typed office:value attributes."""
+    value_type = cell.get(_OFFICE + 'value-type')
+    if value_type == 'string' and cell.get(_OFFICE + 'string-value') is not None:
+        return cell.get(_OFFICE + 'string-value')
+    if value_type in ('float', 'percentage', 'currency') and cell.get(_OFFICE + 'value') is not None:
+        return cell.get(_OFFICE + 'value')
+    return ''.join(cell.itertext()).strip()
+
+
+def _row_values(row, count: int):
+    """Text of the first `count` cells of a row, expanding repeated cells."""
+    values = []
+    for cell in row:
+        if cell.tag not in _CELLS:
+            continue
+        text = _cell_text(cell)
+        values.extend([text] * min(int(cell.get(_COLUMNS_REPEATED, '1')), count - len(values)))
+        if len(values) >= count:
+            break
+    return values + [''] * (count - len(values))
+
+
+def _set_cell(cell, value):
+    """Replace a cell's content, keeping its style and validation attributes."""
+    for attr in list(cell.attrib):
+        if attr.startswith(_OFFICE) or attr == _CALCEXT + 'value-type' or attr == _TABLE + 'formula':
+            del cell.attrib[attr]
+    for child in list(cell):
+        cell.remove(child)
+    cell.text = None
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        text = repr(float(value))
+        cell.set(_OFFICE + 'value-type', 'float')
+        cell.set(_OFFICE + 'value', text)
+    else:
+        text = str(value)
+        cell.set(_OFFICE + 'value-type', 'string')
+    etree.SubElement(cell, _TEXT + 'p').text = text
+
+
+def _scan_table(table) -> Plot3DIndex:
+    """Collect DataIDs and the row after the last data row from the first sheet."""
+    index = Plot3DIndex()
+    position = 0
+    for row in _rows(table):
+        count = int(row.get(_ROWS_REPEATED, '1'))
+        if position + count > DATA_START_ROW:
+            values = _row_values(row, DATA_COLUMNS)
+            if any(values):
+                index.next_row = max(index.next_row, position + count)
+                if values[DATAID_COLUMN]:
+                    index.data_ids.add(values[DATAID_COLUMN])
+        position += count
+    return index
+
+
+def scan_plot3d_file(file_path: str) -> Plot3DIndex:
+    """Build an index for a Plot_3D file by scanning its first sheet once."""
+    with zipfile.ZipFile(file_path) as archive:
+        root = etree.fromstring(archive.read('content.xml'))
+        crc = archive.getinfo('content.xml').CRC
+    index = _scan_table(_first_table(root))
+    index.content_crc = crc
+    return index
+
+
+def get_plot3d_index(file_path: str) -> Plot3DIndex:
+    """Return the sidecar index for a file, rebuilding it if it is missing or stale."""
+    index = Plot3DIndex.load(file_path)
+    if index is None or index.content_crc != _content_crc(file_path):
+        index = scan_plot3d_file(file_path)
+        index.save(file_path)
+    return index
+
+
+def _row_at(table, row_index: int):
+    """Return the standalone row at `row_index`, creating empty rows past the end."""
+    position = 0
+    last = None
+    for row in _rows(table):
+        count = int(row.get(_ROWS_REPEATED, '1'))
+        if row_index < position + count:
+            return _isolate(row, _ROWS_REPEATED, row_index - position)
+        position += count
+        last = row
+    parent = last.getparent() if last is not None else table
+    if row_index > position:
+        filler = etree.SubElement(parent, _ROW)
+        if row_index - position > 1:
+            filler.set(_ROWS_REPEATED, str(row_index - position))
+        etree.SubElement(filler, _CELLS[0])
+    return etree.SubElement(parent, _ROW)
+
+
+def _next_row(row):
+    """Return the standalone row after `row`, creating one at the end if needed."""
+    following = row.getnext()
+    while following is not None and following.tag != _ROW:
+        following = following.getnext()
+    if following is None:
+        following = etree.Element(_ROW)
+        row.addnext(following)
+        return following
+    return _isolate(following, _ROWS_REPEATED, 0)
+
+
+def append_rows(file_path: str, rows: Iterable[Sequence], index: Optional[Plot3DIndex] = None) -> int:
+    """Append rows of (Xnorm, Ynorm, Znorm, DataID) whose DataID is not yet in the file.
+
+    Only columns A-D of the new rows are written; styles, validations and any
+    values in other columns are left as they are. The file is rewritten via a
+    temporary copy and the sidecar index is updated.
+
+    Args:
+        file_path: Existing Plot_3D .ods file
+        rows: Row values, DataID last
+        index: Index from get_plot3d_index, loaded if not given
+
+    Returns:
+        Number of rows appended
+    """
+    if index is None:
+        index = get_plot3d_index(file_path)
+
+    new_rows = [values for values in rows if str(values[DATAID_COLUMN]) not in index.data_ids]
+    if not new_rows:
+        return 0
+
+    with zipfile.ZipFile(file_path) as archive:
+        root = etree.fromstring(archive.read('content.xml'))
+    table = _first_table(root)
+
+    row = _row_at(table, index.next_row)
+    for i, values in enumerate(new_rows):
+        if i:
+            row = _next_row(row)
+        for column in range(DATA_COLUMNS):
+            _set_cell(_cell_at(row, column), values[column])
+
+    content = etree.tostring(root, xml_declaration=True, encoding='UTF-8')
+    temp_path = f"{file_path}.temp"
+    try:
+        with zipfile.ZipFile(file_path) as source, zipfile.ZipFile(temp_path, 'w') as target:
+            for info in source.infolist():
+                data = content if info.filename == 'content.xml' else source.read(info)
+                target.writestr(info, data, compress_type=info.compress_type)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    index.data_ids.update(str(values[DATAID_COLUMN]) for values in new_rows)
+    index.next_row += len(new_rows)
+    index.content_crc = _content_crc(file_path)
+    index.save(file_path)
+    return len(new_rows)
@@ -1,18 +1,117 @@
-"""Manages the recent files functionality."""
+"""Manages the recent files functionality.
 
+Recent files are kept as references to the original images, keyed by path,
+size and modification time, together with a small cached thumbnail. Images
+are only linked or copied into the recent directory when they live on
+removable media that may be ejected before they are reopened.
+"""
+
+import hashlib
+import json
 import os
 import sys
 import shutil
 import time
 from pathlib import Path
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tif', '.tiff')
+
+# Bounding box of cached thumbnails
+THUMBNAIL_SIZE = (160, 160)
+
+# Bytes read from each end of a file for the quick duplicate check
+QUICK_HASH_CHUNK = 64 * 1024
+
+# Linux ioctl that clones a file's extents (reflink) on btrfs/XFS
+FICLONE = 0x40049409
+
+
+def file_fingerprint(filepath: Path) -> str:
+    """Identify a file by its location, size and modification time."""
+    stat = filepath.stat()
+    key = f"{filepath.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def quick_content_hash(filepath: Path) -> str:
+    """Hash of the size and the first and last chunks of a file.
+
+    Cheap even for very large TIFFs; equal quick hashes only mark candidate
+    duplicates, which are confirmed with full_content_hash.
+    """
+    size = filepath.stat().st_size
+    digest = hashlib.sha256(str(size).encode('ascii'))
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(QUICK_HASH_CHUNK))
+        if size > QUICK_HASH_CHUNK:
+            f.seek(max(QUICK_HASH_CHUNK, size - QUICK_HASH_CHUNK))
+            digest.update(f.read(QUICK_HASH_CHUNK))
+    return digest.hexdigest()
+
+
+def full_content_hash(filepath: Path) -> str:
+    """SHA-256 of the whole file."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_removable_media(filepath: Path) -> bool:
+    """Best-effort check whether a file lives on removable media."""
+    try:
+        path = filepath.resolve()
+        if sys.platform == 'win32':
+            import ctypes
+            drive = path.drive + '\\'
+            # DRIVE_REMOVABLE = 2, DRIVE_CDROM = 5
+            return ctypes.windll.kernel32.GetDriveTypeW(drive) in (2, 5)
+        if sys.platform == 'darwin':
+            # External volumes mount under /Volumes; the boot volume links to /
+            parts = path.parts
+            return (len(parts) > 2 and parts[1] == 'Volumes'
+                    and os.path.realpath(os.path.join('/Volumes', parts[2])) != '/')
+        # Linux and others: desktop automounters use these locations
+        return str(path).startswith(('/media/', '/run/media/', '/mnt/'))
+    except Exception as e:
+        logger.debug(f"Could not determine media type for {filepath}: {e}")
+        return False
+
+
+def link_or_copy(src: Path, dest: Path) -> str:
+    """Hardlink, reflink or, failing both, copy src to dest.
+
+    Returns:
+        The method used: 'hardlink', 'reflink' or 'copy'
+    """
+    try:
+        os.link(src, dest)
+        return 'hardlink'
+    except OSError:
+        pass
+    if sys.platform.startswith('linux'):
+        try:
+            import fcntl
+            with open(src, 'rb') as s, open(dest, 'wb') as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            shutil.copystat(src, dest)
+            return 'reflink'
+        except OSError:
+            dest.unlink(missing_ok=True)
+    shutil.copy2(src, dest)
+    return 'copy'
+
+
 class RecentFilesManager:
-    """Manages a list of recently saved files."""
+    """Manages a list of recently opened and saved files."""
+    
+    INDEX_FILENAME = 'recent_index.json'
     
     def __init__(self, recent_dir: str = None, max_files: int = 10):
         """
@@ -65,46 +164,184 @@ class RecentFilesManager:
             self.recent_dir.mkdir(parents=True, exist_ok=True)
             logger.warning(f"Using fallback recent directory: {self.recent_dir}")
         
-    def add_file(self, filepath: str) -> Optional[str]:
+        self.index_path = self.recent_dir / self.INDEX_FILENAME
+        self.thumbnail_dir = self.recent_dir / 'thumbnails'
+        self.store_dir = self.recent_dir / 'store'
+        self._entries: List[Dict] = self._load_index()
+    
+    def _load_index(self) -> List[Dict]:
+        """Load the recent files index, newest first."""
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('entries', [])
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read recent files index, starting a new one: {e}")
+                return []
+        return self._index_legacy_copies()
+    
+    def _index_legacy_copies(self) -> List[Dict]:
+        """Adopt image copies left in the recent directory by earlier versions."""
+        entries = []
+        for path in self.recent_dir.iterdir():
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                try:
+                    stat = path.stat()
+                    entries.append(self._new_entry(path, stored_path=path, last_used=stat.st_mtime))
+                except OSError as e:
+                    logger.error(f"Error indexing legacy recent file {path}: {e}")
+        entries.sort(key=lambda e: e['last_used'], reverse=True)
+        if entries:
+            logger.info(f"Indexed {len(entries)} legacy recent file copies")
+        return entries
+    
+    def _save_index(self):
+        """Write the index atomically."""
+        try:
+            temp_path = self.index_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': self._entries}, f, indent=2)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.error(f"Failed to save recent files index: {e}")
+    
+    def _new_entry(self, path: Path, stored_path: Optional[Path] = None,
+                   last_used: Optional[float] = None) -> Dict:
+        stat = path.stat()
+        fingerprint = file_fingerprint(path)
+        now = time.time()
+        return {
+            'id': fingerprint,
+            'fingerprint': fingerprint,
+            'path': str(path),
+            'name': path.name,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'quick_hash': quick_content_hash(path),
+            'content_hash': None,
+            'stored_path': str(stored_path) if stored_path else None,
+            'thumbnail': None,
+            'added': now,
+            'last_used': last_used if last_used is not None else now,
+        }
+    
+    def _find_duplicate(self, path: Path, size: int, quick_hash: str) -> Optional[Dict]:
+        """Find an entry with the same content as path, hashing fully only on a quick-hash match."""
+        content_hash = None
+        for entry in self._entries:
+            if entry['size'] != size or entry['quick_hash'] != quick_hash:
+                continue
+            source = Path(self._openable_path(entry))
+            if not source.exists():
+                continue
+            if entry.get('content_hash') is None:
+                entry['content_hash'] = full_content_hash(source)
+            if content_hash is None:
+                content_hash = full_content_hash(path)
+            if entry['content_hash'] == content_hash:
+                return entry
+        return None
+    
+    @staticmethod
+    def _openable_path(entry: Dict) -> str:
+        """Path to open for an entry: the stored link/copy if present, else the original."""
+        stored = entry.get('stored_path')
+        if stored and os.path.exists(stored):
+            return stored
+        return entry['path']
+    
+    def _find_entry(self, filepath: str) -> Optional[Dict]:
+        """Find the entry whose original or stored path is filepath."""
+        target = os.path.realpath(filepath)
+        for entry in self._entries:
+            candidates = [entry['path']] + ([entry['stored_path']] if entry.get('stored_path') else [])
+            if target in (os.path.realpath(p) for p in candidates):
+                return entry
+        return None
+    
+    def add_file(self, filepath: str, image=None) -> Optional[str]:
         """
         Add a file to recent files.
         
+        The file is recorded by reference; nothing is copied unless it lives
+        on removable media. Re-adding a file, even after it was edited in
+        place, or the same content under another name, refreshes the
+        existing entry.
+        
         Args:
             filepath: Path to the file to add
+            image: Optional PIL Image of the file, used for the thumbnail
             
         Returns:
-            Path to the copied file in recent directory, or None if copy failed
+            Path to open the file from later, or None if it could not be added
         """
         try:
-            # Use original filename, handling duplicates if needed
-            orig_name = Path(filepath).name
-            dest_path = self.recent_dir / orig_name
+            path = Path(filepath).resolve()
+            fingerprint = file_fingerprint(path)
             
-            # If file exists, add a number to make it unique
-            counter = 1
-            while dest_path.exists():
-                base, ext = os.path.splitext(orig_name)
-                dest_path = self.recent_dir / f"{base}_{counter}{ext}"
-                counter += 1
+            entry = next((e for e in self._entries if e['fingerprint'] == fingerprint), None)
+            if entry is None:
+                entry = self._new_entry(path)
+                edited = next((e for e in self._entries if os.path.realpath(e['path']) == str(path)), None)
+                duplicate = None if edited else self._find_duplicate(path, entry['size'], entry['quick_hash'])
+                if edited is not None:
+                    # Same file, new content: its stored copy and thumbnail are stale
+                    logger.info(f"Recent file {path} has changed")
+                    self._discard_entry_files(edited)
+                    edited.update({key: entry[key] for key in (
+                        'fingerprint', 'size', 'mtime', 'quick_hash', 'content_hash', 'stored_path', 'thumbnail')})
+                    entry = edited
+                elif duplicate is not None:
+                    logger.info(f"{path} has the same content as recent file {duplicate['path']}")
+                    duplicate.update({
+                        'fingerprint': fingerprint,
+                        'path': str(path),
+                        'name': path.name,
+                        'mtime': entry['mtime'],
+                    })
+                    entry = duplicate
+                else:
+                    self._entries.append(entry)
             
-            # Copy the file
-            shutil.copy2(filepath, dest_path)
+            entry['last_used'] = time.time()
             
-            # Set access and modification times to now
-            current_time = time.time()
-            os.utime(dest_path, (current_time, current_time))
+            # Keep a link or copy only if the source may disappear with its media
+            stored = entry.get('stored_path')
+            if is_removable_media(path) and not (stored and os.path.exists(stored)):
+                self.store_dir.mkdir(parents=True, exist_ok=True)
+                dest = self.store_dir / f"{entry['id']}{path.suffix.lower()}"
+                method = link_or_copy(path, dest)
+                entry['stored_path'] = str(dest)
+                logger.info(f"Stored removable-media file {path} in recent files ({method})")
             
-            logger.info(f"Added {filepath} to recent files as {dest_path}")
+            if image is not None:
+                self._write_thumbnail(entry, image)
             
-            # Cleanup old files if needed
+            self._entries.sort(key=lambda e: e['last_used'], reverse=True)
             self._cleanup_old_files()
+            self._save_index()
             
-            return str(dest_path)
+            logger.info(f"Added {filepath} to recent files")
+            return self._openable_path(entry)
             
         except (OSError, shutil.Error) as e:
             logger.error(f"Failed to add file to recent: {e}")
             return None
     
+    def get_recent_entries(self) -> List[Dict]:
+        """
+        Get recent file entries that can still be opened, newest first.
+        
+        Returns:
+            List of entry dictionaries; 'open_path' holds the path to open
+        """
+        entries = []
+        for entry in self._entries:
+            open_path = self._openable_path(entry)
+            if os.path.isfile(open_path):
+                entries.append(dict(entry, open_path=open_path))
+        return entries
+    
     def get_recent_files(self) -> List[str]:
         """
         Get list of recent files, newest first.
@@ -112,93 +349,101 @@ class RecentFilesManager:
         Returns:
             List of paths to recent files
         """
-        try:
-            logger.debug("Starting to get and sort recent files.")
-            
-            # Get all files with their modification times
-            files_with_times = []
-            for f in os.listdir(self.recent_dir):
-                full_path = os.path.join(self.recent_dir, f)
-                if os.path.isfile(full_path):
-                    try:
-                        mtime = os.path.getmtime(full_path)
-                        logger.debug(f"File: {f}, MTime: {datetime.fromtimestamp(mtime)}")
-                        files_with_times.append((full_path, mtime))
-                    except OSError as e:
-                        logger.error(f"Error getting mtime for {f}: {e}")
-                        continue
-            
-            # Sort by modification time, newest first
-            files_with_times.sort(key=lambda x: (-max(os.path.getmtime(x[0]), os.path.getctime(x[0])), x[0]))  # Sort by newest time first
-            logger.debug("Files sorted by modification time (newest first):")
-            for f, mt in files_with_times:
-                logger.debug(f"  {datetime.fromtimestamp(mt)}: {f}")
-            
-            # Return just the file paths
-            return [str(path) for path, _ in files_with_times]
-        except OSError as e:
-            logger.error(f"Failed to list recent files: {e}")
-            return []
+        return [entry['open_path'] for entry in self.get_recent_entries()]
     
-    def _cleanup_old_files(self):
-        """Remove oldest files if we're over the limit.
-        Ensures only the most recent 'max_files' files are kept.
+    def remove_file(self, filepath: str) -> bool:
         """
-        try:
-            logger.debug(f"Starting cleanup of old files (keeping max {self.max_files} files)")
-            
-            # Get all files with their modification times using Path objects
-            files_with_times = []
-            for path in self.recent_dir.iterdir():
-                if path.is_file():
-                    try:
-                        # Get both mtime and ctime to handle copied files
-                        mtime = path.stat().st_mtime
-                        ctime = path.stat().st_ctime
-                        # Use the more recent of mtime and ctime
-                        timestamp = max(mtime, ctime)
-                        logger.debug(f"File: {path.name}, Time: {datetime.fromtimestamp(timestamp)}")
-                        files_with_times.append((path, timestamp))
-                    except (OSError, PermissionError) as e:
-                        logger.error(f"Error accessing file {path}: {e}")
-                        continue
-            
-            # Early exit if we're under the limit
-            if len(files_with_times) <= self.max_files:
-                logger.debug(f"No cleanup needed. Current files: {len(files_with_times)}, Max: {self.max_files}")
-                return
-            
-            # Sort by timestamp, newest first
-            files_with_times.sort(key=lambda x: x[1], reverse=True)
-            
-            # Identify files to remove (everything after max_files)
-            files_to_remove = files_with_times[self.max_files:]
-            
-            # Remove old files
-            for file_path, timestamp in files_to_remove:
-                try:
-                    # Use pathlib's unlink with missing_ok=True to handle race conditions
-                    file_path.unlink(missing_ok=True)
-                    logger.info(f"Removed old recent file: {file_path.name} "
-                             f"(modified: {datetime.fromtimestamp(timestamp)})")
-                except (OSError, PermissionError) as e:
-                    logger.error(f"Failed to remove old file {file_path}: {e}")
-                    # Continue trying to remove other files
-                    continue
+        Remove a file from recent files.
+        
+        Only the reference, its thumbnail and any stored copy are deleted;
+        the original image is never touched.
+        
+        Args:
+            filepath: Original or stored path of the recent file
             
-            # Verify cleanup
-            remaining_files = list(self.recent_dir.iterdir())
-            logger.info(f"Cleanup complete. Remaining files: {len(remaining_files)}")
+        Returns:
+            True if an entry was removed
+        """
+        entry = self._find_entry(filepath)
+        if entry is None:
+            return False
+        self._entries.remove(entry)
+        self._discard_entry_files(entry)
+        self._save_index()
+        return True
+    
+    def get_thumbnail(self, filepath: str) -> Optional[str]:
+        """
+        Get the cached thumbnail for a recent file, creating it on first use.
+        
+        Args:
+            filepath: Original or stored path of the recent file
             
+        Returns:
+            Path to a PNG thumbnail, or None if one could not be made
+        """
+        entry = self._find_entry(filepath)
+        if entry is None:
+            return None
+        thumbnail = entry.get('thumbnail')
+        if thumbnail and (self.thumbnail_dir / thumbnail).exists():
+            return str(self.thumbnail_dir / thumbnail)
+        
+        try:
+            from PIL import Image
+            with Image.open(self._openable_path(entry)) as image:
+                # Lets JPEG decode at reduced size instead of full resolution
+                image.draft('RGB', THUMBNAIL_SIZE)
+                self._write_thumbnail(entry, image)
+            self._save_index()
+            return str(self.thumbnail_dir / entry['thumbnail'])
         except Exception as e:
-            logger.error(f"Error during cleanup of old files: {e}")
-        finally:
-            logger.debug("Cleanup of old files complete.")
-            
-    def __del__(self):
-        """Ensure cleanup is performed when the manager is destroyed."""
+            logger.error(f"Failed to create thumbnail for {filepath}: {e}")
+            return None
+    
+    def _write_thumbnail(self, entry: Dict, image):
+        """Save a small PNG thumbnail of image for entry."""
         try:
-            self._cleanup_old_files()
+            from PIL import Image
+            self.thumbnail_dir.mkdir(parents=True, exist_ok=True)
+            # Resized straight to thumbnail size, never copied at full size
+            scale = min(THUMBNAIL_SIZE[0] / image.width, THUMBNAIL_SIZE[1] / image.height, 1.0)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            thumbnail = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            if thumbnail.mode not in ('RGB', 'RGBA', 'L'):
+                thumbnail = thumbnail.convert('RGB')
+            name = f"{entry['id']}.png"
+            thumbnail.save(self.thumbnail_dir / name, 'PNG')
+            entry['thumbnail'] = name
         except Exception as e:
-            logger.error(f"Error during final cleanup: {e}")
-
+            logger.error(f"Failed to save thumbnail for {entry['path']}: {e}")
+    
+    def _discard_entry_files(self, entry: Dict):
+        """Delete the thumbnail and stored copy belonging to an entry."""
+        paths = []
+        if entry.get('thumbnail'):
+            paths.append(self.thumbnail_dir / entry['thumbnail'])
+        if entry.get('stored_path'):
+            paths.append(Path(entry['stored_path']))
+        for path in paths:
+            # Never delete anything outside the recent directory
+            if self.recent_dir.resolve() not in path.resolve().parents:
+                continue
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Failed to remove {path}: {e}")
+    
+    def _cleanup_old_files(self):
+        """Remove oldest entries if we're over the limit.
+        Ensures only the most recent 'max_files' files are kept.
+        """
+        if len(self._entries) <= self.max_files:
+            logger.debug(f"No cleanup needed. Current files: {len(self._entries)}, Max: {self.max_files}")
+            return
+        
+        for entry in self._entries[self.max_files:]:
+            self._discard_entry_files(entry)
+            logger.info(f"Removed old recent file: {entry['name']} "
+                        f"(last used: {datetime.fromtimestamp(entry['last_used'])})")
+        del self._entries[self.max_files:]
@@ -6,13 +6,17 @@ Analyze how RGB channels respond across the visible light spectrum.
 
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import List, Tuple, Dict, Optional
+from collections.abc import Sequence
+from typing import List, Tuple, Dict, Iterator, Optional, TextIO
 from dataclasses import dataclass
 import sqlite3
 from PIL import Image
 
 from .color_analyzer import ColorAnalyzer, ColorMeasurement, PrintType
 
+# Shared wavelength grid (nm) for every illuminant SPD and RGB response curve
+WAVELENGTHS = np.arange(380, 751, 5)
+
 @dataclass
 class SpectralMeasurement:
     """Represents spectral analysis data for a color sample."""
@@ -22,13 +26,64 @@ class SpectralMeasurement:
     sample_id: str
     illuminant: str = "D65"  # Standard daylight
 
+@dataclass
+class SpectralResponse(Sequence):
+    """Spectral analysis of a set of samples under one illuminant, held as arrays.
+    
+    Behaves as a flat sequence of SpectralMeasurement (sample-major, then
+    wavelength), but the views are only created when indexed or iterated.
+    """
+    wavelengths: np.ndarray        # (W,)
+    rgb_response: np.ndarray       # (N, W, 3)
+    relative_response: np.ndarray  # (N, W, 3)
+    sample_ids: List[str]
+    illuminant: str = "D65"
+    
+    @property
+    def sample_count(self) -> int:
+        return self.rgb_response.shape[0]
+    
+    def __len__(self) -> int:
+        return self.rgb_response.shape[0] * self.rgb_response.shape[1]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("spectral measurement index out of range")
+        sample, wl = divmod(index, len(self.wavelengths))
+        return self._view(sample, wl)
+    
+    def __iter__(self) -> Iterator[SpectralMeasurement]:
+        for sample in range(self.sample_count):
+            for wl in range(len(self.wavelengths)):
+                yield self._view(sample, wl)
+    
+    def _view(self, sample: int, wl: int) -> SpectralMeasurement:
+        return SpectralMeasurement(
+            wavelength=float(self.wavelengths[wl]),
+            rgb_response=tuple(self.rgb_response[sample, wl].tolist()),
+            relative_response=tuple(self.relative_response[sample, wl].tolist()),
+            sample_id=self.sample_ids[sample],
+            illuminant=self.illuminant
+        )
+    
+    def peak_wavelengths(self, sample: int = 0) -> Tuple[float, float, float]:
+        """Wavelength of the strongest R, G and B response for one sample."""
+        peaks = np.argmax(self.rgb_response[sample], axis=0)
+        return tuple(float(self.wavelengths[i]) for i in peaks)
+
 class SpectralAnalyzer:
     """Analyze spectral response characteristics of color samples."""
     
     def __init__(self):
         self.color_analyzer = ColorAnalyzer()
+        self.wavelengths = WAVELENGTHS
         
-        # Standard illuminant spectral power distributions (simplified)
+        # Standard illuminant spectral power distributions (simplified),
+        # each aligned with self.wavelengths
         self.illuminants = {
             'D65': self._generate_d65_spd(),      # Daylight 6500K
             'A': self._generate_illuminant_a(),   # Incandescent 2856K
@@ -36,95 +91,65 @@ class SpectralAnalyzer:
             'LED': self._generate_led_spd()       # Modern LED
         }
         
-        # RGB sensor response curves (approximate sRGB primaries)
+        # RGB sensor response curves (approximate sRGB primaries), (W, 3)
         self.rgb_responses = self._generate_rgb_responses()
     
-    def _generate_d65_spd(self) -> Dict[float, float]:
+    def _generate_d65_spd(self) -> np.ndarray:
         """Generate D65 standard illuminant spectral power distribution."""
-        wavelengths = np.arange(380, 751, 5)
+        wl = self.wavelengths
         # Simplified D65 - actual would use CIE standard
-        spd = {}
-        for wl in wavelengths:
-            if wl < 400:
-                power = 0.3 + 0.7 * (wl - 380) / 20
-            elif wl < 500:
-                power = 1.0
-            elif wl < 600:
-                power = 1.1 - 0.1 * (wl - 500) / 100
-            else:
-                power = 1.0 - 0.2 * (wl - 600) / 100
-            spd[wl] = max(0.1, power)
-        return spd
-    
-    def _generate_illuminant_a(self) -> Dict[float, float]:
+        power = np.select(
+            [wl < 400, wl < 500, wl < 600],
+            [0.3 + 0.7 * (wl - 380) / 20, 1.0, 1.1 - 0.1 * (wl - 500) / 100],
+            1.0 - 0.2 * (wl - 600) / 100
+        )
+        return np.maximum(0.1, power)
+    
+    def _generate_illuminant_a(self) -> np.ndarray:
         """Generate Illuminant A (incandescent) SPD."""
-        wavelengths = np.arange(380, 751, 5)
-        spd = {}
-        for wl in wavelengths:
-            # Planckian radiator at 2856K (simplified)
-            power = (wl / 560) ** -1.5  # Reddish bias
-            spd[wl] = power
-        return spd
-    
-    def _generate_f2_spd(self) -> Dict[float, float]:
+        # Planckian radiator at 2856K (simplified)
+        return (self.wavelengths / 560) ** -1.5  # Reddish bias
+    
+    def _generate_f2_spd(self) -> np.ndarray:
         """Generate F2 fluorescent SPD with mercury peaks."""
-        wavelengths = np.arange(380, 751, 5)
-        spd = {}
-        mercury_peaks = [405, 436, 546, 578]  # Mercury emission lines
+        wl = self.wavelengths
+        mercury_peaks = np.array([405, 436, 546, 578])  # Mercury emission lines
         
-        for wl in wavelengths:
-            # Base fluorescent continuum
-            base = 0.5 + 0.3 * np.sin((wl - 380) * np.pi / 320)
-            
-            # Add mercury peaks
-            peak_contribution = 0
-            for peak in mercury_peaks:
-                if abs(wl - peak) < 10:
-                    peak_contribution += 2.0 * np.exp(-((wl - peak) / 5) ** 2)
-            
-            spd[wl] = base + peak_contribution
-        return spd
+        # Base fluorescent continuum
+        base = 0.5 + 0.3 * np.sin((wl - 380) * np.pi / 320)
+        
+        # Add mercury peaks within 10nm of each line
+        offset = wl[:, None] - mercury_peaks[None, :]
+        peaks = np.where(np.abs(offset) < 10, 2.0 * np.exp(-(offset / 5) ** 2), 0.0)
+        return base + peaks.sum(axis=1)
     
-    def _generate_led_spd(self) -> Dict[float, float]:
+    def _generate_led_spd(self) -> np.ndarray:
         """Generate modern LED SPD (blue peak + phosphor)."""
-        wavelengths = np.arange(380, 751, 5)
-        spd = {}
-        for wl in wavelengths:
-            # Blue LED peak around 450nm
-            blue_peak = 3.0 * np.exp(-((wl - 450) / 20) ** 2)
-            
-            # Phosphor broad emission 500-700nm
-            if wl > 480:
-                phosphor = 0.8 * (1 - np.exp(-(wl - 480) / 60)) * np.exp(-(wl - 550) / 100)
-            else:
-                phosphor = 0
-            
-            spd[wl] = blue_peak + phosphor
-        return spd
+        wl = self.wavelengths
+        # Blue LED peak around 450nm
+        blue_peak = 3.0 * np.exp(-((wl - 450) / 20) ** 2)
+        
+        # Phosphor broad emission 500-700nm
+        phosphor = np.where(
+            wl > 480,
+            0.8 * (1 - np.exp(-(wl - 480) / 60)) * np.exp(-(wl - 550) / 100),
+            0.0
+        )
+        return blue_peak + phosphor
     
-    def _generate_rgb_responses(self) -> Dict[str, Dict[float, float]]:
-        """Generate RGB sensor response curves."""
-        wavelengths = np.arange(380, 751, 5)
-        responses = {'R': {}, 'G': {}, 'B': {}}
-        
-        for wl in wavelengths:
-            # Red response (peak ~600nm)
-            r_response = np.exp(-((wl - 600) / 80) ** 2) if wl > 500 else 0
-            
-            # Green response (peak ~550nm)
-            g_response = np.exp(-((wl - 550) / 60) ** 2)
-            
-            # Blue response (peak ~450nm)
-            b_response = np.exp(-((wl - 450) / 50) ** 2) if wl < 550 else 0
-            
-            responses['R'][wl] = r_response
-            responses['G'][wl] = g_response
-            responses['B'][wl] = b_response
-        
-        return responses
+    def _generate_rgb_responses(self) -> np.ndarray:
+        """Generate RGB sensor response curves as a (wavelengths, 3) array."""
+        wl = self.wavelengths
+        # Red response (peak ~600nm)
+        r_response = np.where(wl > 500, np.exp(-((wl - 600) / 80) ** 2), 0.0)
+        # Green response (peak ~550nm)
+        g_response = np.exp(-((wl - 550) / 60) ** 2)
+        # Blue response (peak ~450nm)
+        b_response = np.where(wl < 550, np.exp(-((wl - 450) / 50) ** 2), 0.0)
+        return np.stack([r_response, g_response, b_response], axis=1)
     
     def analyze_spectral_response(self, measurements: List[ColorMeasurement], 
-                                illuminant: str = 'D65') -> List[SpectralMeasurement]:
+                                illuminant: str = 'D65') -> SpectralResponse:
         """
         Analyze spectral response characteristics of color measurements.
         
@@ -133,41 +158,26 @@ class SpectralAnalyzer:
             illuminant: Illuminant type for analysis
             
         Returns:
-            List of SpectralMeasurement objects
+            SpectralResponse, a sequence of SpectralMeasurement views over
+            (samples x wavelengths x channels) arrays
         """
         if illuminant not in self.illuminants:
             raise ValueError(f"Unknown illuminant: {illuminant}")
         
-        spectral_data = []
-        spd = self.illuminants[illuminant]
+        # Estimate spectral characteristics from RGB ratios for all samples at once
+        rgb = np.array([m.rgb for m in measurements], dtype=float).reshape(-1, 3) / 255.0
+        rgb_response = rgb[:, None, :] * self.rgb_responses[None, :, :]
         
-        for i, measurement in enumerate(measurements):
-            # Convert RGB to relative spectral response
-            r, g, b = measurement.rgb
-            
-            # Estimate spectral characteristics based on RGB ratios
-            for wavelength in sorted(spd.keys()):
-                # Calculate relative response at this wavelength
-                r_resp = self.rgb_responses['R'].get(wavelength, 0) * (r / 255.0)
-                g_resp = self.rgb_responses['G'].get(wavelength, 0) * (g / 255.0)
-                b_resp = self.rgb_responses['B'].get(wavelength, 0) * (b / 255.0)
-                
-                rgb_response = (r_resp, g_resp, b_resp)
-                
-                # Normalize to illuminant power
-                illuminant_power = spd[wavelength]
-                relative_response = tuple(resp / illuminant_power for resp in rgb_response)
-                
-                spectral_measurement = SpectralMeasurement(
-                    wavelength=wavelength,
-                    rgb_response=rgb_response,
-                    relative_response=relative_response,
-                    sample_id=f"sample_{i+1}",
-                    illuminant=illuminant
-                )
-                spectral_data.append(spectral_measurement)
+        # Normalize to illuminant power
+        relative_response = rgb_response / self.illuminants[illuminant][None, :, None]
         
-        return spectral_data
+        return SpectralResponse(
+            wavelengths=self.wavelengths,
+            rgb_response=rgb_response,
+            relative_response=relative_response,
+            sample_ids=[f"sample_{i+1}" for i in range(len(measurements))],
+            illuminant=illuminant
+        )
     
     def plot_spectral_response(self, spectral_data: List[SpectralMeasurement], 
                              sample_ids: Optional[List[str]] = None, 
@@ -189,23 +199,26 @@ class SpectralAnalyzer:
             return
         
         # Group data by sample
-        sample_data = {}
-        for measurement in spectral_data:
-            if sample_ids and measurement.sample_id not in sample_ids:
-                continue
-            
-            if measurement.sample_id not in sample_data:
-                sample_data[measurement.sample_id] = {
-                    'wavelengths': [],
-                    'r_response': [],
-                    'g_response': [],
-                    'b_response': []
-                }
-            
-            sample_data[measurement.sample_id]['wavelengths'].append(measurement.wavelength)
-            sample_data[measurement.sample_id]['r_response'].append(measurement.relative_response[0])
-            sample_data[measurement.sample_id]['g_response'].append(measurement.relative_response[1])
-            sample_data[measurement.sample_id]['b_response'].append(measurement.relative_response[2])
+        if isinstance(spectral_data, SpectralResponse):
+            sample_data = self._curves_by_sample(spectral_data, sample_ids)
+        else:
+            sample_data = {}
+            for measurement in spectral_data:
+                if sample_ids and measurement.sample_id not in sample_ids:
+                    continue
+                
+                if measurement.sample_id not in sample_data:
+                    sample_data[measurement.sample_id] = {
+                        'wavelengths': [],
+                        'r_response': [],
+                        'g_response': [],
+                        'b_response': []
+                    }
+                
+                sample_data[measurement.sample_id]['wavelengths'].append(measurement.wavelength)
+                sample_data[measurement.sample_id]['r_response'].append(measurement.relative_response[0])
+                sample_data[measurement.sample_id]['g_response'].append(measurement.relative_response[1])
+                sample_data[measurement.sample_id]['b_response'].append(measurement.relative_response[2])
         
         # Limit number of samples for readability
         original_sample_count = len(sample_data)
@@ -392,6 +405,23 @@ class SpectralAnalyzer:
         
         plt.show()
     
+    @staticmethod
+    def _curves_by_sample(spectral_data: SpectralResponse, sample_ids: Optional[List[str]] = None) -> Dict:
+        """Per-sample wavelength and relative response curves, straight from the arrays."""
+        wavelengths = spectral_data.wavelengths.tolist()
+        sample_data = {}
+        for index, sample_id in enumerate(spectral_data.sample_ids):
+            if sample_ids and sample_id not in sample_ids:
+                continue
+            relative = spectral_data.relative_response[index]
+            sample_data[sample_id] = {
+                'wavelengths': wavelengths,
+                'r_response': relative[:, 0].tolist(),
+                'g_response': relative[:, 1].tolist(),
+                'b_response': relative[:, 2].tolist()
+            }
+        return sample_data
+    
     def _create_individual_plot(self, sample_data: Dict, plot_type: str, total_samples: int, with_labels: bool = False) -> None:
         """Create an individual pop-out plot window.
         
@@ -679,6 +709,24 @@ class SpectralAnalyzer:
         print(f"Opened labeled multi-plot with {len(sample_data)} samples")
         print("Click buttons to pop out individual labeled plots")
     
+    # Illuminants compared by calculate_metamerism_index
+    METAMERISM_ILLUMINANTS = ('D65', 'A', 'F2')
+    
+    # Per-channel XYZ scaling used to approximate each illuminant (very approximate).
+    # Illuminants without an entry are scaled by their white point; see _xyz_scale.
+    XYZ_ILLUMINANT_SCALE = {
+        'D65': (1.0, 1.0, 1.0),   # sRGB reference white
+        'A': (1.1, 1.0, 0.8),     # Warmer
+        'F2': (0.95, 1.0, 1.05),  # Fluorescent has spiky spectrum
+    }
+    
+    # Standard sRGB to XYZ matrix (would need chromatic adaptation for other illuminants)
+    SRGB_TO_XYZ = np.array([
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ])
+    
     def calculate_metamerism_index(self, measurement1: ColorMeasurement,
                                  measurement2: ColorMeasurement) -> float:
         """
@@ -694,7 +742,7 @@ class SpectralAnalyzer:
         # Convert to XYZ for multiple illuminants
         metameric_differences = []
         
-        for illuminant in ['D65', 'A', 'F2']:
+        for illuminant in self.METAMERISM_ILLUMINANTS:
             # This is a simplified calculation - would need full spectral data for accuracy
             xyz1 = self._rgb_to_xyz(measurement1.rgb, illuminant)
             xyz2 = self._rgb_to_xyz(measurement2.rgb, illuminant)
@@ -707,24 +755,128 @@ class SpectralAnalyzer:
         return np.std(metameric_differences)
     
     def _rgb_to_xyz(self, rgb: Tuple[float, float, float], illuminant: str) -> Tuple[float, float, float]:
-        """Convert RGB to XYZ under specified illuminant (simplified)."""
-        r, g, b = [c / 255.0 for c in rgb]
+        """Convert RGB to XYZ under specified illuminant (simplified).
+        
+        Raises:
+            ValueError: If the illuminant is not in self.illuminants
+        """
+        return tuple(self._xyz_stack([rgb], (illuminant,))[0, 0].tolist())
+    
+    def _xyz_scale(self, illuminant: str) -> np.ndarray:
+        """Per-channel XYZ scaling approximating an illuminant (very approximate).
+        
+        Illuminants without a XYZ_ILLUMINANT_SCALE entry are scaled by their
+        white point, as the RGB sensor sees their SPD, relative to D65 with
+        luminance kept.
+        
+        Raises:
+            ValueError: If the illuminant is not in self.illuminants
+        """
+        if illuminant not in self.illuminants:
+            raise ValueError(f"Unknown illuminant: {illuminant}")
+        if illuminant in self.XYZ_ILLUMINANT_SCALE:
+            return np.array(self.XYZ_ILLUMINANT_SCALE[illuminant])
+        white = self.SRGB_TO_XYZ @ (self.illuminants[illuminant] @ self.rgb_responses)
+        reference = self.SRGB_TO_XYZ @ (self.illuminants['D65'] @ self.rgb_responses)
+        scale = white / reference
+        return scale / scale[1]
+    
+    def _xyz_stack(self, colors: List, illuminants: Tuple[str, ...]) -> np.ndarray:
+        """XYZ of every color under every illuminant, shape (illuminants, colors, 3).
+        
+        Args:
+            colors: Color measurements, or RGB tuples
+            illuminants: Names from self.illuminants
+        
+        Raises:
+            ValueError: If an illuminant is not in self.illuminants
+        """
+        scales = np.array([self._xyz_scale(i) for i in illuminants])
+        rgb = np.array([getattr(c, 'rgb', c) for c in colors], dtype=float).reshape(-1, 3) / 255.0
+        xyz = rgb @ self.SRGB_TO_XYZ.T
+        return xyz[None, :, :] * scales[:, None, :] * 100
+    
+    def _metamerism_rows(self, xyz: np.ndarray, start: int, stop: int, first_column: int = 0) -> np.ndarray:
+        """Metamerism index of samples start:stop against samples first_column onwards."""
+        # (illuminants, rows, columns) color differences in XYZ space
+        diff = np.sqrt(((xyz[:, start:stop, None, :] - xyz[:, None, first_column:, :]) ** 2).sum(axis=-1))
+        return diff.std(axis=0)
+    
+    def calculate_metamerism_matrix(self, measurements: List[ColorMeasurement],
+                                    illuminants: Optional[List[str]] = None,
+                                    chunk_size: int = 256) -> np.ndarray:
+        """
+        Metamerism index between every pair of measurements.
         
-        # Standard sRGB to XYZ matrix (would need chromatic adaptation for other illuminants)
-        x = 0.4124564 * r + 0.3575761 * g + 0.1804375 * b
-        y = 0.2126729 * r + 0.7151522 * g + 0.0721750 * b
-        z = 0.0193339 * r + 0.1191920 * g + 0.9503041 * b
+        Entry [i, j] equals calculate_metamerism_index(measurements[i], measurements[j])
+        when the default illuminants are used.
         
-        # Simple illuminant scaling (very approximate)
-        if illuminant == 'A':
-            x *= 1.1  # Warmer
-            z *= 0.8
-        elif illuminant == 'F2':
-            # Fluorescent has spiky spectrum
-            x *= 0.95
-            z *= 1.05
+        Args:
+            measurements: Color measurements to compare
+            illuminants: Subset of self.illuminants to compare under (default D65, A, F2)
+            chunk_size: Rows computed at once, bounding temporary memory
+            
+        Returns:
+            Symmetric (N, N) array of metamerism indices
+            
+        Raises:
+            ValueError: If an illuminant is not in self.illuminants
+        """
+        xyz = self._xyz_stack(measurements, tuple(illuminants or self.METAMERISM_ILLUMINANTS))
+        count = xyz.shape[1]
+        matrix = np.empty((count, count))
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            matrix[start:stop] = self._metamerism_rows(xyz, start, stop)
+        return matrix
+    
+    def find_metameric_pairs(self, measurements: List[ColorMeasurement], top_n: int = 10,
+                             illuminants: Optional[List[str]] = None,
+                             chunk_size: int = 256) -> List[Tuple[int, int, float]]:
+        """
+        Find the most metameric pairs in a set of measurements.
+        
+        The full matrix is never held in memory; each chunk of rows keeps only
+        its best candidates.
         
-        return (x * 100, y * 100, z * 100)
+        Args:
+            measurements: Color measurements to compare
+            top_n: Number of pairs to return
+            illuminants: Subset of self.illuminants to compare under (default D65, A, F2)
+            chunk_size: Rows computed at once, bounding temporary memory
+            
+        Returns:
+            (index1, index2, metamerism index) tuples with index1 < index2,
+            highest metamerism first
+            
+        Raises:
+            ValueError: If an illuminant is not in self.illuminants
+        """
+        xyz = self._xyz_stack(measurements, tuple(illuminants or self.METAMERISM_ILLUMINANTS))
+        count = xyz.shape[1]
+        if top_n <= 0 or count < 2:
+            return []
+        
+        best_values = np.empty(0)
+        best_pairs = np.empty((0, 2), dtype=np.int64)
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            # Pairs with j < start were covered by earlier chunks
+            rows = self._metamerism_rows(xyz, start, stop, first_column=start)
+            # Keep each pair once (j > i)
+            rows[np.arange(start, count)[None, :] <= np.arange(start, stop)[:, None]] = -np.inf
+            flat = rows.ravel()
+            keep = np.argpartition(flat, -top_n)[-top_n:] if flat.size > top_n else np.arange(flat.size)
+            keep = keep[np.isfinite(flat[keep])]
+            row_idx, col_idx = np.divmod(keep, count - start)
+            best_values = np.concatenate([best_values, flat[keep]])
+            best_pairs = np.concatenate([best_pairs, np.stack([row_idx + start, col_idx + start], axis=1)])
+            if len(best_values) > top_n:
+                keep = np.argpartition(best_values, -top_n)[-top_n:]
+                best_values, best_pairs = best_values[keep], best_pairs[keep]
+        
+        order = np.lexsort((best_pairs[:, 1], best_pairs[:, 0], -best_values))
+        return [(int(best_pairs[k, 0]), int(best_pairs[k, 1]), float(best_values[k])) for k in order]
     
     def analyze_wavelength_deviation(self, measurements: List[ColorMeasurement]) -> Dict[str, List[float]]:
         """
@@ -821,24 +973,28 @@ class SpectralAnalyzer:
             print(f"Error exporting spectral analysis: {e}")
             return False
 
-def analyze_spectral_deviation_from_measurements(measurements: List[ColorMeasurement]) -> None:
+def analyze_spectral_deviation_from_measurements(measurements: List[ColorMeasurement], out: Optional[TextIO] = None) -> None:
     """
     Quick analysis function to examine channel deviation across color samples.
     This directly addresses your question about RGB channel behavior across the spectrum.
+    
+    Args:
+        measurements: Color measurements to analyze
+        out: Stream to write the report to (defaults to stdout)
     """
     analyzer = SpectralAnalyzer()
     
-    print("=== SPECTRAL DEVIATION ANALYSIS ===")
-    print("Analyzing how RGB channels deviate across wavelength ranges...")
-    print()
+    print("=== SPECTRAL DEVIATION ANALYSIS ===", file=out)
+    print("Analyzing how RGB channels deviate across wavelength ranges...", file=out)
+    print(file=out)
     
     # Analyze wavelength-based deviations
     deviation_data = analyzer.analyze_wavelength_deviation(measurements)
     
-    print("Channel Deviation by Wavelength Range:")
-    print("=" * 50)
-    print(f"{'Range':<10} {'R-G Dev':<10} {'R-B Dev':<10} {'G-B Dev':<10} {'Total Dev':<10}")
-    print("-" * 50)
+    print("Channel Deviation by Wavelength Range:", file=out)
+    print("=" * 50, file=out)
+    print(f"{'Range':<10} {'R-G Dev':<10} {'R-B Dev':<10} {'G-B Dev':<10} {'Total Dev':<10}", file=out)
+    print("-" * 50, file=out)
     
     for i, range_name in enumerate(deviation_data['wavelength_range']):
         rg_dev = deviation_data['rg_deviation'][i]
@@ -846,13 +1002,13 @@ def analyze_spectral_deviation_from_measurements(measurements: List[ColorMeasure
         gb_dev = deviation_data['gb_deviation'][i]
         total_dev = deviation_data['total_deviation'][i]
         
-        print(f"{range_name:<10} {rg_dev:<10.3f} {rb_dev:<10.3f} {gb_dev:<10.3f} {total_dev:<10.3f}")
+        print(f"{range_name:<10} {rg_dev:<10.3f} {rb_dev:<10.3f} {gb_dev:<10.3f} {total_dev:<10.3f}", file=out)
     
-    print("\nInterpretation:")
-    print("- Higher values indicate greater channel deviation")
-    print("- R-G Dev: Red-Green channel difference")
-    print("- R-B Dev: Red-Blue channel difference")  
-    print("- G-B Dev: Green-Blue channel difference")
-    print("- Total Dev: Overall RGB channel spread")
-    print("\nThis analysis reveals how color channels behave differently")
-    print("across the visible spectrum for your stamp samples!")
+    print("\nInterpretation:", file=out)
+    print("- Higher values indicate greater channel deviation", file=out)
+    print("- R-G Dev: Red-Green channel difference", file=out)
+    print("- R-B Dev: Red-Blue channel difference", file=out)
+    print("- G-B Dev: Green-Blue channel difference", file=out)
+    print("- Total Dev: Overall RGB channel spread", file=out)
+    print("\nThis analysis reveals how color channels behave differently", file=out)
+    print("across the visible spectrum for your stamp samples!", file=out)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Startup import-time diagnostics for StampZ
+Runs a module import under ``python -X importtime`` in a fresh interpreter
+and summarizes which imports dominate startup.
+
+Usage:
+    python -m utils.startup_profile [--module main] [--top 20] [--budget 1.0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Modules that must not be imported while the main window starts up;
+# each is loaded on first use of the feature that needs it
+DEFERRED_MODULES = ('numpy', 'pandas', 'matplotlib', 'sklearn', 'seaborn', 'odf', 'ezodf', 'colorspacious')
+
+# Default budget in seconds for importing the main module
+DEFAULT_BUDGET = 1.0
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportTiming:
+    """One line of ``-X importtime`` output."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    """Result of profiling one module import."""
+    module: str
+    timings: List[ImportTiming]
+    loaded_modules: List[str]
+
+    @property
+    def total_seconds(self) -> float:
+        """Cumulative import time of the profiled module."""
+        for timing in self.timings:
+            if timing.module == self.module and timing.depth == 0:
+                return timing.cumulative_us / 1e6
+        return sum(t.self_us for t in self.timings) / 1e6
+
+    def top(self, count: int = 20, by: str = 'cumulative') -> List[ImportTiming]:
+        """Slowest imports, by cumulative or self time."""
+        key = (lambda t: t.cumulative_us) if by == 'cumulative' else (lambda t: t.self_us)
+        return sorted(self.timings, key=key, reverse=True)[:count]
+
+    def loaded_deferred_modules(self) -> List[str]:
+        """Heavy modules that were imported even though they should be deferred."""
+        return [name for name in DEFERRED_MODULES if name in self.loaded_modules]
+
+    def format_report(self, count: int = 20) -> str:
+        """Human-readable summary of the slowest imports."""
+        lines = [f"Import of '{self.module}' took {self.total_seconds:.3f}s", ""]
+        lines.append(f"{'cumulative':>12} {'self':>10}  module")
+        for timing in self.top(count):
+            indent = "  " * timing.depth
+            lines.append(f"{timing.cumulative_us / 1000:>10.1f}ms {timing.self_us / 1000:>8.1f}ms  {indent}{timing.module}")
+        deferred = self.loaded_deferred_modules()
+        if deferred:
+            lines.append("")
+            lines.append(f"Heavy modules imported at startup: {', '.join(deferred)}")
+        return "\n".join(lines)
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse the stderr produced by ``python -X importtime``."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(ImportTiming(
+            module=stripped,
+            self_us=int(parts[0]),
+            cumulative_us=int(parts[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return timings
+
+
+def profile_import(module: str = 'main', python: Optional[str] = None) -> StartupProfile:
+    """Import module in a fresh interpreter with ``-X importtime``.
+
+    Args:
+        module: Module to import, relative to the project root
+        python: Interpreter to use (defaults to the running one)
+
+    Returns:
+        StartupProfile with per-module timings and the set of loaded modules
+    """
+    code = f"import sys, {module}; print('\\n'.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return StartupProfile(
+        module=module,
+        timings=parse_importtime(result.stderr),
+        loaded_modules=sorted({name.split('.')[0] for name in result.stdout.split()}),
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize StampZ startup import time")
+    parser.add_argument('--module', default='main', help="Module to import (default: main)")
+    parser.add_argument('--top', type=int, default=20, help="Number of imports to list")
+    parser.add_argument('--budget', type=float, default=None,
+                        help="Fail if the import takes longer than this many seconds")
+    args = parser.parse_args(argv)
+
+    profile = profile_import(args.module)
+    print(profile.format_report(args.top))
+
+    if args.budget is not None and profile.total_seconds > args.budget:
+        print(f"\nOver budget: {profile.total_seconds:.3f}s > {args.budget:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
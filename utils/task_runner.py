@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Background task runner for StampZ
+Runs long operations (analysis, exports, imports) off the Tk main thread.
+Progress, completion and errors are delivered back on the main thread by
+polling a queue with root.after, so callbacks may safely touch widgets.
+"""
+
+import itertools
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from typing import Any, Callable, Dict, List, Optional
+
+from .action_profiler import current_run, end_current_profile, run_profiled
+
+
+class TaskCancelled(BaseException):
+    """Raised inside a task when the user cancels it.
+
+    Derives from BaseException (like asyncio.CancelledError) so that the broad
+    ``except Exception`` handlers used throughout the analysis and export code
+    do not swallow the cancellation.
+    """
+
+
+class BackgroundTask:
+    """Handle for a submitted task.
+
+    Thread tasks receive their handle as the first argument and use it to
+    report progress and check for cancellation.
+    """
+
+    PENDING = "Pending"
+    RUNNING = "Running"
+    DONE = "Done"
+    FAILED = "Failed"
+    CANCELLED = "Cancelled"
+
+    def __init__(self, task_id: int, name: str, runner: 'TaskRunner'):
+        self.id = task_id
+        self.name = name
+        self.status = self.PENDING
+        self.progress: Optional[float] = None   # 0.0-1.0, None if unknown
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.error_traceback = ""
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._runner = runner
+        self._cancel_event = threading.Event()
+        self._future = None
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancellation has been requested."""
+        return self._cancel_event.is_set()
+
+    @property
+    def active(self) -> bool:
+        """True while the task is waiting or running."""
+        return self.status in (self.PENDING, self.RUNNING)
+
+    def cancel(self):
+        """Request cancellation.
+
+        Tasks that have not started are dropped from the queue. Running thread
+        tasks stop at their next report_progress() or check_cancelled() call.
+        """
+        self._cancel_event.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if cancellation has been requested."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, fraction: Optional[float] = None, message: Optional[str] = None):
+        """Report progress from the worker; safe to call from any thread.
+
+        Also acts as a cancellation point.
+
+        Args:
+            fraction: Completed fraction 0.0-1.0, or None to leave unchanged
+            message: Short status text, or None to leave unchanged
+        """
+        self.check_cancelled()
+        self._runner._post(self, 'progress', (fraction, message))
+
+
+class TaskRunner:
+    """Runs callables on a thread or process pool and reports back to Tk."""
+
+    def __init__(self, root, max_workers: int = 2, poll_interval: int = 50,
+                 history_size: int = 50):
+        """Initialize the task runner.
+
+        Args:
+            root: Tk widget whose event loop receives callbacks
+            max_workers: Size of the thread pool (and process pool, if used)
+            poll_interval: Milliseconds between checks for worker events
+            history_size: Number of finished tasks kept for the task panel
+        """
+        self.root = root
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.history_size = history_size
+
+        self._thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stampz-task")
+        self._process_pool = None
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._tasks: List[BackgroundTask] = []
+        self._callbacks: Dict[int, Dict[str, Optional[Callable]]] = {}
+        self._listeners: List[Callable[[BackgroundTask], None]] = []
+        self._poll_id = None
+
+    @property
+    def tasks(self) -> List[BackgroundTask]:
+        """Active tasks and recent history, oldest first."""
+        return list(self._tasks)
+
+    @property
+    def active_tasks(self) -> List[BackgroundTask]:
+        """Tasks that are waiting or running."""
+        return [task for task in self._tasks if task.active]
+
+    def submit(self, name: str, func: Callable, *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               on_progress: Optional[Callable[[Optional[float], str], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None,
+               use_process: bool = False, **kwargs) -> BackgroundTask:
+        """Run func in the background.
+
+        Thread tasks are called as ``func(task, *args, **kwargs)``. Process tasks
+        are called as ``func(*args, **kwargs)``; func and its arguments must be
+        picklable, and they cannot report progress.
+
+        All callbacks run on the Tk main thread.
+
+        Args:
+            name: Label shown in the task panel
+            func: Callable to run
+            on_success: Called with the return value
+            on_error: Called with the exception if func raised
+            on_progress: Called with (fraction, message) on each progress report
+            on_cancel: Called if the task was cancelled
+            use_process: Run in a separate process (CPU-bound, GIL-heavy work)
+
+        Returns:
+            BackgroundTask handle
+        """
+        task = BackgroundTask(next(self._ids), name, self)
+        self._callbacks[task.id] = {
+            'success': on_success, 'error': on_error,
+            'progress': on_progress, 'cancel': on_cancel,
+        }
+        self._tasks.append(task)
+        self._trim_history()
+
+        if use_process:
+            if self._process_pool is None:
+                # Imported here; the process machinery is slow to import and rarely used
+                from concurrent.futures import ProcessPoolExecutor
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            task.status = BackgroundTask.RUNNING
+            task.started_at = time.time()
+            future = self._process_pool.submit(func, *args, **kwargs)
+        else:
+            # Work started by a profiled GUI action is profiled in the worker
+            # instead; the action's own profile ends here
+            profile_label = current_run()
+            if profile_label:
+                end_current_profile()
+            future = self._thread_pool.submit(self._run_in_thread, task, func, args, kwargs, profile_label)
+
+        task._future = future
+        future.add_done_callback(lambda f, t=task: self._post(t, 'finished', f))
+
+        self._notify(task)
+        self._ensure_polling()
+        return task
+
+    def _run_in_thread(self, task: BackgroundTask, func: Callable, args, kwargs,
+                       profile_label: Optional[str] = None):
+        """Worker-thread wrapper that records the start of a thread task."""
+        task.check_cancelled()
+        self._post(task, 'started', None)
+        if profile_label:
+            return run_profiled(f"{profile_label}_task", func, task, *args, **kwargs)
+        return func(task, *args, **kwargs)
+
+    def _post(self, task: BackgroundTask, kind: str, payload):
+        """Queue an event for delivery on the main thread."""
+        self._events.put((task, kind, payload))
+
+    def _ensure_polling(self):
+        """Start the main-thread poll loop if it is not already running."""
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Deliver queued worker events on the main thread."""
+        self._poll_id = None
+        while True:
+            try:
+                task, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._dispatch(task, kind, payload)
+            except Exception as e:
+                print(f"Error in background task callback for '{task.name}': {e}")
+                traceback.print_exc()
+
+        # Keep polling only while something can still produce events
+        if self.active_tasks or not self._events.empty():
+            self._ensure_polling()
+
+    def _dispatch(self, task: BackgroundTask, kind: str, payload):
+        """Apply one worker event to the task and invoke its callbacks."""
+        callbacks = self._callbacks.get(task.id, {})
+
+        if kind == 'started':
+            task.status = BackgroundTask.RUNNING
+            task.started_at = time.time()
+
+        elif kind == 'progress':
+            fraction, message = payload
+            if fraction is not None:
+                task.progress = max(0.0, min(1.0, fraction))
+            if message is not None:
+                task.message = message
+            if callbacks.get('progress'):
+                callbacks['progress'](task.progress, task.message)
+
+        elif kind == 'finished':
+            task.finished_at = time.time()
+            self._callbacks.pop(task.id, None)
+            try:
+                task.result = payload.result()
+            except (CancelledError, TaskCancelled):
+                task.status = BackgroundTask.CANCELLED
+                task.message = "Cancelled"
+                if callbacks.get('cancel'):
+                    callbacks['cancel']()
+            except BaseException as e:
+                task.status = BackgroundTask.FAILED
+                task.error = e
+                task.error_traceback = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+                task.message = str(e)
+                if callbacks.get('error'):
+                    callbacks['error'](e)
+                else:
+                    print(f"Background task '{task.name}' failed:\n{task.error_traceback}")
+            else:
+                task.status = BackgroundTask.DONE
+                task.progress = 1.0
+                if callbacks.get('success'):
+                    callbacks['success'](task.result)
+
+        self._notify(task)
+
+    def _trim_history(self):
+        """Drop the oldest finished tasks beyond history_size."""
+        finished = [task for task in self._tasks if not task.active]
+        for task in finished[:max(0, len(finished) - self.history_size)]:
+            self._tasks.remove(task)
+
+    def add_listener(self, callback: Callable[[BackgroundTask], None]):
+        """Register a main-thread callback invoked whenever a task changes."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[BackgroundTask], None]):
+        """Unregister a listener added with add_listener."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, task: BackgroundTask):
+        for listener in list(self._listeners):
+            try:
+                listener(task)
+            except Exception as e:
+                print(f"Error in task listener: {e}")
+
+    def cancel_all(self):
+        """Request cancellation of every active task."""
+        for task in self.active_tasks:
+            task.cancel()
+
+    def shutdown(self, wait: bool = False):
+        """Cancel outstanding work and stop the worker pools."""
+        self.cancel_all()
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._thread_pool.shutdown(wait=wait, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global task runner shared by the main window, library manager and Plot_3D
+_task_runner = None
+
+
+def get_task_runner(widget=None) -> TaskRunner:
+    """Get the global task runner, creating it on first use.
+
+    Args:
+        widget: Any Tk widget; its root window's event loop receives callbacks.
+                Required on the first call.
+    """
+    global _task_runner
+    if _task_runner is None:
+        if widget is None:
+            raise RuntimeError("get_task_runner() needs a Tk widget on first use")
+        _task_runner = TaskRunner(widget._root())
+    return _task_runner
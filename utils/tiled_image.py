@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Region access to large images for StampZ.
+
+Sheet scans can run to hundreds of megabytes, and decoding one into a PIL
+image, then copying it again for every analysis step, exhausts memory.
+TiledImage reads only the region an operation asks for:
+
+- Uncompressed TIFFs are memory-mapped; a region read touches only the
+  file pages under it.
+- Other files are decoded once. Small images stay in memory; large ones
+  are written to an uncompressed cache in the data directory and mapped
+  from there, so the decoded copy is freed, and opening the same file
+  again maps the cache without decoding.
+
+Regions are returned as 8-bit RGB, matching what the analysis code gets
+from PIL after convert('RGB'): mapped 16-bit RGB samples keep their high
+byte, as PIL's decoder does. 16-bit grayscale is left to PIL, whose
+conversion of it has changed between versions.
+"""
+
+import os
+import threading
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Decoded images larger than this are kept in the on-disk cache, not in memory
+MAX_IN_MEMORY_BYTES = 64 * 1024 * 1024
+
+# Total size of decoded images kept in the cache before the oldest are removed
+MAX_DECODED_CACHE_BYTES = 4 * 1024 * 1024 * 1024
+
+# Rows per strip for whole-image passes and for filling the cache
+STRIP_ROWS = 256
+
+# PIL raw modes that can be memory-mapped: numpy dtype and channel count
+_MAPPABLE_RAWMODES = {
+    'RGB': ('u1', 3),
+    'RGBA': ('u1', 4),
+    'RGBX': ('u1', 4),
+    'L': ('u1', 1),
+    'RGB;16L': ('<u2', 3),
+    'RGB;16B': ('>u2', 3),
+    'RGBA;16L': ('<u2', 4),
+    'RGBA;16B': ('>u2', 4),
+}
+
+_cache_lock = threading.Lock()
+
+
+def _map_uncompressed_tiff(path: str) -> Optional[np.ndarray]:
+    """Memory-map the pixel data of an uncompressed, top-down TIFF.
+
+    Returns:
+        Read-only (height, width, channels) array, or None if the file's
+        pixels aren't stored as one contiguous uncompressed block
+    """
+    with Image.open(path) as image:
+        if image.format != 'TIFF' or not image.tile:
+            return None
+        width, height = image.size
+        tiles = [(codec, extents, offset, args) for codec, extents, offset, args in image.tile]
+
+    rawmode = tiles[0][3][0]
+    if rawmode not in _MAPPABLE_RAWMODES:
+        return None
+    dtype, channels = _MAPPABLE_RAWMODES[rawmode]
+    row_bytes = width * channels * np.dtype(dtype).itemsize
+    start = tiles[0][2]
+    for codec, (left, top, right, bottom), offset, args in tiles:
+        rawmode_, stride, ystep = (tuple(args) + (0, 1))[:3]
+        if (codec != 'raw' or rawmode_ != rawmode or stride not in (0, row_bytes) or ystep != 1
+                or left != 0 or right != width or offset != start + top * row_bytes):
+            return None
+    if tiles[-1][1][3] != height:
+        return None
+    return np.memmap(path, dtype=dtype, mode='r', offset=start, shape=(height, width, channels))
+
+
+def _decoded_cache_dir() -> str:
+    from .path_utils import get_base_data_dir
+    return os.path.join(get_base_data_dir(), 'cache', 'decoded')
+
+
+def _prune_decoded_cache(folder: str, keep: str) -> None:
+    """Remove the least recently used decoded images beyond MAX_DECODED_CACHE_BYTES."""
+    entries = []
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if name.endswith('.npy') and path != keep:
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+    for _, size, path in sorted(entries):
+        if total <= MAX_DECODED_CACHE_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _to_rgb8(pixels: np.ndarray) -> np.ndarray:
+    """(h, w, channels) pixels of any mappable layout as (h, w, 3) uint8 RGB."""
+    if pixels.dtype.itemsize == 2:
+        pixels = (pixels >> 8).astype(np.uint8)
+    if pixels.shape[2] == 1:
+        return np.repeat(pixels, 3, axis=2)
+    return np.ascontiguousarray(pixels[:, :, :3])
+
+
+class TiledImage:
+    """An image whose pixels are read one region at a time.
+
+    Supports the parts of the PIL Image interface the sampling code uses:
+    width, height, size and crop(), plus region() for NumPy access.
+    """
+
+    def __init__(self, pixels: np.ndarray, path: Optional[str] = None, source: str = 'memory'):
+        """Wrap an (height, width, channels) array; use TiledImage.open for files."""
+        self._pixels = pixels
+        self.path = path
+        self.source = source  # 'mapped', 'cache' or 'memory'
+        self.height, self.width = pixels.shape[:2]
+        self.mode = 'RGB'
+
+    @classmethod
+    def open(cls, path: str) -> 'TiledImage':
+        """Open an image file for region access.
+
+        Raises:
+            OSError: If the file can't be read as an image
+        """
+        path = str(path)
+        pixels = _map_uncompressed_tiff(path)
+        if pixels is not None:
+            return cls(pixels, path, 'mapped')
+        return cls._open_decoded(path)
+
+    @classmethod
+    def _open_decoded(cls, path: str) -> 'TiledImage':
+        with Image.open(path) as image:
+            width, height = image.size
+            if width * height * 3 <= MAX_IN_MEMORY_BYTES:
+                return cls(np.asarray(image.convert('RGB')), path, 'memory')
+
+        from .analysis_cache import get_analysis_cache
+        key = get_analysis_cache().image_key(path)
+        folder = _decoded_cache_dir()
+        cache_path = os.path.join(folder, f"{key}.npy")
+        with _cache_lock:
+            if not os.path.exists(cache_path):
+                os.makedirs(folder, exist_ok=True)
+                partial = f"{cache_path}.{os.getpid()}.partial"
+                with Image.open(path) as image:
+                    image.load()
+                    cached = np.lib.format.open_memmap(partial, mode='w+', dtype=np.uint8,
+                                                       shape=(height, width, 3))
+                    for top in range(0, height, STRIP_ROWS):
+                        bottom = min(height, top + STRIP_ROWS)
+                        cached[top:bottom] = np.asarray(image.crop((0, top, width, bottom)).convert('RGB'))
+                    cached.flush()
+                    del cached
+                os.replace(partial, cache_path)
+                _prune_decoded_cache(folder, cache_path)
+            else:
+                os.utime(cache_path)  # Most recently used
+        return cls(np.load(cache_path, mmap_mode='r'), path, 'cache')
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.width, self.height)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (self.height, self.width, 3)
+
+    def region(self, box: Tuple[int, int, int, int]) -> np.ndarray:
+        """8-bit RGB pixels of a (left, top, right, bottom) box, clipped to the image."""
+        left, top, right, bottom = (int(v) for v in box)
+        left, top = max(0, left), max(0, top)
+        right, bottom = min(self.width, right), min(self.height, bottom)
+        if left >= right or top >= bottom:
+            return np.empty((0, 0, 3), dtype=np.uint8)
+        return _to_rgb8(self._pixels[top:bottom, left:right])
+
+    def crop(self, box: Tuple[int, int, int, int]) -> Image.Image:
+        """PIL image of a (left, top, right, bottom) box, clipped to the image."""
+        return Image.fromarray(self.region(box))
+
+    def strips(self, rows: int = STRIP_ROWS) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (top row, RGB pixels) for consecutive full-width strips."""
+        for top in range(0, self.height, rows):
+            yield top, self.region((0, top, self.width, top + rows))
+
+    def close(self) -> None:
+        """Release the mapping; regions already returned stay valid."""
+        self._pixels = np.empty((0, 0, 3), dtype=np.uint8)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
@@ -48,6 +48,13 @@ class SampleAreaPreferences:
     default_anchor: str = "center"  # Default anchor position
 
 
+@dataclass
+class DiagnosticsPreferences:
+    """Preferences for performance diagnostics."""
+    enable_tracing: bool = False  # Record a Chrome trace of hot-path timings
+    enable_profiling: bool = False  # Profile each menu action with cProfile
+
+
 # InterfacePreferences class removed - complexity levels no longer used
 @dataclass 
 class UserPreferences:
@@ -56,6 +63,7 @@ class UserPreferences:
     file_dialog_prefs: FileDialogPreferences
     color_library_prefs: ColorLibraryPreferences
     sample_area_prefs: SampleAreaPreferences
+    diagnostics_prefs: DiagnosticsPreferences
     # interface_prefs removed - complexity levels no longer used
     
     def __init__(self):
@@ -63,6 +71,7 @@ class UserPreferences:
         self.file_dialog_prefs = FileDialogPreferences()
         self.color_library_prefs = ColorLibraryPreferences()
         self.sample_area_prefs = SampleAreaPreferences()
+        self.diagnostics_prefs = DiagnosticsPreferences()
         # self.interface_prefs removed - complexity levels no longer used
 
 
@@ -437,6 +446,42 @@ class PreferencesManager:
             'anchor': self.preferences.sample_area_prefs.default_anchor
         }
     
+    def get_enable_tracing(self) -> bool:
+        """Get whether hot-path tracing is recorded."""
+        return self.preferences.diagnostics_prefs.enable_tracing
+    
+    def set_enable_tracing(self, enabled: bool) -> bool:
+        """Set whether hot-path tracing is recorded.
+        
+        Args:
+            enabled: True to write a Chrome trace to the data directory's traces folder
+        """
+        try:
+            self.preferences.diagnostics_prefs.enable_tracing = enabled
+            self.save_preferences()
+            return True
+        except Exception as e:
+            print(f"Error setting tracing preference: {e}")
+            return False
+    
+    def get_enable_profiling(self) -> bool:
+        """Get whether menu actions are profiled."""
+        return self.preferences.diagnostics_prefs.enable_profiling
+    
+    def set_enable_profiling(self, enabled: bool) -> bool:
+        """Set whether menu actions are profiled.
+        
+        Args:
+            enabled: True to write a cProfile file per action to the data directory's profiles folder
+        """
+        try:
+            self.preferences.diagnostics_prefs.enable_profiling = enabled
+            self.save_preferences()
+            return True
+        except Exception as e:
+            print(f"Error setting profiling preference: {e}")
+            return False
+    
     def get_export_filename(self, sample_set_name: str = None, extension: str = ".ods") -> str:
         """Generate export filename based on preferences."""
         from datetime import datetime
@@ -514,6 +559,14 @@ class PreferencesManager:
                         default_anchor=sample_data.get('default_anchor', 'center')
                     )
                 
+                # Load diagnostics preferences
+                if 'diagnostics_prefs' in data:
+                    diagnostics_data = data['diagnostics_prefs']
+                    self.preferences.diagnostics_prefs = DiagnosticsPreferences(
+                        enable_tracing=diagnostics_data.get('enable_tracing', False),
+                        enable_profiling=diagnostics_data.get('enable_profiling', False)
+                    )
+                
                 # Interface preferences removed - complexity levels no longer used
                 
                 print(f"Loaded preferences from {self.prefs_file}")
@@ -547,6 +600,7 @@ class PreferencesManager:
                 'file_dialog_prefs': asdict(self.preferences.file_dialog_prefs),
                 'color_library_prefs': asdict(self.preferences.color_library_prefs),
                 'sample_area_prefs': asdict(self.preferences.sample_area_prefs),
+                'diagnostics_prefs': asdict(self.preferences.diagnostics_prefs),
                 # 'interface_prefs': removed - complexity levels no longer used
             })
             